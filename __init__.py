@@ -15,15 +15,23 @@ __author__ = "AI Assistant"
 __email__ = "ai@example.com"
 __description__ = "ER Sports Automation Tool with GUI"
 
-# Import các class chính
-from .src.main import ERSportsAutomationGUI, BrowserAutomation
+# Các class chính (import khi dùng tới lần đầu, để chế độ dòng lệnh không cần tkinter)
+_EXPORTS = ('ERSportsAutomationGUI', 'BrowserAutomation', 'AutomationEngine')
 
 # Export các class chính
 __all__ = [
     'ERSportsAutomationGUI',
     'BrowserAutomation',
+    'AutomationEngine',
     '__version__',
     '__author__',
     '__email__',
     '__description__'
 ]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from . import src
+    return getattr(src, name)
@@ -67,10 +67,17 @@ setup(
             'sphinx>=4.0',
             'sphinx-rtd-theme>=1.0',
         ],
+        'watchdog': [
+            'psutil>=5.9',
+        ],
+        'session': [
+            'cryptography>=3.1',
+        ],
     },
     entry_points={
         'console_scripts': [
             'er-sports-automation=er_sports_automation.src.main:main',
+            'er-sports-automation-cli=er_sports_automation.src.cli:main',
         ],
     },
     include_package_data=True,
@@ -4,9 +4,28 @@
 ER Sports Automation Tool - Source Package
 
 Chứa các module chính của ứng dụng automation.
+
+Các class được import khi dùng tới lần đầu, nên `python -m src.cli` (chạy không giao diện)
+không kéo theo tkinter của module GUI.
 """
 
-# Import các class từ main module
-from .main import ERSportsAutomationGUI, BrowserAutomation
+# Tên được export -> module chứa nó
+_EXPORTS = {
+    'ERSportsAutomationGUI': 'main',
+    'BrowserAutomation': 'browser',
+    'OpenVPNManager': 'vpn',
+    'AutomationEngine': 'engine',
+    'RunOptions': 'engine',
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = ['ERSportsAutomationGUI', 'BrowserAutomation']
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,877 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark hiệu năng cho ER Sports Automation Tool
+
+Chạy flow thật (BrowserAutomation + Chrome) với server giả lập standin_server.py
+để đo độ trễ login/purchase mà không chạm vào shop thật.
+
+Cách chạy:
+    python src/benchmark.py purchase --iterations 10 --latency-ms 50 --popup --headless
+    python src/benchmark.py scan --iterations 10 --pages 5 --headless
+    python src/benchmark.py lean --iterations 5 --latency-ms 30 --headless
+    python src/benchmark.py browser --iterations 5 --headless
+    python src/benchmark.py session --iterations 5 --latency-ms 50 --headless
+    python src/benchmark.py cache --iterations 5 --latency-ms 50 --headless
+    python src/benchmark.py log --messages 20000 --burst 500
+    python src/benchmark.py import --products 5000 --tree
+"""
+
+import argparse
+import json
+import sys
+import time
+
+try:
+    from .standin_server import StandInShop, serve_in_thread, listing_path
+    from .stats import percentile
+except ImportError:
+    from standin_server import StandInShop, serve_in_thread, listing_path
+    from stats import percentile
+
+
+def summarize(values):
+    """
+    Tóm tắt độ trễ (giây) thành count/mean/p50/p90/p95/p99/max
+    """
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'mean': round(sum(values) / len(values), 3),
+        'p50': round(percentile(values, 50), 3),
+        'p90': round(percentile(values, 90), 3),
+        'p95': round(percentile(values, 95), 3),
+        'p99': round(percentile(values, 99), 3),
+        'max': round(max(values), 3),
+    }
+
+
+def print_table(title, rows):
+    """
+    In bảng kết quả benchmark dạng text
+
+    Args:
+        title (str): Tiêu đề bảng
+        rows (dict): {tên: summarize(...)}
+    """
+    print(f"\n=== {title} ===")
+    print(f"{'':<12}{'n':>5}{'mean':>9}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for name, stats in rows.items():
+        if not stats.get('count'):
+            print(f"{name:<12}{0:>5}")
+            continue
+        print(f"{name:<12}{stats['count']:>5}" + "".join(
+            f"{stats[key]:>9.3f}" for key in ('mean', 'p50', 'p90', 'p95', 'p99', 'max')))
+
+
+def start_standin(args):
+    """
+    Khởi chạy stand-in server theo tham số dòng lệnh
+
+    Returns:
+        StandInServer: Server đang chạy trong thread nền
+    """
+    shop = StandInShop(pages=args.pages, per_page=args.per_page, product_ids=[args.product],
+                       latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, popup=args.popup,
+                       assets=args.assets, asset_max_age=args.asset_max_age)
+    server = serve_in_thread(shop)
+    print(f"Stand-in server: {server.base_url} (latency={args.latency_ms}ms, pages={args.pages}, "
+          f"popup={'on' if args.popup else 'off'})")
+    return server
+
+
+def run_purchase_benchmark(args):
+    """
+    Đo độ trễ login và purchase trên stand-in server
+
+    Returns:
+        dict: Kết quả benchmark
+    """
+    try:
+        from .browser import BrowserAutomation
+    except ImportError:
+        from browser import BrowserAutomation
+
+    server = start_standin(args)
+    browser = BrowserAutomation(headless=args.headless, chrome_path=args.chrome_path,
+                                base_url=server.base_url,
+                                product_list_url=server.base_url + listing_path())
+    login_times, purchase_times = [], []
+    failures = []
+    try:
+        started = time.perf_counter()
+        if not browser.setup_driver(verbose=False):
+            raise SystemExit("Không thể khởi tạo Chrome")
+        startup = time.perf_counter() - started
+
+        for iteration in range(args.iterations):
+            if browser.is_logged_in:
+                browser.logout()
+
+            started = time.perf_counter()
+            ok = browser.login(args.email, args.password)
+            login_times.append(time.perf_counter() - started)
+            if not ok:
+                failures.append({'iteration': iteration, 'step': 'login'})
+                continue
+
+            started = time.perf_counter()
+            result = browser.purchase_product(None, args.product)
+            purchase_times.append(time.perf_counter() - started)
+            if not result['success']:
+                failures.append({'iteration': iteration, 'step': 'purchase', 'error': result['error']})
+    finally:
+        browser.close()
+        server.shutdown()
+        server.server_close()
+
+    report = {
+        'startup': round(startup, 3),
+        'login': summarize(login_times),
+        'purchase': summarize(purchase_times),
+        'flow_timing': browser.waits.report(),
+        'orders': len(server.shop.orders),
+        'requests': server.shop.request_count,
+        'failures': failures,
+    }
+    print_table("Độ trễ (giây)", {'login': report['login'], 'purchase': report['purchase']})
+    print(f"\nKhởi động Chrome: {report['startup']:.3f}s, đơn hàng: {report['orders']}, "
+          f"request: {report['requests']}, thất bại: {len(failures)}")
+    return report
+
+
+def chrome_cpu_seconds(browser):
+    """
+    Tổng CPU time (giây) của chromedriver và các process Chrome con
+
+    Returns:
+        float: CPU time, None nếu không đọc được process (không có psutil, không phải Linux)
+    """
+    try:
+        from .watchdog import default_processes, tree_usage
+    except ImportError:
+        from watchdog import default_processes, tree_usage
+    processes = default_processes()
+    pid = browser.process_id()
+    if processes is None or pid is None:
+        return None
+    _, cpu, count = tree_usage(processes, pid)
+    return cpu if count else None
+
+
+def run_scan_benchmark(args):
+    """
+    So sánh độ trễ và CPU của quét listing bằng browser và bằng HTTP
+
+    Mỗi lần lặp quét toàn bộ các page (tìm kèm một ID không tồn tại để không dừng sớm).
+
+    Returns:
+        dict: Kết quả theo từng chế độ quét
+    """
+    try:
+        from .browser import BrowserAutomation
+    except ImportError:
+        from browser import BrowserAutomation
+
+    server = start_standin(args)
+    browser = BrowserAutomation(headless=args.headless, chrome_path=args.chrome_path,
+                                base_url=server.base_url,
+                                product_list_url=server.base_url + listing_path())
+    report = {}
+    try:
+        if not browser.setup_driver(verbose=False):
+            raise SystemExit("Không thể khởi tạo Chrome")
+        if not browser.login(args.email, args.password):
+            raise SystemExit("Đăng nhập stand-in server thất bại")
+
+        for mode in args.modes:
+            browser.scan_mode = mode
+            latencies, python_cpu, chrome_cpu = [], [], []
+            found = 0
+            requests_before = server.shop.request_count
+            for _ in range(args.iterations):
+                cpu_started = time.process_time()
+                chrome_started = chrome_cpu_seconds(browser)
+                started = time.perf_counter()
+                index = browser.scan_listing([args.product, 'NOT-LISTED-0000'])
+                latencies.append(time.perf_counter() - started)
+                python_cpu.append(time.process_time() - cpu_started)
+                chrome_finished = chrome_cpu_seconds(browser)
+                if chrome_started is not None and chrome_finished is not None:
+                    chrome_cpu.append(chrome_finished - chrome_started)
+                found += len(index)
+
+            report[mode] = {
+                'latency': summarize(latencies),
+                'python_cpu_mean': round(sum(python_cpu) / len(python_cpu), 3) if python_cpu else None,
+                'chrome_cpu_mean': round(sum(chrome_cpu) / len(chrome_cpu), 3) if chrome_cpu else None,
+                'requests_per_scan': round((server.shop.request_count - requests_before) / max(args.iterations, 1), 1),
+                'found': found,
+            }
+    finally:
+        browser.close()
+        server.shutdown()
+        server.server_close()
+
+    print_table("Quét listing (giây/lần quét)", {mode: result['latency'] for mode, result in report.items()})
+    print(f"\n{'':<12}{'CPU Python':>12}{'CPU Chrome':>12}{'request':>10}")
+    for mode, result in report.items():
+        python_cpu = result['python_cpu_mean']
+        chrome_cpu = result['chrome_cpu_mean']
+        print(f"{mode:<12}{python_cpu if python_cpu is not None else '-':>12}"
+              f"{chrome_cpu if chrome_cpu is not None else '-':>12}{result['requests_per_scan']:>10}")
+    return report
+
+
+def run_lean_benchmark(args):
+    """
+    So sánh thời gian tải trang và byte truyền về khi tắt/bật chế độ lean
+
+    Chạy login + purchase trên stand-in server có tài nguyên tĩnh (ảnh, font, script
+    widget từ host "localhost" đóng vai bên thứ ba).
+
+    Returns:
+        dict: Kết quả theo từng chế độ ('normal', 'lean')
+    """
+    try:
+        from .browser import BrowserAutomation
+        from .lean_mode import LeanProfile, PageLoadStats
+    except ImportError:
+        from browser import BrowserAutomation
+        from lean_mode import LeanProfile, PageLoadStats
+
+    args.assets = True
+    server = start_standin(args)
+    report = {}
+    try:
+        for mode in ('normal', 'lean'):
+            page_stats = PageLoadStats()
+            profile = LeanProfile(blocked_hosts=['localhost']) if mode == 'lean' else None
+            browser = BrowserAutomation(headless=args.headless, chrome_path=args.chrome_path,
+                                        base_url=server.base_url,
+                                        product_list_url=server.base_url + listing_path(),
+                                        lean_profile=profile, page_stats=page_stats)
+            assets_before = server.shop.asset_count
+            purchase_times = []
+            try:
+                if not browser.setup_driver(verbose=False):
+                    raise SystemExit("Không thể khởi tạo Chrome")
+                for _ in range(args.iterations):
+                    if browser.is_logged_in:
+                        browser.logout()
+                    if not browser.login(args.email, args.password):
+                        continue
+                    started = time.perf_counter()
+                    browser.purchase_product(None, args.product)
+                    purchase_times.append(time.perf_counter() - started)
+            finally:
+                browser.close()
+
+            report[mode] = {
+                'purchase': summarize(purchase_times),
+                'page_load': page_stats.report(),
+                'asset_requests': server.shop.asset_count - assets_before,
+            }
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print_table("Purchase (giây)", {mode: result['purchase'] for mode, result in report.items()})
+    print(f"\n{'':<12}{'trang':>8}{'tải TB (ms)':>14}{'byte TB':>12}{'tài nguyên':>12}")
+    for mode, result in report.items():
+        page_load = result['page_load']
+        if not page_load.get('pages'):
+            print(f"{mode:<12}{0:>8}")
+            continue
+        print(f"{mode:<12}{page_load['pages']:>8}{page_load['load_ms_mean']:>14}"
+              f"{page_load['bytes_mean']:>12}{result['asset_requests']:>12}")
+    return report
+
+
+def run_browser_benchmark(args):
+    """
+    So sánh thời gian từ lúc cần browser tới lúc sẵn sàng: mỗi tài khoản một Chrome mới
+    ('cold') và DriverPool dùng lại Chrome đã xóa trạng thái ('pool')
+
+    Mỗi lần lặp giả lập một tài khoản: lấy browser, login, logout, trả browser.
+
+    Returns:
+        dict: Kết quả theo từng chế độ ('cold', 'pool')
+    """
+    try:
+        from .browser import BrowserAutomation
+        from .driver_pool import DriverPool
+    except ImportError:
+        from browser import BrowserAutomation
+        from driver_pool import DriverPool
+
+    server = start_standin(args)
+    report = {}
+    try:
+        for mode in ('cold', 'pool'):
+            pool = DriverPool(lambda: BrowserAutomation(headless=args.headless, chrome_path=args.chrome_path,
+                                                        base_url=server.base_url,
+                                                        product_list_url=server.base_url + listing_path()),
+                              reuse_limit=args.iterations if mode == 'pool' else 0, prewarm=False)
+            ready_times = []
+            login_times = []
+            try:
+                for _ in range(args.iterations):
+                    browser = pool.acquire()
+                    ready_times.append(pool.last_acquire['ready'])
+                    started = time.perf_counter()
+                    if browser.login(args.email, args.password):
+                        login_times.append(time.perf_counter() - started)
+                        browser.logout()
+                    pool.release(browser)
+            finally:
+                pool.close()
+            report[mode] = {'ready': summarize(ready_times), 'login': summarize(login_times),
+                            'launched': pool.stats()['launched']}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print_table("Cần browser -> sẵn sàng (giây)", {mode: result['ready'] for mode, result in report.items()})
+    print_table("Login (giây)", {mode: result['login'] for mode, result in report.items()})
+    for mode, result in report.items():
+        print(f"{mode}: {result['launched']} Chrome đã khởi động")
+    return report
+
+
+def run_session_benchmark(args):
+    """
+    So sánh login sau mỗi lần khởi động lại Chrome: luôn điền form ('form') và nạp cookie
+    đã lưu ('session', chỉ lần đầu điền form)
+
+    Mỗi lần lặp giả lập một lần mở lại app: Chrome mới, login, đóng (không logout để giữ phiên).
+
+    Returns:
+        dict: Kết quả theo từng chế độ ('form', 'session')
+    """
+    import os
+    import tempfile
+    from collections import Counter
+
+    try:
+        from .browser import BrowserAutomation
+        from .session_store import SessionStore, SESSIONS_FILENAME, CRYPTOGRAPHY_AVAILABLE
+    except ImportError:
+        from browser import BrowserAutomation
+        from session_store import SessionStore, SESSIONS_FILENAME, CRYPTOGRAPHY_AVAILABLE
+
+    if not CRYPTOGRAPHY_AVAILABLE:
+        raise SystemExit("Cần cryptography để lưu phiên: pip install cryptography")
+    server = start_standin(args)
+    report = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for mode in ('form', 'session'):
+                store = SessionStore(os.path.join(tmp, SESSIONS_FILENAME)) if mode == 'session' else None
+                login_times = []
+                sources = Counter()
+                for _ in range(args.iterations):
+                    browser = BrowserAutomation(headless=args.headless, chrome_path=args.chrome_path,
+                                                base_url=server.base_url,
+                                                product_list_url=server.base_url + listing_path(),
+                                                session_store=store)
+                    try:
+                        if not browser.setup_driver(verbose=False):
+                            raise SystemExit("Không thể khởi tạo Chrome")
+                        started = time.perf_counter()
+                        if browser.login(args.email, args.password):
+                            login_times.append(time.perf_counter() - started)
+                            sources[browser.last_login_source] += 1
+                    finally:
+                        browser.close()
+                report[mode] = {'login': summarize(login_times), 'sources': dict(sources)}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print_table("Login sau khi khởi động lại Chrome (giây)", {mode: result['login'] for mode, result in report.items()})
+    for mode, result in report.items():
+        print(f"{mode}: {result['sources']}")
+    return report
+
+
+def run_cache_benchmark(args):
+    """
+    So sánh trang đầu của mỗi Chrome mới khởi động: cache trong profile tạm ('off') và cache
+    HTTP trên đĩa dùng chung ('shared')
+
+    Mỗi lần lặp: khởi động Chrome, mở trang chủ (trang đầu) rồi trang listing, đóng Chrome.
+
+    Returns:
+        dict: Kết quả theo từng chế độ ('off', 'shared')
+    """
+    import os
+    import tempfile
+
+    try:
+        from .browser import BrowserAutomation
+        from .disk_cache import DiskCache, CACHE_DIRNAME
+        from .lean_mode import PageLoadStats
+    except ImportError:
+        from browser import BrowserAutomation
+        from disk_cache import DiskCache, CACHE_DIRNAME
+        from lean_mode import PageLoadStats
+
+    server = start_standin(args)
+    report = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for mode in ('off', 'shared'):
+                disk_cache = DiskCache(os.path.join(tmp, CACHE_DIRNAME), slots=1) if mode == 'shared' else None
+                page_stats = PageLoadStats()
+                requests_before = server.shop.asset_count
+                for _ in range(args.iterations):
+                    browser = BrowserAutomation(headless=args.headless, chrome_path=args.chrome_path,
+                                                base_url=server.base_url,
+                                                product_list_url=server.base_url + listing_path(),
+                                                page_stats=page_stats, disk_cache=disk_cache)
+                    try:
+                        if not browser.setup_driver(verbose=False):
+                            raise SystemExit("Không thể khởi tạo Chrome")
+                        browser.navigate(browser.url("/index.html"))
+                        browser.navigate(browser.product_list_url)
+                    finally:
+                        browser.close()
+                report[mode] = dict(page_stats.report(), asset_requests=server.shop.asset_count - requests_before,
+                                    disk_bytes=disk_cache.usage()['bytes'] if disk_cache else None)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print(f"\n{'chế độ':<10}{'trang đầu ms':>14}{'ms TB':>10}{'hit %':>8}{'byte TB':>12}{'request tĩnh':>14}")
+    for mode, result in report.items():
+        hit = result.get('cache_hit_ratio')
+        print(f"{mode:<10}{result.get('first_load_ms_mean') or 0:>14}{result.get('load_ms_mean', 0):>10}"
+              f"{hit if hit is not None else '-':>8}{result.get('bytes_mean', 0):>12}{result['asset_requests']:>14}")
+    return report
+
+
+def legacy_log_pump(source, widgets):
+    """
+    Cách xử lý log queue cũ: lấy hết queue, insert/see từng dòng trên từng widget
+
+    Returns:
+        int: Số entry đã xử lý
+    """
+    import queue
+    import tkinter as tk
+
+    processed = 0
+    try:
+        while True:
+            log_entry, level = source.get_nowait()
+            for widget in widgets:
+                widget.config(state=tk.NORMAL)
+                widget.insert(tk.END, log_entry + "\n")
+                widget.see(tk.END)
+                widget.config(state=tk.DISABLED)
+            processed += 1
+    except queue.Empty:
+        pass
+    return processed
+
+
+def run_log_mode(root, mode, args):
+    """
+    Đẩy một đợt log dồn dập vào queue từ thread nền và đo main loop của Tk
+
+    Args:
+        root: tk.Tk
+        mode (str): 'legacy' (từng dòng, không giới hạn) hoặc 'batched' (LogView)
+        args: Tham số dòng lệnh
+
+    Returns:
+        dict: {'messages', 'elapsed', 'messages_per_s', 'stall_ms_max', 'stall_ms_p95', 'lines_kept'}
+    """
+    import queue
+    import threading
+    import tkinter as tk
+    from tkinter import scrolledtext
+    try:
+        from .log_view import LogView, pump_log_queue, DEFAULT_BATCH_SIZE, POLL_INTERVAL_MS, BACKLOG_INTERVAL_MS
+    except ImportError:
+        from log_view import LogView, pump_log_queue, DEFAULT_BATCH_SIZE, POLL_INTERVAL_MS, BACKLOG_INTERVAL_MS
+
+    heartbeat_ms = 10
+    frame = tk.Frame(root)
+    frame.pack(fill=tk.BOTH, expand=True)
+    widgets = [scrolledtext.ScrolledText(frame, height=15, state=tk.DISABLED) for _ in range(2)]
+    for widget in widgets:
+        widget.pack(fill=tk.BOTH, expand=True)
+    views = [LogView(widgets[0], args.max_lines), LogView(widgets[1], args.max_lines, tagged=False)]
+
+    source = queue.Queue()
+    state = {'processed': 0, 'produced': False, 'last_beat': None, 'stalls': [], 'done': False}
+    levels = ('INFO', 'INFO', 'WARNING', 'SUCCESS', 'ERROR')
+
+    def produce():
+        for start in range(0, args.messages, args.burst):
+            for index in range(start, min(start + args.burst, args.messages)):
+                source.put((f"[2024-01-01 00:00:00] [INFO] Benchmark message {index} " + "x" * 60,
+                            levels[index % len(levels)]))
+            time.sleep(args.burst_interval_ms / 1000.0)
+        state['produced'] = True
+
+    def heartbeat():
+        now = time.perf_counter()
+        if state['last_beat'] is not None:
+            state['stalls'].append(max(0.0, (now - state['last_beat']) * 1000 - heartbeat_ms))
+        state['last_beat'] = now
+        if not state['done']:
+            root.after(heartbeat_ms, heartbeat)
+
+    def pump():
+        if mode == 'legacy':
+            processed = legacy_log_pump(source, widgets)
+            delay = POLL_INTERVAL_MS
+        else:
+            processed = pump_log_queue(source, views, DEFAULT_BATCH_SIZE)
+            delay = BACKLOG_INTERVAL_MS if processed >= DEFAULT_BATCH_SIZE else POLL_INTERVAL_MS
+        state['processed'] += processed
+        if state['produced'] and state['processed'] >= args.messages:
+            state['done'] = True
+            root.quit()
+            return
+        root.after(delay, pump)
+
+    started = time.perf_counter()
+    threading.Thread(target=produce, daemon=True).start()
+    root.after(0, heartbeat)
+    root.after(0, pump)
+    root.mainloop()
+    elapsed = time.perf_counter() - started
+
+    lines_kept = int(widgets[0].index('end-1c').split('.')[0])
+    frame.destroy()
+    return {
+        'messages': state['processed'],
+        'elapsed': round(elapsed, 3),
+        'messages_per_s': round(state['processed'] / elapsed) if elapsed else None,
+        'stall_ms_max': round(max(state['stalls']), 1) if state['stalls'] else 0,
+        'stall_ms_p95': round(percentile(state['stalls'], 95), 1) if state['stalls'] else 0,
+        'lines_kept': lines_kept,
+    }
+
+
+def run_log_benchmark(args):
+    """
+    So sánh cách hiển thị log cũ (từng dòng) và theo lô có giới hạn dòng (cần màn hình cho Tk)
+
+    Returns:
+        dict: Kết quả theo từng chế độ ('legacy', 'batched')
+    """
+    import tkinter as tk
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        raise SystemExit(f"Không mở được cửa sổ Tk: {str(e)}")
+    root.title("Log benchmark")
+    report = {}
+    try:
+        for mode in args.modes:
+            report[mode] = run_log_mode(root, mode, args)
+    finally:
+        root.destroy()
+
+    print(f"\n{'':<12}{'messages':>10}{'msg/s':>10}{'stall max (ms)':>16}{'stall p95 (ms)':>16}{'dòng giữ lại':>14}")
+    for mode, result in report.items():
+        print(f"{mode:<12}{result['messages']:>10}{result['messages_per_s']:>10}{result['stall_ms_max']:>16}"
+              f"{result['stall_ms_p95']:>16}{result['lines_kept']:>14}")
+    return report
+
+
+def write_import_files(directory, count, duplicate_every=10, invalid_every=50):
+    """
+    Tạo file danh sách sản phẩm (JSON, JSONL, CSV) cho benchmark import
+
+    Cứ duplicate_every dòng có một dòng trùng, invalid_every dòng có một dòng không hợp lệ.
+
+    Returns:
+        dict: {định dạng: đường dẫn file}
+    """
+    import os
+    import csv
+
+    records = []
+    for index in range(count):
+        if invalid_every and index % invalid_every == invalid_every - 1:
+            records.append({'name': f"Thiếu ID {index}"})
+        elif duplicate_every and index % duplicate_every == duplicate_every - 1:
+            records.append({'productId': f"P{index - 1:06d}", 'name': f"Sản phẩm {index - 1}"})
+        else:
+            records.append({'productId': f"P{index:06d}", 'name': f"Sản phẩm {index}"})
+
+    paths = {fmt: os.path.join(directory, f"products.{fmt}") for fmt in ('json', 'jsonl', 'csv')}
+    with open(paths['json'], 'w', encoding='utf-8') as f:
+        json.dump(records, f, ensure_ascii=False, indent=2)
+    with open(paths['jsonl'], 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    with open(paths['csv'], 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(('productId', 'name'))
+        for record in records:
+            writer.writerow((record.get('productId', ''), record['name']))
+    return paths
+
+
+def legacy_read_products(filename):
+    """
+    Cách import cũ: json.load cả file rồi lọc phần tử có productId (không bỏ trùng)
+
+    Returns:
+        list: Các tuple (product_id,)
+    """
+    with open(filename, 'r', encoding='utf-8') as f:
+        products = json.load(f)
+    return [(product.get('productId', ''),) for product in products
+            if isinstance(product, dict) and 'productId' in product]
+
+
+def measure_import(read, repeat):
+    """
+    Đo thời gian và bộ nhớ đỉnh (tracemalloc) của một hàm đọc file
+
+    Returns:
+        dict: {'rows', 'ms_best', 'ms_mean', 'peak_kib'}
+    """
+    import tracemalloc
+
+    timings = []
+    rows = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = read()
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    read()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'rows': len(rows),
+        'ms_best': round(min(timings) * 1000, 2),
+        'ms_mean': round(sum(timings) / len(timings) * 1000, 2),
+        'peak_kib': round(peak / 1024),
+    }
+
+
+def run_import_tree(rows, chunk_size):
+    """
+    So sánh chèn vào Treeview: từng dòng kèm get_children() (cách cũ) và ChunkedTreeLoader (cần màn hình)
+
+    Returns:
+        dict: {'legacy': {...}, 'chunked': {...}} với 'ms' tổng và 'stall_ms_max' của main loop
+    """
+    import tkinter as tk
+    from tkinter import ttk
+    try:
+        from .importers import ChunkedTreeLoader
+    except ImportError:
+        from importers import ChunkedTreeLoader
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        raise SystemExit(f"Không mở được cửa sổ Tk: {str(e)}")
+    root.title("Import benchmark")
+    report = {}
+    try:
+        for mode in ('legacy', 'chunked'):
+            tree = ttk.Treeview(root, columns=('ID',), show='headings')
+            tree.pack(fill=tk.BOTH, expand=True)
+            state = {'last_beat': None, 'stalls': [], 'done': False}
+
+            def heartbeat():
+                now = time.perf_counter()
+                if state['last_beat'] is not None:
+                    state['stalls'].append(max(0.0, (now - state['last_beat']) * 1000 - 10))
+                state['last_beat'] = now
+                if not state['done']:
+                    root.after(10, heartbeat)
+
+            def finish(count=None):
+                state['done'] = True
+                root.quit()
+
+            def legacy():
+                for row in rows:
+                    if len(tree.get_children()) < len(rows):
+                        tree.insert('', tk.END, values=row)
+                finish()
+
+            started = time.perf_counter()
+            root.after(0, heartbeat)
+            if mode == 'legacy':
+                root.after(20, legacy)
+            else:
+                root.after(20, lambda: ChunkedTreeLoader(root, tree, rows, chunk_size, on_done=finish).start())
+            root.mainloop()
+            report[mode] = {
+                'rows': len(tree.get_children()),
+                'ms': round((time.perf_counter() - started) * 1000, 1),
+                'stall_ms_max': round(max(state['stalls']), 1) if state['stalls'] else 0,
+            }
+            tree.destroy()
+    finally:
+        root.destroy()
+    return report
+
+
+def run_import_benchmark(args):
+    """
+    Đo thời gian import danh sách sản phẩm lớn: đọc file (cũ và theo luồng) và nạp vào Treeview
+
+    Returns:
+        dict: {'parse': {chế độ: kết quả}, 'tree': {...} nếu có --tree}
+    """
+    import tempfile
+    try:
+        from .importers import read_products, DEFAULT_CHUNK_SIZE
+    except ImportError:
+        from importers import read_products, DEFAULT_CHUNK_SIZE
+
+    limit = args.limit or None
+    report = {'products': args.products, 'parse': {}}
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_import_files(directory, args.products)
+        report['parse']['legacy-json'] = measure_import(lambda: legacy_read_products(paths['json']), args.repeat)
+        for fmt, path in paths.items():
+            report['parse'][f"stream-{fmt}"] = measure_import(
+                lambda path=path: read_products(path, limit=limit).rows, args.repeat)
+        rows = read_products(paths['json'], limit=limit).rows
+
+    print(f"\n=== Import {args.products} sản phẩm ===")
+    print(f"{'':<14}{'rows':>8}{'best (ms)':>12}{'mean (ms)':>12}{'peak (KiB)':>12}")
+    for mode, result in report['parse'].items():
+        print(f"{mode:<14}{result['rows']:>8}{result['ms_best']:>12}{result['ms_mean']:>12}{result['peak_kib']:>12}")
+
+    if args.tree:
+        report['tree'] = run_import_tree(rows, args.chunk_size or DEFAULT_CHUNK_SIZE)
+        print(f"\n{'':<14}{'rows':>8}{'total (ms)':>12}{'stall max (ms)':>16}")
+        for mode, result in report['tree'].items():
+            print(f"{mode:<14}{result['rows']:>8}{result['ms']:>12}{result['stall_ms_max']:>16}")
+    return report
+
+
+def add_standin_arguments(parser):
+    """
+    Thêm các tham số điều chỉnh stand-in server
+    """
+    parser.add_argument('--pages', type=int, default=3, help="Số trang listing")
+    parser.add_argument('--per-page', type=int, default=48, help="Số sản phẩm mỗi trang")
+    parser.add_argument('--product', default='MEZZ', help="Product ID cần mua")
+    parser.add_argument('--latency-ms', type=int, default=0, help="Độ trễ mỗi request (ms)")
+    parser.add_argument('--jitter-ms', type=int, default=0, help="Độ trễ ngẫu nhiên thêm (ms)")
+    parser.add_argument('--popup', action='store_true', help="Chèn popup WorldShopping")
+    parser.add_argument('--assets', action='store_true', help="Chèn ảnh, web font và script widget bên thứ ba")
+    parser.add_argument('--asset-max-age', type=int, default=0,
+                        help="Cache-Control max-age (giây) của tài nguyên tĩnh, 0 = không cache")
+
+
+def add_browser_arguments(parser):
+    """
+    Thêm các tham số cho browser
+    """
+    parser.add_argument('--headless', action='store_true', help="Chạy Chrome ở chế độ headless")
+    parser.add_argument('--chrome-path', default=None, help="Đường dẫn Chrome")
+
+
+def main(argv=None):
+    """
+    Entry point dòng lệnh của benchmark
+    """
+    parser = argparse.ArgumentParser(description="Benchmark ER Sports Automation với server giả lập")
+    parser.add_argument('--output', default=None, help="Ghi kết quả JSON ra file")
+    subparsers = parser.add_subparsers(dest='command')
+
+    purchase = subparsers.add_parser('purchase', help="Độ trễ login/purchase (cần Chrome)")
+    add_standin_arguments(purchase)
+    add_browser_arguments(purchase)
+    purchase.add_argument('--iterations', type=int, default=5, help="Số lần lặp login + purchase")
+    purchase.add_argument('--email', default='bench@example.com')
+    purchase.add_argument('--password', default='benchmark')
+    purchase.set_defaults(func=run_purchase_benchmark)
+
+    scan = subparsers.add_parser('scan', help="So sánh quét listing bằng browser và HTTP (cần Chrome)")
+    add_standin_arguments(scan)
+    add_browser_arguments(scan)
+    scan.add_argument('--iterations', type=int, default=5, help="Số lần quét mỗi chế độ")
+    scan.add_argument('--modes', nargs='+', default=['browser', 'http'], choices=['browser', 'http'],
+                      help="Các chế độ quét cần đo")
+    scan.add_argument('--email', default='bench@example.com')
+    scan.add_argument('--password', default='benchmark')
+    scan.set_defaults(func=run_scan_benchmark)
+
+    lean = subparsers.add_parser('lean', help="So sánh tải trang khi tắt/bật chế độ lean (cần Chrome)")
+    add_standin_arguments(lean)
+    add_browser_arguments(lean)
+    lean.add_argument('--iterations', type=int, default=3, help="Số lần login + purchase mỗi chế độ")
+    lean.add_argument('--email', default='bench@example.com')
+    lean.add_argument('--password', default='benchmark')
+    lean.set_defaults(func=run_lean_benchmark)
+
+    browsers = subparsers.add_parser('browser', help="So sánh khởi động Chrome mới và dùng lại qua DriverPool "
+                                                     "(cần Chrome)")
+    add_standin_arguments(browsers)
+    add_browser_arguments(browsers)
+    browsers.add_argument('--iterations', type=int, default=5, help="Số tài khoản giả lập mỗi chế độ")
+    browsers.add_argument('--email', default='bench@example.com')
+    browsers.add_argument('--password', default='benchmark')
+    browsers.set_defaults(func=run_browser_benchmark)
+
+    session = subparsers.add_parser('session', help="So sánh login bằng form và bằng cookie đã lưu sau khi "
+                                                    "khởi động lại Chrome (cần Chrome, cryptography)")
+    add_standin_arguments(session)
+    add_browser_arguments(session)
+    session.add_argument('--iterations', type=int, default=5, help="Số lần khởi động lại mỗi chế độ")
+    session.add_argument('--email', default='bench@example.com')
+    session.add_argument('--password', default='benchmark')
+    session.set_defaults(func=run_session_benchmark)
+
+    cache = subparsers.add_parser('cache', help="So sánh trang đầu của Chrome mới khi tắt/bật cache HTTP "
+                                                "dùng chung (cần Chrome)")
+    add_standin_arguments(cache)
+    add_browser_arguments(cache)
+    cache.add_argument('--iterations', type=int, default=5, help="Số lần khởi động Chrome mỗi chế độ")
+    # Tài nguyên tĩnh có Cache-Control như shop thật (nếu không thì không có gì để cache)
+    cache.set_defaults(func=run_cache_benchmark, assets=True, asset_max_age=3600)
+
+    log = subparsers.add_parser('log', help="Đo hiển thị log trong GUI khi log dồn dập (cần màn hình)")
+    log.add_argument('--messages', type=int, default=20000, help="Tổng số dòng log")
+    log.add_argument('--burst', type=int, default=500, help="Số dòng mỗi đợt")
+    log.add_argument('--burst-interval-ms', type=int, default=20, help="Khoảng cách giữa các đợt (ms)")
+    log.add_argument('--max-lines', type=int, default=5000, help="Giới hạn dòng của LogView")
+    log.add_argument('--modes', nargs='+', default=['legacy', 'batched'], choices=['legacy', 'batched'],
+                     help="Các chế độ cần đo")
+    log.set_defaults(func=run_log_benchmark)
+
+    imports = subparsers.add_parser('import', help="Đo import danh sách sản phẩm lớn (--tree cần màn hình)")
+    imports.add_argument('--products', type=int, default=5000, help="Số dòng trong file")
+    imports.add_argument('--limit', type=int, default=0, help="Giới hạn số sản phẩm (0 = không giới hạn)")
+    imports.add_argument('--repeat', type=int, default=5, help="Số lần đọc mỗi định dạng")
+    imports.add_argument('--tree', action='store_true', help="Đo thêm chèn vào Treeview")
+    imports.add_argument('--chunk-size', type=int, default=0, help="Số dòng mỗi khối (0 = mặc định)")
+    imports.set_defaults(func=run_import_benchmark)
+
+    args = parser.parse_args(argv)
+    if not getattr(args, 'func', None):
+        parser.print_help()
+        return 1
+
+    report = args.func(args)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Đã ghi kết quả ra {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Điều khiển Chrome (Selenium) cho er-sports.com: đăng nhập, quét listing, mua hàng
+
+Không import tkinter, dùng chung cho GUI (main.py) và chế độ dòng lệnh (cli.py).
+"""
+
+import re
+import time
+import importlib.util
+from datetime import datetime
+from urllib.parse import urljoin, urlsplit
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException, NoSuchElementException
+
+try:
+    from .waits import WaitEngine
+    from .popups import install_popup_guard, suppress_popups
+    from .tracing import Tracer, RoundTripCounter
+    from .listing import extract_listing, find_product, normalize_text, ListingIndex
+    from .http_listing import HttpListingFetcher
+    from .lean_mode import collect_page_metrics
+    from .config_loader import AppConfig, BASE_URL, PRODUCT_LIST_URL
+    from .driver_cache import find_chrome, find_chromedriver, shared_cache
+    from .session_store import cdp_cookie
+except ImportError:
+    from waits import WaitEngine
+    from popups import install_popup_guard, suppress_popups
+    from tracing import Tracer, RoundTripCounter
+    from listing import extract_listing, find_product, normalize_text, ListingIndex
+    from http_listing import HttpListingFetcher
+    from lean_mode import collect_page_metrics
+    from config_loader import AppConfig, BASE_URL, PRODUCT_LIST_URL
+    from driver_cache import find_chrome, find_chromedriver, shared_cache
+    from session_store import cdp_cookie
+
+# webdriver-manager (tải ChromeDriver tự động) chỉ được import khi driver_cache cần tải
+WEBDRIVER_MANAGER_AVAILABLE = importlib.util.find_spec('webdriver_manager') is not None
+
+
+class BrowserAutomation:
+    """
+    Class quản lý automation browser cho er-sports.com
+    Sử dụng Selenium WebDriver để điều khiển Chrome browser
+    """
+
+    def __init__(self, headless=False, chrome_path=None, flow_stats=None, tracer=None,
+                 base_url=None, product_list_url=None, product_cache=None, scan_mode='browser',
+                 lean_profile=None, page_stats=None, config=None, driver_cache=None, session_store=None,
+                 disk_cache=None):
+        """
+        Khởi tạo browser automation
+
+        Args:
+            headless (bool): Chạy browser ở chế độ ẩn (True) hoặc hiện (False)
+            chrome_path (str): Đường dẫn đến Chrome executable
+            flow_stats (FlowStats): Bộ đo thời gian chờ/làm việc dùng chung (tùy chọn)
+            tracer (Tracer): Bộ ghi span dùng chung cho cả phiên (tùy chọn)
+            base_url (str): URL gốc của shop (mặc định BASE_URL, dùng để trỏ sang server giả lập)
+            product_list_url (str): URL trang listing (mặc định PRODUCT_LIST_URL trên base_url)
+            product_cache (ProductCache): Cache product ID -> URL chi tiết dùng chung (tùy chọn)
+            scan_mode (str): Cách quét listing: 'browser' (render trong Chrome) hoặc
+                'http' (tải trực tiếp bằng cookie của phiên Chrome)
+            lean_profile (LeanProfile): Chặn ảnh/font/media/host bên thứ ba (None = tải đầy đủ)
+            page_stats (PageLoadStats): Ghi thời gian tải trang và byte truyền về (tùy chọn)
+            config (AppConfig): Cấu hình từ config.json (timeout, page load strategy, kích thước cửa sổ)
+            driver_cache (DriverCache): Manifest Chrome/ChromeDriver dùng chung (mặc định cache
+                trong bộ nhớ của process)
+            session_store (SessionStore): Cookie phiên đã lưu theo tài khoản (None = luôn login bằng form)
+            disk_cache (DiskCache): Thư mục cache HTTP dùng chung giữa các Chrome (None = cache trong profile tạm)
+        """
+        self.driver = None
+        self.headless = headless
+        self.chrome_path = chrome_path
+        self.is_logged_in = False
+        self.config = config if config is not None else AppConfig()
+        self.driver_cache = driver_cache if driver_cache is not None else shared_cache()
+        self.last_driver_setup = None
+
+        self.base_url = (base_url or BASE_URL).rstrip('/')
+        if product_list_url:
+            self.product_list_url = product_list_url
+        elif base_url:
+            # Giữ nguyên path + query của listing, chỉ đổi host
+            listing = urlsplit(PRODUCT_LIST_URL)
+            self.product_list_url = f"{self.base_url}{listing.path}?{listing.query}"
+        else:
+            self.product_list_url = PRODUCT_LIST_URL
+
+        # Mọi bước chờ đều đi qua wait engine (thay cho time.sleep cố định)
+        self.waits = WaitEngine(flow_stats=flow_stats, timeouts=self.config.wait_timeouts(),
+                                page_load_strategy=self.config.browser.page_load_strategy)
+        self._last_navigation = 0.0
+        self.last_login_timing = None
+
+        # Phiên đăng nhập đã lưu (bỏ qua form login nếu cookie còn hiệu lực)
+        self.session_store = session_store
+        self.session_email = None  # Tài khoản đang đăng nhập (xóa phiên đã lưu khi đăng xuất)
+        self.last_login_source = None  # 'session' (cookie đã lưu) hoặc 'form'
+
+        # Cache URL trang chi tiết theo product ID (bỏ qua quét listing khi đã biết)
+        self.product_cache = product_cache
+
+        # Quét listing qua HTTP (scan_mode='http'), Chrome chỉ dùng cho chi tiết/giỏ hàng/checkout
+        self.scan_mode = scan_mode
+        self.http_listing = None
+
+        # Chế độ lean (chặn tài nguyên không cần thiết) và số liệu tải trang
+        self.lean_profile = lean_profile
+        self.page_stats = page_stats
+
+        # Cache HTTP trên đĩa dùng chung (slot giữ từ lúc khởi động tới lúc đóng Chrome)
+        self.disk_cache = disk_cache
+        self._cache_slot = None
+        self._first_page = False  # Trang kế tiếp là trang đầu của Chrome vừa khởi động
+
+        # Span thời gian theo từng bước của login/purchase
+        self.tracer = tracer if tracer is not None else Tracer()
+        self.round_trips = RoundTripCounter()  # Đếm lệnh WebDriver để theo dõi số round trip
+        self.last_login_spans = None
+
+    def navigate(self, url):
+        """
+        Mở URL qua wait engine và ghi thời gian tải/byte của trang (nếu có page_stats)
+
+        Giữ khoảng cách tối thiểu timing.delay_between_actions giữa hai lần mở trang
+        (chỉ ngủ phần còn thiếu, 0 = không giới hạn).
+
+        Args:
+            url (str): URL cần mở
+        """
+        min_interval = self.config.timing.delay_between_actions
+        if min_interval > 0:
+            remaining = self._last_navigation + min_interval - time.monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
+        self.waits.navigate(url)
+        self._last_navigation = time.monotonic()
+        if self.page_stats is not None:
+            self.page_stats.record(collect_page_metrics(self.driver), first=self._first_page)
+        self._first_page = False
+
+    def url(self, path):
+        """
+        Ghép URL tuyệt đối trên shop hiện tại
+
+        Args:
+            path (str): Đường dẫn tương đối hoặc tuyệt đối (href lấy từ trang)
+
+        Returns:
+            str: URL đầy đủ
+        """
+        return urljoin(self.base_url + '/', path)
+
+    def close_popups(self, verbose=False):
+        """
+        Đóng các popup và overlay có thể che các element cần click
+
+        Toàn bộ việc ẩn popup được thực hiện bởi một script inject vào trang
+        (một round trip WebDriver). Script cài MutationObserver nên popup xuất
+        hiện lại sau đó cũng bị ẩn ngay, các lần gọi sau chỉ đọc bộ đếm.
+
+        Args:
+            verbose (bool): Nếu True, in log chi tiết
+
+        Returns:
+            int: Số node popup/overlay bị vô hiệu hóa trong lần gọi này
+        """
+        try:
+            neutralised = suppress_popups(self.driver)
+        except Exception as e:
+            if verbose:
+                print(f"[close_popups] Không thể chạy script ẩn popup: {str(e)}")
+            return 0
+
+        if verbose:
+            print(f"[close_popups] ✓ Đã vô hiệu hóa {neutralised} popup/overlay")
+        return neutralised
+
+    @staticmethod
+    def find_chrome_executable():
+        """
+        Tìm đường dẫn Chrome executable (Windows, macOS, lệnh trong PATH)
+
+        Returns:
+            str: Đường dẫn đến Chrome hoặc None nếu không tìm thấy
+        """
+        return find_chrome()
+
+    @staticmethod
+    def find_chromedriver_executable():
+        """
+        Tìm đường dẫn ChromeDriver executable
+
+        Returns:
+            str: Đường dẫn đến ChromeDriver hoặc None nếu không tìm thấy
+        """
+        return find_chromedriver()
+
+    def _apply_config_options(self, chrome_options):
+        """
+        Áp dụng page load strategy, kích thước cửa sổ và chế độ lean vào ChromeOptions
+
+        Args:
+            chrome_options: selenium.webdriver.chrome.options.Options
+        """
+        chrome_options.page_load_strategy = self.config.browser.page_load_strategy
+        window = self.config.browser.window_size
+        chrome_options.add_argument(f"--window-size={window.width},{window.height}")
+        if self.lean_profile:
+            self.lean_profile.apply_options(chrome_options)
+        if self._cache_slot is not None:
+            for argument in self._cache_slot.chrome_arguments():
+                chrome_options.add_argument(argument)
+
+    def _configure_driver(self):
+        """
+        Gắn driver vừa tạo vào wait engine, bộ đếm round trip, popup guard, chế độ lean
+        và đặt page load timeout theo cấu hình
+        """
+        self.waits.bind(self.driver)
+        self.round_trips.attach(self.driver)
+        install_popup_guard(self.driver)
+        if self.lean_profile:
+            self.lean_profile.install(self.driver)
+        try:
+            self.driver.set_page_load_timeout(self.config.timing.page_load_timeout)
+        except Exception:
+            pass
+
+    def _start_driver(self, resolution, chrome_options, verbose=True):
+        """
+        Tạo WebDriver với ChromeDriver đã resolve và ghi lại thời gian
+
+        Args:
+            resolution (DriverResolution): Chrome/ChromeDriver từ driver_cache
+            chrome_options: selenium.webdriver.chrome.options.Options
+        """
+        # Đường dẫn ChromeDriver cụ thể: selenium không phải tự tìm (Selenium Manager có thể cần mạng)
+        service = Service(resolution.driver_path) if resolution.driver_path else Service()
+        started = time.perf_counter()
+        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        self._configure_driver()
+        self._first_page = True
+
+        # Ẩn dấu hiệu automation
+        self.driver.execute_script(
+            "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+        )
+        self.last_driver_setup = {
+            'resolve': resolution.elapsed,
+            'create': time.perf_counter() - started,
+            'cached': resolution.cached,
+            'source': resolution.source,
+            'chrome_version': resolution.chrome_version,
+            'driver_version': resolution.driver_version,
+        }
+        if verbose:
+            origin = 'cache' if resolution.cached else 'tìm mới'
+            print(f"[driver] Khởi tạo Chrome {self.last_driver_setup['create']:.2f}s "
+                  f"(tìm ChromeDriver {resolution.elapsed * 1000:.0f} ms, {origin})")
+
+    def setup_driver(self, verbose=True):
+        """
+        Khởi tạo Chrome WebDriver
+
+        Chrome/ChromeDriver lấy từ driver_cache (manifest), nên chỉ lần đầu (hoặc khi Chrome đổi
+        phiên bản) mới phải tìm/tải ChromeDriver. Nếu Chrome từ chối ChromeDriver trong cache thì
+        xóa entry, tìm lại một lần và thử với cài đặt mặc định.
+
+        Returns:
+            bool: True nếu khởi tạo thành công
+        """
+        resolution = self.driver_cache.resolve(self.chrome_path)
+        if self.disk_cache is not None and self._cache_slot is None:
+            self._cache_slot = self.disk_cache.acquire()
+            if verbose and self._cache_slot is None:
+                print("[driver] Mọi thư mục cache HTTP dùng chung đang bận, dùng cache của profile tạm")
+        if verbose:
+            print(f"[driver] {resolution.describe()}")
+            if not resolution.driver_path and not WEBDRIVER_MANAGER_AVAILABLE:
+                print("⚠️  Không tìm thấy ChromeDriver!")
+                print("💡 Để tự động tải ChromeDriver, vui lòng cài đặt:")
+                print("   pip install webdriver-manager")
+                print("   Hoặc tải ChromeDriver thủ công từ: https://chromedriver.chromium.org/")
+                print("Đang thử sử dụng ChromeDriver mặc định từ selenium...")
+        try:
+            chrome_options = Options()
+            chrome_options.add_argument("--lang=en-US")
+            chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+            chrome_options.add_experimental_option("useAutomationExtension", False)
+
+            # Nếu bạn tick Headless thì dùng headless mới
+            if self.headless:
+                chrome_options.add_argument("--headless=new")
+
+            self._apply_config_options(chrome_options)
+
+            if resolution.chrome_path:
+                chrome_options.binary_location = resolution.chrome_path
+            elif verbose:
+                print("Không tìm thấy Chrome, sẽ sử dụng Chrome mặc định trong PATH")
+
+            self._start_driver(resolution, chrome_options, verbose)
+            return True
+        except Exception as e:
+            error_msg = f"Lỗi khởi tạo browser: {str(e)}"
+            if verbose:
+                print(error_msg)
+                print("Đang thử sử dụng Chrome và ChromeDriver mặc định...")
+
+            try:
+                # ChromeDriver trong cache có thể không còn khớp Chrome: tìm lại một lần
+                if resolution.cached:
+                    self.driver_cache.invalidate(resolution)
+                    resolution = self.driver_cache.resolve(self.chrome_path, force=True)
+                    if verbose:
+                        print(f"[driver] Tìm lại: {resolution.describe()}")
+
+                # Thử với cài đặt mặc định
+                chrome_options = Options()
+                chrome_options.add_argument("--lang=en-US")
+                chrome_options.add_argument("--no-sandbox")
+                chrome_options.add_argument("--disable-dev-shm-usage")
+
+                if self.headless:
+                    chrome_options.add_argument("--headless=new")
+
+                self._apply_config_options(chrome_options)
+
+                self._start_driver(resolution, chrome_options, verbose)
+                if verbose:
+                    print("Khởi tạo browser thành công với cài đặt mặc định")
+                return True
+            except Exception as e2:
+                self._release_cache_slot()
+                if verbose:
+                    print(f"Lỗi khởi tạo browser với cài đặt mặc định: {str(e2)}")
+                    if "chromedriver" in str(e2).lower():
+                        print("\n⚠️  LỖI: Không tìm thấy ChromeDriver!")
+                        print("💡 Giải pháp:")
+                        print("   1. Cài đặt webdriver-manager: pip install webdriver-manager")
+                        print("   2. Hoặc tải ChromeDriver thủ công từ: https://chromedriver.chromium.org/")
+                        print("   3. Đặt ChromeDriver vào PATH hoặc cùng thư mục với script")
+                return False
+
+    def login(self, email, password):
+        """
+        Đăng nhập vào tài khoản er-sports.com
+
+        Args:
+            email (str): Email đăng nhập
+            password (str): Mật khẩu
+
+        Returns:
+            bool: True nếu đăng nhập thành công, False nếu thất bại
+        """
+        self.last_login_source = None
+        with self.tracer.span('login') as span:
+            with self.waits.flow('login') as timing:
+                self.last_login_timing = timing
+                logged_in = self._login(email, password)
+        self.last_login_spans = self.tracer.breakdown(span)
+        return logged_in
+
+    def _login(self, email, password):
+        """
+        Thực hiện flow đăng nhập (được đo thời gian bởi login())
+        """
+        print(f"[login] Bắt đầu đăng nhập với email: {email}")
+
+        try:
+            if not self.driver:
+                self.tracer.step('setup_driver')
+                print("[login] Driver chưa khởi tạo, đang thiết lập...")
+                if not self.setup_driver():
+                    print("[login] ✗ Không thể khởi tạo driver")
+                    return False
+                print("[login] ✓ Driver đã được khởi tạo")
+
+            # Phiên đã lưu: nạp cookie trước khi mở trang chủ, thấy link logout là đã đăng nhập
+            restored = self._restore_session(email)
+
+            # Truy cập trang chủ
+            self.tracer.step('open_home')
+            print("[login] Đang truy cập trang chủ...")
+            self.navigate(self.url("/index.html"))
+            print("[login] ✓ Đã tải trang chủ")
+
+            if restored:
+                if self.driver.find_elements(By.CSS_SELECTOR, 'a[href*="logout"]'):
+                    print("[login] ✓✓✓ Đăng nhập bằng phiên đã lưu, bỏ qua form")
+                    self.is_logged_in = True
+                    self.session_email = email
+                    self.last_login_source = 'session'
+                    return True
+                # Trang chủ đã tải: đăng nhập bằng form luôn, không tải lại
+                print("[login] Phiên đã lưu hết hạn, đăng nhập bằng form")
+                self.session_store.forget(email)
+
+            # Đóng popup WorldShopping nếu có (xuất hiện lần đầu vào website)
+            print("[login] Đang đóng popup...")
+            self.close_popups(verbose=True)
+
+            # Gọi trực tiếp hàm JavaScript để mở form login
+            self.tracer.step('open_form')
+            print("[login] Đang gọi hàm ssl_login('login') để mở form...")
+            try:
+                self.driver.execute_script("ssl_login('login');")
+                print("[login] ✓ Đã gọi ssl_login('login')")
+            except Exception as e:
+                print(f"[login] Không thể gọi ssl_login trực tiếp: {str(e)}")
+                # Fallback: click link
+                print("[login] Thử click link đăng nhập...")
+                login_link = self.waits.clickable('#header ul li a[href="javascript:ssl_login(\'login\')"]')
+                login_link.click()
+                print("[login] ✓ Đã click vào link đăng nhập")
+
+            # Đợi form login xuất hiện
+            print("[login] Đang đợi form login xuất hiện...")
+            try:
+                # Đợi cho đến khi có input với name="id"
+                self.waits.element('input[name="id"]')
+                print("[login] ✓ Form login đã xuất hiện")
+            except TimeoutException:
+                print("[login] ✗ Timeout đợi form xuất hiện")
+
+            # Popup có thể tự hiện lại sau khi mở form - guard trong trang sẽ tự ẩn
+            print("[login] Kiểm tra popup sau khi mở form...")
+            self.close_popups(verbose=True)
+
+            # Điền thông tin đăng nhập - thử nhiều selector
+            self.tracer.step('fill_form')
+            print("[login] Đang tìm ô nhập email...")
+
+            # Thử nhiều selector khác nhau cho email input
+            email_input = None
+            email_selectors = [
+                'table.loginform input[name="id"]',
+                'input[name="id"]',
+                'input[type="text"]',
+                'input[type="email"]',
+                'table.loginform input[type="text"]'
+            ]
+
+            for selector in email_selectors:
+                try:
+                    print(f"[login] Thử tìm email với selector: {selector}")
+                    email_input = self.waits.element(selector, timeout=self.waits.timeouts['probe'])
+                    print(f"[login] ✓ Tìm thấy ô email với selector: {selector}")
+                    break
+                except TimeoutException:
+                    continue
+
+            if not email_input:
+                print("[login] ✗ Không tìm thấy ô email với bất kỳ selector nào")
+                print("[login] Đang chụp màn hình và lưu HTML để debug...")
+                try:
+                    self.driver.save_screenshot('debug_login_not_found.png')
+                    print("[login] Đã lưu screenshot: debug_login_not_found.png")
+                except Exception as e:
+                    print(f"[login] Không thể chụp màn hình: {str(e)}")
+                try:
+                    with open('debug_login_page.html', 'w', encoding='utf-8') as f:
+                        f.write(self.driver.page_source)
+                    print("[login] Đã lưu HTML: debug_login_page.html")
+                except Exception as e:
+                    print(f"[login] Không thể lưu HTML: {str(e)}")
+                raise Exception("Không tìm thấy ô nhập email")
+
+            # Scroll đến element
+            print("[login] Đang scroll đến ô email...")
+            self.driver.execute_script("arguments[0].scrollIntoView(true);", email_input)
+
+            # Thử điền bằng JavaScript để tránh bị che
+            print("[login] Đang điền email bằng JavaScript...")
+            try:
+                self.driver.execute_script(
+                    "arguments[0].value = arguments[1]; arguments[0].dispatchEvent(new Event('input'));",
+                    email_input, email)
+                print("[login] ✓ Đã điền email bằng JavaScript")
+            except Exception as e:
+                print(f"[login] Lỗi JS, thử clear thông thường: {str(e)}")
+                email_input.clear()
+                email_input.send_keys(email)
+                print("[login] ✓ Đã điền email bằng cách thông thường")
+
+            # Điền password
+            print("[login] Đang điền password...")
+            password_input = self.driver.find_element(By.CSS_SELECTOR, 'table.loginform input[name="passwd"]')
+
+            # Scroll đến password field
+            self.driver.execute_script("arguments[0].scrollIntoView(true);", password_input)
+
+            # Thử điền bằng JavaScript
+            try:
+                self.driver.execute_script(
+                    "arguments[0].value = arguments[1]; arguments[0].dispatchEvent(new Event('input'));",
+                    password_input, password)
+                print("[login] ✓ Đã điền password bằng JavaScript")
+            except Exception as e:
+                print(f"[login] Lỗi JS, thử cách thông thường: {str(e)}")
+                password_input.clear()
+                password_input.send_keys(password)
+                print("[login] ✓ Đã điền password bằng cách thông thường")
+
+            # Đóng popup lại một lần nữa trước khi submit (popup có thể xuất hiện lại)
+            print("[login] Đóng popup lần cuối trước khi submit...")
+            self.close_popups(verbose=True)
+
+            # Click nút đăng nhập
+            self.tracer.step('submit')
+            print("[login] Đang tìm nút đăng nhập...")
+            login_button = self.driver.find_element(By.CSS_SELECTOR,
+                                                    'div.btn input[onclick="javascript:login_check();"]')
+            print("[login] ✓ Tìm thấy nút đăng nhập, đang click...")
+
+            # Sử dụng JavaScript click để tránh popup che button
+            try:
+                self.driver.execute_script("arguments[0].click();", login_button)
+                print("[login] ✓ Đã click nút đăng nhập bằng JavaScript")
+            except Exception as e:
+                print(f"[login] Không thể click bằng JS: {str(e)}, thử click thường...")
+                login_button.click()
+                print("[login] ✓ Đã click nút đăng nhập bằng click thường")
+
+            # Đợi form submit xong: form cũ bị gỡ khỏi DOM rồi trang mới sẵn sàng
+            self.waits.optional(self.waits.staleness, login_button)
+            self.waits.optional(self.waits.document_ready)
+            self.tracer.step('verify')
+            print("[login] Đang kiểm tra kết quả đăng nhập...")
+
+            # Kiểm tra đăng nhập thành công
+            try:
+                # Kiểm tra xem có xuất hiện link đăng xuất không
+                self.waits.element('a[href*="logout"]', timeout=self.waits.timeouts['probe'])
+                print("[login] ✓✓✓ Đăng nhập THÀNH CÔNG!")
+                self.is_logged_in = True
+                self.session_email = email
+                self.last_login_source = 'form'
+                self._save_session(email)
+                return True
+            except TimeoutException:
+                print("[login] ✗ Không tìm thấy link logout")
+                # Kiểm tra xem có thông báo lỗi không
+                try:
+                    error_message = self.driver.find_element(By.CSS_SELECTOR, '.error, .alert, .warning')
+                    print(f"[login] ✗ Lỗi đăng nhập: {error_message.text}")
+                except NoSuchElementException:
+                    print("[login] ✗ Không thể xác định trạng thái đăng nhập")
+                print("[login] ✗✗✗ Đăng nhập THẤT BẠI!")
+                return False
+
+        except TimeoutException as e:
+            print(f"[login] ✗✗✗ TIMEOUT khi đăng nhập: {str(e)}")
+            return False
+        except Exception as e:
+            print(f"[login] ✗✗✗ LỖI đăng nhập: {str(e)}")
+            import traceback
+            print(f"[login] Traceback: {traceback.format_exc()}")
+            return False
+
+    def _session_enabled(self):
+        return self.session_store is not None and self.config.browser.session.enabled
+
+    def _restore_session(self, email):
+        """
+        Nạp cookie đã lưu của tài khoản vào Chrome (qua CDP, chưa cần mở trang)
+
+        Args:
+            email (str): Email tài khoản
+
+        Returns:
+            bool: True nếu đã nạp cookie (cần kiểm tra link logout sau khi mở trang)
+        """
+        if not self._session_enabled():
+            return False
+        cookies = self.session_store.load(email, max_age=self.config.browser.session.max_age_hours * 3600)
+        if not cookies:
+            return False
+        self.tracer.step('restore_session')
+        try:
+            self.driver.execute_cdp_cmd('Network.setCookies',
+                                        {'cookies': [cdp_cookie(cookie, self.base_url) for cookie in cookies]})
+        except Exception as e:
+            print(f"[login] Không nạp được phiên đã lưu: {str(e)}")
+            return False
+        print(f"[login] Đã nạp {len(cookies)} cookie của phiên đã lưu")
+        return True
+
+    def _save_session(self, email):
+        """
+        Lưu cookie của shop sau khi login bằng form (mã hóa trong sessions.json)
+
+        Args:
+            email (str): Email tài khoản
+        """
+        if not self._session_enabled():
+            return
+        try:
+            cookies = self.driver.get_cookies()
+        except Exception as e:
+            print(f"[login] Không đọc được cookie để lưu phiên: {str(e)}")
+            return
+        self.session_store.save(email, cookies, max_age=self.config.browser.session.max_age_hours * 3600)
+
+    def _sync_http_listing(self):
+        """
+        Chuẩn bị session HTTP cho scan_mode='http' (chép cookie mới nhất từ Chrome)
+
+        Returns:
+            bool: True nếu dùng được HTTP để quét listing
+        """
+        if self.scan_mode != 'http' or not self.driver:
+            return False
+        try:
+            if self.http_listing is None:
+                self.http_listing = HttpListingFetcher()
+            self.http_listing.sync_from_driver(self.driver)
+            return True
+        except Exception as e:
+            print(f"[scan] Không chép được cookie sang HTTP, quét bằng browser: {str(e)}")
+            return False
+
+    def _load_listing(self, listing_url, use_http=False):
+        """
+        Tải một trang listing và lấy danh sách sản phẩm
+
+        Args:
+            listing_url (str): URL trang listing
+            use_http (bool): Tải qua HTTP thay vì render trong Chrome
+
+        Returns:
+            tuple: (list các (tên, href), (text, href) của link kế tiếp hoặc None)
+        """
+        if use_http:
+            try:
+                return self.http_listing.fetch(listing_url)
+            except Exception as e:
+                print(f"[scan] Lỗi HTTP khi tải listing, chuyển sang browser: {str(e)}")
+        self.navigate(listing_url)
+        self.close_popups()
+        return extract_listing(self.driver)
+
+    def scan_listing(self, product_ids, product_url=None, max_pages=5):
+        """
+        Quét listing một lần và dựng chỉ mục cho toàn bộ product ID
+
+        Dừng sớm khi đã tìm thấy mọi product ID hoặc hết trang kế tiếp.
+
+        Args:
+            product_ids (list): Các product ID cần tìm
+            product_url (str): URL trang listing đầu tiên (None = self.product_list_url)
+            max_pages (int): Số page tối đa
+
+        Returns:
+            ListingIndex: Chỉ mục product ID -> {'name', 'url', 'page'}
+        """
+        index = ListingIndex(product_ids)
+        listing_url = product_url or self.product_list_url
+        seen_urls = set()
+        use_http = self._sync_http_listing()
+
+        with self.tracer.span('listing_scan', products=len(index.matcher.product_ids), mode=self.scan_mode):
+            page = 1
+            while listing_url and page <= max_pages and listing_url not in seen_urls:
+                seen_urls.add(listing_url)
+                page_mark = self.round_trips.mark()
+                with self.tracer.span('listing_page', page=page):
+                    try:
+                        items, next_link = self._load_listing(listing_url, use_http)
+                    except Exception as e:
+                        print(f"[scan] Lỗi khi quét page {page}: {str(e)}")
+                        break
+                    with self.tracer.span('product_match', candidates=len(items)):
+                        added = index.add_page(items, page)
+                print(f"[scan] Page {page}: {len(items)} sản phẩm, {added} ID mới, "
+                      f"{self.round_trips.since(page_mark)} round trip WebDriver")
+
+                if index.complete or not next_link or not next_link[1]:
+                    break
+                listing_url = self.url(next_link[1])
+                page_match = re.search(r'page=(\d+)', listing_url)
+                page = int(page_match.group(1)) if page_match and int(page_match.group(1)) > page else page + 1
+
+        print(f"[scan] Tìm thấy {len(index)}/{len(index.matcher.product_ids)} product ID sau "
+              f"{index.pages_scanned} page")
+        if use_http:
+            stats = self.http_listing.stats()
+            print(f"[scan] HTTP: {stats['requests']} request, {stats['bytes']} byte, "
+                  f"{stats['not_modified']} trang 304, {stats['unchanged']} trang không đổi, "
+                  f"{stats['parsed']} trang phải phân tích")
+        return index
+
+    def purchase_product(self, product_url, product_id, detail_url=None):
+        """
+        Mua sản phẩm bằng cách quét từng page trong listing, tìm sản phẩm có chứa product_id trong tên
+
+        Args:
+            product_url (str): URL của trang listing đầu tiên (None = self.product_list_url)
+            product_id (str): ID của sản phẩm cần tìm (tìm trong tên sản phẩm)
+            detail_url (str): URL trang chi tiết đã biết (từ scan_listing), bỏ qua bước quét listing
+
+        Returns:
+            dict: Kết quả mua hàng với thông tin chi tiết
+        """
+        result = {
+            'success': False,
+            'error': None,
+            'error_class': None,
+            'product_id': product_id,
+            'timestamp': datetime.now().isoformat()
+        }
+
+        with self.tracer.span('purchase', product_id=product_id) as span:
+            with self.waits.flow('purchase') as timing:
+                result['timing'] = timing
+                self._purchase_product(result, product_url or self.product_list_url, product_id, detail_url)
+        result['spans'] = self.tracer.breakdown(span)
+
+        return result
+
+    def _purchase_product(self, result, start_url, product_id, detail_url=None):
+        """
+        Thực hiện flow mua hàng (được đo thời gian bởi purchase_product())
+
+        Args:
+            result (dict): Dict kết quả sẽ được cập nhật tại chỗ
+            start_url (str): URL trang listing đầu tiên
+            product_id (str): ID của sản phẩm cần tìm
+            detail_url (str): URL trang chi tiết đã biết (None = quét listing)
+
+        Returns:
+            dict: Chính dict result
+        """
+        try:
+            if not self.is_logged_in:
+                result['error'] = "Chưa đăng nhập"
+                return result
+
+            # Xóa giỏ hàng trước
+            self.tracer.step('basket_clear')
+            print(f"[purchase] Xóa giỏ hàng trước khi mua sản phẩm {product_id}")
+            self.navigate(self.url("/shop/basket.html"))
+            self.close_popups()
+
+            try:
+                clear_button = self.driver.find_element(By.CSS_SELECTOR,
+                                                        '.btn-wrap-back a[href*="basket_clear"]')
+                try:
+                    self.driver.execute_script("arguments[0].click();", clear_button)
+                except:
+                    clear_button.click()
+                # Chấp nhận hộp thoại xác nhận rồi đợi giỏ hàng tải lại
+                alert = self.waits.optional(self.waits.alert)
+                if alert:
+                    alert.accept()
+                    self.waits.optional(self.waits.staleness, clear_button)
+                    self.waits.optional(self.waits.document_ready)
+            except NoSuchElementException:
+                pass  # Giỏ hàng đã trống
+
+            # Xác định URL trang chi tiết: chỉ mục listing -> cache -> quét listing
+            max_pages_to_scan = 5  # Giới hạn số page để tránh vòng lặp vô hạn
+            source = 'listing'
+            found_page = None
+            if detail_url:
+                product_detail_url, source = self.url(detail_url), 'index'
+            else:
+                cached = self.product_cache.get(product_id) if self.product_cache else None
+                if cached:
+                    product_detail_url, source = cached['url'], 'cache'
+                    print(f"[purchase] Cache hit: {product_id} -> {product_detail_url}")
+                else:
+                    product_detail_url, found_page = self._find_on_listing(start_url, product_id, max_pages_to_scan)
+
+            # Nếu không tìm thấy sản phẩm sau khi quét hết
+            if not product_detail_url:
+                result['error'] = f"Không tìm thấy sản phẩm có ID {product_id} sau khi quét {max_pages_to_scan} pages"
+                return result
+
+            # Đã tìm thấy sản phẩm, vào trang chi tiết
+            self.tracer.step('detail_page', source=source)
+            print(f"[purchase] Vào trang chi tiết sản phẩm: {product_detail_url}")
+            self.navigate(product_detail_url)
+            self.close_popups()
+
+            # Trang chi tiết 404 hoặc không còn chứa product ID -> bỏ URL đã biết
+            if not self._detail_has_product(product_id):
+                if self.product_cache and self.product_cache.invalidate(product_id):
+                    print(f"[purchase] Xóa cache của {product_id}: trang chi tiết không còn hợp lệ")
+                if source == 'listing':
+                    result['error'] = f"Trang chi tiết không chứa sản phẩm có ID {product_id}"
+                    return result
+
+                # URL lấy từ cache/chỉ mục đã cũ, quét lại listing
+                product_detail_url, found_page = self._find_on_listing(start_url, product_id, max_pages_to_scan)
+                if not product_detail_url:
+                    result['error'] = f"Không tìm thấy sản phẩm có ID {product_id} sau khi quét {max_pages_to_scan} pages"
+                    return result
+                source = 'listing'
+                self.tracer.step('detail_page', source=source)
+                print(f"[purchase] Vào trang chi tiết sản phẩm: {product_detail_url}")
+                self.navigate(product_detail_url)
+                self.close_popups()
+                if not self._detail_has_product(product_id):
+                    result['error'] = f"Trang chi tiết không chứa sản phẩm có ID {product_id}"
+                    return result
+
+            if self.product_cache:
+                self.product_cache.put(product_id, product_detail_url, found_page)
+
+            # Tìm và click nút "カートへ入れる" (thêm vào giỏ hàng)
+            self.tracer.step('add_to_cart')
+            print(f"[purchase] Tìm nút thêm vào giỏ hàng...")
+            try:
+                add_to_cart_button = self.waits.clickable(
+                    '.item-basket-btn a.btn-basket, a[href*="JavaScript:send"][class*="btn-basket"]'
+                )
+
+                print(f"[purchase] Tìm thấy nút thêm vào giỏ hàng, đang click...")
+                try:
+                    self.driver.execute_script("arguments[0].click();", add_to_cart_button)
+                    print(f"[purchase] ✓ Đã click nút thêm vào giỏ hàng bằng JavaScript")
+                except:
+                    add_to_cart_button.click()
+                    print(f"[purchase] ✓ Đã click nút thêm vào giỏ hàng bằng click thường")
+
+                # Đợi cho đến khi URL thay đổi hoặc có dấu hiệu chuyển trang
+                try:
+                    self.waits.until(
+                        'url_change',
+                        lambda d: "basket.html" in d.current_url or d.current_url != product_detail_url
+                    )
+                    print(f"[purchase] ✓ URL đã thay đổi, đang chuyển sang giỏ hàng...")
+                except TimeoutException:
+                    print(f"[purchase] Cảnh báo: URL chưa thay đổi sau khi click, nhưng vẫn tiếp tục...")
+                    # Thử navigate trực tiếp nếu cần
+                    if "basket.html" not in self.driver.current_url:
+                        print(f"[purchase] Tự động chuyển sang trang giỏ hàng...")
+                        self.navigate(self.url("/shop/basket.html"))
+            except TimeoutException:
+                result['error'] = "Không tìm thấy nút thêm vào giỏ hàng"
+                return result
+
+            # Đợi chuyển sang trang giỏ hàng
+            self.tracer.step('basket_verify')
+            print(f"[purchase] Đợi chuyển sang trang giỏ hàng...")
+            self.waits.url_contains("basket.html")
+            # Đợi trang load hoàn toàn
+            self.waits.optional(self.waits.document_ready)
+            self.close_popups()
+
+            # Đợi cho đến khi trang basket load xong (kiểm tra xem có table.basket không)
+            try:
+                self.waits.element('table.basket, .basket-wrap')
+            except TimeoutException:
+                print(f"[purchase] Cảnh báo: Không tìm thấy bảng giỏ hàng sau khi đợi")
+
+            # Kiểm tra trong giỏ hàng có sản phẩm hay không
+            print(f"[purchase] Kiểm tra giỏ hàng...")
+
+            # Kiểm tra xem có thông báo "giỏ hàng trống" không
+            page_source = self.driver.page_source
+            is_empty = "買い物かごに商品がありません" in page_source or "カートに商品がありません" in page_source
+
+            if is_empty:
+                result['error'] = "Giỏ hàng trống, sản phẩm không được thêm vào"
+                print(f"[purchase] ✗ Giỏ hàng trống")
+                return result
+
+            print(f"[purchase] ✓ Giỏ hàng có sản phẩm (không trống)")
+
+            # Thử đếm số sản phẩm (nhưng không bắt buộc phải chính xác)
+            try:
+                # Tìm các hàng sản phẩm trong table.basket (loại trừ header và message trống)
+                cart_rows = self.driver.find_elements(By.CSS_SELECTOR,
+                                                      'table.basket tbody tr')
+
+                # Lọc các hàng có sản phẩm (không phải header, không phải message trống)
+                actual_items = []
+                for row in cart_rows:
+                    try:
+                        row_text = row.text.strip()
+                        # Loại trừ header và message trống
+                        if (row_text and
+                                "商品情報" not in row_text and
+                                "数量" not in row_text and
+                                "買い物かごに商品がありません" not in row_text and
+                                "カートに商品がありません" not in row_text):
+                            # Kiểm tra xem có input amount hoặc link sản phẩm không
+                            has_amount_input = row.find_elements(By.CSS_SELECTOR,
+                                                                 'input[type="text"][name*="amount"], input[type="number"][name*="amount"]')
+                            has_product_link = row.find_elements(By.CSS_SELECTOR, 'a[href*="shopdetail"]')
+                            if has_amount_input or has_product_link:
+                                actual_items.append(row)
+                    except:
+                        pass
+
+                item_count = len(actual_items)
+                print(f"[purchase] Số sản phẩm trong giỏ hàng (ước tính): {item_count}")
+
+                # Nếu đếm được ít nhất 1 sản phẩm, tiếp tục
+                # Nếu đếm được 0 nhưng đã kiểm tra không trống ở trên (is_empty = False),
+                # vẫn tiếp tục (có thể selector không đúng, nhưng có sản phẩm trong giỏ hàng)
+                if item_count == 0:
+                    print(f"[purchase] Cảnh báo: Không đếm được sản phẩm, nhưng giỏ hàng không trống, vẫn tiếp tục...")
+            except Exception as e:
+                print(f"[purchase] Cảnh báo: Không thể đếm sản phẩm: {str(e)}, nhưng vẫn tiếp tục...")
+
+            # Tìm và click nút "購入手続きへ進む"
+            self.tracer.step('checkout')
+            print(f"[purchase] Tìm nút checkout...")
+            try:
+                try:
+                    checkout_button = self.waits.clickable(
+                        '.btn-wrap-order a[href*="sslorder"], a.btn[href*="sslorder"], .btn-wrap-order a.btn'
+                    )
+                except TimeoutException:
+                    # Thử tìm bằng text
+                    try:
+                        checkout_button = self.waits.clickable('//a[contains(text(), "購入手続きへ進む")]',
+                                                               timeout=self.waits.timeouts['probe'], by=By.XPATH)
+                    except TimeoutException:
+                        result['error'] = "Không tìm thấy nút checkout"
+                        return result
+
+                # Kiểm tra xem nút có bị disable không (nếu disable, có thể là giỏ hàng trống)
+                button_href = checkout_button.get_attribute('href')
+                if button_href and 'alert' in button_href.lower():
+                    result['error'] = "Nút checkout bị disable, giỏ hàng có thể trống"
+                    return result
+
+                print(f"[purchase] Tìm thấy nút checkout, đang click...")
+                try:
+                    self.driver.execute_script("arguments[0].click();", checkout_button)
+                except:
+                    checkout_button.click()
+
+                print(f"[purchase] ✓ Đã click nút checkout")
+
+            except TimeoutException as e:
+                result['error'] = f"Không tìm thấy nút checkout: {str(e)}"
+                result['error_class'] = type(e).__name__
+                return result
+            except Exception as e:
+                result['error'] = f"Lỗi khi xử lý nút checkout: {str(e)}"
+                result['error_class'] = type(e).__name__
+                return result
+
+            # Đợi chuyển sang trang checkout (có thể là step02 hoặc trang khác)
+            print(f"[purchase] Đợi chuyển sang trang checkout...")
+            self.waits.url_contains("checkout", "order")
+            self.waits.optional(self.waits.document_ready)
+            self.close_popups()
+
+            # Tìm và click nút xác nhận đơn hàng "注文を確定する"
+            self.tracer.step('confirm')
+            print(f"[purchase] Tìm nút xác nhận đơn hàng...")
+            try:
+                confirm_button = self.waits.clickable(
+                    'input[name="checkout"][type="button"], input.checkout-confirm[type="button"], '
+                    'input[value*="注文を確定"], input[value*="確定"]',
+                    timeout=self.waits.timeouts['page_load']
+                )
+
+                print(f"[purchase] Tìm thấy nút xác nhận, đang click...")
+                try:
+                    self.driver.execute_script("arguments[0].click();", confirm_button)
+                except:
+                    confirm_button.click()
+
+                print(f"[purchase] ✓ Đã click nút xác nhận đơn hàng")
+            except TimeoutException:
+                result['error'] = "Không tìm thấy nút xác nhận đơn hàng"
+                return result
+
+            # Đợi trang xác nhận chuyển sang trang kết quả
+            self.waits.optional(self.waits.staleness, confirm_button)
+            self.waits.optional(self.waits.document_ready)
+
+            # Kiểm tra thông báo thành công "ご注文ありがとうございました"
+            print(f"[purchase] Kiểm tra kết quả đặt hàng...")
+            page_source = self.driver.page_source
+
+            if "ご注文ありがとうございました" in page_source:
+                print(f"[purchase] ✓✓✓ Đặt hàng THÀNH CÔNG!")
+                result['success'] = True
+            else:
+                result['error'] = "Không tìm thấy thông báo đặt hàng thành công"
+                print(f"[purchase] ✗ Đặt hàng thất bại")
+
+        except Exception as e:
+            result['error'] = f"Lỗi không xác định: {str(e)}"
+            result['error_class'] = type(e).__name__
+            print(f"[purchase] ✗ Lỗi: {str(e)}")
+            import traceback
+            print(f"[purchase] Traceback: {traceback.format_exc()}")
+
+        return result
+
+    def _find_on_listing(self, start_url, product_id, max_pages_to_scan=5):
+        """
+        Quét listing từng page để tìm sản phẩm có product_id trong tên
+
+        Args:
+            start_url (str): URL trang listing đầu tiên
+            product_id (str): ID của sản phẩm cần tìm
+            max_pages_to_scan (int): Giới hạn số lần quét page
+
+        Returns:
+            tuple: (URL trang chi tiết, số page) hoặc (None, None) nếu không tìm thấy
+        """
+        # Bắt đầu quét từ page đầu tiên
+        listing_url = start_url
+        current_page = 1
+        total_scans = 0  # Đếm tổng số lần quét để tránh vòng lặp vô hạn khi refresh
+        product_found = False
+        product_detail_url = None
+        use_http = self._sync_http_listing()
+
+        while not product_found and current_page <= max_pages_to_scan and total_scans < max_pages_to_scan:
+            total_scans += 1
+            self.tracer.step('listing_page', page=current_page)
+            print(f"[purchase] Quét page {current_page} để tìm sản phẩm {product_id} (Lần quét: {total_scans}/{max_pages_to_scan})")
+
+            # Truy cập trang listing
+            page_mark = self.round_trips.mark()
+            if current_page == 1:
+                listing_url = start_url
+
+            # Lấy toàn bộ tên/href sản phẩm và link trang kế tiếp (một round trip hoặc một request HTTP)
+            try:
+                items, next_link = self._load_listing(listing_url, use_http)
+                print(f"[purchase] Tìm thấy {len(items)} sản phẩm trong page {current_page}")
+
+                with self.tracer.span('product_match', candidates=len(items)):
+                    match = find_product(items, product_id)
+                if match:
+                    print(f"[purchase] ✓ Tìm thấy sản phẩm: {match[0]}")
+                    product_found = True
+                    product_detail_url = self.url(match[1])
+                print(f"[purchase] Page {current_page}: {self.round_trips.since(page_mark)} round trip WebDriver")
+
+                # Nếu không tìm thấy trong page này, dùng link "次の48件" trong li.next
+                if not product_found:
+                    if next_link is None:
+                        print(f"[purchase] Không tìm thấy link chuyển trang tiếp theo")
+                        # Nếu không tìm thấy link next và đã quét hết, F5 và quét lại từ đầu
+                        print(f"[purchase] Quét hết page, refresh và quét lại từ đầu")
+                        if not use_http:
+                            self.driver.refresh()
+                            self.waits.optional(self.waits.document_ready)
+                            self.close_popups()
+                        current_page = 1
+                        listing_url = start_url
+                        continue
+
+                    next_text, next_href = next_link
+                    # Kiểm tra xem có phải link "次の48件" không
+                    if "次の" in next_text or "»" in next_text:
+                        if next_href:
+                            # Chuẩn hóa URL
+                            next_href = self.url(next_href)
+
+                            # Trích xuất số page từ URL
+                            page_match = re.search(r'page=(\d+)', next_href)
+                            if page_match:
+                                next_page_num = int(page_match.group(1))
+                                if next_page_num > current_page:
+                                    current_page = next_page_num
+                                    listing_url = next_href
+                                    print(f"[purchase] Chuyển sang page {current_page}")
+                                    continue
+                    else:
+                        # Không tìm thấy link next hợp lệ, thử tăng page number
+                        current_page += 1
+                        if current_page <= max_pages_to_scan:
+                            separator = "&" if "?" in listing_url else "?"
+                            if "page=" not in listing_url:
+                                listing_url = f"{listing_url}{separator}page={current_page}"
+                            else:
+                                listing_url = re.sub(r'page=\d+', f'page={current_page}', listing_url)
+                            continue
+
+            except Exception as e:
+                print(f"[purchase] Lỗi khi quét sản phẩm: {str(e)}")
+                # Nếu có lỗi, refresh và thử lại từ đầu
+                if not use_http:
+                    self.driver.refresh()
+                    self.waits.optional(self.waits.document_ready)
+                    self.close_popups()
+                current_page = 1
+                listing_url = start_url
+                continue
+
+        return (product_detail_url, current_page) if product_found else (None, None)
+
+    def _detail_has_product(self, product_id):
+        """
+        Kiểm tra trang chi tiết hiện tại còn hợp lệ (không phải 404 và có chứa product ID)
+
+        Args:
+            product_id (str): ID sản phẩm
+
+        Returns:
+            bool: True nếu trang chứa product ID (hoặc không đọc được trang)
+        """
+        try:
+            title, text = self.driver.execute_script(
+                "return [document.title || '', document.body ? document.body.innerText : ''];")
+        except Exception:
+            return True  # Không đọc được trang thì để bước thêm vào giỏ hàng tự báo lỗi
+        if title.strip() == '404' or 'not found' in title.lower():
+            return False
+        return normalize_text(product_id).strip() in normalize_text(f"{title}\n{text}")
+
+    def logout(self):
+        """
+        Đăng xuất khỏi tài khoản
+        """
+        try:
+            if not self.driver or not self.is_logged_in:
+                return True
+
+            # Truy cập trang đăng xuất; phiên phía server đã hết nên xóa cả cookie đã lưu
+            self.navigate(self.url("/shop/logout.html"))
+            if self.session_store is not None and self.session_email:
+                self.session_store.forget(self.session_email)
+
+            self.is_logged_in = False
+            self.session_email = None
+            return True
+
+        except Exception as e:
+            print(f"Lỗi khi đăng xuất: {str(e)}")
+            return False
+
+    def reset(self):
+        """
+        Xóa trạng thái phiên (cookie, storage, tab phụ) để dùng lại Chrome cho tài khoản khác
+
+        Cookie xóa cho mọi domain, storage (localStorage, sessionStorage, IndexedDB, service worker)
+        xóa cho origin của shop, qua CDP nên không cần tải trang. Cache HTTP được giữ lại.
+
+        Returns:
+            bool: True nếu đã xóa xong; False thì nên đóng browser thay vì dùng lại
+        """
+        if self.http_listing:
+            self.http_listing.close()
+            self.http_listing = None
+        self.is_logged_in = False
+        self.session_email = None
+        if not self.driver:
+            return False
+        try:
+            handles = self.driver.window_handles
+            for handle in handles[1:]:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            self.driver.switch_to.window(handles[0])
+            self.driver.get("about:blank")
+            origin = "{0.scheme}://{0.netloc}".format(urlsplit(self.base_url))
+            self.driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            self.driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+            return True
+        except Exception as e:
+            print(f"[reset] Không xóa được trạng thái browser: {str(e)}")
+            return False
+
+    def process_id(self):
+        """
+        PID của process ChromeDriver (gốc của cây process Chrome)
+
+        Returns:
+            int: PID, None nếu chưa có driver
+        """
+        process = getattr(getattr(self.driver, 'service', None), 'process', None)
+        return process.pid if process is not None else None
+
+    def close(self):
+        """
+        Đóng browser
+
+        Nếu quit() lỗi (Chrome treo, mất kết nối) thì dừng hẳn process ChromeDriver,
+        không để process nào của lần chạy còn sót lại.
+        """
+        if self.http_listing:
+            self.http_listing.close()
+            self.http_listing = None
+        if self.driver:
+            service = getattr(self.driver, 'service', None)
+            try:
+                self.driver.quit()
+            except Exception as e:
+                print(f"Lỗi khi đóng browser: {str(e)}")
+            finally:
+                self.driver = None
+                self.is_logged_in = False
+                self._stop_service(service)
+        # Chrome đã thoát: slot cache dùng được cho Chrome khác
+        self._release_cache_slot()
+
+    def _release_cache_slot(self):
+        if self._cache_slot is not None:
+            self.disk_cache.release(self._cache_slot)
+            self._cache_slot = None
+
+    @staticmethod
+    def _stop_service(service):
+        """
+        Kill process ChromeDriver nếu vẫn còn chạy sau quit()
+
+        Args:
+            service: selenium Service của driver đã đóng
+        """
+        process = getattr(service, 'process', None)
+        if process is None or process.poll() is not None:
+            return
+        try:
+            service.stop()
+            process.wait(5)
+        except Exception:
+            try:
+                process.kill()
+                process.wait(5)
+            except Exception as e:
+                print(f"Lỗi khi dừng ChromeDriver (pid {process.pid}): {str(e)}")
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chạy automation không cần giao diện (không import tkinter), dùng cho server không có màn hình
+
+Đọc tài khoản, sản phẩm và tùy chọn từ settings.json (cùng định dạng GUI lưu), chạy
+AutomationEngine ở thread riêng và in tiến trình ra stdout: dạng chữ, hoặc JSON Lines với
+--jsonl (mỗi event một dòng, cùng định dạng logs/events.jsonl). SIGTERM/SIGINT dừng engine
+(đóng browser, ngắt VPN), ghi nốt trạng thái, lịch sử và log rồi thoát với mã 0, nên chạy
+được dưới process supervisor (systemd, supervisord...).
+
+Cách chạy:
+    python -m src.cli run --config src/config/settings.json --headless
+    python src/cli.py run --config settings.json --jsonl
+
+Mã thoát: 0 = xong hoặc dừng theo yêu cầu, 1 = lỗi trong automation, 2 = cấu hình sai.
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from dataclasses import replace
+
+try:
+    from .config_loader import ConfigError, PAGE_LOAD_STRATEGIES, load_config
+    from .lean_mode import LeanProfile
+    from .log_setup import setup_queue_logging, stop_queue_logging
+    from .events import EventLog, EVENTS_FILENAME, format_event
+    from .history import HistoryStore, HISTORY_FILENAME
+    from .product_cache import ProductCache
+    from .driver_cache import DriverCache, MANIFEST_FILENAME
+    from .watchdog import ProcessRegistry, PIDS_FILENAME
+    from .session_store import SessionStore, SESSIONS_FILENAME
+    from .disk_cache import create_disk_cache
+    from .settings_store import DebouncedWriter, STATE_FILENAME, read_json
+    from .importers import collect_rows, normalize_account, normalize_product
+    from .engine import AutomationEngine, RunOptions
+except ImportError:
+    from config_loader import ConfigError, PAGE_LOAD_STRATEGIES, load_config
+    from lean_mode import LeanProfile
+    from log_setup import setup_queue_logging, stop_queue_logging
+    from events import EventLog, EVENTS_FILENAME, format_event
+    from history import HistoryStore, HISTORY_FILENAME
+    from product_cache import ProductCache
+    from driver_cache import DriverCache, MANIFEST_FILENAME
+    from watchdog import ProcessRegistry, PIDS_FILENAME
+    from session_store import SessionStore, SESSIONS_FILENAME
+    from disk_cache import create_disk_cache
+    from settings_store import DebouncedWriter, STATE_FILENAME, read_json
+    from importers import collect_rows, normalize_account, normalize_product
+    from engine import AutomationEngine, RunOptions
+
+# Chu kỳ main thread kiểm tra yêu cầu dừng (giây)
+POLL_INTERVAL = 0.2
+
+# Thời gian chờ thread automation kết thúc sau khi dừng (giây)
+DEFAULT_STOP_TIMEOUT = 30
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_CONFIG = 2
+
+
+def load_run_settings(path):
+    """
+    Đọc settings.json: tài khoản, sản phẩm (đã kiểm tra và bỏ trùng) và các tùy chọn
+
+    Args:
+        path (str): File settings.json
+
+    Returns:
+        tuple: (accounts, products, settings)
+
+    Raises:
+        ConfigError: Không đọc được file hoặc không phải JSON object
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            settings = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ConfigError(f"Không đọc được {path}: {str(e)}")
+    if not isinstance(settings, dict):
+        raise ConfigError(f"{path}: cần một JSON object")
+    accounts = collect_rows(settings.get('accounts') or [], normalize_account)
+    products = collect_rows(settings.get('products') or [], normalize_product)
+    return ([{'email': email, 'password': password} for email, password in accounts.rows],
+            [{'productId': product_id} for product_id, in products.rows],
+            settings)
+
+
+def build_options(settings, app_config, headless=None):
+    """
+    Tùy chọn chạy từ settings.json (giá trị GUI đã lưu) và config.json
+
+    Args:
+        settings (dict): Nội dung settings.json
+        app_config (AppConfig): Cấu hình từ config.json
+        headless (bool): Ghi đè headless (None = theo settings/config.json)
+
+    Returns:
+        RunOptions: Tùy chọn
+    """
+    browser = app_config.browser
+    strategy = settings.get('page_load_strategy')
+    if strategy in PAGE_LOAD_STRATEGIES:
+        browser = replace(browser, page_load_strategy=strategy)
+
+    lean_profile = None
+    if settings.get('lean_mode', browser.lean_mode.enabled):
+        lean = browser.lean_mode
+        hosts = settings.get('lean_blocked_hosts', lean.blocked_hosts)
+        lean_profile = LeanProfile(block_images=lean.block_images, block_fonts=lean.block_fonts,
+                                   block_media=lean.block_media,
+                                   blocked_hosts=list(hosts) if hosts is not None else None,
+                                   allowed_hosts=lean.allowed_hosts)
+
+    openvpn_configs = ()
+    if settings.get('enable_openvpn'):
+        openvpn_configs = tuple(path for path in settings.get('openvpn_configs', []) if os.path.exists(path))
+
+    return RunOptions(
+        headless=headless if headless is not None else settings.get('headless', browser.headless),
+        chrome_path=settings.get('chrome_path') or browser.chrome_path or None,
+        scan_mode=settings.get('scan_mode', 'browser'),
+        lean_profile=lean_profile,
+        browser_config=replace(app_config, browser=browser),
+        account_delay=settings.get('account_delay', app_config.timing.delay_between_accounts),
+        product_delay=settings.get('product_delay', app_config.timing.delay_between_products),
+        openvpn_path=settings.get('openvpn_path') or None,
+        openvpn_configs=openvpn_configs,
+        openvpn_mode=settings.get('openvpn_mode', 'sequential'),
+    )
+
+
+class ConsoleReporter:
+    """
+    In log/event ra stdout (chữ hoặc JSON Lines) và ghi vào file log/event log
+    """
+
+    def __init__(self, stream=None, jsonl=False, event_log=None, clock=time.time):
+        """
+        Args:
+            stream: Nơi in tiến trình (mặc định sys.stdout)
+            jsonl (bool): In mỗi event một dòng JSON thay cho dòng log chữ
+            event_log (EventLog): Event log ra file (tùy chọn)
+            clock (callable): Hàm trả về thời gian hiện tại (epoch giây)
+        """
+        self.stream = stream if stream is not None else sys.stdout
+        self.jsonl = jsonl
+        self.event_log = event_log
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def write(self, line):
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def log(self, message, level="INFO"):
+        """
+        Ghi một dòng log (cùng chữ ký với log_message của GUI)
+        """
+        if not self.jsonl:
+            self.write(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] [{level}] {message}")
+        self.logger.info(f"[{level}] {message}")
+        self.emit('log', level=level, message=message)
+
+    def emit(self, event, **fields):
+        """
+        Ghi một event vào event log và (với --jsonl) ra stdout
+        """
+        if self.event_log is not None:
+            self.event_log.emit(event, **fields)
+        if self.jsonl:
+            self.write(format_event(self._clock(), event, fields))
+
+
+def install_signal_handlers(stop_requested):
+    """
+    SIGTERM/SIGINT (và SIGHUP nếu có) chỉ đặt cờ dừng; main thread dừng engine
+
+    Args:
+        stop_requested (threading.Event): Cờ dừng
+
+    Returns:
+        dict: Handler cũ theo signal (truyền cho restore_signal_handlers)
+    """
+    def handler(signum, frame):
+        stop_requested.set()
+
+    previous = {}
+    for name in ('SIGTERM', 'SIGINT', 'SIGHUP'):
+        signum = getattr(signal, name, None)
+        if signum is not None:
+            previous[signum] = signal.signal(signum, handler)
+    return previous
+
+
+def restore_signal_handlers(previous):
+    for signum, handler in previous.items():
+        signal.signal(signum, handler)
+
+
+def run_command(args):
+    """
+    Lệnh run: chạy automation đến khi hết tài khoản hoặc nhận SIGTERM/SIGINT
+
+    Returns:
+        int: Mã thoát
+    """
+    try:
+        app_config = load_config(args.app_config)
+        accounts, products, settings = load_run_settings(args.config)
+    except ConfigError as e:
+        print(f"[cli] Lỗi cấu hình: {str(e)}", file=sys.stderr)
+        return EXIT_CONFIG
+
+    config_dir = os.path.dirname(os.path.abspath(args.config))
+    state_path = args.state or os.path.join(config_dir, STATE_FILENAME)
+    log_config = app_config.logging
+
+    listener = setup_queue_logging(args.log_dir, level=log_config.level, max_file_size=log_config.max_file_size,
+                                   max_files=log_config.max_files, console_output=False,
+                                   file_output=log_config.file_output)
+    event_log = None
+    if log_config.file_output:
+        event_log = EventLog(os.path.join(args.log_dir, EVENTS_FILENAME), log_config.max_file_size,
+                             log_config.max_files)
+    reporter = ConsoleReporter(jsonl=args.jsonl, event_log=event_log)
+
+    history = None
+    if not args.no_history:
+        try:
+            history = HistoryStore(os.path.join(config_dir, HISTORY_FILENAME))
+        except Exception as e:
+            reporter.log(f"Không mở được lịch sử chạy: {str(e)}", "ERROR")
+
+    # Dọn Chrome/ChromeDriver còn sót từ lần chạy trước bị crash/kill
+    process_registry = ProcessRegistry(os.path.join(config_dir, PIDS_FILENAME))
+    killed = process_registry.sweep()
+    if killed:
+        reporter.log(f"Đã dọn {killed} process Chrome/ChromeDriver còn sót từ lần chạy trước", "WARNING")
+
+    # Cookie phiên đăng nhập theo tài khoản (mã hóa), lần chạy sau bỏ qua form login
+    session_store = SessionStore(os.path.join(config_dir, SESSIONS_FILENAME))
+    if app_config.browser.session.enabled and not session_store.enabled:
+        reporter.log("Chưa cài cryptography (pip install cryptography): không lưu phiên đăng nhập", "WARNING")
+
+    # Cache HTTP dùng chung cho mọi Chrome; xóa slot vượt giới hạn dung lượng từ lần chạy trước
+    disk_cache = create_disk_cache(app_config.browser.disk_cache, config_dir)
+    if disk_cache is not None:
+        freed = disk_cache.cleanup()
+        if freed:
+            reporter.log(f"Đã dọn {freed / 1024 / 1024:.0f} MB cache HTTP vượt giới hạn", "INFO")
+
+    state_writer = DebouncedWriter(state_path)
+    engine = AutomationEngine(ProductCache(os.path.join(config_dir, 'product_cache.json')),
+                              log=reporter.log, emit=reporter.emit, history=history,
+                              save_state=lambda: state_writer.schedule(engine.state()),
+                              driver_cache=DriverCache(os.path.join(config_dir, MANIFEST_FILENAME)),
+                              process_registry=process_registry, session_store=session_store,
+                              disk_cache=disk_cache)
+    engine.load_state(read_json(state_path))
+
+    options = build_options(settings, app_config, headless=True if args.headless else None)
+    reporter.log(f"Khởi động (không giao diện): {len(accounts)} tài khoản, {len(products)} sản phẩm, "
+                 f"cấu hình {os.path.abspath(args.config)}", "INFO")
+
+    result = {}
+
+    def work():
+        result['ok'] = engine.run(accounts, products, options)
+
+    stop_requested = threading.Event()
+    previous_handlers = install_signal_handlers(stop_requested)
+    worker = threading.Thread(target=work, name='automation', daemon=True)
+    stopped = False
+    try:
+        worker.start()
+        while worker.is_alive():
+            worker.join(POLL_INTERVAL)
+            if stop_requested.is_set():
+                reporter.log("Nhận tín hiệu dừng, đang đóng browser/VPN...", "WARNING")
+                stopped = True
+                engine.stop()
+                worker.join(args.stop_timeout)
+                if worker.is_alive():
+                    reporter.log(f"Thread automation chưa dừng sau {args.stop_timeout}s, thoát", "ERROR")
+                break
+    finally:
+        restore_signal_handlers(previous_handlers)
+        process_registry.sweep(own=True)
+        snapshot = engine.stats.snapshot()
+        memory = engine.watchdog.report() if engine.watchdog is not None else None
+        page_load = engine.page_stats.report()
+        reporter.emit('summary', scans=snapshot.scans, successes=snapshot.successes, failures=snapshot.failures,
+                      purchased_today=len(engine.purchased_today), stopped=stopped, chrome_memory=memory,
+                      page_load=page_load)
+        if not args.jsonl:
+            reporter.write(f"[cli] Quét {snapshot.scans}, thành công {snapshot.successes}, "
+                           f"thất bại {snapshot.failures}, tài khoản đã mua hôm nay {len(engine.purchased_today)}")
+            if memory and memory['peak_rss_mb'] is not None:
+                reporter.write(f"[cli] Chrome: RSS cao nhất {memory['peak_rss_mb']:.0f} MB, "
+                               f"{len(memory['series'])} lần đo, khởi động lại {len(memory['recycles'])} lần")
+            if page_load.get('cache_hit_ratio') is not None:
+                reporter.write(f"[cli] Cache HTTP: hit {page_load['cache_hit_ratio']:.1f}%, trang đầu của Chrome "
+                               f"mới {page_load['first_load_ms_mean'] or 0:.0f} ms")
+        state_writer.schedule(engine.state())
+        state_writer.close()
+        if history is not None:
+            history.close()
+        if event_log is not None:
+            event_log.close()
+        stop_queue_logging(listener)
+
+    if stopped or result.get('ok', False):
+        return EXIT_OK
+    return EXIT_ERROR
+
+
+def main(argv=None):
+    """
+    Entry point dòng lệnh (không giao diện)
+    """
+    parser = argparse.ArgumentParser(description="ER Sports Automation - chạy không cần giao diện")
+    subparsers = parser.add_subparsers(dest='command')
+
+    run = subparsers.add_parser('run', help="Chạy automation đến khi hết tài khoản hoặc nhận SIGTERM")
+    run.add_argument('--config', required=True, help="File settings.json (tài khoản, sản phẩm, tùy chọn)")
+    run.add_argument('--app-config', default=None, help="File config.json (mặc định tìm như GUI)")
+    run.add_argument('--state', default=None, help="File state.json (mặc định cạnh --config)")
+    run.add_argument('--log-dir', default='logs', help="Thư mục log và events.jsonl")
+    run.add_argument('--headless', action='store_true', help="Luôn chạy Chrome headless")
+    run.add_argument('--jsonl', action='store_true', help="In tiến trình dạng JSON Lines")
+    run.add_argument('--no-history', action='store_true', help="Không ghi lịch sử SQLite")
+    run.add_argument('--stop-timeout', type=float, default=DEFAULT_STOP_TIMEOUT,
+                     help="Thời gian chờ thread automation dừng (giây)")
+    run.set_defaults(func=run_command)
+
+    args = parser.parse_args(argv)
+    if not getattr(args, 'func', None):
+        parser.print_help()
+        return EXIT_CONFIG
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Load file cấu hình (config.json) thành các dataclass có kiểu
+
+Cấu trúc giống config/config_sample.json. Các mục được đọc:
+- browser: headless, chrome_path, user_agent, window_size, page_load_strategy, lean_mode
+- timing: delay_between_accounts, delay_between_products, delay_between_actions,
+  page_load_timeout, element_wait_timeout
+- logging: level, max_file_size, max_files, console_output, file_output
+Các mục khác (automation, website, security) được giữ nguyên trong AppConfig.raw.
+Giá trị sai kiểu hoặc ngoài phạm vi sẽ raise ConfigError kèm đường dẫn khóa.
+"""
+
+import os
+import sys
+import json
+from dataclasses import dataclass, field, fields, is_dataclass
+
+# Chiến lược tải trang của Chrome
+PAGE_LOAD_STRATEGIES = ('normal', 'eager', 'none')
+
+# Mức log hợp lệ
+LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+# Tên file cấu hình được tìm theo thứ tự trong các thư mục cấu hình
+CONFIG_FILENAME = 'config.json'
+
+# URL gốc của website (đặt biến môi trường ERS_BASE_URL để trỏ sang server giả lập standin_server.py)
+BASE_URL = os.environ.get('ERS_BASE_URL', "https://www.er-sports.com").rstrip('/')
+
+# URL cố định để mua tất cả sản phẩm (trang liệt kê sản phẩm), ghi đè bằng ERS_PRODUCT_LIST_URL
+PRODUCT_LIST_URL = os.environ.get(
+    'ERS_PRODUCT_LIST_URL',
+    BASE_URL + "/shop/shopbrand.html?search=mezz&sort=price_desc&money1=&money2=&prize1=&company1=&content1=&originalcode1=&category=&subcategory="
+)
+
+
+class ConfigError(ValueError):
+    """
+    File cấu hình không hợp lệ
+    """
+
+
+@dataclass(frozen=True)
+class WindowSize:
+    width: int = 1920
+    height: int = 1080
+
+
+@dataclass(frozen=True)
+class LeanModeConfig:
+    enabled: bool = False
+    block_images: bool = True
+    block_fonts: bool = True
+    block_media: bool = True
+    blocked_hosts: tuple = None  # None = danh sách mặc định của lean_mode
+    allowed_hosts: tuple = None
+
+
+@dataclass(frozen=True)
+class WatchdogConfig:
+    enabled: bool = True
+    max_rss_mb: int = 1500  # Tổng RSS của ChromeDriver + Chrome, 0 = không giới hạn
+    max_cpu_percent: float = 0  # CPU giữa hai lần đo (100 = một core), 0 = không giới hạn
+    cpu_samples: int = 3  # Số lần đo liên tiếp vượt ngưỡng CPU trước khi khởi động lại
+    sample_interval: float = 30  # Giây giữa hai lần đo
+
+
+@dataclass(frozen=True)
+class SessionConfig:
+    enabled: bool = True  # Lưu cookie sau khi login (mã hóa, cần cryptography), lần sau bỏ qua form login
+    max_age_hours: float = 12  # Phiên cũ hơn thì login lại bằng form
+
+
+@dataclass(frozen=True)
+class DiskCacheConfig:
+    enabled: bool = True  # Cache HTTP trên đĩa dùng chung cho mọi Chrome (--disk-cache-dir)
+    dir: str = ''  # Thư mục cache, '' = chrome_cache trong thư mục cấu hình
+    max_size_mb: int = 256  # Tổng dung lượng tối đa, chia đều cho các slot
+    slots: int = 2  # Số Chrome dùng cache cùng lúc (Chrome đang dùng + Chrome khởi động trước)
+
+
+@dataclass(frozen=True)
+class BrowserConfig:
+    headless: bool = False
+    chrome_path: str = ''
+    user_agent: str = ''
+    window_size: WindowSize = field(default_factory=WindowSize)
+    page_load_strategy: str = 'normal'
+    lean_mode: LeanModeConfig = field(default_factory=LeanModeConfig)
+    reuse_limit: int = 10  # Số tài khoản dùng chung một Chrome (đã xóa cookie/storage), 0 = mỗi tài khoản một Chrome
+    prewarm: bool = True  # Khởi động Chrome kế tiếp trong nền khi đổi VPN/nghỉ giữa tài khoản
+    watchdog: WatchdogConfig = field(default_factory=WatchdogConfig)
+    session: SessionConfig = field(default_factory=SessionConfig)
+    disk_cache: DiskCacheConfig = field(default_factory=DiskCacheConfig)
+
+
+@dataclass(frozen=True)
+class TimingConfig:
+    delay_between_accounts: float = 10
+    delay_between_products: float = 5
+    delay_between_actions: float = 0  # Khoảng cách tối thiểu giữa hai lần mở trang
+    page_load_timeout: float = 15
+    element_wait_timeout: float = 10
+
+
+@dataclass(frozen=True)
+class LoggingConfig:
+    level: str = 'INFO'
+    max_file_size: int = 10 * 1024 * 1024  # Byte, vượt quá thì xoay file
+    max_files: int = 5  # Số file đã xoay (nén .gz) được giữ lại
+    console_output: bool = True
+    file_output: bool = True
+
+
+@dataclass(frozen=True)
+class AppConfig:
+    browser: BrowserConfig = field(default_factory=BrowserConfig)
+    timing: TimingConfig = field(default_factory=TimingConfig)
+    logging: LoggingConfig = field(default_factory=LoggingConfig)
+    source: str = None  # File đã load (None = giá trị mặc định)
+    raw: dict = field(default_factory=dict, compare=False)
+
+    def wait_timeouts(self):
+        """
+        Timeout cho WaitEngine theo loại bước chờ
+
+        Returns:
+            dict: {'page_load', 'url_change', 'element', 'clickable', 'probe'}
+        """
+        page_load = self.timing.page_load_timeout
+        element = self.timing.element_wait_timeout
+        return {
+            'page_load': page_load,
+            'url_change': page_load,
+            'element': element,
+            'clickable': element,
+            'probe': min(5, element),
+        }
+
+
+def _coerce(value, expected, key):
+    """
+    Chuyển giá trị JSON sang kiểu của field, raise ConfigError nếu không được
+    """
+    if expected is bool:
+        if isinstance(value, bool):
+            return value
+        raise ConfigError(f"{key}: cần true/false, nhận {value!r}")
+    if expected in (int, float):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ConfigError(f"{key}: cần số, nhận {value!r}")
+        return expected(value)
+    if expected is str:
+        if value is None:
+            return ''
+        if not isinstance(value, str):
+            raise ConfigError(f"{key}: cần chuỗi, nhận {value!r}")
+        return value
+    if expected is tuple:
+        if value is None:
+            return None
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            raise ConfigError(f"{key}: cần danh sách chuỗi, nhận {value!r}")
+        return tuple(value)
+    if is_dataclass(expected):
+        return _build(expected, value, key)
+    return value
+
+
+def _build(cls, data, prefix):
+    """
+    Tạo dataclass cls từ dict (bỏ qua khóa không biết, thiếu khóa thì dùng mặc định)
+    """
+    if data is None:
+        return cls()
+    if not isinstance(data, dict):
+        raise ConfigError(f"{prefix}: cần object, nhận {data!r}")
+    values = {}
+    for item in fields(cls):
+        if item.name in data:
+            values[item.name] = _coerce(data[item.name], item.type, f"{prefix}.{item.name}")
+    return cls(**values)
+
+
+def _validate(config):
+    strategy = config.browser.page_load_strategy
+    if strategy not in PAGE_LOAD_STRATEGIES:
+        raise ConfigError(f"browser.page_load_strategy: phải là một trong {', '.join(PAGE_LOAD_STRATEGIES)}, "
+                          f"nhận {strategy!r}")
+    for name in ('page_load_timeout', 'element_wait_timeout'):
+        if getattr(config.timing, name) <= 0:
+            raise ConfigError(f"timing.{name}: phải lớn hơn 0")
+    for name in ('delay_between_accounts', 'delay_between_products', 'delay_between_actions'):
+        if getattr(config.timing, name) < 0:
+            raise ConfigError(f"timing.{name}: không được âm")
+    if config.browser.reuse_limit < 0:
+        raise ConfigError("browser.reuse_limit: không được âm")
+    watchdog = config.browser.watchdog
+    for name in ('max_rss_mb', 'max_cpu_percent'):
+        if getattr(watchdog, name) < 0:
+            raise ConfigError(f"browser.watchdog.{name}: không được âm")
+    if watchdog.cpu_samples < 1:
+        raise ConfigError("browser.watchdog.cpu_samples: phải lớn hơn hoặc bằng 1")
+    if watchdog.sample_interval <= 0:
+        raise ConfigError("browser.watchdog.sample_interval: phải lớn hơn 0")
+    if config.browser.session.max_age_hours <= 0:
+        raise ConfigError("browser.session.max_age_hours: phải lớn hơn 0")
+    if config.browser.disk_cache.max_size_mb <= 0:
+        raise ConfigError("browser.disk_cache.max_size_mb: phải lớn hơn 0")
+    if config.browser.disk_cache.slots < 1:
+        raise ConfigError("browser.disk_cache.slots: phải lớn hơn hoặc bằng 1")
+    size = config.browser.window_size
+    if size.width <= 0 or size.height <= 0:
+        raise ConfigError("browser.window_size: width/height phải lớn hơn 0")
+    if config.logging.level.upper() not in LOG_LEVELS:
+        raise ConfigError(f"logging.level: phải là một trong {', '.join(LOG_LEVELS)}, nhận {config.logging.level!r}")
+    if config.logging.max_file_size <= 0:
+        raise ConfigError("logging.max_file_size: phải lớn hơn 0")
+    if config.logging.max_files < 1:
+        raise ConfigError("logging.max_files: phải lớn hơn hoặc bằng 1")
+
+
+def parse_config(data, source=None):
+    """
+    Tạo AppConfig từ dict đã đọc từ JSON
+
+    Args:
+        data (dict): Nội dung file cấu hình
+        source (str): Đường dẫn file (để ghi vào AppConfig.source)
+
+    Returns:
+        AppConfig: Cấu hình đã kiểm tra
+
+    Raises:
+        ConfigError: Cấu hình sai kiểu hoặc ngoài phạm vi
+    """
+    if not isinstance(data, dict):
+        raise ConfigError("File cấu hình phải là một JSON object")
+    config = AppConfig(browser=_build(BrowserConfig, data.get('browser'), 'browser'),
+                       timing=_build(TimingConfig, data.get('timing'), 'timing'),
+                       logging=_build(LoggingConfig, data.get('logging'), 'logging'),
+                       source=source,
+                       raw={key: value for key, value in data.items()
+                            if key not in ('browser', 'timing', 'logging')})
+    _validate(config)
+    return config
+
+
+def default_config_dirs():
+    """
+    Các thư mục tìm config.json: cạnh file .exe (khi đóng gói) hoặc src/config, rồi config/ ở gốc repo
+
+    Returns:
+        list: Đường dẫn thư mục
+    """
+    if getattr(sys, 'frozen', False):
+        base_path = os.path.dirname(sys.executable)
+    else:
+        base_path = os.path.dirname(os.path.abspath(__file__))
+    return [os.path.join(base_path, 'config'), os.path.join(base_path, '..', 'config')]
+
+
+def load_config(path=None, search_dirs=None):
+    """
+    Load cấu hình
+
+    Thứ tự: path truyền vào, biến môi trường ERS_CONFIG, config.json trong search_dirs.
+    Không tìm thấy file nào thì trả về cấu hình mặc định.
+
+    Args:
+        path (str): Đường dẫn file cấu hình (tùy chọn)
+        search_dirs (list): Thư mục tìm config.json (mặc định default_config_dirs())
+
+    Returns:
+        AppConfig: Cấu hình
+
+    Raises:
+        ConfigError: File không đọc được hoặc không hợp lệ
+    """
+    path = path or os.environ.get('ERS_CONFIG')
+    if not path:
+        for directory in (search_dirs if search_dirs is not None else default_config_dirs()):
+            candidate = os.path.join(directory, CONFIG_FILENAME)
+            if os.path.exists(candidate):
+                path = candidate
+                break
+    if not path:
+        return AppConfig()
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ConfigError(f"Không đọc được file cấu hình {path}: {str(e)}")
+    return parse_config(data, os.path.abspath(path))
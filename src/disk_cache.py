@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Thư mục cache HTTP trên đĩa dùng chung cho mọi Chrome do app khởi động
+
+Mỗi Chrome chạy với profile tạm (cookie, storage riêng cho từng lần khởi động), nên trước đây
+CSS/JS/ảnh của shop bị tải lại với mỗi Chrome mới. Giờ cache HTTP được đặt ra ngoài profile
+bằng --disk-cache-dir, vào config/chrome_cache/slot-N:
+
+- Chỉ cache HTTP nằm trong thư mục này; cookie và trạng thái tài khoản vẫn ở profile tạm.
+- Hai Chrome không được dùng chung một thư mục cache cùng lúc, nên mỗi Chrome giữ một slot
+  (khóa file của hệ điều hành, tự nhả khi process chết). Hết slot thì Chrome chạy không có
+  cache dùng chung như trước.
+- Giới hạn dung lượng: mỗi slot được --disk-cache-size = max_size_mb / slots, Chrome tự xóa bớt.
+  cleanup() (lúc mở app) xóa slot không dùng vượt quá giới hạn hoặc thừa so với số slot.
+"""
+
+import os
+import shutil
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+CACHE_DIRNAME = 'chrome_cache'
+SLOT_PREFIX = 'slot-'
+LOCK_SUFFIX = '.lock'
+
+# Giới hạn mặc định (ghi đè bằng browser.disk_cache trong config.json)
+DEFAULT_MAX_SIZE_MB = 256
+DEFAULT_SLOTS = 2  # Chrome đang dùng + Chrome khởi động trước (DriverPool)
+
+# Chrome có thể vượt --disk-cache-size một chút trước khi tự xóa; vượt quá tỷ lệ này thì dọn
+OVERSHOOT_RATIO = 1.25
+
+MB = 1024 * 1024
+
+
+def dir_size(path):
+    """
+    Tổng dung lượng các file trong thư mục (đệ quy)
+
+    Returns:
+        int: Byte, 0 nếu không có thư mục
+    """
+    total = 0
+    try:
+        entries = list(os.scandir(path))
+    except OSError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                total += dir_size(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                total += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            continue
+    return total
+
+
+def _try_lock(handle):
+    """
+    Khóa file không chờ (fcntl trên POSIX, msvcrt trên Windows)
+
+    Returns:
+        bool: True nếu đã khóa được
+    """
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        elif msvcrt is not None:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(handle):
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+        elif msvcrt is not None:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+    except OSError:
+        pass
+
+
+class CacheSlot:
+    """
+    Một thư mục cache đang được một Chrome giữ
+    """
+
+    def __init__(self, index, path, size, handle):
+        """
+        Args:
+            index (int): Số thứ tự slot
+            path (str): Thư mục cache (giá trị của --disk-cache-dir)
+            size (int): Giới hạn dung lượng (byte, giá trị của --disk-cache-size)
+            handle: File lock đang mở
+        """
+        self.index = index
+        self.path = path
+        self.size = size
+        self.handle = handle
+
+    def chrome_arguments(self):
+        """
+        Returns:
+            list: Cờ dòng lệnh Chrome
+        """
+        return [f"--disk-cache-dir={self.path}", f"--disk-cache-size={self.size}"]
+
+
+class DiskCache:
+    """
+    Các slot cache HTTP dưới một thư mục gốc, dùng chung giữa các lần khởi động Chrome và các lần mở app
+    """
+
+    def __init__(self, root, max_size_mb=DEFAULT_MAX_SIZE_MB, slots=DEFAULT_SLOTS):
+        """
+        Args:
+            root (str): Thư mục gốc (config/chrome_cache)
+            max_size_mb (int): Tổng dung lượng tối đa của mọi slot (MB)
+            slots (int): Số Chrome dùng cache cùng lúc
+        """
+        self.root = root
+        self.slots = max(1, slots)
+        self.slot_size = int(max_size_mb * MB) // self.slots
+        self._lock = threading.Lock()
+        self._held = {}  # index -> CacheSlot đang được Chrome trong process này giữ
+
+    def _slot_path(self, index):
+        return os.path.join(self.root, f"{SLOT_PREFIX}{index}")
+
+    def _open_lock(self, index):
+        """
+        Mở và khóa file lock của slot
+
+        Returns:
+            file: File lock đã khóa, None nếu slot đang được process khác dùng
+        """
+        handle = open(self._slot_path(index) + LOCK_SUFFIX, 'a+b')
+        if _try_lock(handle):
+            return handle
+        handle.close()
+        return None
+
+    def acquire(self):
+        """
+        Giữ một slot trống cho Chrome sắp khởi động
+
+        Returns:
+            CacheSlot: Slot đã khóa, None nếu mọi slot đang bận hoặc không tạo được thư mục
+        """
+        try:
+            os.makedirs(self.root, exist_ok=True)
+        except OSError as e:
+            print(f"[disk_cache] Không tạo được thư mục cache: {str(e)}")
+            return None
+        with self._lock:
+            for index in range(self.slots):
+                if index in self._held:
+                    continue
+                try:
+                    handle = self._open_lock(index)
+                except OSError:
+                    continue
+                if handle is None:
+                    continue
+                slot = CacheSlot(index, self._slot_path(index), self.slot_size, handle)
+                self._held[index] = slot
+                return slot
+        return None
+
+    def release(self, slot):
+        """
+        Nhả slot sau khi Chrome đã đóng
+
+        Args:
+            slot (CacheSlot): Slot lấy từ acquire()
+        """
+        if slot is None:
+            return
+        with self._lock:
+            if self._held.get(slot.index) is not slot:
+                return
+            del self._held[slot.index]
+        _unlock(slot.handle)
+        slot.handle.close()
+
+    def _slot_indexes(self):
+        """
+        Returns:
+            list: Số thứ tự các slot đang có thư mục trên đĩa
+        """
+        indexes = []
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return indexes
+        for name in names:
+            suffix = name[len(SLOT_PREFIX):]
+            if name.startswith(SLOT_PREFIX) and suffix.isdigit() and os.path.isdir(os.path.join(self.root, name)):
+                indexes.append(int(suffix))
+        return sorted(indexes)
+
+    def cleanup(self):
+        """
+        Xóa slot không có Chrome nào dùng: vượt giới hạn dung lượng hoặc thừa (đã giảm số slot)
+
+        Returns:
+            int: Số byte đã xóa
+        """
+        freed = 0
+        for index in self._slot_indexes():
+            path = self._slot_path(index)
+            with self._lock:
+                if index in self._held:
+                    continue
+                try:
+                    handle = self._open_lock(index)
+                except OSError:
+                    continue
+                if handle is None:
+                    continue
+                try:
+                    size = dir_size(path)
+                    if index >= self.slots or size > self.slot_size * OVERSHOOT_RATIO:
+                        shutil.rmtree(path, ignore_errors=True)
+                        freed += size - dir_size(path)
+                finally:
+                    _unlock(handle)
+                    handle.close()
+            if index >= self.slots:
+                try:
+                    os.remove(path + LOCK_SUFFIX)
+                except OSError:
+                    pass
+        return freed
+
+    def usage(self):
+        """
+        Returns:
+            dict: {'root', 'bytes', 'slots', 'max_bytes'}
+        """
+        return {'root': self.root, 'bytes': dir_size(self.root), 'slots': len(self._slot_indexes()),
+                'max_bytes': self.slot_size * self.slots}
+
+
+def create_disk_cache(config, config_dir):
+    """
+    Tạo DiskCache theo browser.disk_cache trong config.json
+
+    Args:
+        config (DiskCacheConfig): Cấu hình cache
+        config_dir (str): Thư mục cấu hình (thư mục gốc mặc định)
+
+    Returns:
+        DiskCache: Cache dùng chung, None nếu tắt trong config
+    """
+    if not config.enabled:
+        return None
+    root = os.path.expanduser(config.dir) if config.dir else os.path.join(config_dir, CACHE_DIRNAME)
+    return DiskCache(root, max_size_mb=config.max_size_mb, slots=config.slots)
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache đường dẫn/phiên bản Chrome và ChromeDriver (driver_manifest.json)
+
+Lần đầu tìm Chrome, đọc phiên bản, tìm ChromeDriver có sẵn (PATH, cạnh file .exe) cùng
+major version hoặc tải bằng webdriver-manager, rồi ghi kết quả vào manifest. Các lần tạo
+browser sau (trong cùng phiên hoặc lần mở app sau) dùng lại ngay: nếu file Chrome không đổi
+(kích thước + mtime) thì không chạy process nào và không cần mạng. Khi file Chrome đổi thì
+đọc lại phiên bản; chỉ tìm/tải lại ChromeDriver khi phiên bản Chrome khác trong manifest,
+khi file ChromeDriver không còn hoặc khi invalidate() (Chrome từ chối driver trong cache).
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import threading
+import subprocess
+from dataclasses import dataclass
+
+try:
+    from .settings_store import atomic_write_text, read_json
+except ImportError:
+    from settings_store import atomic_write_text, read_json
+
+# Tên file manifest trong thư mục cấu hình
+MANIFEST_FILENAME = 'driver_manifest.json'
+
+# Phiên bản định dạng manifest (khác thì bỏ qua file cũ)
+MANIFEST_VERSION = 1
+
+# Thời gian chờ tối đa khi chạy `<binary> --version` (giây)
+VERSION_TIMEOUT = 10
+
+# Tên lệnh Chrome/Chromium trong PATH (Linux/macOS)
+CHROME_COMMANDS = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome')
+
+# Đường dẫn Chrome thường gặp
+CHROME_PATHS = (
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+    os.path.expanduser(r"~\AppData\Local\Google\Chrome\Application\chrome.exe"),
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+)
+
+# Đường dẫn ChromeDriver thường gặp (ngoài PATH)
+CHROMEDRIVER_PATHS = (
+    r"C:\Program Files\ChromeDriver\chromedriver.exe",
+    r"C:\chromedriver\chromedriver.exe",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chromedriver.exe'),
+)
+
+_VERSION_RE = re.compile(r'\d+(?:\.\d+){1,3}')
+
+
+def parse_version(text):
+    """
+    Lấy số phiên bản đầu tiên trong chuỗi ("Google Chrome 120.0.6099.109" -> "120.0.6099.109")
+
+    Returns:
+        str: Phiên bản hoặc None
+    """
+    match = _VERSION_RE.search(text or '')
+    return match.group(0) if match else None
+
+
+def major_version(version):
+    """
+    Major version ("120.0.6099.109" -> 120), None nếu không đọc được
+    """
+    try:
+        return int(version.split('.')[0])
+    except (AttributeError, ValueError):
+        return None
+
+
+def file_fingerprint(path):
+    """
+    Dấu vết file để biết file có bị thay (cập nhật Chrome) mà không cần chạy nó
+
+    Returns:
+        list: [kích thước, mtime_ns] hoặc None nếu không stat được
+    """
+    try:
+        st = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def run_version(args):
+    """
+    Chạy `<binary> --version` và trả về stdout (None nếu lỗi/timeout)
+    """
+    try:
+        output = subprocess.run(list(args) + ['--version'], capture_output=True, text=True,
+                                timeout=VERSION_TIMEOUT)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.stdout
+
+
+def find_chrome(which=shutil.which):
+    """
+    Tìm Chrome đã cài (Windows, macOS, lệnh trong PATH)
+
+    Returns:
+        str: Đường dẫn hoặc None
+    """
+    for path in CHROME_PATHS:
+        if os.path.exists(path):
+            return path
+    for command in CHROME_COMMANDS:
+        path = which(command)
+        if path:
+            return path
+    return None
+
+
+def find_chromedriver(which=shutil.which):
+    """
+    Tìm ChromeDriver có sẵn: cạnh file .exe (PyInstaller), trong PATH, các thư mục thường gặp
+
+    Returns:
+        str: Đường dẫn hoặc None
+    """
+    if getattr(sys, 'frozen', False):
+        path = os.path.join(os.path.dirname(sys.executable), 'chromedriver.exe')
+        if os.path.exists(path):
+            return path
+    for command in ('chromedriver.exe', 'chromedriver'):
+        path = which(command)
+        if path:
+            return path
+    for path in CHROMEDRIVER_PATHS:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def install_chromedriver(chrome_version=None):
+    """
+    Tải ChromeDriver khớp Chrome đã cài bằng webdriver-manager (cần mạng lần đầu)
+
+    Args:
+        chrome_version (str): Phiên bản Chrome đã đọc được (webdriver-manager tự xác định lại)
+
+    Returns:
+        str: Đường dẫn ChromeDriver
+
+    Raises:
+        ImportError: Chưa cài webdriver-manager
+    """
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+
+@dataclass(frozen=True)
+class DriverResolution:
+    chrome_path: str = None  # None = Chrome mặc định trong PATH
+    chrome_version: str = None
+    driver_path: str = None  # None = để selenium tự tìm (Service() mặc định)
+    driver_version: str = None
+    source: str = 'selenium'  # 'local', 'webdriver-manager' hoặc 'selenium'
+    cached: bool = False
+    elapsed: float = 0.0
+
+    def describe(self):
+        """
+        Mô tả ngắn cho log
+        """
+        chrome = f"Chrome {self.chrome_version or '?'}"
+        if self.chrome_path:
+            chrome += f" ({self.chrome_path})"
+        if self.driver_path:
+            driver = f"ChromeDriver {self.driver_version or '?'} ({self.driver_path}, {self.source})"
+        else:
+            driver = "ChromeDriver mặc định của selenium"
+        origin = "cache" if self.cached else "tìm mới"
+        return f"{chrome}, {driver}, {origin} {self.elapsed * 1000:.0f} ms"
+
+
+class DriverCache:
+    """
+    Manifest Chrome/ChromeDriver đã tìm được (thread-safe, dùng chung giữa các browser)
+    """
+
+    def __init__(self, path=None, install=install_chromedriver, probe=run_version, which=shutil.which,
+                 clock=time.perf_counter):
+        """
+        Khởi tạo cache (tự load manifest nếu có)
+
+        Args:
+            path (str): File manifest (None = chỉ giữ trong bộ nhớ của process)
+            install (callable): install(chrome_version) -> đường dẫn ChromeDriver tải về
+            probe (callable): probe([binary]) -> stdout của `binary --version`
+            which (callable): Tìm lệnh trong PATH (shutil.which)
+            clock (callable): Đồng hồ đo thời gian tìm driver
+        """
+        self.path = path
+        self._install = install
+        self._probe = probe
+        self._which = which
+        self._clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self.load()
+
+    def load(self):
+        """
+        Đọc manifest (bỏ qua file hỏng hoặc khác định dạng)
+        """
+        data = read_json(self.path)
+        entries = data.get('entries') if data.get('version') == MANIFEST_VERSION else None
+        if not isinstance(entries, dict):
+            entries = {}
+        with self._lock:
+            self._entries = {key: entry for key, entry in entries.items()
+                             if isinstance(entry, dict) and entry.get('driver_path')}
+
+    def save(self):
+        """
+        Ghi manifest (chỉ các entry có đường dẫn ChromeDriver)
+        """
+        if not self.path:
+            return
+        with self._lock:
+            entries = {key: dict(entry) for key, entry in self._entries.items() if entry.get('driver_path')}
+        try:
+            atomic_write_text(self.path, json.dumps({'version': MANIFEST_VERSION, 'entries': entries},
+                                                    ensure_ascii=False, indent=2))
+        except OSError as e:
+            print(f"[driver] Không ghi được {self.path}: {str(e)}")
+
+    def chrome_version(self, chrome_path):
+        """
+        Phiên bản Chrome đã cài
+
+        Trên Windows chrome.exe --version mở cửa sổ Chrome thay vì in phiên bản, nên đọc tên
+        thư mục phiên bản cạnh chrome.exe (Application\\120.0.6099.109\\).
+
+        Returns:
+            str: Phiên bản hoặc None
+        """
+        if not chrome_path:
+            return None
+        if os.name == 'nt':
+            try:
+                names = os.listdir(os.path.dirname(chrome_path))
+            except OSError:
+                return None
+            versions = [name for name in names if _VERSION_RE.fullmatch(name)]
+            return max(versions, key=lambda v: [int(part) for part in v.split('.')]) if versions else None
+        return parse_version(self._probe([chrome_path]))
+
+    def driver_version(self, driver_path):
+        return parse_version(self._probe([driver_path]))
+
+    def resolve(self, chrome_path=None, force=False):
+        """
+        Chrome và ChromeDriver dùng để tạo browser
+
+        Args:
+            chrome_path (str): Chrome chọn trong cài đặt (None/không tồn tại = tự tìm)
+            force (bool): Bỏ qua cache, tìm lại ChromeDriver
+
+        Returns:
+            DriverResolution: Kết quả (cached=True nếu dùng lại manifest)
+        """
+        with self._lock:
+            started = self._clock()
+            if not (chrome_path and os.path.exists(chrome_path)):
+                chrome_path = find_chrome(self._which)
+            key = chrome_path or ''
+            fingerprint = file_fingerprint(chrome_path)
+            entry = None if force else self._entries.get(key)
+
+            chrome_version = None
+            if entry is not None and self._driver_usable(entry):
+                if chrome_path is None or entry.get('chrome_fingerprint') == fingerprint:
+                    self.hits += 1
+                    return self._resolution(entry, True, started)
+                chrome_version = self.chrome_version(chrome_path)
+                if chrome_version is not None and chrome_version == entry.get('chrome_version'):
+                    # File Chrome đổi nhưng cùng phiên bản: giữ driver, cập nhật dấu vết
+                    entry['chrome_fingerprint'] = fingerprint
+                    self.hits += 1
+                    resolution = self._resolution(entry, True, started)
+                    save = True
+                else:
+                    entry = None
+            else:
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                if chrome_version is None:
+                    chrome_version = self.chrome_version(chrome_path)
+                driver_path, driver_version, source = self._find_driver(chrome_version)
+                entry = {
+                    'chrome_path': chrome_path,
+                    'chrome_version': chrome_version,
+                    'chrome_fingerprint': fingerprint,
+                    'driver_path': driver_path,
+                    'driver_version': driver_version,
+                    'source': source,
+                    'resolved_at': time.time(),
+                }
+                self._entries[key] = entry
+                resolution = self._resolution(entry, False, started)
+                save = driver_path is not None
+        if save:
+            self.save()
+        return resolution
+
+    def invalidate(self, resolution=None):
+        """
+        Xóa entry (Chrome từ chối ChromeDriver trong cache)
+
+        Args:
+            resolution (DriverResolution): Kết quả resolve() cần xóa (None = xóa toàn bộ)
+
+        Returns:
+            bool: True nếu có entry bị xóa
+        """
+        with self._lock:
+            if resolution is None:
+                removed = bool(self._entries)
+                self._entries.clear()
+            else:
+                removed = self._entries.pop(resolution.chrome_path or '', None) is not None
+        if removed:
+            self.save()
+        return removed
+
+    def stats(self):
+        """
+        Số lần dùng lại/tìm mới
+
+        Returns:
+            dict: {'hits', 'misses', 'size'}
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+    @staticmethod
+    def _driver_usable(entry):
+        # Entry không có driver (chỉ giữ trong bộ nhớ) = đã thử, dùng Service() mặc định của selenium
+        return entry.get('driver_path') is None or os.path.exists(entry['driver_path'])
+
+    def _find_driver(self, chrome_version):
+        """
+        ChromeDriver có sẵn cùng major version với Chrome, nếu không có thì tải bằng webdriver-manager
+
+        Returns:
+            tuple: (driver_path, driver_version, source)
+        """
+        chrome_major = major_version(chrome_version)
+        local = find_chromedriver(self._which)
+        if local:
+            version = self.driver_version(local)
+            if chrome_major is None or major_version(version) in (None, chrome_major):
+                return local, version, 'local'
+            print(f"[driver] Bỏ qua {local}: ChromeDriver {version} không khớp Chrome {chrome_version}")
+
+        try:
+            driver_path = self._install(chrome_version)
+        except ImportError:
+            print("[driver] Chưa cài webdriver-manager (pip install webdriver-manager), dùng ChromeDriver mặc định "
+                  "của selenium")
+            return None, None, 'selenium'
+        except Exception as e:
+            print(f"[driver] Không tải được ChromeDriver: {str(e)}")
+            return None, None, 'selenium'
+        return driver_path, self.driver_version(driver_path), 'webdriver-manager'
+
+    def _resolution(self, entry, cached, started):
+        return DriverResolution(
+            chrome_path=entry.get('chrome_path'),
+            chrome_version=entry.get('chrome_version'),
+            driver_path=entry.get('driver_path'),
+            driver_version=entry.get('driver_version'),
+            source=entry.get('source', 'selenium'),
+            cached=cached,
+            elapsed=self._clock() - started,
+        )
+
+
+# Cache dùng chung trong process khi không truyền driver_cache (chỉ giữ trong bộ nhớ)
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache():
+    """
+    DriverCache trong bộ nhớ dùng chung cho các BrowserAutomation tạo không kèm cache
+
+    Returns:
+        DriverCache: Cache
+    """
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = DriverCache()
+        return _shared_cache
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vòng đời Chrome của một lần chạy automation: khởi động trước, dùng lại, đóng chắc chắn
+
+- prewarm(): khởi động Chrome kế tiếp trong thread nền (trong lúc đổi VPN, nghỉ giữa tài khoản)
+- acquire(): lấy browser sẵn sàng, đo thời gian từ lúc cần browser tới lúc dùng được
+- release(): xóa cookie/storage/tab phụ rồi giữ lại cho tài khoản sau thay vì khởi động lại
+- close(): đóng mọi Chrome/ChromeDriver pool đã tạo, kể cả browser đang khởi động dở
+Nếu có ProcessRegistry (watchdog.py), process của mỗi browser được ghi vào chrome_pids.json
+khi khởi động và process còn sót sau quit() bị kill khi đóng.
+"""
+
+import threading
+import time
+
+# Số tài khoản tối đa dùng chung một Chrome trước khi khởi động lại (giới hạn bộ nhớ tăng dần)
+DEFAULT_REUSE_LIMIT = 10
+
+# Thời gian chờ thread khởi động trước kết thúc khi đóng pool (giây)
+CLOSE_TIMEOUT = 30
+
+# Nguồn của browser trả về từ acquire()
+SOURCE_REUSED = 'reused'        # Chrome của tài khoản trước, đã xóa trạng thái
+SOURCE_PREWARMED = 'prewarmed'  # Khởi động trước trong thread nền
+SOURCE_COLD = 'cold'            # Khởi động khi cần (không có browser dự phòng)
+
+
+class DriverPool:
+    """
+    Quản lý các BrowserAutomation của một lần chạy (tối đa một browser dự phòng)
+
+    Browser cần có setup_driver(verbose), reset() và close() (và process_id() nếu có registry).
+    """
+
+    def __init__(self, factory, reuse_limit=DEFAULT_REUSE_LIMIT, prewarm=True, registry=None,
+                 clock=time.perf_counter):
+        """
+        Args:
+            factory (callable): factory() tạo BrowserAutomation chưa khởi tạo driver
+            reuse_limit (int): Số lần dùng tối đa của một Chrome (0 = không dùng lại)
+            prewarm (bool): Cho phép khởi động trước trong thread nền
+            registry (ProcessRegistry): Ghi/dọn process Chrome/ChromeDriver (tùy chọn)
+            clock (callable): Đồng hồ đơn điệu (giây)
+        """
+        self._factory = factory
+        self.registry = registry
+        self.reuse_limit = reuse_limit
+        self.prewarm_enabled = prewarm
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._spare = None  # (browser, nguồn) sẵn sàng cho acquire() kế tiếp
+        self._warming = None  # Thread đang khởi động browser dự phòng
+        self._browsers = []  # Mọi browser đã tạo và chưa đóng
+        self._uses = {}  # id(browser) -> số lần đã acquire
+        self._closed = False
+        self.last_acquire = None
+        self.counts = {SOURCE_REUSED: 0, SOURCE_PREWARMED: 0, SOURCE_COLD: 0, 'launched': 0, 'discarded': 0}
+        self.ready_total = 0.0
+
+    def _launch(self):
+        """
+        Tạo browser và khởi động Chrome (lỗi khởi tạo để login() thử lại và báo lỗi)
+
+        Returns:
+            BrowserAutomation: Browser mới, None nếu pool đã đóng trong lúc khởi động
+        """
+        browser = self._factory()
+        with self._lock:
+            if self._closed:
+                browser = None
+            else:
+                self._browsers.append(browser)
+                self._uses[id(browser)] = 0
+                self.counts['launched'] += 1
+        if browser is None:
+            return None
+        try:
+            browser.setup_driver(verbose=False)
+            if self.registry is not None:
+                self.registry.register(browser.process_id())
+        except Exception as e:
+            print(f"[driver_pool] Lỗi khởi động Chrome: {str(e)}")
+        with self._lock:
+            closed = self._closed
+        if closed:
+            # close() chạy trong lúc đang khởi động: driver vừa tạo chưa được đóng
+            self._quit(browser)
+            return None
+        return browser
+
+    def _warm(self):
+        try:
+            browser = self._launch()
+        except Exception as e:
+            print(f"[driver_pool] Lỗi khởi động trước: {str(e)}")
+            browser = None
+        with self._lock:
+            if browser is not None and self._spare is None:
+                self._spare = (browser, SOURCE_PREWARMED)
+                browser = None
+            self._warming = None
+            self._changed.notify_all()
+        if browser is not None:
+            self._quit(browser)
+
+    def prewarm(self):
+        """
+        Khởi động browser kế tiếp trong thread nền nếu chưa có browser dự phòng
+
+        Returns:
+            bool: True nếu đã bắt đầu khởi động
+        """
+        with self._lock:
+            if not self.prewarm_enabled or self._closed or self._spare or self._warming:
+                return False
+            self._warming = threading.Thread(target=self._warm, name='driver-prewarm', daemon=True)
+            self._warming.start()
+        return True
+
+    def acquire(self):
+        """
+        Lấy browser sẵn sàng: browser dự phòng, chờ browser đang khởi động trước, hoặc khởi động mới
+
+        Returns:
+            BrowserAutomation: Browser đã có driver (driver là None nếu khởi động lỗi)
+
+        Raises:
+            RuntimeError: Pool đã đóng
+        """
+        started = self._clock()
+        with self._lock:
+            while self._spare is None and self._warming is not None and not self._closed:
+                self._changed.wait()
+            if self._closed:
+                raise RuntimeError("DriverPool đã đóng")
+            spare, self._spare = self._spare, None
+        if spare:
+            browser, source = spare
+        else:
+            browser, source = self._launch(), SOURCE_COLD
+            if browser is None:
+                raise RuntimeError("DriverPool đã đóng")
+
+        ready = self._clock() - started
+        with self._lock:
+            self._uses[id(browser)] = self._uses.get(id(browser), 0) + 1
+            self.counts[source] += 1
+            self.ready_total += ready
+        self.last_acquire = {'source': source, 'ready': ready, 'uses': self._uses[id(browser)]}
+        return browser
+
+    def release(self, browser, reuse=True):
+        """
+        Trả browser về pool: xóa trạng thái để dùng lại, hoặc đóng (hết lượt dùng, reset lỗi)
+
+        Args:
+            browser (BrowserAutomation): Browser lấy từ acquire()
+            reuse (bool): False để đóng luôn (ví dụ Chrome bị treo)
+
+        Returns:
+            bool: True nếu browser được giữ lại cho lần acquire() sau
+        """
+        with self._lock:
+            keep = (reuse and not self._closed and self._spare is None
+                    and self._uses.get(id(browser), 0) < self.reuse_limit)
+        if keep:
+            try:
+                keep = bool(browser.reset())
+            except Exception as e:
+                print(f"[driver_pool] Lỗi xóa trạng thái browser: {str(e)}")
+                keep = False
+        if keep:
+            with self._lock:
+                keep = not self._closed and self._spare is None
+                if keep:
+                    self._spare = (browser, SOURCE_REUSED)
+                    self._changed.notify_all()
+        if not keep:
+            with self._lock:
+                self.counts['discarded'] += 1
+            self._quit(browser)
+        return keep
+
+    def _quit(self, browser):
+        with self._lock:
+            if browser in self._browsers:
+                self._browsers.remove(browser)
+            self._uses.pop(id(browser), None)
+        pid = browser.process_id() if self.registry is not None else None
+        try:
+            browser.close()
+        except Exception as e:
+            print(f"[driver_pool] Lỗi khi đóng browser: {str(e)}")
+        if pid is not None:
+            killed = self.registry.release(pid)
+            if killed:
+                print(f"[driver_pool] Đã kill {killed} process Chrome còn sót sau khi đóng")
+
+    def close(self, wait=True):
+        """
+        Đóng mọi browser đã tạo; browser đang khởi động dở tự đóng khi khởi động xong
+
+        Args:
+            wait (bool): Chờ thread khởi động trước kết thúc (False khi gọi từ nút Dừng)
+        """
+        with self._lock:
+            self._closed = True
+            self._spare = None
+            browsers = list(self._browsers)
+            warming = self._warming
+            self._changed.notify_all()
+        for browser in browsers:
+            self._quit(browser)
+        if wait and warming is not None:
+            warming.join(CLOSE_TIMEOUT)
+
+    def stats(self):
+        """
+        Số lần acquire theo nguồn và thời gian chờ trung bình
+
+        Returns:
+            dict: {'acquired', 'reused', 'prewarmed', 'cold', 'launched', 'discarded', 'ready_mean', 'open'}
+        """
+        with self._lock:
+            acquired = self.counts[SOURCE_REUSED] + self.counts[SOURCE_PREWARMED] + self.counts[SOURCE_COLD]
+            stats = dict(self.counts)
+            stats['acquired'] = acquired
+            stats['ready_mean'] = round(self.ready_total / acquired, 4) if acquired else None
+            stats['open'] = len(self._browsers)
+        return stats
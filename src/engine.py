@@ -0,0 +1,669 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vòng lặp automation không phụ thuộc giao diện (không import tkinter)
+
+AutomationEngine chạy logic mua hàng dùng chung cho GUI (main.py) và chế độ dòng lệnh (cli.py):
+- Kết nối OpenVPN (nếu bật)
+- Mỗi tài khoản chỉ mua thành công một lần mỗi ngày
+- Mua thành công: đăng xuất, đổi IP và tài khoản
+- Mua thất bại: giữ nguyên IP và tài khoản, quét tiếp
+- Chrome lấy từ DriverPool: khởi động trước trong lúc kết nối/đổi VPN, dùng lại (đã xóa
+  cookie/storage) cho tài khoản sau, đóng hết khi kết thúc
+- ChromeWatchdog đo RSS/CPU của Chrome giữa hai sản phẩm, vượt ngưỡng thì khởi động lại browser
+- SessionStore: login bằng cookie đã lưu của tài khoản, chỉ điền form khi phiên đã hết hạn
+- DiskCache: cache HTTP trên đĩa dùng chung cho mọi Chrome (trang đầu của Chrome mới tải nhanh hơn)
+Log, event và lưu trạng thái được truyền vào dưới dạng callback. Các lần nghỉ chờ trên
+threading.Event nên stop() (nút Dừng, SIGTERM) có hiệu lực ngay, không phải đợi hết delay.
+"""
+
+import threading
+from datetime import datetime
+from dataclasses import dataclass
+
+try:
+    from .tracing import Tracer
+    from .lean_mode import LeanProfile, PageLoadStats
+    from .config_loader import AppConfig, PRODUCT_LIST_URL
+    from .stats import StatsCollector, FlowStats
+    from .events import account_hash, step_events
+    from .vpn import OpenVPNManager
+    from .driver_pool import DriverPool, SOURCE_REUSED, SOURCE_PREWARMED, SOURCE_COLD
+    from .watchdog import ChromeWatchdog
+except ImportError:
+    from tracing import Tracer
+    from lean_mode import LeanProfile, PageLoadStats
+    from config_loader import AppConfig, PRODUCT_LIST_URL
+    from stats import StatsCollector, FlowStats
+    from events import account_hash, step_events
+    from vpn import OpenVPNManager
+    from driver_pool import DriverPool, SOURCE_REUSED, SOURCE_PREWARMED, SOURCE_COLD
+    from watchdog import ChromeWatchdog
+
+# Thời gian chờ sau khi kết nối VPN và sau khi ngắt trước khi kết nối lại (giây)
+VPN_CONNECT_WAIT = 5
+VPN_SWITCH_WAIT = 3
+
+# Nghỉ giữa hai vòng quét toàn bộ danh sách sản phẩm (giây)
+ROUND_PAUSE = 1
+
+
+def create_browser(**kwargs):
+    """
+    Tạo BrowserAutomation; module browser (selenium, webdriver-manager, requests) chỉ được
+    import ở lần gọi đầu tiên nên GUI/CLI khởi động không phải chờ các thư viện này
+
+    Args:
+        **kwargs: Tham số của BrowserAutomation
+
+    Returns:
+        BrowserAutomation: Browser mới
+    """
+    try:
+        from .browser import BrowserAutomation
+    except ImportError:
+        from browser import BrowserAutomation
+    return BrowserAutomation(**kwargs)
+
+
+def today():
+    """
+    Ngày hiện tại dạng YYYY-mm-dd (khóa của danh sách đã mua hôm nay)
+    """
+    return datetime.now().strftime('%Y-%m-%d')
+
+
+@dataclass(frozen=True)
+class RunOptions:
+    headless: bool = False
+    chrome_path: str = None
+    scan_mode: str = 'browser'
+    lean_profile: LeanProfile = None  # None = tải trang đầy đủ
+    browser_config: AppConfig = None
+    account_delay: float = 0
+    product_delay: float = 0
+    openvpn_path: str = None
+    openvpn_configs: tuple = ()  # Rỗng = không dùng OpenVPN
+    openvpn_mode: str = 'sequential'  # 'sequential' hoặc 'random'
+    product_list_url: str = PRODUCT_LIST_URL
+
+
+class AutomationEngine:
+    """
+    Chạy vòng lặp login/quét/mua cho một danh sách tài khoản và sản phẩm
+    """
+
+    def __init__(self, product_cache, log=None, emit=None, history=None, save_state=None,
+                 browser_factory=create_browser, vpn_factory=OpenVPNManager, driver_cache=None,
+                 process_registry=None, session_store=None, disk_cache=None):
+        """
+        Args:
+            product_cache (ProductCache): Cache product ID -> URL chi tiết
+            log (callable): log(message, level) cho từng dòng log (mặc định print)
+            emit (callable): emit(event, **fields) ghi event log (tùy chọn)
+            history (HistoryStore): Lịch sử login/purchase (tùy chọn)
+            save_state (callable): Gọi khi danh sách đã mua hôm nay thay đổi (tùy chọn)
+            browser_factory (callable): Tạo BrowserAutomation (thay được trong test)
+            vpn_factory (callable): Tạo OpenVPNManager từ đường dẫn openvpn
+            driver_cache (DriverCache): Manifest Chrome/ChromeDriver dùng cho mọi browser (tùy chọn)
+            process_registry (ProcessRegistry): Ghi process Chrome/ChromeDriver để dọn khi bị bỏ lại (tùy chọn)
+            session_store (SessionStore): Cookie phiên đã lưu theo tài khoản (tùy chọn)
+            disk_cache (DiskCache): Cache HTTP trên đĩa dùng chung cho mọi browser (tùy chọn)
+        """
+        self.product_cache = product_cache
+        self.history = history
+        self._log = log or (lambda message, level="INFO": print(f"[{level}] {message}"))
+        self._emit = emit
+        self._save_state = save_state
+        self.browser_factory = browser_factory
+        self.vpn_factory = vpn_factory
+        self.driver_cache = driver_cache
+        self.process_registry = process_registry
+        self.session_store = session_store
+        self.disk_cache = disk_cache
+
+        # Thống kê đọc bằng snapshot; span từng bước báo bước đang chạy cho bộ thống kê
+        self.stats = StatsCollector()
+        self.flow_stats = FlowStats()
+        self.tracer = Tracer(listener=self.stats.set_current_step)
+        self.page_stats = PageLoadStats()
+
+        # Trạng thái mua hàng theo ngày
+        self.purchased_today = set()
+        self.purchased_date = today()
+
+        self.browser = None
+        self.pool = None
+        self.watchdog = None  # ChromeWatchdog của lần chạy gần nhất (chuỗi bộ nhớ cho báo cáo)
+        self.vpn_manager = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self):
+        return not self._stop.is_set()
+
+    def log(self, message, level="INFO"):
+        self._log(message, level)
+
+    def emit(self, event, **fields):
+        if self._emit is not None:
+            self._emit(event, **fields)
+
+    def wait(self, seconds):
+        """
+        Nghỉ seconds giây, thoát sớm khi bị dừng
+
+        Returns:
+            bool: True nếu đã bị dừng
+        """
+        if seconds and seconds > 0:
+            return self._stop.wait(seconds)
+        return self._stop.is_set()
+
+    def load_state(self, state):
+        """
+        Nạp danh sách tài khoản đã mua hôm nay (bỏ qua nếu là của ngày khác)
+
+        Args:
+            state (dict): {'purchased_today', 'purchased_date'} từ state.json
+        """
+        current = today()
+        if state.get('purchased_date', current) == current:
+            self.purchased_today = set(state.get('purchased_today', []))
+        else:
+            self.purchased_today = set()
+        self.purchased_date = current
+
+    def state(self):
+        """
+        Trạng thái cần lưu vào state.json
+
+        Returns:
+            dict: {'purchased_today', 'purchased_date'}
+        """
+        return {
+            'purchased_today': sorted(self.purchased_today),
+            'purchased_date': self.purchased_date,
+        }
+
+    def save_state(self):
+        if self._save_state is not None:
+            self._save_state()
+
+    def reset_daily_purchases(self):
+        """
+        Xóa đánh dấu các tài khoản đã mua thành công trong hôm nay
+        """
+        self.purchased_today.clear()
+        self.purchased_date = today()
+        self.save_state()
+
+    def reset_stats(self):
+        """
+        Reset thống kê về 0
+        """
+        self.stats.reset()
+        self.flow_stats.reset()
+        self.product_cache.reset_stats()
+        self.page_stats.reset()
+
+    def stop(self):
+        """
+        Dừng automation: báo vòng lặp dừng, đóng browser và ngắt VPN ngay
+
+        Gọi được từ thread khác (nút Dừng, signal handler của CLI).
+        """
+        self._stop.set()
+
+        # Đóng cả browser đang dùng lẫn browser dự phòng/đang khởi động trước
+        pool = self.pool
+        if pool:
+            pool.close(wait=False)
+
+        if self.vpn_manager:
+            try:
+                self.vpn_manager.disconnect()
+                self.log("Đã ngắt kết nối VPN", "INFO")
+            except Exception as e:
+                self.log(f"Lỗi khi ngắt VPN: {str(e)}", "ERROR")
+
+    def connect_vpn(self, options):
+        """
+        Kết nối VPN với IP Nhật Bản tiếp theo (hoặc ngẫu nhiên) rồi chờ kết nối ổn định
+        """
+        if options.openvpn_mode == "random":
+            self.vpn_manager.connect_random_japan()
+        else:
+            self.vpn_manager.connect_next_japan()
+        self.wait(VPN_CONNECT_WAIT)
+
+    def switch_vpn(self, options):
+        """
+        Đổi sang IP Nhật Bản mới cho tài khoản kế tiếp
+        """
+        self.log("Đang đổi sang IP Nhật Bản mới...", "INFO")
+        self.vpn_manager.disconnect()
+        if self.wait(VPN_SWITCH_WAIT):
+            return
+        self.connect_vpn(options)
+        self.log("Đã kết nối VPN mới", "INFO")
+
+    def create_pool(self, options):
+        """
+        Tạo DriverPool cho một lần chạy: mọi browser dùng chung tùy chọn của options
+
+        Returns:
+            DriverPool: Pool chưa khởi động browser nào
+        """
+        def factory():
+            return self.browser_factory(
+                headless=options.headless,
+                chrome_path=options.chrome_path or None,
+                flow_stats=self.flow_stats,
+                tracer=self.tracer,
+                product_cache=self.product_cache,
+                scan_mode=options.scan_mode,
+                lean_profile=options.lean_profile,
+                page_stats=self.page_stats,
+                config=options.browser_config,
+                driver_cache=self.driver_cache,
+                session_store=self.session_store,
+                disk_cache=self.disk_cache
+            )
+
+        browser_config = (options.browser_config or AppConfig()).browser
+        return DriverPool(factory, reuse_limit=browser_config.reuse_limit, prewarm=browser_config.prewarm,
+                          registry=self.process_registry)
+
+    def create_watchdog(self, options):
+        """
+        Tạo ChromeWatchdog theo browser.watchdog trong config
+
+        Returns:
+            ChromeWatchdog: Watchdog (None nếu tắt trong config)
+        """
+        config = (options.browser_config or AppConfig()).browser.watchdog
+        if not config.enabled:
+            return None
+        return ChromeWatchdog(max_rss_mb=config.max_rss_mb, max_cpu_percent=config.max_cpu_percent,
+                              cpu_samples=config.cpu_samples, interval=config.sample_interval)
+
+    def acquire_browser(self, account=None):
+        """
+        Lấy browser từ pool, log và ghi event thời gian từ lúc cần browser tới lúc sẵn sàng
+
+        Args:
+            account (str): Hash email tài khoản (cho event log)
+        """
+        self.browser = self.pool.acquire()
+        acquired = self.pool.last_acquire
+        labels = {SOURCE_REUSED: "dùng lại Chrome", SOURCE_PREWARMED: "khởi động trước", SOURCE_COLD: "khởi động mới"}
+        self.log(f"Browser sẵn sàng sau {acquired['ready'] * 1000:.0f} ms ({labels[acquired['source']]}, "
+                 f"lần dùng {acquired['uses']})", "INFO")
+        self.emit('browser', source=acquired['source'], duration=round(acquired['ready'], 4), uses=acquired['uses'],
+                  account=account)
+        if acquired['source'] != SOURCE_REUSED:
+            self.log_driver_setup(getattr(self.browser, 'last_driver_setup', None))
+        if self.watchdog is not None:
+            self.watchdog.attach(self.browser.process_id())
+
+    def recycle_if_needed(self, account=None):
+        """
+        Điểm an toàn giữa hai sản phẩm: đo Chrome, vượt ngưỡng thì đóng browser để login lại
+        bằng Chrome mới (khởi động trước khi bộ nhớ gần tới ngưỡng)
+
+        Args:
+            account (str): Hash email tài khoản (cho event log)
+
+        Returns:
+            bool: True nếu đã đóng browser (cần login lại)
+        """
+        if self.watchdog is None or self.browser is None:
+            return False
+        previous = self.watchdog.last_sample
+        reason = self.watchdog.check()
+        sample = self.watchdog.last_sample
+        if sample is not None and sample is not previous:
+            self.emit('memory', rss_mb=sample.rss_mb, cpu_percent=sample.cpu_percent, processes=sample.processes)
+        if reason is None:
+            if self.watchdog.near_limit():
+                self.pool.prewarm()
+            return False
+        self.log(f"Chrome vượt ngưỡng ({reason}) -> khởi động lại browser", "WARNING")
+        self.emit('recycle', reason=reason, account=account)
+        self.watchdog.record_recycle(reason)
+        self.close_browser(reuse=False)
+        return True
+
+    def close_browser(self, reuse=False):
+        """
+        Trả browser hiện tại về pool
+
+        Args:
+            reuse (bool): Xóa trạng thái và giữ lại cho tài khoản sau (False = đóng)
+        """
+        browser, self.browser = self.browser, None
+        if reuse and self.watchdog is not None and self.watchdog.near_limit():
+            # Chrome đã gần ngưỡng bộ nhớ: tài khoản sau dùng Chrome mới
+            reuse = False
+        if browser and self.pool:
+            self.pool.release(browser, reuse=reuse)
+        elif browser:
+            browser.close()
+
+    def run(self, accounts, products, options):
+        """
+        Chạy automation đến khi bị dừng hoặc hết tài khoản chưa mua hôm nay
+
+        Args:
+            accounts (list): Các dict {'email', 'password'}
+            products (list): Các dict {'productId'}
+            options (RunOptions): Tùy chọn browser, delay và OpenVPN
+
+        Returns:
+            bool: False nếu dừng vì lỗi
+        """
+        self._stop.clear()
+        ok = True
+        self.pool = self.create_pool(options)
+        self.watchdog = self.create_watchdog(options)
+        try:
+            # Khởi động Chrome đầu tiên trong nền, song song với kết nối VPN
+            if any(account['email'] not in self.purchased_today for account in accounts):
+                self.pool.prewarm()
+
+            # Khởi tạo OpenVPN manager nếu bật
+            if options.openvpn_configs:
+                self.vpn_manager = self.vpn_factory(options.openvpn_path)
+                self.vpn_manager.load_config_files(list(options.openvpn_configs))
+                self.log("Đã khởi tạo OpenVPN Manager", "INFO")
+
+            # Kết nối VPN đầu tiên (nếu bật)
+            if self.vpn_manager and self.vpn_manager.config_files:
+                self.connect_vpn(options)
+                self.log("Đã kết nối VPN với IP Nhật Bản đầu tiên", "INFO")
+
+            self.run_accounts(accounts, products, options)
+
+            # Đóng browser và VPN nếu còn
+            self.close_browser()
+            self.log_pool_stats()
+            self.log_page_cache()
+            if self.vpn_manager:
+                self.vpn_manager.disconnect()
+                self.log("Đã ngắt kết nối VPN", "INFO")
+
+            self.log("Hoàn thành automation!", "SUCCESS")
+
+        except Exception as e:
+            ok = not self.running
+            if self.running:
+                self.log(f"Lỗi trong automation: {str(e)}", "ERROR")
+
+        finally:
+            # Đảm bảo đóng tất cả kết nối và mọi Chrome/ChromeDriver đã khởi động
+            self.browser = None
+            try:
+                self.pool.close()
+            except Exception:
+                pass
+
+            if self.vpn_manager:
+                try:
+                    self.vpn_manager.disconnect()
+                except Exception:
+                    pass
+                self.vpn_manager = None
+
+            self.product_cache.save()
+            self._stop.set()
+        return ok
+
+    def run_accounts(self, accounts, products, options):
+        """
+        Vòng lặp chính: lần lượt từng tài khoản chưa mua hôm nay, quét đến khi mua được
+        """
+        current_account_index = 0
+        current_account = None
+        is_logged_in = False
+        has_vpn = bool(self.vpn_manager and self.vpn_manager.config_files)
+
+        while self.running:
+            # Đảm bảo ngày hiện tại; nếu qua ngày mới, tự làm sạch đánh dấu
+            today_str = today()
+            if self.purchased_date != today_str:
+                self.purchased_today.clear()
+                self.purchased_date = today_str
+                self.save_state()
+
+            # Tìm tài khoản kế tiếp chưa mua hôm nay
+            found_account = False
+            while current_account_index < len(accounts):
+                candidate = accounts[current_account_index]
+                if candidate['email'] not in self.purchased_today:
+                    current_account = candidate
+                    found_account = True
+                    break
+                current_account_index += 1
+
+            if not found_account:
+                self.log("Đã sử dụng hết tài khoản hợp lệ (đã mua hôm nay sẽ bị bỏ qua).", "WARNING")
+                break
+
+            account_id = account_hash(current_account['email'])
+
+            # Nếu chưa đăng nhập, đăng nhập vào tài khoản hiện tại
+            if not is_logged_in or self.browser is None:
+                self.log(f"Đăng nhập với tài khoản: {current_account['email']}", "INFO")
+
+                self.acquire_browser(account_id)
+
+                login_ok = self.browser.login(current_account['email'], current_account['password'])
+                login_timing = self.browser.last_login_timing
+                restored = login_ok and getattr(self.browser, 'last_login_source', None) == 'session'
+                self.log_flow_timing('login', login_timing, self.browser.last_login_spans, account=account_id)
+                self.record_attempt('login', login_ok, account_id, timing=login_timing,
+                                    spans=self.browser.last_login_spans, session=restored or None)
+                if login_ok:
+                    via = " (phiên đã lưu)" if restored else ""
+                    self.log(f"Đăng nhập thành công{via}: {current_account['email']}", "SUCCESS")
+                    is_logged_in = True
+                else:
+                    self.log(f"Đăng nhập thất bại: {current_account['email']}", "ERROR")
+                    self.close_browser(reuse=current_account_index + 1 < len(accounts))
+                    is_logged_in = False
+                    # Chuyển qua tài khoản tiếp theo, đổi VPN nếu còn tài khoản
+                    current_account_index += 1
+                    if current_account_index < len(accounts):
+                        self.pool.prewarm()
+                        if has_vpn:
+                            self.switch_vpn(options)
+                    continue
+
+            # Đã đăng nhập -> quét liên tục danh sách sản phẩm cho đến khi mua thành công hoặc bị dừng
+            purchase_success = False
+            while self.running and is_logged_in and not purchase_success:
+                detail_urls = self.resolve_detail_urls(products, options)
+                found_products = [p for p in products if p['productId'] in detail_urls]
+
+                for product_idx, product in enumerate(found_products):
+                    if not self.running or not is_logged_in:
+                        break
+
+                    # Thử mua sản phẩm
+                    self.stats.record_scan()
+
+                    product_name = product.get('productId')
+                    self.log(f"Đang thử mua sản phẩm ({product_idx + 1}/{len(found_products)}): {product_name}",
+                             "INFO")
+
+                    result = self.browser.purchase_product(
+                        options.product_list_url, product['productId'],
+                        detail_url=detail_urls[product['productId']]
+                    )
+                    self.log_flow_timing('purchase', result.get('timing'), result.get('spans'),
+                                         account=account_id, product=product_name)
+                    self.record_attempt('purchase', result['success'], account_id, product=product_name,
+                                        timing=result.get('timing'), spans=result.get('spans'),
+                                        error=result['error'], error_class=result.get('error_class'))
+
+                    if result['success']:
+                        purchase_success = True
+                        self.stats.record_result(True)
+                        self.log(f"Mua thành công: {product_name}", "SUCCESS")
+
+                        # Đánh dấu tài khoản đã mua hôm nay và lưu
+                        self.purchased_today.add(current_account['email'])
+                        self.purchased_date = today_str
+                        self.save_state()
+
+                        # Đăng xuất và trả browser (xóa cookie/storage) trước khi đổi IP
+                        try:
+                            self.browser.logout()
+                        except Exception:
+                            pass
+                        self.close_browser(reuse=current_account_index + 1 < len(accounts))
+                        is_logged_in = False
+
+                        # Chuyển tài khoản tiếp theo, đổi VPN (nếu bật) cho tài khoản kế tiếp;
+                        # Chrome kế tiếp (nếu không dùng lại được) khởi động trong lúc đổi VPN và nghỉ
+                        current_account = None
+                        current_account_index += 1
+                        if current_account_index < len(accounts):
+                            self.pool.prewarm()
+                            if has_vpn:
+                                self.switch_vpn(options)
+
+                        # Delay giữa các tài khoản
+                        self.wait(options.account_delay)
+                        break
+                    else:
+                        self.stats.record_result(False)
+                        error_msg = result['error'] or "Lỗi không xác định"
+                        self.log(f"Mua thất bại: {product_name} - {error_msg}", "ERROR")
+
+                        # Giữ nguyên IP và tài khoản, tiếp tục sản phẩm tiếp theo
+                        self.log("Mua thất bại -> Giữ nguyên IP và tài khoản, tiếp tục quét tiếp", "INFO")
+                        # Delay giữa các sản phẩm
+                        self.wait(options.product_delay)
+                        if self.recycle_if_needed(account_id):
+                            is_logged_in = False
+
+                self.product_cache.save()
+
+                # Kết thúc một vòng quét toàn bộ danh sách -> lặp lại nếu chưa thành công
+                # Thêm một nhịp nghỉ ngắn để giảm tải
+                if not purchase_success and self.running and is_logged_in:
+                    if self.recycle_if_needed(account_id):
+                        is_logged_in = False
+                    else:
+                        self.wait(ROUND_PAUSE)
+
+    def log_pool_stats(self):
+        """
+        Log tổng kết DriverPool: số lần dùng lại/khởi động trước/khởi động mới, thời gian chờ trung bình
+        """
+        stats = self.pool.stats()
+        if not stats['acquired']:
+            return
+        self.log(f"Browser: {stats['acquired']} lần lấy ({stats['reused']} dùng lại, {stats['prewarmed']} khởi động "
+                 f"trước, {stats['cold']} khởi động mới), chờ trung bình {stats['ready_mean'] * 1000:.0f} ms, "
+                 f"{stats['launched']} Chrome đã khởi động", "INFO")
+
+    def log_page_cache(self):
+        """
+        Log tỷ lệ tài nguyên lấy từ cache HTTP và thời gian tải trang đầu của mỗi Chrome mới
+        """
+        report = self.page_stats.report()
+        if report.get('cache_hit_ratio') is None:
+            return
+        message = f"Cache HTTP: {report['cache_hit_ratio']:.1f}% tài nguyên lấy từ cache"
+        if report['first_load_ms_mean'] is not None:
+            message += (f", trang đầu của Chrome mới tải trung bình {report['first_load_ms_mean']:.0f} ms "
+                        f"({report['first_pages']} lần)")
+        self.log(message, "INFO")
+
+    def log_driver_setup(self, setup):
+        """
+        Log thời gian tìm ChromeDriver và khởi tạo Chrome của browser vừa tạo
+
+        Args:
+            setup (dict): BrowserAutomation.last_driver_setup (None = chưa tạo được driver)
+        """
+        if not setup:
+            return
+        origin = "cache" if setup['cached'] else f"tìm mới ({setup['source']})"
+        self.log(f"Khởi tạo Chrome {setup['create']:.2f}s, tìm ChromeDriver {setup['resolve'] * 1000:.0f} ms "
+                 f"[{origin}, Chrome {setup['chrome_version'] or '?'}, "
+                 f"ChromeDriver {setup['driver_version'] or '?'}]", "INFO")
+
+    def resolve_detail_urls(self, products, options):
+        """
+        URL trang chi tiết cho các sản phẩm: lấy từ cache, phần còn lại tìm trong một lần quét listing
+
+        Returns:
+            dict: {product ID: URL chi tiết} (sản phẩm không có trên listing bị bỏ qua)
+        """
+        detail_urls = {}
+        for product in products:
+            cached = self.product_cache.get(product['productId'])
+            if cached:
+                detail_urls[product['productId']] = cached['url']
+        uncached_ids = [product['productId'] for product in products if product['productId'] not in detail_urls]
+        if uncached_ids:
+            listing_index = self.browser.scan_listing(uncached_ids, options.product_list_url)
+            if listing_index.missing:
+                self.log(f"Không có trên listing: {', '.join(listing_index.missing)}", "INFO")
+            for product_id, entry in listing_index.entries.items():
+                self.product_cache.put(product_id, entry['url'], entry['page'])
+                detail_urls[product_id] = entry['url']
+        return detail_urls
+
+    def log_flow_timing(self, flow_name, timing, spans=None, account=None, product=None):
+        """
+        Ghi log thời gian chờ/làm việc của một lần chạy flow
+
+        Args:
+            flow_name (str): Tên flow (login, purchase)
+            timing (dict): {'total', 'waiting', 'working'} từ WaitEngine.flow()
+            spans (dict): Cây span từ Tracer.breakdown() (tùy chọn)
+            account (str): Hash email tài khoản (cho event log)
+            product (str): Product ID (cho event log)
+        """
+        self.stats.record_flow(flow_name, spans)
+        for step, duration in step_events(spans):
+            self.emit('step', flow=flow_name, step=step, duration=duration, account=account, product=product)
+        if not timing:
+            return
+        message = (f"[timing] {flow_name}: tổng {timing['total']:.2f}s, "
+                   f"chờ {timing['waiting']:.2f}s, làm việc {timing['working']:.2f}s")
+        if spans and spans.get('children'):
+            steps = ", ".join(f"{child['name']} {child['duration']:.2f}s" for child in spans['children'])
+            message += f" | {steps}"
+        self.log(message, "INFO")
+
+    def record_attempt(self, kind, ok, account, product=None, timing=None, spans=None, error=None,
+                       error_class=None, session=None):
+        """
+        Ghi kết quả một lần login/purchase vào event log và lịch sử SQLite
+
+        Args:
+            kind (str): 'login' hoặc 'purchase'
+            ok (bool): Thành công
+            account (str): Hash email tài khoản
+            product (str): Product ID
+            timing (dict): {'total', 'waiting', 'working'} từ WaitEngine.flow()
+            spans (dict): Cây span từ Tracer.breakdown()
+            error (str): Thông báo lỗi
+            error_class (str): Tên exception
+            session (bool): Login bằng cookie đã lưu (chỉ cho event log)
+        """
+        steps = step_events(spans)
+        duration = round(timing['total'], 3) if timing else (spans['duration'] if spans else None)
+        step = steps[-1][0] if steps else None
+        self.emit(kind, account=account, product=product, ok=ok, duration=duration, step=step,
+                  error=error, error_class=error_class, session=session)
+        if self.history is not None:
+            self.history.record(kind, ok, account=account, product=product, duration=duration,
+                                waiting=round(timing['waiting'], 3) if timing else None, step=step,
+                                error=error, error_class=error_class, spans=spans)
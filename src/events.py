@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Event log dạng JSON Lines và lệnh phân tích offline
+
+Song song với log chữ, mỗi log_message, lần đăng nhập, lần mua và từng bước của flow
+được ghi thành một dòng JSON có trường cố định:
+    ts, event ('log', 'login', 'purchase', 'step', 'browser'), level, message, account (hash email),
+    product, flow, step, duration (giây), ok, error, error_class
+Event 'browser' ghi thời gian từ lúc cần browser tới lúc sẵn sàng (source: reused/prewarmed/cold).
+Ghi qua queue ở thread nền vào logs/events.jsonl, xoay và nén giống file log
+(events.jsonl.1.gz, ...).
+
+Lệnh phân tích đọc từng dòng (kể cả file .gz) nên không phải load cả file vào bộ nhớ;
+percentile độ trễ được tính từ histogram bucket logarit (sai số tương đối khoảng 5%).
+
+Cách chạy:
+    python src/events.py logs/events.jsonl*
+    python src/events.py logs/events.jsonl* --since 2024-05-01 --json
+"""
+
+import argparse
+import bisect
+import gzip
+import hashlib
+import json
+import logging
+import math
+import os
+import queue
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+
+try:
+    from .log_setup import GzipRotatingFileHandler, QueueListener
+except ImportError:
+    from log_setup import GzipRotatingFileHandler, QueueListener
+
+# Tên file event trong thư mục log
+EVENTS_FILENAME = 'events.jsonl'
+
+# Bucket histogram: 1ms đến ~1 giờ, 24 bucket mỗi bậc 10 (mỗi bucket rộng ~10%)
+HISTOGRAM_MIN = 0.001
+HISTOGRAM_BUCKETS_PER_DECADE = 24
+HISTOGRAM_DECADES = 7
+
+
+def account_hash(email):
+    """
+    Hash ngắn của email để phân biệt tài khoản mà không ghi email ra file
+
+    Args:
+        email (str): Email tài khoản
+
+    Returns:
+        str: 12 ký tự hex, None nếu không có email
+    """
+    if not email:
+        return None
+    return hashlib.blake2b(email.strip().lower().encode('utf-8'), digest_size=6).hexdigest()
+
+
+def format_event(ts, event, fields):
+    """
+    Định dạng một event thành một dòng JSON (trường có giá trị None được bỏ qua)
+
+    Args:
+        ts (float): Thời điểm (epoch giây)
+        event (str): Loại event
+        fields (dict): Các trường của event
+
+    Returns:
+        str: Dòng JSON (không có ký tự xuống dòng)
+    """
+    record = {'ts': round(ts, 3), 'event': event}
+    record.update((key, value) for key, value in fields.items() if value is not None)
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+
+
+class EventLog:
+    """
+    Ghi event JSON Lines qua queue (thread gọi emit không làm I/O)
+    """
+
+    def __init__(self, path, max_file_size=10 * 1024 * 1024, max_files=5, clock=time.time):
+        """
+        Args:
+            path (str): File events.jsonl
+            max_file_size (int): Dung lượng tối đa trước khi xoay file (byte)
+            max_files (int): Số file đã xoay (nén .gz) được giữ lại
+            clock (callable): Hàm trả về thời gian hiện tại (epoch giây)
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._clock = clock
+        handler = GzipRotatingFileHandler(path, max_file_size, max_files)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        self._queue = queue.SimpleQueue()
+        self._listener = QueueListener(self._queue, handler)
+        self._listener.start()
+
+    def emit(self, event, **fields):
+        """
+        Ghi một event (trường có giá trị None được bỏ qua)
+
+        Args:
+            event (str): Loại event ('log', 'login', 'purchase', 'step', 'browser')
+            **fields: Các trường của event
+        """
+        line = format_event(self._clock(), event, fields)
+        self._queue.put(logging.makeLogRecord({'msg': line, 'levelno': logging.INFO, 'levelname': 'INFO'}))
+
+    def close(self):
+        """
+        Ghi nốt các event còn trong queue và đóng file
+        """
+        self._listener.stop()
+
+
+def step_events(spans):
+    """
+    Các bước (con trực tiếp) trong cây span của một flow
+
+    Args:
+        spans (dict): Cây span từ Tracer.breakdown()
+
+    Returns:
+        list: Các (tên bước, thời gian)
+    """
+    if not spans:
+        return []
+    return [(child['name'], child['duration']) for child in spans.get('children', [])]
+
+
+class LatencyHistogram:
+    """
+    Histogram độ trễ với bucket logarit: bộ nhớ cố định, percentile gần đúng
+    """
+
+    def __init__(self):
+        count = HISTOGRAM_BUCKETS_PER_DECADE * HISTOGRAM_DECADES
+        self.bounds = [HISTOGRAM_MIN * 10 ** (index / HISTOGRAM_BUCKETS_PER_DECADE) for index in range(1, count + 1)]
+        self.buckets = [0] * (count + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        """
+        Thêm một giá trị (giây)
+        """
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, p):
+        """
+        Percentile gần đúng (trung điểm hình học của bucket, kẹp trong [min, max])
+
+        Args:
+            p (float): Percentile (0-100)
+
+        Returns:
+            float: Giá trị, None nếu chưa có dữ liệu
+        """
+        if not self.count:
+            return None
+        if p >= 100:
+            return self.max
+        rank = max(1, math.ceil(self.count * p / 100.0))
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= rank:
+                break
+        upper = self.bounds[index] if index < len(self.bounds) else self.max
+        lower = self.bounds[index - 1] if index > 0 else min(self.min, upper)
+        value = math.sqrt(lower * upper) if lower > 0 else upper
+        return min(max(value, self.min), self.max)
+
+    def summary(self):
+        """
+        Returns:
+            dict: {'count', 'mean', 'p50', 'p90', 'p99', 'max'}
+        """
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 3),
+            'p50': round(self.percentile(50), 3),
+            'p90': round(self.percentile(90), 3),
+            'p99': round(self.percentile(99), 3),
+            'max': round(self.max, 3),
+        }
+
+
+def iter_events(paths, stats=None):
+    """
+    Đọc event từ các file .jsonl / .jsonl.N.gz, từng dòng một
+
+    Args:
+        paths (list): Các file event
+        stats (Counter): Đếm 'lines', 'bad_lines' (tùy chọn)
+
+    Yields:
+        dict: Event
+    """
+    stats = stats if stats is not None else Counter()
+    for path in paths:
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                stats['lines'] += 1
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    stats['bad_lines'] += 1
+                    continue
+                if isinstance(event, dict) and 'event' in event:
+                    yield event
+                else:
+                    stats['bad_lines'] += 1
+
+
+class EventSummary:
+    """
+    Tổng hợp event theo luồng (không giữ lại từng event)
+    """
+
+    def __init__(self):
+        self.first_ts = None
+        self.last_ts = None
+        self.purchases = 0
+        self.purchases_ok = 0
+        self.logins = 0
+        self.logins_ok = 0
+        self.logins_restored = 0  # Login bằng cookie đã lưu (không điền form)
+        self.levels = Counter()
+        self.failures = Counter()  # (step, error_class) -> số lần
+        self.steps = {}  # 'flow.step' -> LatencyHistogram
+        self.flows = {}  # flow -> LatencyHistogram
+        self.accounts = set()
+
+    def add(self, event):
+        """
+        Thêm một event vào tổng hợp
+        """
+        ts = event.get('ts')
+        if isinstance(ts, (int, float)):
+            self.first_ts = ts if self.first_ts is None else min(self.first_ts, ts)
+            self.last_ts = ts if self.last_ts is None else max(self.last_ts, ts)
+        if event.get('account'):
+            self.accounts.add(event['account'])
+
+        kind = event['event']
+        duration = event.get('duration')
+        if kind == 'log':
+            self.levels[event.get('level', 'INFO')] += 1
+        elif kind == 'step' and isinstance(duration, (int, float)):
+            name = f"{event.get('flow', '?')}.{event.get('step', '?')}"
+            self.steps.setdefault(name, LatencyHistogram()).add(duration)
+        elif kind == 'browser' and isinstance(duration, (int, float)):
+            self.flows.setdefault('browser_ready', LatencyHistogram()).add(duration)
+        elif kind in ('login', 'purchase'):
+            # Login bằng phiên đã lưu tính riêng để so với login bằng form
+            flow = 'login_session' if kind == 'login' and event.get('session') else kind
+            if isinstance(duration, (int, float)):
+                self.flows.setdefault(flow, LatencyHistogram()).add(duration)
+            if kind == 'login':
+                self.logins += 1
+                self.logins_ok += bool(event.get('ok'))
+                self.logins_restored += bool(event.get('session'))
+            else:
+                self.purchases += 1
+                if event.get('ok'):
+                    self.purchases_ok += 1
+                else:
+                    self.failures[(event.get('step') or '?', event.get('error_class') or '-')] += 1
+
+    def report(self):
+        """
+        Returns:
+            dict: Báo cáo tổng hợp (thông lượng, lỗi, độ trễ theo bước)
+        """
+        hours = (self.last_ts - self.first_ts) / 3600.0 if self.first_ts is not None else 0
+        failed = self.purchases - self.purchases_ok
+        return {
+            'period': {
+                'start': datetime.fromtimestamp(self.first_ts).isoformat() if self.first_ts else None,
+                'end': datetime.fromtimestamp(self.last_ts).isoformat() if self.last_ts else None,
+                'hours': round(hours, 2),
+            },
+            'throughput': {
+                'purchases': self.purchases,
+                'purchases_ok': self.purchases_ok,
+                'purchases_per_hour': round(self.purchases / hours, 2) if hours else None,
+                'success_rate': round(self.purchases_ok / self.purchases * 100, 1) if self.purchases else 0,
+                'logins': self.logins,
+                'login_failures': self.logins - self.logins_ok,
+                'logins_restored': self.logins_restored,
+                'accounts': len(self.accounts),
+            },
+            'failures': [
+                {'step': step, 'error_class': error_class, 'count': count,
+                 'share': round(count / failed * 100, 1)}
+                for (step, error_class), count in self.failures.most_common()
+            ],
+            'flows': {name: histogram.summary() for name, histogram in sorted(self.flows.items())},
+            'steps': {name: histogram.summary() for name, histogram in sorted(self.steps.items())},
+            'log_levels': dict(self.levels),
+        }
+
+
+def print_report(report):
+    """
+    In báo cáo dạng text
+    """
+    period = report['period']
+    throughput = report['throughput']
+    print(f"Khoảng thời gian: {period['start']} -> {period['end']} ({period['hours']} giờ)")
+    print(f"Mua: {throughput['purchases']} lần, thành công {throughput['purchases_ok']} "
+          f"({throughput['success_rate']}%), {throughput['purchases_per_hour']} lần/giờ")
+    print(f"Đăng nhập: {throughput['logins']} lần, thất bại {throughput['login_failures']}, "
+          f"dùng phiên đã lưu {throughput.get('logins_restored', 0)}, {throughput['accounts']} tài khoản")
+
+    if report['failures']:
+        print("\n=== Lỗi mua hàng theo bước ===")
+        print(f"{'bước':<20}{'loại lỗi':<28}{'số lần':>8}{'%':>8}")
+        for row in report['failures']:
+            print(f"{row['step']:<20}{row['error_class']:<28}{row['count']:>8}{row['share']:>8}")
+
+    for title, rows in (("Flow (giây)", report['flows']), ("Bước (giây)", report['steps'])):
+        if not rows:
+            continue
+        print(f"\n=== {title} ===")
+        print(f"{'':<28}{'n':>7}{'mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}")
+        for name, stats in rows.items():
+            print(f"{name:<28}{stats['count']:>7}" + "".join(
+                f"{stats[key]:>9.3f}" for key in ('mean', 'p50', 'p90', 'p99', 'max')))
+
+
+def summarize_files(paths, since=None, until=None):
+    """
+    Tổng hợp event từ các file
+
+    Args:
+        paths (list): Các file event
+        since (float): Chỉ lấy event từ thời điểm này (epoch giây, tùy chọn)
+        until (float): Chỉ lấy event trước thời điểm này (epoch giây, tùy chọn)
+
+    Returns:
+        dict: Báo cáo (kèm 'lines', 'bad_lines')
+    """
+    stats = Counter()
+    summary = EventSummary()
+    for event in iter_events(paths, stats):
+        if since is not None or until is not None:
+            ts = event.get('ts')
+            if isinstance(ts, bool) or not isinstance(ts, (int, float)):
+                # Không lọc được theo thời gian: tính là dòng không đọc được
+                stats['bad_lines'] += 1
+                continue
+            if (since is not None and ts < since) or (until is not None and ts >= until):
+                continue
+        summary.add(event)
+    report = summary.report()
+    report['lines'] = stats['lines']
+    report['bad_lines'] = stats['bad_lines']
+    return report
+
+
+def parse_date(value):
+    """
+    Chuyển 'YYYY-mm-dd' hoặc 'YYYY-mm-ddTHH:MM' thành epoch giây (argparse type)
+    """
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Ngày không hợp lệ: {value}")
+
+
+def main(argv=None):
+    """
+    Entry point dòng lệnh: tổng hợp event log
+    """
+    parser = argparse.ArgumentParser(description="Phân tích event log (events.jsonl) của ER Sports Automation")
+    parser.add_argument('files', nargs='+', help="Các file events.jsonl / events.jsonl.N.gz")
+    parser.add_argument('--since', type=parse_date, default=None, help="Từ ngày (YYYY-mm-dd[THH:MM])")
+    parser.add_argument('--until', type=parse_date, default=None, help="Đến trước ngày (YYYY-mm-dd[THH:MM])")
+    parser.add_argument('--json', action='store_true', help="In kết quả dạng JSON")
+    args = parser.parse_args(argv)
+
+    missing = [path for path in args.files if not os.path.exists(path)]
+    if missing:
+        parser.error(f"Không tìm thấy file: {', '.join(missing)}")
+
+    report = summarize_files(args.files, args.since, args.until)
+    if args.json:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print_report(report)
+        if report['bad_lines']:
+            print(f"\nBỏ qua {report['bad_lines']}/{report['lines']} dòng không đọc được")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
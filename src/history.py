@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lịch sử các lần login/purchase lưu trong SQLite
+
+Mỗi kết quả login/purchase (kèm thời gian, bước cuối, loại lỗi và cây span) được đưa
+vào queue; một thread nền ghi theo lô trong một transaction (WAL, synchronous=NORMAL),
+nên thread automation không phải chờ disk. Báo cáo theo sản phẩm/theo giờ được tính
+trực tiếp bằng SQL; xuất CSV/JSONL đọc theo từng khối từ cursor cho khoảng thời gian bất kỳ.
+"""
+
+import os
+import csv
+import json
+import time
+import queue
+import sqlite3
+import threading
+
+# Tên file database trong thư mục cấu hình
+HISTORY_FILENAME = 'history.db'
+
+# Số bản ghi tối đa mỗi transaction và thời gian chờ gom lô (giây)
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 2.0
+
+# Số dòng đọc mỗi lần khi xuất
+FETCH_SIZE = 500
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    account TEXT,
+    product TEXT,
+    ok INTEGER NOT NULL,
+    duration REAL,
+    waiting REAL,
+    step TEXT,
+    error TEXT,
+    error_class TEXT,
+    spans TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_attempts_ts ON attempts (ts);
+CREATE INDEX IF NOT EXISTS idx_attempts_product_ts ON attempts (product, ts);
+"""
+
+COLUMNS = ('ts', 'kind', 'account', 'product', 'ok', 'duration', 'waiting', 'step', 'error', 'error_class', 'spans')
+
+INSERT_SQL = f"INSERT INTO attempts ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})"
+
+
+def _time_filter(start, end):
+    """
+    Điều kiện WHERE theo khoảng thời gian [start, end)
+
+    Returns:
+        tuple: (chuỗi WHERE, tham số)
+    """
+    clauses = []
+    params = []
+    if start is not None:
+        clauses.append("ts >= ?")
+        params.append(start)
+    if end is not None:
+        clauses.append("ts < ?")
+        params.append(end)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+class HistoryStore:
+    """
+    Lưu lịch sử login/purchase vào SQLite (ghi theo lô ở thread nền)
+    """
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL, clock=time.time):
+        """
+        Mở (hoặc tạo) database và khởi động thread ghi
+
+        Args:
+            path (str): File SQLite
+            batch_size (int): Số bản ghi tối đa mỗi transaction
+            flush_interval (float): Thời gian chờ gom lô (giây)
+            clock (callable): Hàm trả về thời gian hiện tại (epoch giây)
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._clock = clock
+        self._queue = queue.Queue()
+        self.written = 0
+
+        connection = self._connect()
+        try:
+            connection.executescript(SCHEMA)
+            connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        finally:
+            connection.close()
+
+        self._thread = threading.Thread(target=self._writer, name='history-writer', daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def record(self, kind, ok, account=None, product=None, duration=None, waiting=None, step=None,
+               error=None, error_class=None, spans=None, ts=None):
+        """
+        Đưa một kết quả vào hàng đợi ghi (không chờ disk)
+
+        Args:
+            kind (str): 'login' hoặc 'purchase'
+            ok (bool): Thành công
+            account (str): Hash email tài khoản
+            product (str): Product ID
+            duration (float): Tổng thời gian (giây)
+            waiting (float): Thời gian chờ trong flow (giây)
+            step (str): Bước cuối cùng đã chạy
+            error (str): Thông báo lỗi
+            error_class (str): Tên exception
+            spans (dict): Cây span từ Tracer.breakdown()
+            ts (float): Thời điểm (epoch giây, mặc định hiện tại)
+        """
+        self._queue.put((ts if ts is not None else self._clock(), kind, account, product, int(bool(ok)),
+                         duration, waiting, step, error, error_class,
+                         json.dumps(spans, ensure_ascii=False) if spans else None))
+
+    def _writer(self):
+        connection = self._connect()
+        try:
+            running = True
+            while running:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+                rows = []
+                waiters = []
+                while True:
+                    if item is None:
+                        running = False
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        rows.append(item)
+                    if not running or len(rows) >= self.batch_size:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if rows:
+                    try:
+                        with connection:
+                            connection.executemany(INSERT_SQL, rows)
+                        self.written += len(rows)
+                    except sqlite3.Error as e:
+                        print(f"[history] Lỗi khi ghi lịch sử: {str(e)}")
+                for waiter in waiters:
+                    waiter.set()
+        finally:
+            connection.close()
+
+    def flush(self, timeout=10):
+        """
+        Chờ các bản ghi đã đưa vào hàng đợi được ghi xong
+
+        Returns:
+            bool: True nếu đã ghi xong trong thời gian chờ
+        """
+        if not self._thread.is_alive():
+            return False
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """
+        Ghi nốt hàng đợi và dừng thread ghi
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _query(self, sql, params=()):
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.row_factory = sqlite3.Row
+        try:
+            return [dict(row) for row in connection.execute(sql, params)]
+        finally:
+            connection.close()
+
+    def product_summary(self, start=None, end=None):
+        """
+        Tổng hợp purchase theo sản phẩm
+
+        Args:
+            start (float): Từ thời điểm (epoch giây, tùy chọn)
+            end (float): Đến trước thời điểm (epoch giây, tùy chọn)
+
+        Returns:
+            list: Các dict {'product', 'attempts', 'successes', 'success_rate', 'avg_duration',
+                'max_duration', 'last_success'}
+        """
+        where, params = _time_filter(start, end)
+        where += (" AND " if where else " WHERE ") + "kind = 'purchase'"
+        return self._query(f"""
+            SELECT product,
+                   COUNT(*) AS attempts,
+                   SUM(ok) AS successes,
+                   ROUND(100.0 * SUM(ok) / COUNT(*), 1) AS success_rate,
+                   ROUND(AVG(duration), 3) AS avg_duration,
+                   ROUND(MAX(duration), 3) AS max_duration,
+                   MAX(CASE WHEN ok THEN ts END) AS last_success
+            FROM attempts{where}
+            GROUP BY product
+            ORDER BY attempts DESC""", params)
+
+    def hourly_summary(self, start=None, end=None):
+        """
+        Tổng hợp login/purchase theo giờ (giờ địa phương)
+
+        Returns:
+            list: Các dict {'hour', 'kind', 'attempts', 'successes', 'avg_duration'}
+        """
+        where, params = _time_filter(start, end)
+        return self._query(f"""
+            SELECT strftime('%Y-%m-%d %H:00', ts, 'unixepoch', 'localtime') AS hour,
+                   kind,
+                   COUNT(*) AS attempts,
+                   SUM(ok) AS successes,
+                   ROUND(AVG(duration), 3) AS avg_duration
+            FROM attempts{where}
+            GROUP BY hour, kind
+            ORDER BY hour, kind""", params)
+
+    def failure_summary(self, start=None, end=None):
+        """
+        Số lần thất bại theo loại, bước cuối và loại lỗi
+
+        Returns:
+            list: Các dict {'kind', 'step', 'error_class', 'failures'}
+        """
+        where, params = _time_filter(start, end)
+        where += (" AND " if where else " WHERE ") + "ok = 0"
+        return self._query(f"""
+            SELECT kind, step, error_class, COUNT(*) AS failures
+            FROM attempts{where}
+            GROUP BY kind, step, error_class
+            ORDER BY failures DESC""", params)
+
+    def iter_rows(self, start=None, end=None):
+        """
+        Đọc lần lượt các bản ghi trong khoảng thời gian (theo khối FETCH_SIZE dòng)
+
+        Yields:
+            dict: Bản ghi (spans đã parse lại thành dict)
+        """
+        where, params = _time_filter(start, end)
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.row_factory = sqlite3.Row
+        try:
+            cursor = connection.execute(f"SELECT id, {', '.join(COLUMNS)} FROM attempts{where} ORDER BY ts", params)
+            while True:
+                rows = cursor.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                for row in rows:
+                    record = dict(row)
+                    record['ok'] = bool(record['ok'])
+                    if record['spans']:
+                        record['spans'] = json.loads(record['spans'])
+                    yield record
+        finally:
+            connection.close()
+
+    def export(self, filename, start=None, end=None):
+        """
+        Xuất bản ghi ra file CSV hoặc JSONL (theo đuôi file)
+
+        Args:
+            filename (str): File đích (.csv hoặc .jsonl)
+            start (float): Từ thời điểm (epoch giây, tùy chọn)
+            end (float): Đến trước thời điểm (epoch giây, tùy chọn)
+
+        Returns:
+            int: Số bản ghi đã xuất
+        """
+        count = 0
+        if filename.lower().endswith('.csv'):
+            with open(filename, 'w', encoding='utf-8-sig', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(('id',) + COLUMNS)
+                for record in self.iter_rows(start, end):
+                    if record['spans']:
+                        record['spans'] = json.dumps(record['spans'], ensure_ascii=False)
+                    writer.writerow([record['id']] + [record[column] for column in COLUMNS])
+                    count += 1
+        else:
+            with open(filename, 'w', encoding='utf-8') as f:
+                for record in self.iter_rows(start, end):
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    count += 1
+        return count
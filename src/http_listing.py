@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Quét listing bằng HTTP trực tiếp (không render trong Chrome)
+
+Cookie của phiên WebDriver đã đăng nhập được chép sang một requests.Session có
+connection pool keep-alive; các trang shopbrand.html được tải trực tiếp và phân
+tích bằng HTMLParser. Selenium chỉ còn dùng cho trang chi tiết, giỏ hàng và
+checkout. Kết quả có cùng dạng với listing.extract_listing() nên có thể thay thế
+trực tiếp trong vòng quét.
+
+Vòng quét liên tục thường gặp lại đúng các trang cũ, nên mỗi trang được nhớ lại:
+- Gửi If-None-Match / If-Modified-Since khi server có ETag / Last-Modified; 304 thì
+  dùng lại kết quả phân tích trước đó (không tải lại nội dung)
+- Băm nội dung đã chuẩn hóa (bỏ script, comment, khoảng trắng); trang không đổi thì
+  dùng lại kết quả mà không phải chạy parser
+"""
+
+import re
+import hashlib
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Số kết nối giữ lại trong pool cho mỗi host
+DEFAULT_POOL_SIZE = 4
+
+# Timeout mỗi request (giây)
+DEFAULT_TIMEOUT = 10
+
+# <meta charset="..."> / content="text/html; charset=..." trong phần đầu trang
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([A-Za-z0-9_\-]+)', re.IGNORECASE)
+
+# Phần không ảnh hưởng tới danh sách sản phẩm nhưng có thể đổi giữa các lần tải
+VOLATILE_RE = re.compile(r'<script\b.*?</script>|<!--.*?-->|<input[^>]*type=["\']?hidden[^>]*>',
+                         re.IGNORECASE | re.DOTALL)
+WHITESPACE_RE = re.compile(r'\s+')
+TAG_GAP_RE = re.compile(r'>\s+<')
+
+# Số trang listing tối đa được nhớ lại
+DEFAULT_MAX_PAGES = 64
+
+
+class ListingHTMLParser(HTMLParser):
+    """
+    Lấy (tên, href) của link shopdetail và link "次の48件" (li.next a) từ HTML listing
+    """
+
+    def __init__(self, base_url=''):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.items = []
+        self.next_link = None
+        self._seen = set()
+        self._anchor = None  # [href, list text, là link next]
+        self._next_li_depth = 0
+        self._li_stack = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'li':
+            classes = (dict(attrs).get('class') or '').split()
+            is_next = 'next' in classes
+            self._li_stack.append(is_next)
+            if is_next:
+                self._next_li_depth += 1
+        elif tag == 'a':
+            href = dict(attrs).get('href') or ''
+            self._anchor = [href, [], self._next_li_depth > 0]
+
+    def handle_endtag(self, tag):
+        if tag == 'li' and self._li_stack:
+            if self._li_stack.pop():
+                self._next_li_depth -= 1
+        elif tag == 'a' and self._anchor is not None:
+            href, text, is_next = self._anchor
+            self._anchor = None
+            name = ' '.join(''.join(text).split())
+            url = urljoin(self.base_url, href) if href else ''
+            if is_next and self.next_link is None:
+                self.next_link = (name, url)
+            if name and 'shopdetail' in href and (url, name) not in self._seen:
+                self._seen.add((url, name))
+                self.items.append((name, url))
+
+    def handle_data(self, data):
+        if self._anchor is not None:
+            self._anchor[1].append(data)
+
+
+def parse_listing_html(html, base_url=''):
+    """
+    Phân tích HTML trang listing
+
+    Args:
+        html (str): Nội dung trang shopbrand.html
+        base_url (str): URL của trang (để chuẩn hóa href tương đối)
+
+    Returns:
+        tuple: (list các (tên, href), (text, href) của link kế tiếp hoặc None)
+    """
+    parser = ListingHTMLParser(base_url)
+    parser.feed(html)
+    parser.close()
+    return parser.items, parser.next_link
+
+
+def content_hash(html):
+    """
+    Băm nội dung trang sau khi bỏ script, comment, input hidden và chuẩn hóa khoảng trắng
+
+    Args:
+        html (str): Nội dung trang
+
+    Returns:
+        str: Hex digest
+    """
+    normalized = WHITESPACE_RE.sub(' ', TAG_GAP_RE.sub('><', VOLATILE_RE.sub('', html))).strip()
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def decode_html(response):
+    """
+    Giải mã nội dung HTML theo charset trong header, nếu không có thì theo thẻ meta
+    (trang shop Nhật thường dùng EUC-JP/Shift_JIS)
+
+    Args:
+        response (requests.Response): Response HTTP
+
+    Returns:
+        str: Nội dung đã giải mã
+    """
+    if 'charset' not in response.headers.get('Content-Type', '').lower():
+        match = META_CHARSET_RE.search(response.content[:4096])
+        response.encoding = match.group(1).decode('ascii') if match else 'utf-8'
+    try:
+        return response.text
+    except LookupError:
+        return response.content.decode('utf-8', errors='replace')
+
+
+class HttpListingFetcher:
+    """
+    Tải trang listing qua HTTP keep-alive với cookie của phiên WebDriver
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, pool_size=DEFAULT_POOL_SIZE, max_pages=DEFAULT_MAX_PAGES):
+        """
+        Khởi tạo session HTTP
+
+        Args:
+            timeout (float): Timeout mỗi request (giây)
+            pool_size (int): Số kết nối keep-alive giữ lại cho mỗi host
+            max_pages (int): Số trang listing được nhớ lại (ETag, hash, kết quả phân tích)
+        """
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.bytes_received = 0
+        self.requests_made = 0
+        self.not_modified = 0  # Số lần server trả 304
+        self.unchanged = 0  # Số lần nội dung tải về giống lần trước (bỏ qua parser)
+        self.parsed = 0
+        self.max_pages = max_pages
+        self._pages = {}  # url -> {'etag', 'last_modified', 'hash', 'result'}
+
+    def sync_from_driver(self, driver):
+        """
+        Chép cookie và User-Agent từ WebDriver sang session HTTP
+
+        Args:
+            driver: Selenium WebDriver đã đăng nhập
+
+        Returns:
+            int: Số cookie đã chép
+        """
+        cookies = driver.get_cookies()
+        self.session.cookies.clear()
+        for cookie in cookies:
+            self.session.cookies.set(cookie['name'], cookie['value'],
+                                     domain=cookie.get('domain', ''), path=cookie.get('path', '/'))
+        try:
+            user_agent = driver.execute_script("return navigator.userAgent;")
+            if user_agent:
+                self.session.headers['User-Agent'] = user_agent
+        except Exception:
+            pass
+        return len(cookies)
+
+    def fetch(self, url):
+        """
+        Tải và phân tích một trang listing
+
+        Args:
+            url (str): URL trang shopbrand.html
+
+        Returns:
+            tuple: (list các (tên, href), (text, href) hoặc None)
+
+        Raises:
+            requests.RequestException: Lỗi kết nối hoặc HTTP status lỗi
+        """
+        cached = self._pages.get(url)
+        headers = {}
+        if cached and cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if cached and cached['last_modified']:
+            headers['If-Modified-Since'] = cached['last_modified']
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        self.requests_made += 1
+        if response.status_code == 304 and cached:
+            self.not_modified += 1
+            return cached['result']
+        response.raise_for_status()
+        self.bytes_received += len(response.content)
+
+        html = decode_html(response)
+        digest = content_hash(html)
+        if cached and cached['hash'] == digest:
+            self.unchanged += 1
+            result = cached['result']
+        else:
+            self.parsed += 1
+            result = parse_listing_html(html, response.url)
+
+        if url not in self._pages and len(self._pages) >= self.max_pages:
+            self._pages.pop(next(iter(self._pages)))
+        self._pages[url] = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'hash': digest,
+            'result': result,
+        }
+        return result
+
+    def stats(self):
+        """
+        Số liệu tải listing
+
+        Returns:
+            dict: {'requests', 'bytes', 'not_modified', 'unchanged', 'parsed'}
+        """
+        return {
+            'requests': self.requests_made,
+            'bytes': self.bytes_received,
+            'not_modified': self.not_modified,
+            'unchanged': self.unchanged,
+            'parsed': self.parsed,
+        }
+
+    def close(self):
+        """
+        Đóng các kết nối trong pool
+        """
+        self.session.close()
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Import danh sách tài khoản/sản phẩm theo luồng và nạp vào Treeview theo từng khối
+
+File được đọc theo khối READ_SIZE byte, không load toàn bộ vào bộ nhớ:
+- JSON array: parse từng phần tử bằng json.JSONDecoder.raw_decode
+- JSONL: mỗi dòng một object (hoặc một chuỗi/số với sản phẩm)
+- CSV: có dòng tiêu đề (email,password / productId) hoặc theo vị trí cột
+Kiểm tra, chuẩn hóa và bỏ trùng trong cùng một lượt đọc, dừng thêm khi đủ giới hạn
+(vẫn đọc hết file để đếm số dòng bị bỏ). ChunkedTreeLoader chèn các dòng vào Treeview
+theo khối qua after(), để vòng lặp sự kiện Tk không bị chặn.
+"""
+
+import io
+import os
+import csv
+import json
+from dataclasses import dataclass
+
+# Số dòng tối đa trong danh sách tài khoản/sản phẩm trên GUI
+MAX_ACCOUNTS = 60
+MAX_PRODUCTS = 60
+
+# Số ký tự đọc mỗi lần khi parse JSON array
+READ_SIZE = 64 * 1024
+
+# Số dòng chèn vào Treeview mỗi lần và khoảng nghỉ giữa hai khối (ms)
+DEFAULT_CHUNK_SIZE = 200
+CHUNK_INTERVAL_MS = 1
+
+# Định dạng file theo đuôi (file khác được coi là JSON)
+FORMATS = {'.json': 'json', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.csv': 'csv', '.txt': 'csv'}
+
+# Tên cột chấp nhận cho Product ID
+PRODUCT_KEYS = ('productId', 'product_id', 'id')
+
+_WHITESPACE = ' \t\r\n'
+_DELIMITERS = ',]' + _WHITESPACE
+
+
+class ImportFormatError(ValueError):
+    """
+    File import sai định dạng
+    """
+
+
+@dataclass(frozen=True)
+class ImportResult:
+    rows: tuple = ()  # Các dòng hợp lệ (tuple giá trị cột Treeview), theo thứ tự trong file
+    total: int = 0  # Số bản ghi đọc được
+    invalid: int = 0  # Thiếu trường bắt buộc hoặc sai kiểu
+    duplicates: int = 0  # Trùng trong file hoặc trùng với dòng đã có
+    over_limit: int = 0  # Hợp lệ nhưng vượt giới hạn
+
+    def summary(self):
+        """
+        Mô tả ngắn kết quả import cho log
+
+        Returns:
+            str: Ví dụ "60/1200 dòng (3 không hợp lệ, 5 trùng, 1132 vượt giới hạn)"
+        """
+        skipped = [f"{count} {label}" for count, label in ((self.invalid, 'không hợp lệ'),
+                                                             (self.duplicates, 'trùng'),
+                                                             (self.over_limit, 'vượt giới hạn')) if count]
+        text = f"{len(self.rows)}/{self.total} dòng"
+        return f"{text} ({', '.join(skipped)})" if skipped else text
+
+
+def detect_format(filename):
+    """
+    Xác định định dạng file theo đuôi
+
+    Returns:
+        str: 'json', 'jsonl' hoặc 'csv'
+    """
+    return FORMATS.get(os.path.splitext(filename)[1].lower(), 'json')
+
+
+def iter_json_array(f, read_size=READ_SIZE):
+    """
+    Đọc lần lượt các phần tử của một JSON array mà không load cả file
+
+    Nếu file không bắt đầu bằng '[' mà bằng '{' thì được đọc như JSONL.
+
+    Args:
+        f: File text đã mở
+        read_size (int): Số ký tự đọc mỗi lần
+
+    Yields:
+        Phần tử đã parse
+
+    Raises:
+        ImportFormatError: File không phải JSON array hợp lệ
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = f.read(read_size)
+        if not chunk:
+            eof = True
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer) or eof:
+                return
+            fill()
+
+    skip_whitespace()
+    if pos < len(buffer) and buffer[pos] == '{':
+        # Đọc nốt dòng đang dở để buffer kết thúc đúng ở cuối dòng
+        yield from iter_jsonl(io.StringIO(buffer[pos:] + f.readline()))
+        yield from iter_jsonl(f)
+        return
+    if pos >= len(buffer) or buffer[pos] != '[':
+        raise ImportFormatError("File JSON phải chứa một array")
+    pos += 1
+
+    expect_value = True
+    while True:
+        skip_whitespace()
+        if pos >= len(buffer):
+            raise ImportFormatError("File JSON bị cắt cụt (thiếu ']')")
+        char = buffer[pos]
+        if char == ']':
+            return
+        if not expect_value:
+            if char != ',':
+                raise ImportFormatError(f"File JSON: cần ',' hoặc ']', gặp {char!r}")
+            pos += 1
+            expect_value = True
+            continue
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise ImportFormatError(f"File JSON không hợp lệ: {e.msg}") from None
+                fill()
+                continue
+            # Số ở cuối buffer có thể còn chữ số/phần thập phân ở khối tiếp theo
+            if not eof and (end >= len(buffer) or buffer[end] not in _DELIMITERS):
+                fill()
+                continue
+            break
+        pos = end
+        expect_value = False
+        yield value
+
+
+def iter_jsonl(f):
+    """
+    Đọc file JSONL (mỗi dòng một giá trị JSON, bỏ qua dòng trống)
+
+    Dòng không parse được trả về None để được đếm là không hợp lệ.
+
+    Yields:
+        Giá trị đã parse hoặc None
+    """
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+def iter_csv(f, columns):
+    """
+    Đọc file CSV thành dict theo tên cột
+
+    Nếu dòng đầu chứa một trong các tên cột thì được dùng làm tiêu đề, ngược lại các cột
+    được hiểu theo vị trí trong columns.
+
+    Args:
+        f: File text đã mở (newline='')
+        columns (tuple): Tên cột theo vị trí
+
+    Yields:
+        dict: Một dòng
+    """
+    reader = csv.reader(f)
+    header = None
+    for row in reader:
+        cells = [cell.strip() for cell in row]
+        if not any(cells):
+            continue
+        if header is None:
+            header = cells if any(cell in columns or cell in PRODUCT_KEYS for cell in cells) else columns
+            if header is cells:
+                continue
+        yield dict(zip(header, cells))
+
+
+def iter_records(f, fmt, columns):
+    """
+    Đọc các bản ghi từ file theo định dạng
+
+    Args:
+        f: File text đã mở
+        fmt (str): 'json', 'jsonl' hoặc 'csv'
+        columns (tuple): Tên cột theo vị trí (dùng cho CSV không có tiêu đề)
+
+    Yields:
+        Bản ghi (dict, chuỗi hoặc số)
+    """
+    if fmt == 'csv':
+        return iter_csv(f, columns)
+    if fmt == 'jsonl':
+        return iter_jsonl(f)
+    return iter_json_array(f)
+
+
+def normalize_account(record):
+    """
+    Chuẩn hóa một tài khoản
+
+    Returns:
+        tuple: (email, password), None nếu không hợp lệ
+    """
+    if not isinstance(record, dict):
+        return None
+    email = record.get('email')
+    password = record.get('password')
+    # Mật khẩu toàn chữ số được Treeview trả về dạng int rồi lưu vào settings.json như vậy
+    if isinstance(password, int) and not isinstance(password, bool):
+        password = str(password)
+    if not isinstance(email, str) or not isinstance(password, str):
+        return None
+    email = email.strip()
+    if not email or not password:
+        return None
+    return email, password
+
+
+def normalize_product(record):
+    """
+    Chuẩn hóa một sản phẩm (object có productId, hoặc chính Product ID dạng chuỗi/số)
+
+    Returns:
+        tuple: (product_id,), None nếu không hợp lệ
+    """
+    if isinstance(record, dict):
+        for key in PRODUCT_KEYS:
+            value = record.get(key)
+            if value is not None and value != '':
+                record = value
+                break
+        else:
+            return None
+    if isinstance(record, bool) or not isinstance(record, (str, int)):
+        return None
+    product_id = str(record).strip()
+    return (product_id,) if product_id else None
+
+
+def collect_rows(records, normalize, limit=None, existing=()):
+    """
+    Kiểm tra, chuẩn hóa và bỏ trùng các bản ghi trong một lượt
+
+    Dòng trùng được xác định theo cột đầu tiên (email / Product ID).
+
+    Args:
+        records (iterable): Bản ghi thô
+        normalize (callable): normalize_account hoặc normalize_product
+        limit (int): Số dòng tối đa (tính cả existing), None = không giới hạn
+        existing (iterable): Khóa các dòng đã có trong danh sách
+
+    Returns:
+        ImportResult: Kết quả
+    """
+    seen = set(existing)
+    room = None if limit is None else max(0, limit - len(seen))
+    rows = []
+    total = invalid = duplicates = over_limit = 0
+    for record in records:
+        total += 1
+        row = normalize(record)
+        if row is None:
+            invalid += 1
+            continue
+        if row[0] in seen:
+            duplicates += 1
+            continue
+        seen.add(row[0])
+        if room is not None and len(rows) >= room:
+            over_limit += 1
+            continue
+        rows.append(row)
+    return ImportResult(tuple(rows), total, invalid, duplicates, over_limit)
+
+
+def merge_rows(result, limit=None, existing=()):
+    """
+    Bỏ trùng và áp giới hạn cho kết quả đã đọc khi nối thêm vào danh sách đang có
+
+    Args:
+        result (ImportResult): Kết quả đọc file (đọc với existing rỗng)
+        limit (int): Số dòng tối đa (tính cả existing), None = không giới hạn
+        existing (iterable): Khóa các dòng đã có trong danh sách
+
+    Returns:
+        ImportResult: Kết quả với số dòng trùng/vượt giới hạn cộng dồn
+    """
+    merged = collect_rows(result.rows, lambda row: row, limit, existing)
+    return ImportResult(merged.rows, result.total, result.invalid,
+                        result.duplicates + merged.duplicates, result.over_limit + merged.over_limit)
+
+
+def _read_file(filename, columns, normalize, limit, existing):
+    fmt = detect_format(filename)
+    with open(filename, 'r', encoding='utf-8-sig', newline='' if fmt == 'csv' else None) as f:
+        return collect_rows(iter_records(f, fmt, columns), normalize, limit, existing)
+
+
+def read_accounts(filename, limit=MAX_ACCOUNTS, existing=()):
+    """
+    Đọc danh sách tài khoản từ file JSON/JSONL/CSV
+
+    Args:
+        filename (str): File cần import
+        limit (int): Số tài khoản tối đa (tính cả existing)
+        existing (iterable): Email đã có trong danh sách
+
+    Returns:
+        ImportResult: rows là các (email, password)
+
+    Raises:
+        ImportFormatError: File sai định dạng
+        OSError: Không đọc được file
+    """
+    return _read_file(filename, ('email', 'password'), normalize_account, limit, existing)
+
+
+def read_products(filename, limit=MAX_PRODUCTS, existing=()):
+    """
+    Đọc danh sách sản phẩm từ file JSON/JSONL/CSV
+
+    Args:
+        filename (str): File cần import
+        limit (int): Số sản phẩm tối đa (tính cả existing)
+        existing (iterable): Product ID đã có trong danh sách
+
+    Returns:
+        ImportResult: rows là các (product_id,)
+
+    Raises:
+        ImportFormatError: File sai định dạng
+        OSError: Không đọc được file
+    """
+    return _read_file(filename, ('productId',), normalize_product, limit, existing)
+
+
+class ChunkedTreeLoader:
+    """
+    Chèn các dòng vào Treeview theo từng khối, mỗi khối một lần after()
+    """
+
+    def __init__(self, root, tree, rows, chunk_size=DEFAULT_CHUNK_SIZE, on_done=None,
+                 interval_ms=CHUNK_INTERVAL_MS):
+        """
+        Args:
+            root: Widget Tk dùng để gọi after()
+            tree: ttk.Treeview đích
+            rows (list): Các tuple giá trị cột
+            chunk_size (int): Số dòng mỗi khối
+            on_done (callable): Gọi với số dòng đã chèn khi xong
+            interval_ms (int): Khoảng nghỉ giữa hai khối (ms)
+        """
+        self.root = root
+        self.tree = tree
+        self.rows = rows
+        self.chunk_size = max(1, chunk_size)
+        self.on_done = on_done
+        self.interval_ms = interval_ms
+        self.inserted = 0
+        self.chunks = 0
+        self._job = None
+        self.cancelled = False
+
+    @property
+    def done(self):
+        return self.inserted >= len(self.rows)
+
+    def start(self):
+        """
+        Chèn khối đầu tiên ngay, các khối sau được hẹn qua after()
+
+        Returns:
+            ChunkedTreeLoader: self
+        """
+        self._step()
+        return self
+
+    def _step(self):
+        self._job = None
+        if self.cancelled:
+            return
+        end = min(self.inserted + self.chunk_size, len(self.rows))
+        for index in range(self.inserted, end):
+            self.tree.insert('', 'end', values=self.rows[index])
+        self.inserted = end
+        self.chunks += 1
+        if self.done:
+            if self.on_done is not None:
+                self.on_done(self.inserted)
+        else:
+            self._job = self.root.after(self.interval_ms, self._step)
+
+    def cancel(self):
+        """
+        Dừng nạp (các dòng đã chèn được giữ nguyên)
+        """
+        self.cancelled = True
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chế độ "lean" cho Chrome: chặn tài nguyên không cần cho flow automation
+
+Flow login/purchase chỉ cần DOM, nên ảnh, web font, media và các script bên thứ ba
+(analytics, quảng cáo, widget WorldShopping) được chặn:
+- Chrome prefs chặn ảnh ngay từ lúc khởi động (không cần CDP)
+- CDP Network.setBlockedURLs chặn theo đuôi file và theo host
+Host trong allowlist không bao giờ bị chặn theo host (giữ script checkout hoạt động).
+
+Module cũng đo thời gian tải trang và số byte truyền về (Navigation/Resource Timing)
+để so sánh khi bật và tắt chế độ này.
+"""
+
+import fnmatch
+
+# Đuôi file theo loại tài nguyên
+IMAGE_EXTENSIONS = ['png', 'jpg', 'jpeg', 'gif', 'webp', 'svg', 'ico', 'bmp', 'avif']
+FONT_EXTENSIONS = ['woff', 'woff2', 'ttf', 'otf', 'eot']
+MEDIA_EXTENSIONS = ['mp4', 'webm', 'ogg', 'mp3', 'wav', 'm4a', 'mov']
+
+# Host bên thứ ba mặc định bị chặn (analytics, quảng cáo, widget)
+DEFAULT_BLOCKED_HOSTS = [
+    'www.google-analytics.com',
+    '*.google-analytics.com',
+    'www.googletagmanager.com',
+    '*.doubleclick.net',
+    'connect.facebook.net',
+    '*.facebook.com',
+    'static.ads-twitter.com',
+    '*.criteo.com',
+    '*.yahoo.co.jp',
+    '*.zigzag.inc',
+    '*.worldshopping.global',
+]
+
+# Host luôn được phép (thanh toán/checkout)
+DEFAULT_ALLOWED_HOSTS = [
+    '*.er-sports.com',
+    'er-sports.com',
+    '*.makeshop.jp',
+]
+
+# Đo thời gian tải trang hiện tại và tổng byte (trang + tài nguyên) trong một round trip
+PAGE_METRICS_SCRIPT = r"""
+var nav = (performance.getEntriesByType('navigation') || [])[0];
+var resources = performance.getEntriesByType('resource') || [];
+var bytes = nav ? (nav.transferSize || nav.encodedBodySize || 0) : 0;
+var measured = 0, cached = 0;
+for (var i = 0; i < resources.length; i++) {
+    var entry = resources[i];
+    bytes += entry.transferSize || entry.encodedBodySize || 0;
+    // decodedBodySize = 0: host khác không cho đọc số liệu (không tính); transferSize = 0: lấy từ cache
+    if (entry.decodedBodySize > 0) {
+        measured++;
+        if (entry.transferSize === 0) cached++;
+    }
+}
+var load = 0;
+if (nav) {
+    load = (nav.loadEventEnd || nav.domContentLoadedEventEnd || nav.responseEnd) - nav.startTime;
+}
+return {url: location.href, load_ms: Math.max(load, 0), bytes: bytes, resources: resources.length,
+        measured: measured, cached: cached};
+"""
+
+
+class LeanProfile:
+    """
+    Cấu hình chặn tài nguyên cho Chrome
+    """
+
+    def __init__(self, block_images=True, block_fonts=True, block_media=True,
+                 blocked_hosts=None, allowed_hosts=None):
+        """
+        Args:
+            block_images (bool): Chặn ảnh
+            block_fonts (bool): Chặn web font
+            block_media (bool): Chặn audio/video
+            blocked_hosts (list): Host bị chặn (hỗ trợ wildcard '*.example.com'),
+                None = DEFAULT_BLOCKED_HOSTS
+            allowed_hosts (list): Host không bao giờ bị chặn theo host,
+                None = DEFAULT_ALLOWED_HOSTS
+        """
+        self.block_images = block_images
+        self.block_fonts = block_fonts
+        self.block_media = block_media
+        self.blocked_hosts = list(DEFAULT_BLOCKED_HOSTS if blocked_hosts is None else blocked_hosts)
+        self.allowed_hosts = list(DEFAULT_ALLOWED_HOSTS if allowed_hosts is None else allowed_hosts)
+
+    def is_allowed_host(self, host):
+        """
+        Kiểm tra host có nằm trong allowlist không
+
+        Args:
+            host (str): Host hoặc pattern host
+
+        Returns:
+            bool: True nếu được phép
+        """
+        host = host.lower().strip()
+        return any(fnmatch.fnmatch(host, pattern.lower()) or host == pattern.lower().lstrip('*.')
+                   for pattern in self.allowed_hosts)
+
+    def effective_blocked_hosts(self):
+        """
+        Các host thực sự bị chặn (đã bỏ host thuộc allowlist)
+
+        Returns:
+            list: Host/pattern host
+        """
+        return [host for host in self.blocked_hosts if host.strip() and not self.is_allowed_host(host)]
+
+    def blocked_url_patterns(self):
+        """
+        Pattern URL cho CDP Network.setBlockedURLs
+
+        Returns:
+            list: Pattern (wildcard '*')
+        """
+        extensions = []
+        if self.block_images:
+            extensions += IMAGE_EXTENSIONS
+        if self.block_fonts:
+            extensions += FONT_EXTENSIONS
+        if self.block_media:
+            extensions += MEDIA_EXTENSIONS
+
+        patterns = []
+        for extension in extensions:
+            patterns.append(f"*.{extension}")
+            patterns.append(f"*.{extension}?*")
+        for host in self.effective_blocked_hosts():
+            patterns.append(f"*://{host.strip()}/*")
+        return patterns
+
+    def chrome_prefs(self):
+        """
+        Chrome prefs chặn tài nguyên từ lúc khởi động
+
+        Returns:
+            dict: Prefs cho add_experimental_option('prefs', ...)
+        """
+        prefs = {}
+        if self.block_images:
+            prefs['profile.managed_default_content_settings.images'] = 2
+        return prefs
+
+    def apply_options(self, chrome_options):
+        """
+        Áp dụng prefs và cờ dòng lệnh vào ChromeOptions
+
+        Args:
+            chrome_options: selenium.webdriver.chrome.options.Options
+        """
+        prefs = self.chrome_prefs()
+        if prefs:
+            chrome_options.add_experimental_option('prefs', prefs)
+        if self.block_media:
+            chrome_options.add_argument('--autoplay-policy=user-gesture-required')
+
+    def install(self, driver):
+        """
+        Bật chặn URL qua CDP (áp dụng cho mọi lần tải trang sau đó)
+
+        Args:
+            driver: Selenium WebDriver (Chrome)
+
+        Returns:
+            bool: True nếu CDP nhận lệnh
+        """
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_url_patterns()})
+            return True
+        except Exception:
+            return False
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Tạo profile từ dict cấu hình (browser.lean_mode trong config)
+
+        Args:
+            data (dict): {'block_images', 'block_fonts', 'block_media', 'blocked_hosts', 'allowed_hosts'}
+
+        Returns:
+            LeanProfile: Profile
+        """
+        data = data or {}
+        return cls(block_images=data.get('block_images', True),
+                   block_fonts=data.get('block_fonts', True),
+                   block_media=data.get('block_media', True),
+                   blocked_hosts=data.get('blocked_hosts'),
+                   allowed_hosts=data.get('allowed_hosts'))
+
+
+def collect_page_metrics(driver):
+    """
+    Đọc thời gian tải và số byte của trang hiện tại
+
+    Args:
+        driver: Selenium WebDriver
+
+    Returns:
+        dict: {'url', 'load_ms', 'bytes', 'resources'} hoặc None nếu không đọc được
+    """
+    try:
+        return driver.execute_script(PAGE_METRICS_SCRIPT)
+    except Exception:
+        return None
+
+
+class PageLoadStats:
+    """
+    Tổng hợp thời gian tải trang và byte truyền về trong một phiên chạy
+    """
+
+    def __init__(self):
+        self.load_times = []
+        self.first_load_times = []  # Trang đầu tiên của mỗi Chrome mới khởi động
+        self.total_bytes = 0
+        self.total_resources = 0
+        self.measured_resources = 0
+        self.cached_resources = 0
+
+    def record(self, metrics, first=False):
+        """
+        Ghi số liệu một lần tải trang
+
+        Args:
+            metrics (dict): Kết quả collect_page_metrics()
+            first (bool): Trang đầu tiên sau khi khởi động Chrome (cache trong bộ nhớ còn trống)
+        """
+        if not metrics:
+            return
+        load_ms = float(metrics.get('load_ms') or 0)
+        self.load_times.append(load_ms)
+        if first:
+            self.first_load_times.append(load_ms)
+        self.total_bytes += int(metrics.get('bytes') or 0)
+        self.total_resources += int(metrics.get('resources') or 0)
+        self.measured_resources += int(metrics.get('measured') or 0)
+        self.cached_resources += int(metrics.get('cached') or 0)
+
+    def report(self):
+        """
+        Báo cáo tổng hợp
+
+        Returns:
+            dict: {'pages', 'load_ms_mean', 'load_ms_max', 'bytes_total', 'bytes_mean', 'resources_mean',
+                'cache_hit_ratio', 'first_pages', 'first_load_ms_mean'}
+        """
+        pages = len(self.load_times)
+        if not pages:
+            return {'pages': 0}
+        first = len(self.first_load_times)
+        measured = self.measured_resources
+        return {
+            'pages': pages,
+            'load_ms_mean': round(sum(self.load_times) / pages, 1),
+            'load_ms_max': round(max(self.load_times), 1),
+            'bytes_total': self.total_bytes,
+            'bytes_mean': round(self.total_bytes / pages),
+            'resources_mean': round(self.total_resources / pages, 1),
+            # % tài nguyên (đo được) lấy từ cache HTTP thay vì tải qua mạng
+            'cache_hit_ratio': round(self.cached_resources / measured * 100, 1) if measured else None,
+            'first_pages': first,
+            'first_load_ms_mean': round(sum(self.first_load_times) / first, 1) if first else None,
+        }
+
+    def reset(self):
+        """
+        Xóa số liệu đã ghi
+        """
+        self.load_times = []
+        self.first_load_times = []
+        self.total_bytes = 0
+        self.total_resources = 0
+        self.measured_resources = 0
+        self.cached_resources = 0
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Đọc trang listing sản phẩm (shopbrand.html) của er-sports.com
+
+Toàn bộ tên sản phẩm, href chi tiết và link trang kế tiếp được lấy trong một lần
+execute_script duy nhất (JSON gọn), việc so khớp product ID làm trong Python.
+Trước đây mỗi link tốn hai round trip WebDriver (.text và get_attribute('href'))
+cho cả vòng lọc lẫn vòng so khớp.
+
+Mỗi vòng automation quét listing một lần (scan_listing()) để dựng ListingIndex;
+mọi product ID được so khớp cùng lúc bằng automaton Aho-Corasick trên tên đã
+chuẩn hóa NFKC (không phân biệt full-width/half-width, hoa/thường).
+"""
+
+import json
+import unicodedata
+from collections import deque
+
+# Selector link sản phẩm trên trang listing
+PRODUCT_LINK_SELECTOR = ('ul.category-list li .detail p.name a, .category-list li .detail p.name a, '
+                         '.category-list li p.name a, ul.category-list p.name a, '
+                         'a[href*="/shopdetail"], a[href*="shopdetail.html"]')
+
+# Selector link chuyển sang trang kế tiếp ("次の48件")
+NEXT_LINK_SELECTOR = 'li.next a'
+
+# Trả về JSON: {"items": [[tên, href], ...], "next": [text, href] | null}
+LISTING_EXTRACT_SCRIPT = r"""
+var seen = {};
+var items = [];
+var links = document.querySelectorAll(arguments[0]);
+for (var i = 0; i < links.length; i++) {
+    var href = links[i].href || '';
+    var name = (links[i].innerText || links[i].textContent || '').trim();
+    if (!name || href.indexOf('shopdetail') === -1 || seen[href + '\n' + name]) { continue; }
+    seen[href + '\n' + name] = true;
+    items.push([name, href]);
+}
+var next = document.querySelector(arguments[1]);
+return JSON.stringify({
+    items: items,
+    next: next ? [(next.innerText || next.textContent || '').trim(), next.href || ''] : null
+});
+"""
+
+
+def extract_listing(driver):
+    """
+    Lấy toàn bộ sản phẩm và link trang kế tiếp của trang listing hiện tại
+
+    Args:
+        driver: Selenium WebDriver đang ở trang listing
+
+    Returns:
+        tuple: (list các (tên, href), (text, href) của link kế tiếp hoặc None)
+    """
+    payload = driver.execute_script(LISTING_EXTRACT_SCRIPT, PRODUCT_LINK_SELECTOR, NEXT_LINK_SELECTOR)
+    return parse_listing_payload(payload)
+
+
+def parse_listing_payload(payload):
+    """
+    Giải mã JSON trả về từ LISTING_EXTRACT_SCRIPT
+
+    Args:
+        payload (str): Chuỗi JSON
+
+    Returns:
+        tuple: (list các (tên, href), (text, href) hoặc None)
+    """
+    data = json.loads(payload) if payload else {}
+    items = [(name, href) for name, href in data.get('items') or []]
+    next_link = data.get('next')
+    return items, (tuple(next_link) if next_link else None)
+
+
+def normalize_text(text):
+    """
+    Chuẩn hóa chuỗi để so khớp: NFKC (ＭＥＺＺ -> MEZZ, ｶﾀｶﾅ -> カタカナ) và không phân biệt hoa/thường
+
+    Args:
+        text (str): Chuỗi gốc
+
+    Returns:
+        str: Chuỗi đã chuẩn hóa
+    """
+    return unicodedata.normalize('NFKC', text or '').casefold()
+
+
+def find_product(items, product_id):
+    """
+    Tìm sản phẩm đầu tiên có product_id trong tên (đã chuẩn hóa)
+
+    Args:
+        items (list): List các (tên, href)
+        product_id (str): ID sản phẩm cần tìm
+
+    Returns:
+        tuple: (tên, href) hoặc None nếu không có
+    """
+    needle = normalize_text(product_id).strip()
+    if not needle:
+        return None
+    for name, href in items:
+        if needle in normalize_text(name):
+            return name, href
+    return None
+
+
+class ProductMatcher:
+    """
+    So khớp nhiều product ID cùng lúc trong một lần duyệt tên (Aho-Corasick)
+
+    Chi phí mỗi tên là O(độ dài tên + số kết quả), không phụ thuộc số product ID.
+    """
+
+    def __init__(self, product_ids):
+        """
+        Dựng automaton từ danh sách product ID
+
+        Args:
+            product_ids (list): Các product ID (chuỗi rỗng bị bỏ qua)
+        """
+        self.product_ids = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for product_id in product_ids:
+            pattern = normalize_text(product_id).strip()
+            if not pattern or product_id in self.product_ids:
+                continue
+            self.product_ids.append(product_id)
+            state = 0
+            for char in pattern:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._output[state].append(product_id)
+
+        # Tính fail link theo BFS; output của state gộp output của fail link
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find_all(self, text):
+        """
+        Tìm tất cả product ID xuất hiện trong chuỗi
+
+        Args:
+            text (str): Tên sản phẩm
+
+        Returns:
+            list: Các product ID khớp (mỗi ID một lần, theo thứ tự xuất hiện)
+        """
+        found = []
+        state = 0
+        for char in normalize_text(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for product_id in self._output[state]:
+                if product_id not in found:
+                    found.append(product_id)
+        return found
+
+
+class ListingIndex:
+    """
+    Chỉ mục product ID -> sản phẩm trên listing, dựng từ một lần quét các trang
+    """
+
+    def __init__(self, product_ids):
+        """
+        Args:
+            product_ids (list): Các product ID cần tìm trong vòng quét này
+        """
+        self.matcher = ProductMatcher(product_ids)
+        self.entries = {}
+        self.pages_scanned = 0
+        self.items_scanned = 0
+
+    def add_page(self, items, page):
+        """
+        Thêm các sản phẩm của một trang listing vào chỉ mục
+
+        Args:
+            items (list): List các (tên, href)
+            page (int): Số trang listing
+
+        Returns:
+            int: Số product ID mới tìm thấy trong trang
+        """
+        self.pages_scanned += 1
+        self.items_scanned += len(items)
+        added = 0
+        for name, href in items:
+            for product_id in self.matcher.find_all(name):
+                if product_id not in self.entries:
+                    self.entries[product_id] = {'name': name, 'url': href, 'page': page}
+                    added += 1
+        return added
+
+    @property
+    def complete(self):
+        """
+        True nếu đã tìm thấy mọi product ID
+        """
+        return len(self.entries) == len(self.matcher.product_ids)
+
+    @property
+    def missing(self):
+        """
+        Các product ID chưa tìm thấy
+        """
+        return [pid for pid in self.matcher.product_ids if pid not in self.entries]
+
+    def get(self, product_id):
+        """
+        Lấy thông tin sản phẩm đã tìm thấy
+
+        Returns:
+            dict: {'name', 'url', 'page'} hoặc None
+        """
+        return self.entries.get(product_id)
+
+    def __contains__(self, product_id):
+        return product_id in self.entries
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Logging ra file/console không chặn thread gọi log
+
+Root logger chỉ có một QueueHandler: mỗi lần log chỉ là một lần put vào queue.
+Một QueueListener chạy ở thread nền ghi ra console và file logs/automation.log.
+File được xoay theo dung lượng (logging.max_file_size), file cũ được nén thành
+automation.log.N.gz và chỉ giữ logging.max_files file; các file log kiểu cũ
+(automation_YYYYmmdd_HHMMSS.log, mỗi lần chạy một file) cũng được dọn theo số lượng này.
+"""
+
+import os
+import glob
+import gzip
+import queue
+import shutil
+import logging
+import logging.handlers
+
+# Tên file log hiện tại trong thư mục log
+LOG_FILENAME = 'automation.log'
+
+# File log kiểu cũ (mỗi lần khởi động một file)
+LEGACY_LOG_PATTERN = 'automation_*.log'
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+def gzip_rotator(source, dest):
+    """
+    Nén file log vừa xoay thành dest (.gz) rồi xóa file gốc
+
+    Args:
+        source (str): File log hiện tại
+        dest (str): File đích (đã có đuôi .gz)
+    """
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+class GzipRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler nén các file đã xoay (automation.log.1.gz, .2.gz, ...)
+    """
+
+    def __init__(self, filename, max_bytes, backup_count, encoding='utf-8'):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding=encoding)
+        self.namer = lambda name: name + '.gz'
+        self.rotator = gzip_rotator
+
+
+class QueueListener(logging.handlers.QueueListener):
+    """
+    QueueListener có cờ running: stop() gọi nhiều lần chỉ dừng và đóng handler một lần
+    """
+
+    def __init__(self, queue, *handlers, respect_handler_level=False):
+        super().__init__(queue, *handlers, respect_handler_level=respect_handler_level)
+        self.running = False
+
+    def start(self):
+        super().start()
+        self.running = True
+
+    def stop(self):
+        """
+        Ghi nốt các bản ghi còn trong queue, dừng thread và đóng các handler
+
+        Returns:
+            bool: False nếu listener không chạy (đã dừng trước đó)
+        """
+        if not self.running:
+            return False
+        self.running = False
+        super().stop()
+        for handler in self.handlers:
+            handler.close()
+        return True
+
+
+def enforce_retention(log_dir, max_files):
+    """
+    Xóa file log cũ trong thư mục log, chỉ giữ max_files file
+
+    File đã xoay thừa (automation.log.N.gz với N > max_files) và các file log kiểu cũ
+    ngoài max_files file mới nhất bị xóa. File log hiện tại không bị đụng tới.
+
+    Args:
+        log_dir (str): Thư mục log
+        max_files (int): Số file cũ được giữ cho mỗi loại
+
+    Returns:
+        list: Các file đã xóa
+    """
+    removed = []
+    base = os.path.join(log_dir, LOG_FILENAME)
+    for path in glob.glob(base + '.*'):
+        suffix = path[len(base) + 1:]
+        index = suffix[:-3] if suffix.endswith('.gz') else suffix
+        if index.isdigit() and int(index) > max_files:
+            removed.append(path)
+
+    legacy = sorted(glob.glob(os.path.join(log_dir, LEGACY_LOG_PATTERN)), key=os.path.getmtime, reverse=True)
+    removed.extend(legacy[max_files:])
+
+    for path in list(removed):
+        try:
+            os.remove(path)
+        except OSError:
+            removed.remove(path)
+    return removed
+
+
+def setup_queue_logging(log_dir='logs', level='INFO', max_file_size=10 * 1024 * 1024, max_files=5,
+                        console_output=True, file_output=True):
+    """
+    Cấu hình root logger ghi qua queue, listener ghi ra file/console ở thread nền
+
+    Args:
+        log_dir (str): Thư mục log
+        level (str): Mức log (INFO, DEBUG...)
+        max_file_size (int): Dung lượng tối đa của file log trước khi xoay (byte)
+        max_files (int): Số file đã xoay được giữ lại
+        console_output (bool): Ghi ra console
+        file_output (bool): Ghi ra file
+
+    Returns:
+        QueueListener: Listener đã chạy (gọi stop_queue_logging khi thoát)
+    """
+    handlers = []
+    formatter = logging.Formatter(LOG_FORMAT)
+    if file_output:
+        os.makedirs(log_dir, exist_ok=True)
+        enforce_retention(log_dir, max_files)
+        handlers.append(GzipRotatingFileHandler(os.path.join(log_dir, LOG_FILENAME), max_file_size, max_files))
+    if console_output:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(getattr(logging, level.upper(), logging.INFO))
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def stop_queue_logging(listener):
+    """
+    Ghi nốt các bản ghi còn trong queue, dừng listener và đóng file
+
+    Args:
+        listener (QueueListener): Listener từ setup_queue_logging (None = bỏ qua)
+    """
+    if listener is not None:
+        listener.stop()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Hiển thị log trong GUI theo lô, giới hạn số dòng
+
+Log từ các thread được đưa vào queue và main loop của Tk lấy ra định kỳ. Mỗi lần
+chỉ lấy tối đa một số entry nhất định, và mỗi widget nhận cả lô trong một lệnh
+insert (thay vì config/insert/see/config cho từng dòng), nên một đợt log dồn dập
+không làm đứng giao diện. Mỗi widget giữ tối đa max_lines dòng: dòng cũ nhất bị
+xóa khi vượt quá (ring buffer), nên chạy nhiều ngày không làm widget phình ra.
+Trước khi tab log được dựng (tab dựng lần đầu khi được chọn), log được giữ trong
+LogBuffer với cùng giới hạn và chuyển sang widget khi tab xuất hiện.
+"""
+
+import queue
+import tkinter as tk
+from collections import deque
+
+# Số dòng tối đa giữ trong mỗi widget log
+DEFAULT_MAX_LINES = 5000
+# Giới hạn nhỏ nhất chọn được trong tab cài đặt
+MIN_MAX_LINES = 500
+
+# Số entry tối đa lấy ra khỏi queue trong một lần xử lý
+DEFAULT_BATCH_SIZE = 200
+
+# Chu kỳ kiểm tra queue (ms); khi còn tồn đọng thì kiểm tra lại sớm hơn
+POLL_INTERVAL_MS = 100
+BACKLOG_INTERVAL_MS = 10
+
+
+def drain_queue(source, limit=DEFAULT_BATCH_SIZE):
+    """
+    Lấy tối đa limit entry khỏi queue mà không chờ
+
+    Args:
+        source (queue.Queue): Queue log
+        limit (int): Số entry tối đa
+
+    Returns:
+        list: Các entry đã lấy ra
+    """
+    entries = []
+    try:
+        while len(entries) < limit:
+            entries.append(source.get_nowait())
+    except queue.Empty:
+        pass
+    return entries
+
+
+class LogView:
+    """
+    Ring buffer dòng log trên một Text widget (chỉ đọc)
+    """
+
+    def __init__(self, widget, max_lines=DEFAULT_MAX_LINES, tagged=True):
+        """
+        Args:
+            widget: tk.Text / ScrolledText (state=DISABLED)
+            max_lines (int): Số dòng tối đa giữ lại
+            tagged (bool): Gắn tag theo level (INFO, WARNING, ERROR, SUCCESS) để tô màu
+        """
+        self.widget = widget
+        self.max_lines = max(1, int(max_lines))
+        self.tagged = tagged
+        self.line_count = 0
+
+    def append(self, entries):
+        """
+        Thêm một lô entry vào cuối widget trong một lệnh insert
+
+        Args:
+            entries (list): Các (log_entry, level)
+        """
+        if not entries:
+            return
+        # Entry sẽ bị cắt ngay thì không cần insert
+        entries = entries[-self.max_lines:]
+
+        chunks = []
+        added = 0
+        for log_entry, level in entries:
+            text = log_entry + "\n"
+            added += text.count("\n")
+            if self.tagged and chunks and chunks[-1][1] == level:
+                chunks[-1][0].append(text)
+            else:
+                chunks.append(([text], level))
+
+        if self.tagged:
+            args = []
+            for texts, level in chunks:
+                args.extend(("".join(texts), (level,)))
+        else:
+            args = ["".join(text for texts, _ in chunks for text in texts)]
+
+        self.widget.config(state=tk.NORMAL)
+        self.widget.insert(tk.END, *args)
+        self.line_count += added
+        self._trim()
+        self.widget.see(tk.END)
+        self.widget.config(state=tk.DISABLED)
+
+    def set_max_lines(self, max_lines):
+        """
+        Đổi giới hạn số dòng (cắt bớt ngay nếu đang vượt)
+
+        Args:
+            max_lines (int): Số dòng tối đa
+        """
+        self.max_lines = max(1, int(max_lines))
+        if self.line_count > self.max_lines:
+            self.widget.config(state=tk.NORMAL)
+            self._trim()
+            self.widget.config(state=tk.DISABLED)
+
+    def clear(self):
+        """
+        Xóa toàn bộ nội dung
+        """
+        self.widget.config(state=tk.NORMAL)
+        self.widget.delete("1.0", tk.END)
+        self.widget.config(state=tk.DISABLED)
+        self.line_count = 0
+
+    def _trim(self):
+        excess = self.line_count - self.max_lines
+        if excess > 0:
+            self.widget.delete("1.0", f"{excess + 1}.0")
+            self.line_count -= excess
+
+
+class LogBuffer:
+    """
+    Giữ các entry log cho widget chưa được tạo (cùng giao diện append/set_max_lines/clear với LogView)
+    """
+
+    def __init__(self, max_lines=DEFAULT_MAX_LINES):
+        """
+        Args:
+            max_lines (int): Số entry tối đa giữ lại
+        """
+        self.max_lines = max(1, int(max_lines))
+        self.entries = deque(maxlen=self.max_lines)
+
+    @property
+    def line_count(self):
+        return len(self.entries)
+
+    def append(self, entries):
+        self.entries.extend(entries)
+
+    def set_max_lines(self, max_lines):
+        self.max_lines = max(1, int(max_lines))
+        self.entries = deque(self.entries, maxlen=self.max_lines)
+
+    def clear(self):
+        self.entries.clear()
+
+    def attach(self, widget, tagged=True):
+        """
+        Tạo LogView trên widget vừa dựng và chuyển các entry đang giữ sang
+
+        Args:
+            widget: tk.Text / ScrolledText (state=DISABLED)
+            tagged (bool): Gắn tag theo level
+
+        Returns:
+            LogView: View thay cho buffer
+        """
+        view = LogView(widget, self.max_lines, tagged)
+        view.append(list(self.entries))
+        self.entries.clear()
+        return view
+
+
+def pump_log_queue(source, views, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Chuyển một lô entry từ queue sang các LogView
+
+    Args:
+        source (queue.Queue): Queue log (entry dạng (log_entry, level))
+        views (list): Các LogView nhận log
+        batch_size (int): Số entry tối đa mỗi lần
+
+    Returns:
+        int: Số entry đã xử lý (bằng batch_size nghĩa là queue có thể còn tồn đọng)
+    """
+    entries = drain_queue(source, batch_size)
+    for view in views:
+        view.append(entries)
+    return len(entries)
@@ -9,1158 +9,94 @@ Phiên bản: 1.0.0
 Ngày tạo: 2024
 """
 
+import time
+
+# Mốc thời gian import (bảng --profile-startup)
+_IMPORT_STARTED = time.perf_counter()
+
+import argparse
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext, filedialog
 import threading
-import time
 import json
 import os
 import logging
-import subprocess
-import random
-from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException, \
-    UnexpectedAlertPresentException
-from selenium.webdriver.common.alert import Alert
+from datetime import datetime, timedelta
+from dataclasses import replace
 import queue
 import sys
-import shutil
-import re
 
-# Thử import webdriver-manager để tự động quản lý ChromeDriver
-try:
-    from webdriver_manager.chrome import ChromeDriverManager
+_STDLIB_IMPORTED = time.perf_counter()
 
-    WEBDRIVER_MANAGER_AVAILABLE = True
+try:
+    from .product_cache import ProductCache
+    from .driver_cache import DriverCache, MANIFEST_FILENAME
+    from .watchdog import ProcessRegistry, PIDS_FILENAME
+    from .session_store import SessionStore, SESSIONS_FILENAME
+    from .disk_cache import create_disk_cache
+    from .lean_mode import LeanProfile, DEFAULT_BLOCKED_HOSTS
+    from .config_loader import AppConfig, ConfigError, PAGE_LOAD_STRATEGIES, load_config
+    from .log_setup import setup_queue_logging, stop_queue_logging
+    from .stats import format_duration
+    from .settings_store import SettingsStore
+    from .history import HistoryStore, HISTORY_FILENAME
+    from .events import EventLog, EVENTS_FILENAME
+    from .log_view import LogBuffer, LogView, pump_log_queue, DEFAULT_MAX_LINES, DEFAULT_BATCH_SIZE, \
+        MIN_MAX_LINES, POLL_INTERVAL_MS, BACKLOG_INTERVAL_MS
+    from .importers import ChunkedTreeLoader, read_accounts, read_products, collect_rows, merge_rows, \
+        normalize_account, normalize_product, MAX_ACCOUNTS, MAX_PRODUCTS
+    from .engine import AutomationEngine, RunOptions
+    from .startup import StartupProfile
 except ImportError:
-    WEBDRIVER_MANAGER_AVAILABLE = False
-
-# URL cố định để mua tất cả sản phẩm (trang liệt kê sản phẩm)
-PRODUCT_LIST_URL = "https://www.er-sports.com/shop/shopbrand.html?search=mezz&sort=price_desc&money1=&money2=&prize1=&company1=&content1=&originalcode1=&category=&subcategory="
-
-
-class BrowserAutomation:
+    from product_cache import ProductCache
+    from driver_cache import DriverCache, MANIFEST_FILENAME
+    from watchdog import ProcessRegistry, PIDS_FILENAME
+    from session_store import SessionStore, SESSIONS_FILENAME
+    from disk_cache import create_disk_cache
+    from lean_mode import LeanProfile, DEFAULT_BLOCKED_HOSTS
+    from config_loader import AppConfig, ConfigError, PAGE_LOAD_STRATEGIES, load_config
+    from log_setup import setup_queue_logging, stop_queue_logging
+    from stats import format_duration
+    from settings_store import SettingsStore
+    from history import HistoryStore, HISTORY_FILENAME
+    from events import EventLog, EVENTS_FILENAME
+    from log_view import LogBuffer, LogView, pump_log_queue, DEFAULT_MAX_LINES, DEFAULT_BATCH_SIZE, \
+        MIN_MAX_LINES, POLL_INTERVAL_MS, BACKLOG_INTERVAL_MS
+    from importers import ChunkedTreeLoader, read_accounts, read_products, collect_rows, merge_rows, \
+        normalize_account, normalize_product, MAX_ACCOUNTS, MAX_PRODUCTS
+    from engine import AutomationEngine, RunOptions
+    from startup import StartupProfile
+
+_MODULES_IMPORTED = time.perf_counter()
+
+# Chu kỳ vẽ lại thống kê trên GUI (ms)
+STATS_REFRESH_MS = 500
+
+
+def __getattr__(name):
     """
-    Class quản lý automation browser cho er-sports.com
-    Sử dụng Selenium WebDriver để điều khiển Chrome browser
+    BrowserAutomation (selenium, webdriver-manager) chỉ được import khi dùng tới
     """
-
-    def __init__(self, headless=False, chrome_path=None):
-        """
-        Khởi tạo browser automation
-
-        Args:
-            headless (bool): Chạy browser ở chế độ ẩn (True) hoặc hiện (False)
-            chrome_path (str): Đường dẫn đến Chrome executable
-        """
-        self.driver = None
-        self.headless = headless
-        self.chrome_path = chrome_path
-        self.is_logged_in = False
-
-    def close_popups(self, verbose=False):
-        """
-        Đóng các popup và overlay có thể che các element cần click
-
-        Args:
-            verbose (bool): Nếu True, in log chi tiết
-        """
-        if verbose:
-            print("[close_popups] Bắt đầu đóng popups...")
-
-        try:
-            # Kiểm tra và đóng popup WorldShopping với ID: zigzag-modal
-            popup_found = False
-            try:
-                # Thử tìm popup với ID zigzag-modal (popup chính)
-                if verbose:
-                    print("[close_popups] Đang tìm popup zigzag-modal...")
-                popup = self.driver.find_element(By.ID, 'zigzag-modal')
-                if popup.is_displayed():
-                    if verbose:
-                        print("[close_popups] ✓ Tìm thấy popup zigzag-modal đang hiển thị")
-                    popup_found = True
-                else:
-                    if verbose:
-                        print("[close_popups] Tìm thấy popup zigzag-modal nhưng không hiển thị")
-            except NoSuchElementException:
-                if verbose:
-                    print("[close_popups] Không tìm thấy popup zigzag-modal")
-            except Exception as e:
-                if verbose:
-                    print(f"[close_popups] Lỗi khi tìm popup zigzag-modal: {str(e)}")
-
-            # Thử tìm nút close với nhiều selector khác nhau nếu tìm thấy popup
-            if popup_found:
-                if verbose:
-                    print("[close_popups] Bắt đầu đóng popup...")
-
-                try:
-                    close_selectors = [
-                        'button#zigzag-test__modal-close',  # Nút close chính
-                        '#zigzag-modal button',
-                        '#zigzag-modal button.close',
-                        '#zigzag-modal [alt="Close"]',
-                        '#zigzag-modal .close',
-                        '#zigzag-modal img[alt="Close"]',
-                        'button[type="button"] img[alt="Close"]',
-                        '#zigzag-worldshopping-checkout button.close',
-                        '#zigzag-worldshopping-checkout .close-btn',
-                        '#zigzag-worldshopping-checkout .modal-close'
-                    ]
-
-                    for selector in close_selectors:
-                        try:
-                            close_btn = self.driver.find_element(By.CSS_SELECTOR, selector)
-                            if close_btn.is_displayed():
-                                if verbose:
-                                    print(f"[close_popups] Tìm thấy nút close với selector: {selector}")
-                                self.driver.execute_script("arguments[0].click();", close_btn)
-                                time.sleep(0.3)
-                                if verbose:
-                                    print("[close_popups] ✓ Đã click vào nút close")
-                                break
-                        except:
-                            continue
-
-                    # Nếu không tìm thấy nút close, thử Escape key
-                    try:
-                        if verbose:
-                            print("[close_popups] Thử nhấn phím ESC...")
-                        self.driver.find_element(By.TAG_NAME, 'body').send_keys(Keys.ESCAPE)
-                        time.sleep(0.3)
-                        if verbose:
-                            print("[close_popups] ✓ Đã nhấn ESC")
-                    except Exception as e:
-                        if verbose:
-                            print(f"[close_popups] Không thể nhấn ESC: {str(e)}")
-                except Exception as e:
-                    if verbose:
-                        print(f"[close_popups] Lỗi khi tìm nút close: {str(e)}")
-                    # Click ra ngoài bằng cách click vào body
-                    try:
-                        body = self.driver.find_element(By.TAG_NAME, 'body')
-                        self.driver.execute_script("arguments[0].click();", body)
-                        time.sleep(0.3)
-                        if verbose:
-                            print("[close_popups] ✓ Đã click ra ngoài popup")
-                    except Exception as e2:
-                        if verbose:
-                            print(f"[close_popups] Không thể click ra ngoài: {str(e2)}")
-
-                # Ẩn popup bằng CSS - thử nhiều cách
-                try:
-                    if verbose:
-                        print("[close_popups] Thử ẩn popup bằng JavaScript...")
-                    scripts = [
-                        "document.getElementById('zigzag-modal').style.display='none';",
-                        "var popup = document.getElementById('zigzag-modal'); if(popup) popup.style.display='none';",
-                        "document.getElementById('zigzag-modal').remove();",
-                        "document.getElementById('zigzag-worldshopping-checkout').style.display='none';",
-                        "document.getElementById('zigzag-worldshopping-checkout').remove();"
-                    ]
-                    for script in scripts:
-                        try:
-                            self.driver.execute_script(script)
-                            time.sleep(0.2)
-                            if verbose:
-                                print(f"[close_popups] ✓ Đã chạy script: {script}")
-                        except:
-                            continue
-                except Exception as e:
-                    if verbose:
-                        print(f"[close_popups] Lỗi khi ẩn popup bằng JS: {str(e)}")
-
-            # Kiểm tra popup WorldShopping với nhiều selector khác nhau (fallback)
-            if not popup_found:
-                try:
-                    worldshopping_popups = [
-                        (By.ID, 'zigzag-modal'),  # Popup chính
-                        (By.ID, 'zigzag-worldshopping-checkout'),
-                        (By.CLASS_NAME, 'worldshopping-popup'),
-                        (By.CSS_SELECTOR, '[class*="worldshopping"]'),
-                        (By.CSS_SELECTOR, '[id*="zigzag"]'),
-                        (By.CSS_SELECTOR, '[class*="NoticeV2"]'),
-                        (By.CSS_SELECTOR, '.modal[class*="world"]')
-                    ]
-
-                    for locator_type, locator_value in worldshopping_popups:
-                        try:
-                            popup = self.driver.find_element(locator_type, locator_value)
-                            if popup.is_displayed():
-                                # Thử đóng popup
-                                try:
-                                    # Tìm nút X trong popup
-                                    close_btn = popup.find_element(By.CSS_SELECTOR,
-                                                                   'button, .close, [aria-label*="close" i]')
-                                    self.driver.execute_script("arguments[0].click();", close_btn)
-                                    time.sleep(0.3)
-                                except:
-                                    # Ẩn popup
-                                    self.driver.execute_script("arguments[0].style.display='none';", popup)
-                                    time.sleep(0.3)
-                                break
-                        except:
-                            continue
-                except:
-                    pass
-
-            # Kiểm tra các popup/overlay khác có thể che element
-            try:
-                overlay_selectors = [
-                    '.modal-backdrop',
-                    '.overlay',
-                    '.popup-overlay',
-                    '[style*="position: fixed"]',
-                    '[style*="z-index"]'
-                ]
-
-                for selector in overlay_selectors:
-                    try:
-                        overlays = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                        for overlay in overlays:
-                            try:
-                                overlay_id = overlay.get_attribute('id') or ''
-                                if overlay.is_displayed() and 'zigzag' not in overlay_id:
-                                    self.driver.execute_script("arguments[0].style.display='none';", overlay)
-                                    time.sleep(0.2)
-                            except:
-                                pass
-                    except:
-                        pass
-            except:
-                pass
-
-        except:
-            pass
-
-    @staticmethod
-    def find_chrome_executable():
-        """
-        Tìm đường dẫn Chrome executable trên Windows
-
-        Returns:
-            str: Đường dẫn đến chrome.exe hoặc None nếu không tìm thấy
-        """
-        # Danh sách các đường dẫn có thể có
-        possible_paths = [
-            r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-            r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
-            os.path.expanduser(r"~\AppData\Local\Google\Chrome\Application\chrome.exe"),
-        ]
-
-        for path in possible_paths:
-            if os.path.exists(path):
-                return path
-
-        return None
-
-    @staticmethod
-    def find_chromedriver_executable():
-        """
-        Tìm đường dẫn ChromeDriver executable
-
-        Returns:
-            str: Đường dẫn đến chromedriver.exe hoặc None nếu không tìm thấy
-        """
-        # Nếu đang chạy trong môi trường PyInstaller
-        if getattr(sys, 'frozen', False):
-            # Lấy thư mục chứa executable
-            base_path = os.path.dirname(sys.executable)
-            chromedriver_path = os.path.join(base_path, 'chromedriver.exe')
-            if os.path.exists(chromedriver_path):
-                return chromedriver_path
-
-        # Tìm trong PATH
-        chromedriver = shutil.which('chromedriver.exe')
-        if chromedriver:
-            return chromedriver
-
-        # Tìm trong các thư mục thông thường
-        possible_paths = [
-            r"C:\Program Files\ChromeDriver\chromedriver.exe",
-            r"C:\chromedriver\chromedriver.exe",
-            os.path.join(os.path.dirname(__file__), 'chromedriver.exe'),
-        ]
-
-        for path in possible_paths:
-            if os.path.exists(path):
-                return path
-
-        return None
-
-    def setup_driver(self, verbose=True):
-        try:
-            chrome_options = Options()
-            chrome_options.add_argument("--lang=en-US")
-            chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            chrome_options.add_experimental_option("useAutomationExtension", False)
-            chrome_options.add_experimental_option("detach", True)  # Giữ Chrome mở
-
-            # Nếu bạn tick Headless thì dùng headless mới
-            if self.headless:
-                chrome_options.add_argument("--headless=new")
-
-            # Tìm đường dẫn Chrome
-            chrome_executable = self.chrome_path if (
-                    self.chrome_path and os.path.exists(self.chrome_path)) else self.find_chrome_executable()
-
-            if chrome_executable:
-                chrome_options.binary_location = chrome_executable
-                if verbose:
-                    print(f"Sử dụng Chrome tại: {chrome_executable}")
-            elif verbose:
-                print("Không tìm thấy Chrome, sẽ sử dụng Chrome mặc định trong PATH")
-
-            # Tìm đường dẫn ChromeDriver
-            # Ưu tiên: 1. ChromeDriver đã có sẵn, 2. webdriver-manager tự động tải, 3. Service() mặc định
-            chromedriver_path = self.find_chromedriver_executable()
-            service = None
-
-            if chromedriver_path:
-                if verbose:
-                    print(f"Sử dụng ChromeDriver tại: {chromedriver_path}")
-                service = Service(chromedriver_path)
-            elif WEBDRIVER_MANAGER_AVAILABLE:
-                try:
-                    if verbose:
-                        print("Không tìm thấy ChromeDriver, đang tải tự động bằng webdriver-manager...")
-                    chromedriver_path = ChromeDriverManager().install()
-                    if verbose:
-                        print(f"✓ Đã tải và cài đặt ChromeDriver tại: {chromedriver_path}")
-                    service = Service(chromedriver_path)
-                except Exception as e:
-                    if verbose:
-                        print(f"Cảnh báo: Không thể tải ChromeDriver tự động: {str(e)}")
-                    # Fallback: thử dùng Service() mặc định
-                    if verbose:
-                        print("Đang thử sử dụng ChromeDriver mặc định từ selenium...")
-                    service = Service()
-            else:
-                if verbose:
-                    print("⚠️  Không tìm thấy ChromeDriver!")
-                    print("💡 Để tự động tải ChromeDriver, vui lòng cài đặt:")
-                    print("   pip install webdriver-manager")
-                    print("   Hoặc tải ChromeDriver thủ công từ: https://chromedriver.chromium.org/")
-                    print("Đang thử sử dụng ChromeDriver mặc định từ selenium...")
-                service = Service()
-
-            # Khởi tạo WebDriver
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-
-            # Ẩn dấu hiệu automation
-            self.driver.execute_script(
-                "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
-            )
-            return True
-        except Exception as e:
-            error_msg = f"Lỗi khởi tạo browser: {str(e)}"
-            if verbose:
-                print(error_msg)
-                print("Đang thử sử dụng Chrome và ChromeDriver mặc định...")
-
-            try:
-                # Thử với webdriver-manager nếu có
-                if WEBDRIVER_MANAGER_AVAILABLE:
-                    try:
-                        if verbose:
-                            print("Đang thử tải ChromeDriver bằng webdriver-manager...")
-                        chromedriver_path = ChromeDriverManager().install()
-                        if verbose:
-                            print(f"Đã tải ChromeDriver tại: {chromedriver_path}")
-                        service = Service(chromedriver_path)
-                    except Exception as e_manager:
-                        if verbose:
-                            print(f"Cảnh báo: Không thể tải ChromeDriver: {str(e_manager)}")
-                        service = Service()
-                else:
-                    service = Service()
-
-                # Thử với cài đặt mặc định
-                chrome_options = Options()
-                chrome_options.add_argument("--lang=en-US")
-                chrome_options.add_argument("--no-sandbox")
-                chrome_options.add_argument("--disable-dev-shm-usage")
-
-                if self.headless:
-                    chrome_options.add_argument("--headless=new")
-
-                self.driver = webdriver.Chrome(service=service, options=chrome_options)
-                self.driver.execute_script(
-                    "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
-                )
-                if verbose:
-                    print("Khởi tạo browser thành công với cài đặt mặc định")
-                return True
-            except Exception as e2:
-                if verbose:
-                    print(f"Lỗi khởi tạo browser với cài đặt mặc định: {str(e2)}")
-                    if "chromedriver" in str(e2).lower():
-                        print("\n⚠️  LỖI: Không tìm thấy ChromeDriver!")
-                        print("💡 Giải pháp:")
-                        print("   1. Cài đặt webdriver-manager: pip install webdriver-manager")
-                        print("   2. Hoặc tải ChromeDriver thủ công từ: https://chromedriver.chromium.org/")
-                        print("   3. Đặt ChromeDriver vào PATH hoặc cùng thư mục với script")
-                return False
-
-    def login(self, email, password):
-        """
-        Đăng nhập vào tài khoản er-sports.com
-
-        Args:
-            email (str): Email đăng nhập
-            password (str): Mật khẩu
-
-        Returns:
-            bool: True nếu đăng nhập thành công, False nếu thất bại
-        """
-        print(f"[login] Bắt đầu đăng nhập với email: {email}")
-
-        try:
-            if not self.driver:
-                print("[login] Driver chưa khởi tạo, đang thiết lập...")
-                if not self.setup_driver():
-                    print("[login] ✗ Không thể khởi tạo driver")
-                    return False
-                print("[login] ✓ Driver đã được khởi tạo")
-
-            # Truy cập trang chủ
-            print("[login] Đang truy cập trang chủ...")
-            self.driver.get("https://www.er-sports.com/index.html")
-            time.sleep(2)
-            print("[login] ✓ Đã tải trang chủ")
-
-            # Đóng popup WorldShopping nếu có (xuất hiện lần đầu vào website)
-            print("[login] Đang đóng popup lần 1...")
-            self.close_popups(verbose=True)
-            time.sleep(1)
-
-            # Gọi trực tiếp hàm JavaScript để mở form login
-            print("[login] Đang gọi hàm ssl_login('login') để mở form...")
-            try:
-                self.driver.execute_script("ssl_login('login');")
-                print("[login] ✓ Đã gọi ssl_login('login')")
-            except Exception as e:
-                print(f"[login] Không thể gọi ssl_login trực tiếp: {str(e)}")
-                # Fallback: click link
-                print("[login] Thử click link đăng nhập...")
-                login_link = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable(
-                        (By.CSS_SELECTOR, '#header ul li a[href="javascript:ssl_login(\'login\')"]'))
-                )
-                login_link.click()
-                print("[login] ✓ Đã click vào link đăng nhập")
-
-            # Đợi form login xuất hiện
-            print("[login] Đang đợi form login xuất hiện...")
-
-            # Thử nhiều cách để đợi form xuất hiện
-            form_loaded = False
-            try:
-                # Đợi cho đến khi có input với name="id"
-                WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, 'input[name="id"]'))
-                )
-                form_loaded = True
-                print("[login] ✓ Form login đã xuất hiện")
-            except TimeoutException:
-                print("[login] ✗ Timeout đợi form xuất hiện")
-
-            if not form_loaded:
-                time.sleep(2)  # Thêm delay nếu form chưa xuất hiện
-
-            # Đóng popup WorldShopping nếu có (thử nhiều lần vì popup có thể tự hiện lại)
-            print("[login] Đang đóng popup nhiều lần...")
-            for i in range(5):  # Tăng số lần thử
-                print(f"[login] Đóng popup lần {i + 1}/5...")
-                self.close_popups(verbose=True)
-                time.sleep(0.5)
-
-            # Điền thông tin đăng nhập - thử nhiều selector
-            print("[login] Đang tìm ô nhập email...")
-
-            # Thử nhiều selector khác nhau cho email input
-            email_input = None
-            email_selectors = [
-                'table.loginform input[name="id"]',
-                'input[name="id"]',
-                'input[type="text"]',
-                'input[type="email"]',
-                'table.loginform input[type="text"]'
-            ]
-
-            for selector in email_selectors:
-                try:
-                    print(f"[login] Thử tìm email với selector: {selector}")
-                    email_input = WebDriverWait(self.driver, 5).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    print(f"[login] ✓ Tìm thấy ô email với selector: {selector}")
-                    break
-                except TimeoutException:
-                    continue
-
-            if not email_input:
-                print("[login] ✗ Không tìm thấy ô email với bất kỳ selector nào")
-                print("[login] Đang chụp màn hình và lưu HTML để debug...")
-                try:
-                    self.driver.save_screenshot('debug_login_not_found.png')
-                    print("[login] Đã lưu screenshot: debug_login_not_found.png")
-                except Exception as e:
-                    print(f"[login] Không thể chụp màn hình: {str(e)}")
-                try:
-                    with open('debug_login_page.html', 'w', encoding='utf-8') as f:
-                        f.write(self.driver.page_source)
-                    print("[login] Đã lưu HTML: debug_login_page.html")
-                except Exception as e:
-                    print(f"[login] Không thể lưu HTML: {str(e)}")
-                raise Exception("Không tìm thấy ô nhập email")
-
-            # Scroll đến element
-            print("[login] Đang scroll đến ô email...")
-            self.driver.execute_script("arguments[0].scrollIntoView(true);", email_input)
-            time.sleep(0.5)
-
-            # Đóng popup lại một lần nữa sau khi scroll
-            print("[login] Đóng popup sau khi scroll...")
-            self.close_popups(verbose=True)
-            time.sleep(0.5)
-
-            # Thử điền bằng JavaScript để tránh bị che
-            print("[login] Đang điền email bằng JavaScript...")
-            try:
-                self.driver.execute_script(
-                    "arguments[0].value = arguments[1]; arguments[0].dispatchEvent(new Event('input'));",
-                    email_input, email)
-                print("[login] ✓ Đã điền email bằng JavaScript")
-            except Exception as e:
-                print(f"[login] Lỗi JS, thử clear thông thường: {str(e)}")
-                email_input.clear()
-                email_input.send_keys(email)
-                print("[login] ✓ Đã điền email bằng cách thông thường")
-
-            # Điền password
-            print("[login] Đang điền password...")
-            password_input = self.driver.find_element(By.CSS_SELECTOR, 'table.loginform input[name="passwd"]')
-
-            # Scroll đến password field
-            self.driver.execute_script("arguments[0].scrollIntoView(true);", password_input)
-            time.sleep(0.5)
-
-            # Thử điền bằng JavaScript
-            try:
-                self.driver.execute_script(
-                    "arguments[0].value = arguments[1]; arguments[0].dispatchEvent(new Event('input'));",
-                    password_input, password)
-                print("[login] ✓ Đã điền password bằng JavaScript")
-            except Exception as e:
-                print(f"[login] Lỗi JS, thử cách thông thường: {str(e)}")
-                password_input.clear()
-                password_input.send_keys(password)
-                print("[login] ✓ Đã điền password bằng cách thông thường")
-
-            # Đóng popup lại một lần nữa trước khi submit (popup có thể xuất hiện lại)
-            print("[login] Đóng popup lần cuối trước khi submit...")
-            self.close_popups(verbose=True)
-            time.sleep(0.5)
-
-            # Click nút đăng nhập
-            print("[login] Đang tìm nút đăng nhập...")
-            login_button = self.driver.find_element(By.CSS_SELECTOR,
-                                                    'div.btn input[onclick="javascript:login_check();"]')
-            print("[login] ✓ Tìm thấy nút đăng nhập, đang click...")
-
-            # Sử dụng JavaScript click để tránh popup che button
-            try:
-                self.driver.execute_script("arguments[0].click();", login_button)
-                print("[login] ✓ Đã click nút đăng nhập bằng JavaScript")
-            except Exception as e:
-                print(f"[login] Không thể click bằng JS: {str(e)}, thử click thường...")
-                login_button.click()
-                print("[login] ✓ Đã click nút đăng nhập bằng click thường")
-
-            time.sleep(3)
-            print("[login] Đang kiểm tra kết quả đăng nhập...")
-
-            # Kiểm tra đăng nhập thành công
-            try:
-                # Kiểm tra xem có xuất hiện link đăng xuất không
-                logout_link = self.driver.find_element(By.CSS_SELECTOR, 'a[href*="logout"]')
-                print("[login] ✓✓✓ Đăng nhập THÀNH CÔNG!")
-                self.is_logged_in = True
-                return True
-            except NoSuchElementException:
-                print("[login] ✗ Không tìm thấy link logout")
-                # Kiểm tra xem có thông báo lỗi không
-                try:
-                    error_message = self.driver.find_element(By.CSS_SELECTOR, '.error, .alert, .warning')
-                    print(f"[login] ✗ Lỗi đăng nhập: {error_message.text}")
-                except NoSuchElementException:
-                    print("[login] ✗ Không thể xác định trạng thái đăng nhập")
-                print("[login] ✗✗✗ Đăng nhập THẤT BẠI!")
-                return False
-
-        except TimeoutException as e:
-            print(f"[login] ✗✗✗ TIMEOUT khi đăng nhập: {str(e)}")
-            return False
-        except Exception as e:
-            print(f"[login] ✗✗✗ LỖI đăng nhập: {str(e)}")
-            import traceback
-            print(f"[login] Traceback: {traceback.format_exc()}")
-            return False
-
-    def purchase_product(self, product_url, product_id):
-        """
-        Mua sản phẩm bằng cách quét từng page trong listing, tìm sản phẩm có chứa product_id trong tên
-
-        Args:
-            product_url (str): URL của trang listing (không dùng trực tiếp)
-            product_id (str): ID của sản phẩm cần tìm (tìm trong tên sản phẩm)
-
-        Returns:
-            dict: Kết quả mua hàng với thông tin chi tiết
-        """
-        result = {
-            'success': False,
-            'error': None,
-            'product_id': product_id,
-            'timestamp': datetime.now().isoformat()
-        }
-
-        try:
-            if not self.is_logged_in:
-                result['error'] = "Chưa đăng nhập"
-                return result
-
-            # Xóa giỏ hàng trước
-            print(f"[purchase] Xóa giỏ hàng trước khi mua sản phẩm {product_id}")
-            self.driver.get("https://www.er-sports.com/shop/basket.html")
-            time.sleep(2)
-            self.close_popups()
-            time.sleep(0.5)
-
-            try:
-                clear_button = self.driver.find_element(By.CSS_SELECTOR,
-                                                        '.btn-wrap-back a[href*="basket_clear"]')
-                try:
-                    self.driver.execute_script("arguments[0].click();", clear_button)
-                    time.sleep(1)
-                    try:
-                        WebDriverWait(self.driver, 5).until(EC.alert_is_present())
-                        alert = self.driver.switch_to.alert
-                        alert.accept()
-                        time.sleep(1)
-                    except TimeoutException:
-                        pass
-                except:
-                    clear_button.click()
-                    time.sleep(1)
-                    try:
-                        WebDriverWait(self.driver, 5).until(EC.alert_is_present())
-                        alert = self.driver.switch_to.alert
-                        alert.accept()
-                        time.sleep(1)
-                    except TimeoutException:
-                        pass
-            except NoSuchElementException:
-                pass  # Giỏ hàng đã trống
-
-            # Bắt đầu quét từ page đầu tiên
-            listing_url = PRODUCT_LIST_URL
-            current_page = 1
-            max_pages_to_scan = 5  # Giới hạn số page để tránh vòng lặp vô hạn
-            total_scans = 0  # Đếm tổng số lần quét để tránh vòng lặp vô hạn khi refresh
-            product_found = False
-            product_detail_url = None
-
-            while not product_found and current_page <= max_pages_to_scan and total_scans < max_pages_to_scan:
-                total_scans += 1
-                print(f"[purchase] Quét page {current_page} để tìm sản phẩm {product_id} (Lần quét: {total_scans}/{max_pages_to_scan})")
-
-                # Truy cập trang listing
-                if current_page == 1:
-                    listing_url = PRODUCT_LIST_URL
-                    self.driver.get(listing_url)
-                else:
-                    self.driver.get(listing_url)
-
-                time.sleep(2)
-                self.close_popups()
-                time.sleep(0.5)
-
-                # Tìm tất cả các sản phẩm trong trang
-                try:
-                    # Thử nhiều selector khác nhau để tìm link sản phẩm
-                    product_items = self.driver.find_elements(By.CSS_SELECTOR,
-                                                              'ul.category-list li .detail p.name a, .category-list li .detail p.name a, '
-                                                              '.category-list li p.name a, ul.category-list p.name a, '
-                                                              'a[href*="/shopdetail"], a[href*="shopdetail.html"]')
-
-                    # Lọc các link có text (tên sản phẩm)
-                    valid_product_items = []
-                    for item in product_items:
-                        try:
-                            text = item.text.strip()
-                            href = item.get_attribute('href') or ''
-                            if text and href and ('shopdetail' in href):
-                                valid_product_items.append(item)
-                        except:
-                            continue
-
-                    product_items = valid_product_items
-                    print(f"[purchase] Tìm thấy {len(product_items)} sản phẩm trong page {current_page}")
-
-                    for product_link in product_items:
-                        try:
-                            product_name = product_link.text
-                            href = product_link.get_attribute('href')
-
-                            # Kiểm tra xem product_id có trong tên sản phẩm không
-                            if product_id and product_id in product_name:
-                                print(f"[purchase] ✓ Tìm thấy sản phẩm: {product_name}")
-                                product_found = True
-
-                                # Lấy URL đầy đủ
-                                if href.startswith('/'):
-                                    product_detail_url = f"https://www.er-sports.com{href}"
-                                elif href.startswith('http'):
-                                    product_detail_url = href
-                                else:
-                                    product_detail_url = f"https://www.er-sports.com/{href}"
-
-                                break
-                        except Exception as e:
-                            print(f"[purchase] Lỗi khi xử lý sản phẩm: {str(e)}")
-                            continue
-
-                    # Nếu không tìm thấy trong page này, thử tìm link "次の48件"
-                    if not product_found:
-                        try:
-                            # Tìm link "次の48件" trong li.next
-                            next_link = self.driver.find_element(By.CSS_SELECTOR, 'li.next a')
-                            next_text = next_link.text
-
-                            # Kiểm tra xem có phải link "次の48件" không
-                            if "次の" in next_text or "»" in next_text:
-                                next_href = next_link.get_attribute('href')
-                                if next_href:
-                                    # Chuẩn hóa URL
-                                    if next_href.startswith('/'):
-                                        next_href = f"https://www.er-sports.com{next_href}"
-
-                                    # Trích xuất số page từ URL
-                                    page_match = re.search(r'page=(\d+)', next_href)
-                                    if page_match:
-                                        next_page_num = int(page_match.group(1))
-                                        if next_page_num > current_page:
-                                            current_page = next_page_num
-                                            listing_url = next_href
-                                            print(f"[purchase] Chuyển sang page {current_page}")
-                                            continue
-                            else:
-                                # Không tìm thấy link next hợp lệ, thử tăng page number
-                                current_page += 1
-                                if current_page <= max_pages_to_scan:
-                                    separator = "&" if "?" in listing_url else "?"
-                                    if "page=" not in listing_url:
-                                        listing_url = f"{listing_url}{separator}page={current_page}"
-                                    else:
-                                        listing_url = re.sub(r'page=\d+', f'page={current_page}', listing_url)
-                                    continue
-                        except NoSuchElementException:
-                            print(f"[purchase] Không tìm thấy link chuyển trang tiếp theo")
-                            # Nếu không tìm thấy link next và đã quét hết, F5 và quét lại từ đầu
-                            print(f"[purchase] Quét hết page, refresh và quét lại từ đầu")
-                            self.driver.refresh()
-                            time.sleep(2)
-                            self.close_popups()
-                            current_page = 1
-                            listing_url = PRODUCT_LIST_URL
-                            continue
-
-                except Exception as e:
-                    print(f"[purchase] Lỗi khi quét sản phẩm: {str(e)}")
-                    # Nếu có lỗi, refresh và thử lại từ đầu
-                    self.driver.refresh()
-                    time.sleep(2)
-                    self.close_popups()
-                    current_page = 1
-                    listing_url = PRODUCT_LIST_URL
-                    continue
-
-            # Nếu không tìm thấy sản phẩm sau khi quét hết
-            if not product_found:
-                result['error'] = f"Không tìm thấy sản phẩm có ID {product_id} sau khi quét {max_pages_to_scan} pages"
-                return result
-
-            # Đã tìm thấy sản phẩm, vào trang chi tiết
-            print(f"[purchase] Vào trang chi tiết sản phẩm: {product_detail_url}")
-            self.driver.get(product_detail_url)
-            time.sleep(2)
-            self.close_popups()
-            time.sleep(0.5)
-
-            # Tìm và click nút "カートへ入れる" (thêm vào giỏ hàng)
-            print(f"[purchase] Tìm nút thêm vào giỏ hàng...")
-            try:
-                add_to_cart_button = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                                '.item-basket-btn a.btn-basket, a[href*="JavaScript:send"][class*="btn-basket"]'))
-                )
-
-                print(f"[purchase] Tìm thấy nút thêm vào giỏ hàng, đang click...")
-                try:
-                    self.driver.execute_script("arguments[0].click();", add_to_cart_button)
-                    print(f"[purchase] ✓ Đã click nút thêm vào giỏ hàng bằng JavaScript")
-                except:
-                    add_to_cart_button.click()
-                    print(f"[purchase] ✓ Đã click nút thêm vào giỏ hàng bằng click thường")
-
-                # Đợi một chút để JavaScript xử lý
-                time.sleep(2)
-
-                # Đợi cho đến khi URL thay đổi hoặc có dấu hiệu chuyển trang
-                try:
-                    WebDriverWait(self.driver, 10).until(
-                        lambda d: "basket.html" in d.current_url or d.current_url != product_detail_url
-                    )
-                    print(f"[purchase] ✓ URL đã thay đổi, đang chuyển sang giỏ hàng...")
-                except TimeoutException:
-                    print(f"[purchase] Cảnh báo: URL chưa thay đổi sau khi click, nhưng vẫn tiếp tục...")
-                    # Thử navigate trực tiếp nếu cần
-                    if "basket.html" not in self.driver.current_url:
-                        print(f"[purchase] Tự động chuyển sang trang giỏ hàng...")
-                        self.driver.get("https://www.er-sports.com/shop/basket.html")
-            except TimeoutException:
-                result['error'] = "Không tìm thấy nút thêm vào giỏ hàng"
-                return result
-
-            # Đợi chuyển sang trang giỏ hàng
-            print(f"[purchase] Đợi chuyển sang trang giỏ hàng...")
-            WebDriverWait(self.driver, 15).until(
-                lambda d: "basket.html" in d.current_url
-            )
-            # Đợi trang load hoàn toàn
-            time.sleep(3)
-            self.close_popups()
-            time.sleep(1)
-
-            # Đợi cho đến khi trang basket load xong (kiểm tra xem có table.basket không)
-            try:
-                WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, 'table.basket, .basket-wrap'))
-                )
-            except TimeoutException:
-                print(f"[purchase] Cảnh báo: Không tìm thấy bảng giỏ hàng sau khi đợi")
-
-            # Kiểm tra trong giỏ hàng có sản phẩm hay không
-            print(f"[purchase] Kiểm tra giỏ hàng...")
-
-            # Kiểm tra xem có thông báo "giỏ hàng trống" không
-            page_source = self.driver.page_source
-            is_empty = "買い物かごに商品がありません" in page_source or "カートに商品がありません" in page_source
-
-            if is_empty:
-                result['error'] = "Giỏ hàng trống, sản phẩm không được thêm vào"
-                print(f"[purchase] ✗ Giỏ hàng trống")
-                return result
-
-            print(f"[purchase] ✓ Giỏ hàng có sản phẩm (không trống)")
-
-            # Thử đếm số sản phẩm (nhưng không bắt buộc phải chính xác)
-            try:
-                # Tìm các hàng sản phẩm trong table.basket (loại trừ header và message trống)
-                cart_rows = self.driver.find_elements(By.CSS_SELECTOR,
-                                                      'table.basket tbody tr')
-
-                # Lọc các hàng có sản phẩm (không phải header, không phải message trống)
-                actual_items = []
-                for row in cart_rows:
-                    try:
-                        row_text = row.text.strip()
-                        # Loại trừ header và message trống
-                        if (row_text and
-                                "商品情報" not in row_text and
-                                "数量" not in row_text and
-                                "買い物かごに商品がありません" not in row_text and
-                                "カートに商品がありません" not in row_text):
-                            # Kiểm tra xem có input amount hoặc link sản phẩm không
-                            has_amount_input = row.find_elements(By.CSS_SELECTOR,
-                                                                 'input[type="text"][name*="amount"], input[type="number"][name*="amount"]')
-                            has_product_link = row.find_elements(By.CSS_SELECTOR, 'a[href*="shopdetail"]')
-                            if has_amount_input or has_product_link:
-                                actual_items.append(row)
-                    except:
-                        pass
-
-                item_count = len(actual_items)
-                print(f"[purchase] Số sản phẩm trong giỏ hàng (ước tính): {item_count}")
-
-                # Nếu đếm được ít nhất 1 sản phẩm, tiếp tục
-                # Nếu đếm được 0 nhưng đã kiểm tra không trống ở trên (is_empty = False),
-                # vẫn tiếp tục (có thể selector không đúng, nhưng có sản phẩm trong giỏ hàng)
-                if item_count == 0:
-                    print(f"[purchase] Cảnh báo: Không đếm được sản phẩm, nhưng giỏ hàng không trống, vẫn tiếp tục...")
-            except Exception as e:
-                print(f"[purchase] Cảnh báo: Không thể đếm sản phẩm: {str(e)}, nhưng vẫn tiếp tục...")
-
-            # Tìm và click nút "購入手続きへ進む"
-            print(f"[purchase] Tìm nút checkout...")
-            try:
-                checkout_button = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                                '.btn-wrap-order a[href*="sslorder"], a.btn[href*="sslorder"], .btn-wrap-order a.btn'))
-                )
-            except TimeoutException:
-                # Thử tìm bằng text
-                try:
-                    checkout_button = WebDriverWait(self.driver, 5).until(
-                        EC.element_to_be_clickable((By.XPATH,
-                                                    '//a[contains(text(), "購入手続きへ進む")]'))
-                    )
-                except TimeoutException:
-                    result['error'] = "Không tìm thấy nút checkout"
-                    return result
-
-                # Kiểm tra xem nút có bị disable không (nếu disable, có thể là giỏ hàng trống)
-                button_href = checkout_button.get_attribute('href')
-                if button_href and 'alert' in button_href.lower():
-                    result['error'] = "Nút checkout bị disable, giỏ hàng có thể trống"
-                    return result
-
-                print(f"[purchase] Tìm thấy nút checkout, đang click...")
-                try:
-                    self.driver.execute_script("arguments[0].click();", checkout_button)
-                    time.sleep(3)
-                except:
-                    checkout_button.click()
-                    time.sleep(3)
-
-                print(f"[purchase] ✓ Đã click nút checkout")
-
-            except TimeoutException as e:
-                result['error'] = f"Không tìm thấy nút checkout: {str(e)}"
-                return result
-            except Exception as e:
-                result['error'] = f"Lỗi khi xử lý nút checkout: {str(e)}"
-                return result
-
-            # Đợi chuyển sang trang checkout (có thể là step02 hoặc trang khác)
-            print(f"[purchase] Đợi chuyển sang trang checkout...")
-            WebDriverWait(self.driver, 15).until(
-                lambda d: "checkout" in d.current_url or "order" in d.current_url
-            )
-            time.sleep(3)
-            self.close_popups()
-            time.sleep(0.5)
-
-            # Tìm và click nút xác nhận đơn hàng "注文を確定する"
-            print(f"[purchase] Tìm nút xác nhận đơn hàng...")
-            try:
-                confirm_button = WebDriverWait(self.driver, 15).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                                'input[name="checkout"][type="button"], input.checkout-confirm[type="button"], '
-                                                'input[value*="注文を確定"], input[value*="確定"]'))
-                )
-
-                print(f"[purchase] Tìm thấy nút xác nhận, đang click...")
-                try:
-                    self.driver.execute_script("arguments[0].click();", confirm_button)
-                    time.sleep(3)
-                except:
-                    confirm_button.click()
-                    time.sleep(3)
-
-                print(f"[purchase] ✓ Đã click nút xác nhận đơn hàng")
-            except TimeoutException:
-                result['error'] = "Không tìm thấy nút xác nhận đơn hàng"
-                return result
-
-            # Đợi một chút để trang load
-            time.sleep(3)
-
-            # Kiểm tra thông báo thành công "ご注文ありがとうございました"
-            print(f"[purchase] Kiểm tra kết quả đặt hàng...")
-            page_source = self.driver.page_source
-
-            if "ご注文ありがとうございました" in page_source:
-                print(f"[purchase] ✓✓✓ Đặt hàng THÀNH CÔNG!")
-                result['success'] = True
-            else:
-                result['error'] = "Không tìm thấy thông báo đặt hàng thành công"
-                print(f"[purchase] ✗ Đặt hàng thất bại")
-
-        except Exception as e:
-            result['error'] = f"Lỗi không xác định: {str(e)}"
-            print(f"[purchase] ✗ Lỗi: {str(e)}")
-            import traceback
-            print(f"[purchase] Traceback: {traceback.format_exc()}")
-
-        return result
-
-    def logout(self):
-        """
-        Đăng xuất khỏi tài khoản
-        """
+    if name == 'BrowserAutomation':
         try:
-            if not self.driver or not self.is_logged_in:
-                return True
-
-            # Truy cập trang đăng xuất
-            self.driver.get("https://www.er-sports.com/shop/logout.html")
-            time.sleep(2)
-
-            self.is_logged_in = False
-            return True
-
-        except Exception as e:
-            print(f"Lỗi khi đăng xuất: {str(e)}")
-            return False
-
-    def close(self):
-        """
-        Đóng browser
-        """
-        if self.driver:
-            try:
-                self.driver.quit()
-            except Exception as e:
-                print(f"Lỗi khi đóng browser: {str(e)}")
-            finally:
-                self.driver = None
-                self.is_logged_in = False
+            from .browser import BrowserAutomation
+        except ImportError:
+            from browser import BrowserAutomation
+        return BrowserAutomation
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-class OpenVPNManager:
+def import_profile():
     """
-    Class quản lý kết nối OpenVPN
-    Sử dụng để thay đổi IP address bằng cách kết nối/disconnect VPN
-    """
-
-    def __init__(self, openvpn_path=None):
-        """
-        Khởi tạo OpenVPN Manager
-
-        Args:
-            openvpn_path (str): Đường dẫn đến OpenVPN executable
-        """
-        self.openvpn_path = openvpn_path or "C:\\Program Files\\OpenVPN\\bin\\openvpn.exe"
-        self.current_connection = None
-        self.config_files = []
-        self.current_config_index = 0
-
-    def load_config_files(self, config_files):
-        """
-        Nạp danh sách file config OpenVPN
-
-        Args:
-            config_files (list): List các đường dẫn đến file .ovpn
-        """
-        self.config_files = [f for f in config_files if os.path.exists(f)]
-
-    def connect(self, config_file):
-        """
-        Kết nối VPN sử dụng config file
-
-        Args:
-            config_file (str): Đường dẫn đến file .ovpn
-
-        Returns:
-            bool: True nếu kết nối thành công
-        """
-        try:
-            if not os.path.exists(config_file):
-                print(f"File config không tồn tại: {config_file}")
-                return False
-
-            # Đóng kết nối cũ nếu có
-            self.disconnect()
-
-            # Kết nối OpenVPN với config file
-            self.current_connection = subprocess.Popen(
-                [self.openvpn_path, '--config', config_file],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-
-            # Đợi kết nối thành công (tối đa 30 giây)
-            time.sleep(5)
-
-            # Kiểm tra xem process còn chạy không
-            if self.current_connection and self.current_connection.poll() is None:
-                return True
-            else:
-                return False
-
-        except Exception as e:
-            print(f"Lỗi khi kết nối VPN: {str(e)}")
-            return False
-
-    def disconnect(self):
-        """
-        Ngắt kết nối VPN hiện tại
-        """
-        try:
-            if self.current_connection:
-                self.current_connection.terminate()
-                self.current_connection.wait(timeout=10)
-                self.current_connection = None
-
-            # Đảm bảo đóng tất cả OpenVPN processes
-            subprocess.run(['taskkill', '/F', '/IM', 'openvpn.exe'],
-                           capture_output=True)
-
-            time.sleep(3)
-
-        except Exception as e:
-            print(f"Lỗi khi ngắt kết nối VPN: {str(e)}")
-
-    def connect_random_japan(self):
-        """
-        Kết nối VPN random với một IP Nhật Bản
-
-        Returns:
-            str: Đường dẫn config file được sử dụng, None nếu thất bại
-        """
-        if not self.config_files:
-            print("Không có config file nào được load")
-            return None
+    StartupProfile đã có sẵn các giai đoạn import của main.py
 
-        # Random một config file
-        selected_config = random.choice(self.config_files)
-
-        if self.connect(selected_config):
-            return selected_config
-        else:
-            return None
-
-    def connect_next_japan(self):
-        """
-        Kết nối VPN với IP Nhật Bản tiếp theo trong danh sách
-
-        Returns:
-            str: Đường dẫn config file được sử dụng, None nếu thất bại
-        """
-        if not self.config_files:
-            print("Không có config file nào được load")
-            return None
-
-        # Lấy config file tiếp theo
-        config_file = self.config_files[self.current_config_index % len(self.config_files)]
-        self.current_config_index += 1
-
-        if self.connect(config_file):
-            return config_file
-        else:
-            return None
+    Returns:
+        StartupProfile: Profile với gốc là lúc bắt đầu import main.py
+    """
+    profile = StartupProfile(origin=_IMPORT_STARTED)
+    profile.add("import tkinter + stdlib", _IMPORT_STARTED, _STDLIB_IMPORTED)
+    profile.add("import module nội bộ", _STDLIB_IMPORTED, _MODULES_IMPORTED)
+    return profile
 
 
 class ERSportsAutomationGUI:
@@ -1173,11 +109,23 @@ class ERSportsAutomationGUI:
     - Xem log chi tiết
     """
 
-    def __init__(self):
+    def __init__(self, profile=None, print_profile=False):
         """
         Khởi tạo giao diện chính
+
+        Chỉ dựng các tab hiển thị ngay; tab Log và Cài đặt được dựng khi chọn lần đầu,
+        cấu hình đã lưu được load sau khi cửa sổ hiển thị lần đầu.
+
+        Args:
+            profile (StartupProfile): Nơi ghi thời gian từng giai đoạn khởi tạo (tùy chọn)
+            print_profile (bool): In bảng thời gian khởi động ra stdout khi load cấu hình xong
         """
-        self.root = tk.Tk()
+        self.profile = profile if profile is not None else StartupProfile()
+        self.print_profile = print_profile
+        started = time.perf_counter()
+
+        with self.profile.phase("tk.Tk()"):
+            self.root = tk.Tk()
         self.root.title("ER Sports Automation Tool - Python GUI")
         self.root.geometry("1200x800")
         self.root.resizable(True, True)
@@ -1185,58 +133,127 @@ class ERSportsAutomationGUI:
         # Biến trạng thái
         self.is_running = False
         self.automation_thread = None
-        self.browser = None
-        self.vpn_manager = None
         self.openvpn_config_files = []
+        self._stats_texts = {}
+
+        # Cache product ID -> URL trang chi tiết, lưu giữa các lần chạy
+        self.product_cache = ProductCache(os.path.join(self.get_config_dir(), 'product_cache.json'))
+
+        # Chrome/ChromeDriver đã tìm được, dùng lại cho mọi browser và các lần mở app sau
+        self.driver_cache = DriverCache(os.path.join(self.get_config_dir(), MANIFEST_FILENAME))
 
-        # Biến đếm
-        self.scan_count = 0
-        self.success_count = 0
-        self.failure_count = 0
+        # Process Chrome/ChromeDriver do app khởi động (dọn process còn sót khi mở/đóng app)
+        self.process_registry = ProcessRegistry(os.path.join(self.get_config_dir(), PIDS_FILENAME))
 
-        # Trạng thái mua hàng theo ngày
-        self.purchased_today = set()
-        self.purchased_date = datetime.now().strftime('%Y-%m-%d')
+        # Cookie phiên đăng nhập theo tài khoản (mã hóa), lần chạy sau bỏ qua form login
+        self.session_store = SessionStore(os.path.join(self.get_config_dir(), SESSIONS_FILENAME))
 
         # Queue để giao tiếp giữa threads
         self.log_queue = queue.Queue()
 
+        # Cấu hình từ config.json (timeout, page load strategy, kích thước cửa sổ, logging...)
+        config_error = None
+        try:
+            with self.profile.phase("load_config"):
+                self.app_config = load_config()
+        except ConfigError as e:
+            self.app_config = AppConfig()
+            config_error = e
+
         # Thiết lập logging
-        self.setup_logging()
+        with self.profile.phase("setup_logging"):
+            self.setup_logging()
+        if config_error:
+            self.log_message(f"Lỗi file cấu hình, dùng giá trị mặc định: {str(config_error)}", "ERROR")
+        if self.app_config.browser.session.enabled and not self.session_store.enabled:
+            self.log_message("Chưa cài cryptography (pip install cryptography): không lưu phiên đăng nhập", "WARNING")
+
+        # Cache HTTP dùng chung cho mọi Chrome (dọn slot vượt giới hạn sau khi hiện cửa sổ)
+        self.disk_cache = create_disk_cache(self.app_config.browser.disk_cache, self.get_config_dir())
+
+        # settings.json (cấu hình) và state.json (đã mua hôm nay), ghi gộp ở thread nền
+        self.settings_store = SettingsStore(self.get_config_dir())
+
+        # Các lần nạp Treeview đang chạy (import/load cấu hình) và lần lưu bị hoãn trong lúc nạp;
+        # trước khi load xong settings.json thì không ghi đè file
+        self.tree_loaders = {}
+        self.save_pending = False
+        self.settings_loaded = False
+
+        # Lịch sử login/purchase (SQLite, ghi theo lô ở thread nền)
+        try:
+            with self.profile.phase("HistoryStore"):
+                self.history = HistoryStore(os.path.join(self.get_config_dir(), HISTORY_FILENAME))
+        except Exception as e:
+            self.history = None
+            self.log_message(f"Không mở được lịch sử chạy: {str(e)}", "ERROR")
+
+        # Vòng lặp automation (không phụ thuộc Tk), chạy ở thread riêng; trạng thái đã mua hôm nay
+        # nằm trong engine
+        self.engine = AutomationEngine(self.product_cache, log=self.log_message, emit=self.emit_event,
+                                       history=self.history, save_state=self.save_state,
+                                       driver_cache=self.driver_cache, process_registry=self.process_registry,
+                                       session_store=self.session_store, disk_cache=self.disk_cache)
+
+        # Thống kê: thread automation ghi, GUI đọc snapshot theo chu kỳ STATS_REFRESH_MS; thời gian
+        # chờ/làm việc của các flow, span từng bước (xuất Chrome trace) và thời gian tải trang
+        self.stats = self.engine.stats
+        self.flow_stats = self.engine.flow_stats
+        self.tracer = self.engine.tracer
+        self.page_stats = self.engine.page_stats
 
         # Tạo giao diện
-        self.create_widgets()
+        with self.profile.phase("create_widgets"):
+            self.create_widgets()
+
+        # Giá trị mặc định từ config.json, sau đó settings.json đã lưu sẽ ghi đè
+        self.apply_app_config()
 
-        # Load cấu hình đã lưu
-        self.load_settings()
+        # Load cấu hình đã lưu sau khi cửa sổ hiển thị lần đầu
+        self.root.bind('<Map>', self.on_first_map, add='+')
 
         # Bắt đầu kiểm tra log queue
         self.check_log_queue()
 
+        # Vẽ thống kê theo chu kỳ
+        self.refresh_stats()
+
         # Lưu khi đóng app
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.profile.add("khởi tạo GUI (tổng)", started, time.perf_counter())
 
     def setup_logging(self):
         """
         Thiết lập hệ thống logging
+
+        Log đi qua queue, thread nền ghi ra logs/automation.log (xoay theo dung lượng,
+        nén file cũ) và console theo mục logging trong config.json.
         """
-        # Tạo thư mục logs nếu chưa có
-        if not os.path.exists('logs'):
-            os.makedirs('logs')
+        log_config = self.app_config.logging
+        self.log_listener = setup_queue_logging('logs', level=log_config.level,
+                                                max_file_size=log_config.max_file_size,
+                                                max_files=log_config.max_files,
+                                                console_output=log_config.console_output,
+                                                file_output=log_config.file_output)
 
-        # Cấu hình logging
-        log_filename = f"logs/automation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+        self.logger = logging.getLogger(__name__)
 
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_filename, encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
+        # Event JSON Lines song song với log chữ (phân tích bằng python src/events.py)
+        self.event_log = None
+        if log_config.file_output:
+            self.event_log = EventLog(os.path.join('logs', EVENTS_FILENAME), log_config.max_file_size,
+                                      log_config.max_files)
 
-        self.logger = logging.getLogger(__name__)
+    def emit_event(self, event, **fields):
+        """
+        Ghi một event vào event log (bỏ qua nếu không ghi log ra file)
+
+        Args:
+            event (str): Loại event ('log', 'login', 'purchase', 'step')
+            **fields: Các trường của event (account, product, step, duration, error_class...)
+        """
+        if self.event_log is not None:
+            self.event_log.emit(event, **fields)
 
     def create_widgets(self):
         """
@@ -1252,11 +269,44 @@ class ERSportsAutomationGUI:
         # Tab 2: Thống kê và điều khiển
         self.create_control_tab()
 
-        # Tab 3: Log viewer
-        self.create_log_tab()
+        # Biến của tab cài đặt có ngay (load/lưu cấu hình, chạy automation không cần widget)
+        self.create_settings_vars()
+
+        # Tab 3, 4: chỉ tạo khung, nội dung được dựng khi tab được chọn lần đầu. Log tới trước
+        # đó được giữ trong buffer; danh sách config OpenVPN vẽ lại từ openvpn_config_files
+        self.lazy_tabs = {}
+        self.log_view = LogBuffer(DEFAULT_MAX_LINES)
+        self.log_text = None
+        self.config_listbox = None
+        self.add_lazy_tab("Log Chi tiết", self.create_log_tab)
+        self.add_lazy_tab("Cài đặt", self.create_settings_tab)
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
 
-        # Tab 4: Cài đặt
-        self.create_settings_tab()
+    def add_lazy_tab(self, text, builder):
+        """
+        Thêm tab rỗng, builder(frame) dựng nội dung khi tab được chọn lần đầu
+
+        Args:
+            text (str): Tiêu đề tab
+            builder (callable): Hàm dựng nội dung tab
+
+        Returns:
+            ttk.Frame: Khung của tab
+        """
+        frame = ttk.Frame(self.notebook)
+        self.notebook.add(frame, text=text)
+        self.lazy_tabs[str(frame)] = (frame, text, builder)
+        return frame
+
+    def on_tab_changed(self, event=None):
+        """
+        Dựng nội dung tab vừa được chọn nếu chưa dựng
+        """
+        lazy_tab = self.lazy_tabs.pop(str(self.notebook.select()), None)
+        if lazy_tab is not None:
+            frame, text, builder = lazy_tab
+            with self.profile.phase(f"dựng tab {text}"):
+                builder(frame)
 
     def create_account_product_tab(self):
         """
@@ -1267,7 +317,7 @@ class ERSportsAutomationGUI:
         self.notebook.add(main_frame, text="Tài khoản & Sản phẩm")
 
         # Frame cho tài khoản
-        account_frame = ttk.LabelFrame(main_frame, text="Danh sách tài khoản (Tối đa 60)")
+        account_frame = ttk.LabelFrame(main_frame, text=f"Danh sách tài khoản (Tối đa {MAX_ACCOUNTS})")
         account_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
         # Treeview cho tài khoản (chỉ còn Email, Password)
@@ -1305,11 +355,11 @@ class ERSportsAutomationGUI:
         ttk.Button(account_buttons_frame, text="Thêm tài khoản", command=self.add_account).pack(side=tk.LEFT, padx=2)
         ttk.Button(account_buttons_frame, text="Xóa tài khoản", command=self.remove_account).pack(side=tk.LEFT, padx=2)
         ttk.Button(account_buttons_frame, text="Xóa tất cả", command=self.clear_accounts).pack(side=tk.LEFT, padx=2)
-        ttk.Button(account_buttons_frame, text="Import JSON", command=self.import_accounts).pack(side=tk.LEFT, padx=2)
+        ttk.Button(account_buttons_frame, text="Import", command=self.import_accounts).pack(side=tk.LEFT, padx=2)
         ttk.Button(account_buttons_frame, text="Export JSON", command=self.export_accounts).pack(side=tk.LEFT, padx=2)
 
         # Frame cho sản phẩm
-        product_frame = ttk.LabelFrame(main_frame, text="Danh sách sản phẩm (Tối đa 60)")
+        product_frame = ttk.LabelFrame(main_frame, text=f"Danh sách sản phẩm (Tối đa {MAX_PRODUCTS})")
         product_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
         # Treeview cho sản phẩm (chỉ còn ID)
@@ -1343,7 +393,7 @@ class ERSportsAutomationGUI:
         ttk.Button(product_buttons_frame, text="Thêm sản phẩm", command=self.add_product).pack(side=tk.LEFT, padx=2)
         ttk.Button(product_buttons_frame, text="Xóa sản phẩm", command=self.remove_product).pack(side=tk.LEFT, padx=2)
         ttk.Button(product_buttons_frame, text="Xóa tất cả", command=self.clear_products).pack(side=tk.LEFT, padx=2)
-        ttk.Button(product_buttons_frame, text="Import JSON", command=self.import_products).pack(side=tk.LEFT, padx=2)
+        ttk.Button(product_buttons_frame, text="Import", command=self.import_products).pack(side=tk.LEFT, padx=2)
         ttk.Button(product_buttons_frame, text="Export JSON", command=self.export_products).pack(side=tk.LEFT, padx=2)
 
     def create_control_tab(self):
@@ -1381,6 +431,31 @@ class ERSportsAutomationGUI:
         self.success_rate_label = ttk.Label(stats_grid, text="0%", font=('Arial', 12), foreground='purple')
         self.success_rate_label.grid(row=1, column=3, sticky=tk.W, padx=5)
 
+        ttk.Label(stats_grid, text="Cache hit/miss:", font=('Arial', 12, 'bold')).grid(row=2, column=0, sticky=tk.W,
+                                                                                       padx=5)
+        self.cache_stats_label = ttk.Label(stats_grid, text="0 / 0", font=('Arial', 12), foreground='teal')
+        self.cache_stats_label.grid(row=2, column=1, sticky=tk.W, padx=5)
+
+        ttk.Label(stats_grid, text="Tốc độ quét:", font=('Arial', 12, 'bold')).grid(row=2, column=2, sticky=tk.W,
+                                                                                    padx=5)
+        self.scan_rate_label = ttk.Label(stats_grid, text="0.0 / phút", font=('Arial', 12), foreground='blue')
+        self.scan_rate_label.grid(row=2, column=3, sticky=tk.W, padx=5)
+
+        ttk.Label(stats_grid, text="Thành công gần nhất:", font=('Arial', 12, 'bold')).grid(row=3, column=0,
+                                                                                            sticky=tk.W, padx=5)
+        self.last_success_label = ttk.Label(stats_grid, text="-", font=('Arial', 12), foreground='green')
+        self.last_success_label.grid(row=3, column=1, sticky=tk.W, padx=5)
+
+        ttk.Label(stats_grid, text="Bước hiện tại:", font=('Arial', 12, 'bold')).grid(row=3, column=2, sticky=tk.W,
+                                                                                      padx=5)
+        self.current_step_label = ttk.Label(stats_grid, text="-", font=('Arial', 12), foreground='gray')
+        self.current_step_label.grid(row=3, column=3, sticky=tk.W, padx=5)
+
+        ttk.Label(stats_grid, text="Thời gian bước (p50 / p95):", font=('Arial', 12, 'bold')).grid(
+            row=4, column=0, sticky=tk.NW, padx=5)
+        self.step_latency_label = ttk.Label(stats_grid, text="-", font=('Consolas', 10), justify=tk.LEFT)
+        self.step_latency_label.grid(row=4, column=1, columnspan=3, sticky=tk.W, padx=5)
+
         # Frame điều khiển
         control_buttons_frame = ttk.LabelFrame(control_frame, text="Điều khiển")
         control_buttons_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -1400,6 +475,19 @@ class ERSportsAutomationGUI:
         ttk.Button(buttons_frame, text="Reset tài khoản đã mua hôm nay", command=self.reset_daily_purchases).pack(
             side=tk.LEFT, padx=5)
         ttk.Button(buttons_frame, text="Xuất Báo cáo", command=self.export_report).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons_frame, text="Xuất Trace", command=self.export_trace).pack(side=tk.LEFT, padx=5)
+
+        # Khoảng thời gian cho báo cáo lịch sử và xuất lịch sử (để trống = toàn bộ)
+        history_frame = ttk.Frame(control_buttons_frame)
+        history_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        ttk.Label(history_frame, text="Lịch sử từ ngày (YYYY-mm-dd):").pack(side=tk.LEFT, padx=5)
+        self.history_from_var = tk.StringVar()
+        ttk.Entry(history_frame, textvariable=self.history_from_var, width=12).pack(side=tk.LEFT)
+        ttk.Label(history_frame, text="đến ngày:").pack(side=tk.LEFT, padx=5)
+        self.history_to_var = tk.StringVar()
+        ttk.Entry(history_frame, textvariable=self.history_to_var, width=12).pack(side=tk.LEFT)
+        ttk.Button(history_frame, text="Xuất Lịch sử (CSV/JSONL)", command=self.export_history).pack(side=tk.LEFT,
+                                                                                                    padx=5)
 
         # Frame trạng thái
         status_frame = ttk.LabelFrame(control_frame, text="Trạng thái")
@@ -1407,14 +495,15 @@ class ERSportsAutomationGUI:
 
         self.status_text = scrolledtext.ScrolledText(status_frame, height=15, state=tk.DISABLED)
         self.status_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.status_view = LogView(self.status_text, DEFAULT_MAX_LINES, tagged=False)
 
-    def create_log_tab(self):
+    def create_log_tab(self, log_frame):
         """
-        Tạo tab xem log
-        """
-        log_frame = ttk.Frame(self.notebook)
-        self.notebook.add(log_frame, text="Log Chi tiết")
+        Tạo nội dung tab xem log
 
+        Args:
+            log_frame (ttk.Frame): Khung của tab
+        """
         # Frame toolbar cho log
         log_toolbar = ttk.Frame(log_frame)
         log_toolbar.pack(fill=tk.X, padx=5, pady=5)
@@ -1433,13 +522,36 @@ class ERSportsAutomationGUI:
         self.log_text.tag_configure("ERROR", foreground="red")
         self.log_text.tag_configure("SUCCESS", foreground="green")
 
-    def create_settings_tab(self):
+        # Ring buffer: chỉ giữ tối đa số dòng cấu hình trong tab cài đặt (nhận cả log đã có trong buffer)
+        self.log_view = self.log_view.attach(self.log_text)
+
+    def create_settings_vars(self):
+        """
+        Tạo biến của tab cài đặt với giá trị mặc định (widget dựng sau trong create_settings_tab)
         """
-        Tạo tab cài đặt
+        self.headless_var = tk.BooleanVar()
+        self.chrome_path_var = tk.StringVar(value="C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe")
+        self.scan_mode_var = tk.StringVar(value="browser")
+        self.page_load_strategy_var = tk.StringVar(value="normal")
+        self.lean_mode_var = tk.BooleanVar(value=False)
+        self.lean_blocked_hosts_var = tk.StringVar(value=", ".join(DEFAULT_BLOCKED_HOSTS))
+        self.account_delay_var = tk.IntVar(value=5)
+        self.product_delay_var = tk.IntVar(value=3)
+        self.auto_save_var = tk.BooleanVar(value=True)
+        self.retry_failed_var = tk.BooleanVar(value=True)
+        self.max_retries_var = tk.IntVar(value=3)
+        self.log_max_lines_var = tk.IntVar(value=DEFAULT_MAX_LINES)
+        self.enable_openvpn_var = tk.BooleanVar(value=False)
+        self.openvpn_path_var = tk.StringVar(value="C:\\Program Files\\OpenVPN\\bin\\openvpn.exe")
+        self.openvpn_mode_var = tk.StringVar(value="sequential")
+
+    def create_settings_tab(self, settings_frame):
         """
-        settings_frame = ttk.Frame(self.notebook)
-        self.notebook.add(settings_frame, text="Cài đặt")
+        Tạo nội dung tab cài đặt (biến đã có từ create_settings_vars)
 
+        Args:
+            settings_frame (ttk.Frame): Khung của tab
+        """
         # Frame cài đặt browser
         browser_frame = ttk.LabelFrame(settings_frame, text="Cài đặt Browser")
         browser_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -1448,7 +560,6 @@ class ERSportsAutomationGUI:
         browser_settings.pack(fill=tk.X, padx=10, pady=10)
 
         # Checkbox headless
-        self.headless_var = tk.BooleanVar()
         ttk.Checkbutton(browser_settings, text="Chạy browser ở chế độ ẩn (Headless)", variable=self.headless_var).pack(
             anchor=tk.W)
 
@@ -1457,11 +568,30 @@ class ERSportsAutomationGUI:
         chrome_path_frame = ttk.Frame(browser_settings)
         chrome_path_frame.pack(fill=tk.X, pady=2)
 
-        self.chrome_path_var = tk.StringVar(value="C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe")
         ttk.Entry(chrome_path_frame, textvariable=self.chrome_path_var, width=60).pack(side=tk.LEFT, fill=tk.X,
                                                                                        expand=True)
         ttk.Button(chrome_path_frame, text="Chọn", command=self.browse_chrome_path).pack(side=tk.RIGHT, padx=5)
 
+        # Chế độ quét listing
+        ttk.Label(browser_settings, text="Chế độ quét listing:").pack(anchor=tk.W, pady=(5, 2))
+        ttk.Radiobutton(browser_settings, text="Browser (render trong Chrome)", variable=self.scan_mode_var,
+                        value="browser").pack(anchor=tk.W)
+        ttk.Radiobutton(browser_settings, text="HTTP nhanh (dùng cookie của Chrome, Chrome chỉ dùng cho giỏ hàng)",
+                        variable=self.scan_mode_var, value="http").pack(anchor=tk.W)
+
+        # Page load strategy của Chrome
+        ttk.Label(browser_settings, text="Page load strategy:").pack(anchor=tk.W, pady=(5, 2))
+        ttk.Combobox(browser_settings, textvariable=self.page_load_strategy_var, values=PAGE_LOAD_STRATEGIES,
+                     state="readonly", width=12).pack(anchor=tk.W)
+        ttk.Label(browser_settings, text="eager/none: tiếp tục ngay khi DOM dùng được, không chờ script bên thứ ba",
+                  foreground='gray').pack(anchor=tk.W)
+
+        # Chế độ lean: chặn ảnh, font, media và host bên thứ ba
+        ttk.Checkbutton(browser_settings, text="Chế độ lean (chặn ảnh, font, media, analytics/widget bên thứ ba)",
+                        variable=self.lean_mode_var).pack(anchor=tk.W, pady=(5, 0))
+        ttk.Label(browser_settings, text="Host bị chặn ở chế độ lean (cách nhau bởi dấu phẩy):").pack(anchor=tk.W)
+        ttk.Entry(browser_settings, textvariable=self.lean_blocked_hosts_var, width=60).pack(fill=tk.X, pady=2)
+
         # Frame cài đặt timing
         timing_frame = ttk.LabelFrame(settings_frame, text="Cài đặt Thời gian")
         timing_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -1471,13 +601,11 @@ class ERSportsAutomationGUI:
 
         # Delay giữa các tài khoản
         ttk.Label(timing_settings, text="Delay giữa các tài khoản (giây):").pack(anchor=tk.W)
-        self.account_delay_var = tk.IntVar(value=5)
         ttk.Scale(timing_settings, from_=1, to=30, variable=self.account_delay_var, orient=tk.HORIZONTAL).pack(
             fill=tk.X)
 
         # Delay giữa các sản phẩm
         ttk.Label(timing_settings, text="Delay giữa các sản phẩm (giây):").pack(anchor=tk.W)
-        self.product_delay_var = tk.IntVar(value=3)
         ttk.Scale(timing_settings, from_=1, to=20, variable=self.product_delay_var, orient=tk.HORIZONTAL).pack(
             fill=tk.X)
 
@@ -1489,19 +617,26 @@ class ERSportsAutomationGUI:
         other_settings.pack(fill=tk.X, padx=10, pady=10)
 
         # Auto-save results
-        self.auto_save_var = tk.BooleanVar(value=True)
         ttk.Checkbutton(other_settings, text="Tự động lưu kết quả", variable=self.auto_save_var).pack(anchor=tk.W)
 
         # Retry failed purchases
-        self.retry_failed_var = tk.BooleanVar(value=True)
         ttk.Checkbutton(other_settings, text="Thử lại mua hàng thất bại", variable=self.retry_failed_var).pack(
             anchor=tk.W)
 
         # Max retries
         ttk.Label(other_settings, text="Số lần thử lại tối đa:").pack(anchor=tk.W)
-        self.max_retries_var = tk.IntVar(value=3)
         ttk.Scale(other_settings, from_=1, to=10, variable=self.max_retries_var, orient=tk.HORIZONTAL).pack(fill=tk.X)
 
+        # Số dòng log tối đa giữ trong tab log và khung trạng thái
+        ttk.Label(other_settings, text="Số dòng log tối đa hiển thị:").pack(anchor=tk.W)
+        # Áp dụng khi chọn xong (mũi tên, Enter, rời ô), không theo từng phím gõ
+        log_max_lines_spinbox = ttk.Spinbox(other_settings, from_=MIN_MAX_LINES, to=100000, increment=500,
+                                            textvariable=self.log_max_lines_var, width=10,
+                                            command=self.apply_log_max_lines)
+        log_max_lines_spinbox.pack(anchor=tk.W)
+        log_max_lines_spinbox.bind('<Return>', lambda event: self.apply_log_max_lines())
+        log_max_lines_spinbox.bind('<FocusOut>', lambda event: self.apply_log_max_lines())
+
         # Frame cài đặt OpenVPN
         vpn_frame = ttk.LabelFrame(settings_frame, text="Cài đặt OpenVPN (Japan IP)")
         vpn_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -1510,7 +645,6 @@ class ERSportsAutomationGUI:
         vpn_settings.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
         # Enable OpenVPN
-        self.enable_openvpn_var = tk.BooleanVar(value=False)
         ttk.Checkbutton(vpn_settings, text="Sử dụng OpenVPN để fake IP Nhật Bản",
                         variable=self.enable_openvpn_var).pack(anchor=tk.W)
 
@@ -1519,7 +653,6 @@ class ERSportsAutomationGUI:
         openvpn_path_frame = ttk.Frame(vpn_settings)
         openvpn_path_frame.pack(fill=tk.X)
 
-        self.openvpn_path_var = tk.StringVar(value="C:\\Program Files\\OpenVPN\\bin\\openvpn.exe")
         ttk.Entry(openvpn_path_frame, textvariable=self.openvpn_path_var, width=60).pack(side=tk.LEFT, fill=tk.X,
                                                                                          expand=True)
         ttk.Button(openvpn_path_frame, text="Chọn", command=self.browse_openvpn_path).pack(side=tk.RIGHT, padx=5)
@@ -1536,6 +669,7 @@ class ERSportsAutomationGUI:
         self.config_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         config_scrollbar.config(command=self.config_listbox.yview)
         config_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.refresh_config_listbox()
 
         # Buttons cho config files
         config_buttons_frame = ttk.Frame(vpn_settings)
@@ -1550,7 +684,6 @@ class ERSportsAutomationGUI:
 
         # OpenVPN mode
         ttk.Label(vpn_settings, text="Chế độ kết nối:").pack(anchor=tk.W, pady=(5, 2))
-        self.openvpn_mode_var = tk.StringVar(value="sequential")
         ttk.Radiobutton(vpn_settings, text="Tuần tự (Sequential)", variable=self.openvpn_mode_var,
                         value="sequential").pack(anchor=tk.W)
         ttk.Radiobutton(vpn_settings, text="Ngẫu nhiên (Random)", variable=self.openvpn_mode_var,
@@ -1563,7 +696,8 @@ class ERSportsAutomationGUI:
 
         ttk.Button(manual_save_frame, text="💾 Lưu cấu hình thủ công",
                    command=lambda: (
-                       self.save_settings(), self.log_message("Đã lưu cấu hình thủ công", "SUCCESS"))).pack(
+                       self.save_settings(), self.settings_store.flush(),
+                       self.log_message("Đã lưu cấu hình thủ công", "SUCCESS"))).pack(
             side=tk.LEFT,
             padx=5)
 
@@ -1575,8 +709,8 @@ class ERSportsAutomationGUI:
         """
         Thêm tài khoản mới vào danh sách
         """
-        if len(self.account_tree.get_children()) >= 60:
-            messagebox.showwarning("Cảnh báo", "Chỉ được thêm tối đa 60 tài khoản!")
+        if len(self.account_tree.get_children()) >= MAX_ACCOUNTS:
+            messagebox.showwarning("Cảnh báo", f"Chỉ được thêm tối đa {MAX_ACCOUNTS} tài khoản!")
             return
 
         email = self.email_var.get().strip()
@@ -1626,21 +760,26 @@ class ERSportsAutomationGUI:
     def clear_accounts(self):
         """
         Xóa tất cả tài khoản
+
+        Returns:
+            bool: True nếu người dùng xác nhận và đã xóa
         """
-        if messagebox.askyesno("Xác nhận", "Bạn có chắc muốn xóa tất cả tài khoản?"):
-            self.account_tree.delete(*self.account_tree.get_children())
-            self.log_message("Đã xóa tất cả tài khoản", "INFO")
+        if not messagebox.askyesno("Xác nhận", "Bạn có chắc muốn xóa tất cả tài khoản?"):
+            return False
+        self.account_tree.delete(*self.account_tree.get_children())
+        self.log_message("Đã xóa tất cả tài khoản", "INFO")
 
-            # Auto-save nếu bật
-            if self.auto_save_var.get():
-                self.save_settings()
+        # Auto-save nếu bật
+        if self.auto_save_var.get():
+            self.save_settings()
+        return True
 
     def add_product(self):
         """
         Thêm sản phẩm mới vào danh sách
         """
-        if len(self.product_tree.get_children()) >= 60:
-            messagebox.showwarning("Cảnh báo", "Chỉ được thêm tối đa 60 sản phẩm!")
+        if len(self.product_tree.get_children()) >= MAX_PRODUCTS:
+            messagebox.showwarning("Cảnh báo", f"Chỉ được thêm tối đa {MAX_PRODUCTS} sản phẩm!")
             return
 
         product_id = self.product_id_var.get().strip()
@@ -1688,51 +827,31 @@ class ERSportsAutomationGUI:
     def clear_products(self):
         """
         Xóa tất cả sản phẩm
+
+        Returns:
+            bool: True nếu người dùng xác nhận và đã xóa
         """
-        if messagebox.askyesno("Xác nhận", "Bạn có chắc muốn xóa tất cả sản phẩm?"):
-            self.product_tree.delete(*self.product_tree.get_children())
-            self.log_message("Đã xóa tất cả sản phẩm", "INFO")
+        if not messagebox.askyesno("Xác nhận", "Bạn có chắc muốn xóa tất cả sản phẩm?"):
+            return False
+        self.product_tree.delete(*self.product_tree.get_children())
+        self.log_message("Đã xóa tất cả sản phẩm", "INFO")
 
-            # Auto-save nếu bật
-            if self.auto_save_var.get():
-                self.save_settings()
+        # Auto-save nếu bật
+        if self.auto_save_var.get():
+            self.save_settings()
+        return True
 
     def import_accounts(self):
         """
-        Import danh sách tài khoản từ file JSON
+        Import danh sách tài khoản từ file JSON, JSONL hoặc CSV (đọc ở thread nền)
         """
         filename = filedialog.askopenfilename(
-            title="Chọn file JSON chứa tài khoản",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+            title="Chọn file chứa tài khoản",
+            filetypes=[("JSON, JSONL, CSV", "*.json *.jsonl *.ndjson *.csv"), ("All files", "*.*")]
         )
 
         if filename:
-            try:
-                with open(filename, 'r', encoding='utf-8') as f:
-                    accounts = json.load(f)
-
-                if not isinstance(accounts, list):
-                    raise ValueError("File JSON phải chứa một array")
-
-                # Xóa tài khoản hiện tại
-                self.clear_accounts()
-
-                # Thêm tài khoản mới
-                for account in accounts[:60]:  # Giới hạn 60 tài khoản
-                    if isinstance(account, dict) and 'email' in account and 'password' in account:
-                        self.account_tree.insert('', tk.END, values=(
-                            account.get('email', ''),
-                            account.get('password', '')
-                        ))
-
-                self.log_message(f"Đã import {len(accounts)} tài khoản từ {filename}", "SUCCESS")
-
-                # Auto-save sau khi import
-                if self.auto_save_var.get():
-                    self.save_settings()
-
-            except Exception as e:
-                messagebox.showerror("Lỗi", f"Không thể import file: {str(e)}")
+            self.start_import('accounts', filename)
 
     def export_accounts(self):
         """
@@ -1768,39 +887,91 @@ class ERSportsAutomationGUI:
 
     def import_products(self):
         """
-        Import danh sách sản phẩm từ file JSON
+        Import danh sách sản phẩm từ file JSON, JSONL hoặc CSV (đọc ở thread nền)
         """
         filename = filedialog.askopenfilename(
-            title="Chọn file JSON chứa sản phẩm",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+            title="Chọn file chứa sản phẩm",
+            filetypes=[("JSON, JSONL, CSV", "*.json *.jsonl *.ndjson *.csv *.txt"), ("All files", "*.*")]
         )
 
         if filename:
-            try:
-                with open(filename, 'r', encoding='utf-8') as f:
-                    products = json.load(f)
+            self.start_import('products', filename)
+
+    def start_import(self, kind, filename):
+        """
+        Đọc file import ở thread nền, rồi nạp kết quả vào Treeview theo từng khối
+
+        Danh sách hiện tại chỉ bị xóa (có hỏi xác nhận) sau khi đọc file thành công.
+
+        Args:
+            kind (str): 'accounts' hoặc 'products'
+            filename (str): File cần import
+        """
+        thread = threading.Thread(target=self.run_import, args=(kind, filename),
+                                  name=f"import-{kind}", daemon=True)
+        thread.start()
+
+    def run_import(self, kind, filename):
+        """
+        Thread đọc file import: parse, kiểm tra và bỏ trùng trong một lượt (không đụng tới Tk)
+        """
+        reader = read_accounts if kind == 'accounts' else read_products
+        started = time.perf_counter()
+        try:
+            result = reader(filename)
+        except (OSError, ValueError) as e:
+            self.root.after(0, messagebox.showerror, "Lỗi", f"Không thể import file: {str(e)}")
+            return
+        self.root.after(0, self.finish_import, kind, filename, result, time.perf_counter() - started)
 
-                if not isinstance(products, list):
-                    raise ValueError("File JSON phải chứa một array")
+    def finish_import(self, kind, filename, result, elapsed):
+        """
+        Nạp kết quả import vào Treeview (main thread)
+        """
+        tree = self.account_tree if kind == 'accounts' else self.product_tree
+        label = 'tài khoản' if kind == 'accounts' else 'sản phẩm'
 
-                # Xóa sản phẩm hiện tại
-                self.clear_products()
+        # Xóa danh sách hiện tại; không xác nhận thì nối thêm (bỏ trùng, tính cả giới hạn)
+        clear = self.clear_accounts if kind == 'accounts' else self.clear_products
+        if not clear():
+            existing = [str(tree.item(item)['values'][0]) for item in tree.get_children()]
+            result = merge_rows(result, MAX_ACCOUNTS if kind == 'accounts' else MAX_PRODUCTS, existing)
 
-                # Thêm sản phẩm mới
-                for product in products[:60]:  # Giới hạn 60 sản phẩm
-                    if isinstance(product, dict) and 'productId' in product:
-                        self.product_tree.insert('', tk.END, values=(
-                            product.get('productId', '')
-                        ))
+        def done(count):
+            self.log_message(f"Đã import {label} từ {filename}: {result.summary()} "
+                             f"(đọc {elapsed * 1000:.0f} ms)", "SUCCESS")
+            # Auto-save sau khi import
+            if self.auto_save_var.get():
+                self.save_settings()
 
-                self.log_message(f"Đã import {len(products)} sản phẩm từ {filename}", "SUCCESS")
+        self.load_tree_rows(kind, tree, result.rows, done)
 
-                # Auto-save sau khi import
-                if self.auto_save_var.get():
-                    self.save_settings()
+    def load_tree_rows(self, kind, tree, rows, on_done=None):
+        """
+        Chèn các dòng vào Treeview theo từng khối qua after() (hủy lần nạp dở trước đó)
 
-            except Exception as e:
-                messagebox.showerror("Lỗi", f"Không thể import file: {str(e)}")
+        Args:
+            kind (str): 'accounts' hoặc 'products'
+            tree: Treeview đích
+            rows (tuple): Các tuple giá trị cột
+            on_done (callable): Gọi với số dòng đã chèn khi xong
+        """
+        previous = self.tree_loaders.pop(kind, None)
+        if previous is not None:
+            previous.cancel()
+
+        def done(count):
+            self.tree_loaders.pop(kind, None)
+            if on_done is not None:
+                on_done(count)
+            # Lần lưu bị hoãn trong lúc nạp
+            if self.save_pending and not self.tree_loaders:
+                self.save_pending = False
+                self.save_settings()
+
+        loader = ChunkedTreeLoader(self.root, tree, rows, on_done=done)
+        self.tree_loaders[kind] = loader
+        loader.start()
 
     def export_products(self):
         """
@@ -1837,6 +1008,10 @@ class ERSportsAutomationGUI:
         """
         Bắt đầu quá trình automation
         """
+        if self.tree_loaders or not self.settings_loaded:
+            messagebox.showwarning("Cảnh báo", "Danh sách tài khoản/sản phẩm đang được nạp, vui lòng thử lại!")
+            return
+
         # Kiểm tra dữ liệu đầu vào
         accounts = []
         for item in self.account_tree.get_children():
@@ -1876,8 +1051,9 @@ class ERSportsAutomationGUI:
         self.start_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
 
-        # Bắt đầu thread automation
-        self.automation_thread = threading.Thread(target=self.run_automation, args=(accounts, products))
+        # Bắt đầu thread automation (tùy chọn đọc từ widget ngay tại main thread)
+        self.automation_thread = threading.Thread(target=self.run_automation,
+                                                  args=(accounts, products, self.build_run_options()))
         self.automation_thread.daemon = True
         self.automation_thread.start()
 
@@ -1888,19 +1064,7 @@ class ERSportsAutomationGUI:
         Dừng quá trình automation
         """
         self.is_running = False
-
-        if self.browser:
-            try:
-                self.browser.close()
-            except Exception as e:
-                self.log_message(f"Lỗi khi đóng browser: {str(e)}", "ERROR")
-
-        if self.vpn_manager:
-            try:
-                self.vpn_manager.disconnect()
-                self.log_message("Đã ngắt kết nối VPN", "INFO")
-            except Exception as e:
-                self.log_message(f"Lỗi khi ngắt VPN: {str(e)}", "ERROR")
+        self.engine.stop()
 
         # Cập nhật trạng thái UI
         self.start_button.config(state=tk.NORMAL)
@@ -1908,9 +1072,9 @@ class ERSportsAutomationGUI:
 
         self.log_message("Đã dừng automation", "WARNING")
 
-    def run_automation(self, accounts, products):
+    def run_automation(self, accounts, products, options):
         """
-        Chạy automation trong thread riêng với logic mới:
+        Chạy automation trong thread riêng (logic trong AutomationEngine.run):
         - Kết nối OpenVPN (nếu bật)
         - Mỗi sản phẩm chỉ mua 1 lần
         - Nếu mua thành công: đổi IP và tài khoản
@@ -1919,198 +1083,11 @@ class ERSportsAutomationGUI:
         Args:
             accounts (list): Danh sách tài khoản
             products (list): Danh sách sản phẩm
+            options (RunOptions): Tùy chọn từ tab cài đặt
         """
         try:
-            # Khởi tạo OpenVPN manager nếu bật
-            if self.enable_openvpn_var.get() and self.openvpn_config_files:
-                self.vpn_manager = OpenVPNManager(self.openvpn_path_var.get())
-                self.vpn_manager.load_config_files(self.openvpn_config_files)
-                self.log_message("Đã khởi tạo OpenVPN Manager", "INFO")
-
-            # Khởi tạo biến trạng thái
-            current_account_index = 0
-            current_account = None
-            is_logged_in = False
-
-            # Kết nối VPN đầu tiên (nếu bật)
-            if self.vpn_manager and self.vpn_manager.config_files:
-                if self.openvpn_mode_var.get() == "random":
-                    self.vpn_manager.connect_random_japan()
-                else:
-                    self.vpn_manager.connect_next_japan()
-                self.log_message("Đã kết nối VPN với IP Nhật Bản đầu tiên", "INFO")
-                time.sleep(5)
-
-            # Vòng lặp chính: chạy liên tục đến khi dừng hoặc hết tài khoản hợp lệ
-            while self.is_running:
-                # Đảm bảo ngày hiện tại; nếu qua ngày mới, tự làm sạch đánh dấu
-                today_str = datetime.now().strftime('%Y-%m-%d')
-                if self.purchased_date != today_str:
-                    self.purchased_today.clear()
-                    self.purchased_date = today_str
-                    self.save_settings()
-
-                # Tìm tài khoản kế tiếp chưa mua hôm nay
-                found_account = False
-                start_idx = current_account_index
-                while current_account_index < len(accounts):
-                    candidate = accounts[current_account_index]
-                    if candidate['email'] not in self.purchased_today:
-                        current_account = candidate
-                        found_account = True
-                        break
-                    current_account_index += 1
-
-                if not found_account:
-                    self.log_message("Đã sử dụng hết tài khoản hợp lệ (đã mua hôm nay sẽ bị bỏ qua).", "WARNING")
-                    break
-
-                # Nếu chưa đăng nhập, đăng nhập vào tài khoản hiện tại
-                if not is_logged_in or self.browser is None:
-                    self.log_message(f"Đăng nhập với tài khoản: {current_account['email']}", "INFO")
-
-                    # Khởi tạo browser
-                    self.browser = BrowserAutomation(
-                        headless=self.headless_var.get(),
-                        chrome_path=self.chrome_path_var.get() if self.chrome_path_var.get() else None
-                    )
-
-                    if self.browser.login(current_account['email'], current_account['password']):
-                        self.log_message(f"Đăng nhập thành công: {current_account['email']}", "SUCCESS")
-                        is_logged_in = True
-                    else:
-                        self.log_message(f"Đăng nhập thất bại: {current_account['email']}", "ERROR")
-                        # Đóng browser nếu có
-                        if self.browser:
-                            self.browser.close()
-                            self.browser = None
-                        is_logged_in = False
-                        # Chuyển qua tài khoản tiếp theo
-                        current_account_index += 1
-
-                        # Đổi VPN nếu còn tài khoản
-                        if self.vpn_manager and self.vpn_manager.config_files and current_account_index < len(accounts):
-                            self.log_message("Đang đổi sang IP Nhật Bản mới...", "INFO")
-                            self.vpn_manager.disconnect()
-                            time.sleep(3)
-                            if self.openvpn_mode_var.get() == "random":
-                                self.vpn_manager.connect_random_japan()
-                            else:
-                                self.vpn_manager.connect_next_japan()
-                            self.log_message("Đã kết nối VPN mới", "INFO")
-                            time.sleep(5)
-                        continue
-
-                # Đã đăng nhập -> quét liên tục danh sách sản phẩm cho đến khi mua thành công hoặc bị dừng
-                purchase_success = False
-                while self.is_running and is_logged_in and not purchase_success:
-                    for product_idx, product in enumerate(products):
-                        if not self.is_running or not is_logged_in:
-                            break
-
-                        # Thử mua sản phẩm
-                        self.scan_count += 1
-                        self.update_stats()
-
-                        product_name = product.get('productId')
-                        self.log_message(
-                            f"Đang thử mua sản phẩm ({product_idx + 1}/{len(products)}): {product_name}",
-                            "INFO"
-                        )
-
-                        result = self.browser.purchase_product(PRODUCT_LIST_URL, product['productId'])
-
-                        if result['success']:
-                            purchase_success = True
-                            self.success_count += 1
-                            self.log_message(f"Mua thành công: {product_name}", "SUCCESS")
-                            self.update_stats()
-
-                            # Đánh dấu tài khoản đã mua hôm nay và lưu
-                            self.purchased_today.add(current_account['email'])
-                            self.purchased_date = today_str
-                            self.save_settings()
-
-                            # Đăng xuất và đóng browser trước khi đổi IP
-                            try:
-                                self.browser.logout()
-                            except Exception:
-                                pass
-                            if self.browser:
-                                self.browser.close()
-                                self.browser = None
-                            is_logged_in = False
-
-                            # Chuyển tài khoản tiếp theo
-                            current_account = None
-                            current_account_index += 1
-
-                            # Đổi VPN sang IP Nhật Bản khác (nếu bật) cho tài khoản kế tiếp
-                            if self.vpn_manager and self.vpn_manager.config_files and current_account_index < len(
-                                    accounts):
-                                self.log_message("Đang đổi sang IP Nhật Bản mới...", "INFO")
-                                self.vpn_manager.disconnect()
-                                time.sleep(3)
-                                if self.openvpn_mode_var.get() == "random":
-                                    self.vpn_manager.connect_random_japan()
-                                else:
-                                    self.vpn_manager.connect_next_japan()
-                                self.log_message("Đã kết nối VPN mới", "INFO")
-                                time.sleep(5)
-
-                            # Delay giữa các tài khoản
-                            if self.account_delay_var.get() > 0:
-                                time.sleep(self.account_delay_var.get())
-
-                            break
-                        else:
-                            self.failure_count += 1
-                            error_msg = result['error'] or "Lỗi không xác định"
-                            self.log_message(f"Mua thất bại: {product_name} - {error_msg}", "ERROR")
-                            self.update_stats()
-
-                            # Giữ nguyên IP và tài khoản, tiếp tục sản phẩm tiếp theo
-                            self.log_message(
-                                "Mua thất bại -> Giữ nguyên IP và tài khoản, tiếp tục quét tiếp",
-                                "INFO"
-                            )
-                            # Delay giữa các sản phẩm
-                            if self.product_delay_var.get() > 0:
-                                time.sleep(self.product_delay_var.get())
-
-                    # Kết thúc một vòng quét toàn bộ danh sách -> lặp lại nếu chưa thành công
-                    # Thêm một nhịp nghỉ ngắn để giảm tải
-                    if not purchase_success and self.is_running and is_logged_in:
-                        time.sleep(1)
-
-            # Đóng browser và VPN nếu còn
-            if self.browser:
-                self.browser.close()
-                self.browser = None
-
-            if self.vpn_manager:
-                self.vpn_manager.disconnect()
-                self.log_message("Đã ngắt kết nối VPN", "INFO")
-
-            self.log_message("Hoàn thành automation!", "SUCCESS")
-
-        except Exception as e:
-            self.log_message(f"Lỗi trong automation: {str(e)}", "ERROR")
-
+            self.engine.run(accounts, products, options)
         finally:
-            # Đảm bảo đóng tất cả kết nối
-            if self.browser:
-                try:
-                    self.browser.close()
-                except:
-                    pass
-
-            if self.vpn_manager:
-                try:
-                    self.vpn_manager.disconnect()
-                except:
-                    pass
-
             # Cập nhật trạng thái UI
             self.root.after(0, self.automation_finished)
 
@@ -2124,26 +1101,124 @@ class ERSportsAutomationGUI:
 
     def update_stats(self):
         """
-        Cập nhật hiển thị thống kê
+        Cập nhật hiển thị thống kê từ snapshot hiện tại (chỉ gọi từ main thread)
         """
-        self.scan_count_label.config(text=str(self.scan_count))
-        self.success_count_label.config(text=str(self.success_count))
-        self.failure_count_label.config(text=str(self.failure_count))
+        snapshot = self.stats.snapshot()
+        self.set_stats_text(self.scan_count_label, str(snapshot.scans))
+        self.set_stats_text(self.success_count_label, str(snapshot.successes))
+        self.set_stats_text(self.failure_count_label, str(snapshot.failures))
+        self.set_stats_text(self.success_rate_label, f"{snapshot.success_rate:.1f}%" if snapshot.scans else "0%")
+        self.set_stats_text(self.scan_rate_label, f"{snapshot.scans_per_minute:.1f} / phút")
 
-        # Tính tỷ lệ thành công
-        if self.scan_count > 0:
-            success_rate = (self.success_count / self.scan_count) * 100
-            self.success_rate_label.config(text=f"{success_rate:.1f}%")
+        if snapshot.since_last_success is None:
+            self.set_stats_text(self.last_success_label, "-")
         else:
-            self.success_rate_label.config(text="0%")
+            self.set_stats_text(self.last_success_label, f"{format_duration(snapshot.since_last_success)} trước")
+
+        if snapshot.current_step:
+            self.set_stats_text(self.current_step_label,
+                                f"{snapshot.current_step} ({format_duration(snapshot.current_step_elapsed)})")
+        else:
+            self.set_stats_text(self.current_step_label, "-")
+
+        lines = [f"{step.name:<28}{step.p50:>7.2f}s / {step.p95:.2f}s  (n={step.count})"
+                 for step in snapshot.steps]
+        self.set_stats_text(self.step_latency_label, "\n".join(lines) or "-")
+
+        cache_stats = self.product_cache.stats()
+        self.set_stats_text(self.cache_stats_label,
+                            f"{cache_stats['hits']} / {cache_stats['misses']} ({cache_stats['hit_rate']:.0f}%)")
+
+    def set_stats_text(self, label, text):
+        """
+        Đổi text của label thống kê (bỏ qua nếu không đổi)
+        """
+        if self._stats_texts.get(label) != text:
+            self._stats_texts[label] = text
+            label.config(text=text)
+
+    def refresh_stats(self):
+        """
+        Vẽ lại thống kê theo chu kỳ cố định, dù thread automation cập nhật nhiều hay ít
+        """
+        self.update_stats()
+        self.root.after(STATS_REFRESH_MS, self.refresh_stats)
+
+    def apply_app_config(self):
+        """
+        Lấy giá trị mặc định cho tab cài đặt từ config.json (nếu có file)
+        """
+        if not self.app_config.source:
+            return
+        browser = self.app_config.browser
+        timing = self.app_config.timing
+        self.headless_var.set(browser.headless)
+        if browser.chrome_path:
+            self.chrome_path_var.set(browser.chrome_path)
+        self.page_load_strategy_var.set(browser.page_load_strategy)
+        self.lean_mode_var.set(browser.lean_mode.enabled)
+        if browser.lean_mode.blocked_hosts is not None:
+            self.lean_blocked_hosts_var.set(", ".join(browser.lean_mode.blocked_hosts))
+        self.account_delay_var.set(int(timing.delay_between_accounts))
+        self.product_delay_var.set(int(timing.delay_between_products))
+        self.log_message(f"Đã load cấu hình từ {self.app_config.source}", "INFO")
+
+    def build_run_options(self):
+        """
+        Tùy chọn cho một lần chạy AutomationEngine từ tab cài đặt (chỉ gọi từ main thread)
+
+        Returns:
+            RunOptions: Tùy chọn
+        """
+        return RunOptions(
+            headless=self.headless_var.get(),
+            chrome_path=self.chrome_path_var.get() or None,
+            scan_mode=self.scan_mode_var.get(),
+            lean_profile=self.build_lean_profile() if self.lean_mode_var.get() else None,
+            browser_config=self.build_browser_config(),
+            account_delay=self.account_delay_var.get(),
+            product_delay=self.product_delay_var.get(),
+            openvpn_path=self.openvpn_path_var.get(),
+            openvpn_configs=tuple(self.openvpn_config_files) if self.enable_openvpn_var.get() else (),
+            openvpn_mode=self.openvpn_mode_var.get(),
+        )
+
+    def build_browser_config(self):
+        """
+        Cấu hình truyền cho BrowserAutomation (config.json + lựa chọn trong tab cài đặt)
+
+        Returns:
+            AppConfig: Cấu hình
+        """
+        browser = replace(self.app_config.browser, page_load_strategy=self.page_load_strategy_var.get())
+        return replace(self.app_config, browser=browser)
+
+    def build_lean_profile(self):
+        """
+        Profile chặn tài nguyên cho chế độ lean
+
+        Returns:
+            LeanProfile: Profile
+        """
+        lean = self.app_config.browser.lean_mode
+        return LeanProfile(block_images=lean.block_images, block_fonts=lean.block_fonts,
+                           block_media=lean.block_media, blocked_hosts=self.get_lean_blocked_hosts(),
+                           allowed_hosts=lean.allowed_hosts)
+
+    def get_lean_blocked_hosts(self):
+        """
+        Danh sách host bị chặn ở chế độ lean (từ ô nhập trong tab cài đặt)
+
+        Returns:
+            list: Các host
+        """
+        return [host.strip() for host in self.lean_blocked_hosts_var.get().split(',') if host.strip()]
 
     def reset_stats(self):
         """
         Reset thống kê về 0
         """
-        self.scan_count = 0
-        self.success_count = 0
-        self.failure_count = 0
+        self.engine.reset_stats()
         self.update_stats()
         self.log_message("Đã reset thống kê", "INFO")
 
@@ -2151,27 +1226,47 @@ class ERSportsAutomationGUI:
         """
         Xóa đánh dấu các tài khoản đã mua thành công trong hôm nay
         """
-        self.purchased_today.clear()
-        self.purchased_date = datetime.now().strftime('%Y-%m-%d')
-        self.save_settings()
+        self.engine.reset_daily_purchases()
         self.log_message("Đã reset danh sách tài khoản đã mua hôm nay", "INFO")
 
     def export_report(self):
         """
-        Xuất báo cáo chi tiết
+        Xuất báo cáo chi tiết (kèm tổng hợp lịch sử theo sản phẩm/theo giờ trong khoảng ngày đã chọn)
         """
+        time_range = self.get_history_range()
+        if time_range is None:
+            return
+        snapshot = self.stats.snapshot()
         report = {
             'timestamp': datetime.now().isoformat(),
             'statistics': {
-                'total_scans': self.scan_count,
-                'successful_purchases': self.success_count,
-                'failed_purchases': self.failure_count,
-                'success_rate': (self.success_count / self.scan_count * 100) if self.scan_count > 0 else 0
+                'total_scans': snapshot.scans,
+                'successful_purchases': snapshot.successes,
+                'failed_purchases': snapshot.failures,
+                'success_rate': snapshot.success_rate,
+                'scans_per_minute': round(snapshot.scans_per_minute, 2),
+                'steps': {step.name: {'count': step.count, 'p50': round(step.p50, 3), 'p95': round(step.p95, 3)}
+                          for step in snapshot.steps},
             },
+            'flow_timing': self.flow_stats.report(),
+            'product_cache': self.product_cache.stats(),
+            'page_load': dict(self.page_stats.report(), lean_mode=self.lean_mode_var.get()),
+            'chrome_memory': self.engine.watchdog.report() if self.engine.watchdog is not None else None,
+            'disk_cache': self.disk_cache.usage() if self.disk_cache is not None else None,
             'accounts': [],
             'products': []
         }
 
+        if self.history is not None:
+            self.history.flush()
+            report['history'] = {
+                'range': {'from': self.history_from_var.get().strip() or None,
+                          'to': self.history_to_var.get().strip() or None},
+                'products': self.history.product_summary(*time_range),
+                'hours': self.history.hourly_summary(*time_range),
+                'failures': self.history.failure_summary(*time_range),
+            }
+
         # Thêm thông tin tài khoản
         for item in self.account_tree.get_children():
             values = self.account_tree.item(item)['values']
@@ -2202,6 +1297,73 @@ class ERSportsAutomationGUI:
             except Exception as e:
                 messagebox.showerror("Lỗi", f"Không thể xuất báo cáo: {str(e)}")
 
+    def get_history_range(self):
+        """
+        Khoảng thời gian từ hai ô ngày trong tab điều khiển (ngày 'đến' được tính trọn ngày)
+
+        Returns:
+            tuple: (start, end) epoch giây (None = không giới hạn), None nếu ngày không hợp lệ
+        """
+        bounds = []
+        for var, extra in ((self.history_from_var, timedelta(0)), (self.history_to_var, timedelta(days=1))):
+            value = var.get().strip()
+            if not value:
+                bounds.append(None)
+                continue
+            try:
+                bounds.append((datetime.strptime(value, '%Y-%m-%d') + extra).timestamp())
+            except ValueError:
+                messagebox.showerror("Lỗi", f"Ngày không hợp lệ: {value} (định dạng YYYY-mm-dd)")
+                return None
+        return tuple(bounds)
+
+    def export_history(self):
+        """
+        Xuất lịch sử login/purchase trong khoảng ngày đã chọn ra CSV hoặc JSONL
+        """
+        if self.history is None:
+            messagebox.showerror("Lỗi", "Lịch sử chạy không khả dụng")
+            return
+        time_range = self.get_history_range()
+        if time_range is None:
+            return
+
+        filename = filedialog.asksaveasfilename(
+            title="Xuất lịch sử",
+            defaultextension=".csv",
+            initialfile=f"history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            filetypes=[("CSV files", "*.csv"), ("JSON Lines", "*.jsonl"), ("All files", "*.*")]
+        )
+
+        if filename:
+            try:
+                self.history.flush()
+                count = self.history.export(filename, *time_range)
+                self.log_message(f"Đã xuất {count} bản ghi lịch sử ra {filename}", "SUCCESS")
+
+            except Exception as e:
+                messagebox.showerror("Lỗi", f"Không thể xuất lịch sử: {str(e)}")
+
+    def export_trace(self):
+        """
+        Xuất span thời gian của phiên chạy ra file Chrome trace-event JSON
+        (mở bằng https://ui.perfetto.dev hoặc chrome://tracing)
+        """
+        filename = filedialog.asksaveasfilename(
+            title="Lưu trace",
+            defaultextension=".json",
+            initialfile=f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+        )
+
+        if filename:
+            try:
+                count = self.tracer.export_chrome_trace(filename)
+                self.log_message(f"Đã xuất {count} span ra {filename}", "SUCCESS")
+
+            except Exception as e:
+                messagebox.showerror("Lỗi", f"Không thể xuất trace: {str(e)}")
+
     def log_message(self, message, level="INFO"):
         """
         Ghi log message
@@ -2218,40 +1380,41 @@ class ERSportsAutomationGUI:
 
         # Ghi vào file log
         self.logger.info(f"[{level}] {message}")
+        self.emit_event('log', level=level, message=message)
 
     def check_log_queue(self):
         """
         Kiểm tra và xử lý log queue
-        """
-        try:
-            while True:
-                log_entry, level = self.log_queue.get_nowait()
-
-                # Thêm vào log text widget
-                self.log_text.config(state=tk.NORMAL)
-                self.log_text.insert(tk.END, log_entry + "\n")
-                self.log_text.see(tk.END)
-                self.log_text.config(state=tk.DISABLED)
 
-                # Thêm vào status text
-                self.status_text.config(state=tk.NORMAL)
-                self.status_text.insert(tk.END, log_entry + "\n")
-                self.status_text.see(tk.END)
-                self.status_text.config(state=tk.DISABLED)
+        Mỗi lần chỉ xử lý tối đa DEFAULT_BATCH_SIZE entry (một lệnh insert cho mỗi widget);
+        nếu queue còn tồn đọng thì kiểm tra lại ngay sau khi Tk xử lý xong các sự kiện khác.
+        """
+        processed = pump_log_queue(self.log_queue, (self.log_view, self.status_view), DEFAULT_BATCH_SIZE)
 
-        except queue.Empty:
-            pass
+        # Lên lịch kiểm tra lại
+        delay = BACKLOG_INTERVAL_MS if processed >= DEFAULT_BATCH_SIZE else POLL_INTERVAL_MS
+        self.root.after(delay, self.check_log_queue)
 
-        # Lên lịch kiểm tra lại sau 100ms
-        self.root.after(100, self.check_log_queue)
+    def apply_log_max_lines(self):
+        """
+        Áp dụng giới hạn số dòng log từ tab cài đặt (không nhỏ hơn MIN_MAX_LINES)
+        """
+        try:
+            value = int(self.log_max_lines_var.get())
+        except (tk.TclError, ValueError):
+            value = None
+        # Ô trống/không phải số thì giữ giới hạn đang dùng
+        max_lines = self.log_view.max_lines if value is None else max(MIN_MAX_LINES, value)
+        if value != max_lines:
+            self.log_max_lines_var.set(max_lines)
+        self.log_view.set_max_lines(max_lines)
+        self.status_view.set_max_lines(max_lines)
 
     def refresh_log(self):
         """
         Làm mới log viewer
         """
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.delete(1.0, tk.END)
-        self.log_text.config(state=tk.DISABLED)
+        self.log_view.clear()
         self.log_message("Đã làm mới log viewer", "INFO")
 
     def clear_log(self):
@@ -2259,9 +1422,7 @@ class ERSportsAutomationGUI:
         Xóa log viewer
         """
         if messagebox.askyesno("Xác nhận", "Bạn có chắc muốn xóa log?"):
-            self.log_text.config(state=tk.NORMAL)
-            self.log_text.delete(1.0, tk.END)
-            self.log_text.config(state=tk.DISABLED)
+            self.log_view.clear()
             self.log_message("Đã xóa log", "INFO")
 
     def save_log(self):
@@ -2341,6 +1502,16 @@ class ERSportsAutomationGUI:
             if self.auto_save_var.get():
                 self.save_settings()
 
+    def refresh_config_listbox(self):
+        """
+        Vẽ lại danh sách file config OpenVPN (bỏ qua nếu tab cài đặt chưa được dựng)
+        """
+        if self.config_listbox is None:
+            return
+        self.config_listbox.delete(0, tk.END)
+        for config in self.openvpn_config_files:
+            self.config_listbox.insert(tk.END, os.path.basename(config))
+
     def clear_openvpn_configs(self):
         """
         Xóa tất cả file config OpenVPN
@@ -2354,27 +1525,51 @@ class ERSportsAutomationGUI:
             if self.auto_save_var.get():
                 self.save_settings()
 
+    @staticmethod
+    def get_config_dir():
+        """
+        Thư mục config - hỗ trợ cả khi chạy từ source và từ .exe
+
+        Returns:
+            str: Đường dẫn thư mục config
+        """
+        if getattr(sys, 'frozen', False):
+            # Chạy từ .exe
+            base_path = os.path.dirname(sys.executable)
+        else:
+            # Chạy từ source
+            base_path = os.path.dirname(__file__)
+        return os.path.join(base_path, 'config')
+
     def save_settings(self):
         """
-        Lưu tất cả cấu hình vào file
+        Lưu cấu hình vào settings.json (ghi gộp ở thread nền, chỉ gọi từ main thread)
+
+        Nếu cấu hình đã lưu chưa được load hoặc danh sách đang được nạp dở thì hoãn đến khi nạp xong.
         """
+        if self.tree_loaders or not self.settings_loaded:
+            self.save_pending = True
+            return
         try:
             settings = {
                 'accounts': [],
                 'products': [],
                 'chrome_path': self.chrome_path_var.get(),
                 'headless': self.headless_var.get(),
+                'scan_mode': self.scan_mode_var.get(),
+                'page_load_strategy': self.page_load_strategy_var.get(),
+                'lean_mode': self.lean_mode_var.get(),
+                'lean_blocked_hosts': self.get_lean_blocked_hosts(),
                 'account_delay': self.account_delay_var.get(),
                 'product_delay': self.product_delay_var.get(),
                 'auto_save': self.auto_save_var.get(),
                 'retry_failed': self.retry_failed_var.get(),
                 'max_retries': self.max_retries_var.get(),
+                'log_max_lines': self.log_max_lines_var.get(),
                 'enable_openvpn': self.enable_openvpn_var.get(),
                 'openvpn_path': self.openvpn_path_var.get(),
                 'openvpn_configs': self.openvpn_config_files,
                 'openvpn_mode': self.openvpn_mode_var.get(),
-                'purchased_today': list(self.purchased_today),
-                'purchased_date': self.purchased_date,
             }
 
             # Lưu tài khoản (email, password)
@@ -2392,63 +1587,42 @@ class ERSportsAutomationGUI:
                     'productId': values[0]
                 })
 
-            # Tìm config_dir - hỗ trợ cả khi chạy từ source và từ .exe
-            if getattr(sys, 'frozen', False):
-                # Chạy từ .exe
-                base_path = os.path.dirname(sys.executable)
-            else:
-                # Chạy từ source
-                base_path = os.path.dirname(__file__)
-
-            config_dir = os.path.join(base_path, 'config')
-            if not os.path.exists(config_dir):
-                os.makedirs(config_dir)
-
-            settings_file = os.path.join(config_dir, 'settings.json')
-            with open(settings_file, 'w', encoding='utf-8') as f:
-                json.dump(settings, f, ensure_ascii=False, indent=2)
+            self.settings_store.save_settings(settings)
 
         except Exception as e:
             print(f"Lỗi khi lưu cấu hình: {str(e)}")
 
+    def save_state(self):
+        """
+        Lưu trạng thái thay đổi thường xuyên (tài khoản đã mua hôm nay) vào state.json
+
+        Gọi được từ thread automation (không đọc widget Tk). Bỏ qua khi state.json chưa được load.
+        """
+        if not self.settings_loaded:
+            return
+        self.settings_store.save_state(self.engine.state())
+
     def load_settings(self):
         """
         Load cấu hình từ file
         """
         try:
-            # Tìm config_dir - hỗ trợ cả khi chạy từ source và từ .exe
-            if getattr(sys, 'frozen', False):
-                # Chạy từ .exe
-                base_path = os.path.dirname(sys.executable)
-            else:
-                # Chạy từ source
-                base_path = os.path.dirname(__file__)
-
-            config_dir = os.path.join(base_path, 'config')
-            settings_file = os.path.join(config_dir, 'settings.json')
-
-            if not os.path.exists(settings_file):
+            settings, state = self.settings_store.load()
+            if not settings and not state:
                 return
 
-            with open(settings_file, 'r', encoding='utf-8') as f:
-                settings = json.load(f)
-
-            # Load tài khoản
+            # Load tài khoản và sản phẩm (bỏ trùng với dòng đã có, nạp theo khối)
             if 'accounts' in settings:
-                for account in settings['accounts']:
-                    if len(self.account_tree.get_children()) < 60:
-                        self.account_tree.insert('', tk.END, values=(
-                            account.get('email', ''),
-                            account.get('password', '')
-                        ))
-
-            # Load sản phẩm
+                existing = [str(self.account_tree.item(item)['values'][0])
+                            for item in self.account_tree.get_children()]
+                result = collect_rows(settings['accounts'], normalize_account, MAX_ACCOUNTS, existing)
+                self.load_tree_rows('accounts', self.account_tree, result.rows)
+
             if 'products' in settings:
-                for product in settings['products']:
-                    if len(self.product_tree.get_children()) < 60:
-                        self.product_tree.insert('', tk.END, values=(
-                            product.get('productId', '')
-                        ))
+                existing = [str(self.product_tree.item(item)['values'][0])
+                            for item in self.product_tree.get_children()]
+                result = collect_rows(settings['products'], normalize_product, MAX_PRODUCTS, existing)
+                self.load_tree_rows('products', self.product_tree, result.rows)
 
             # Load cài đặt
             if 'chrome_path' in settings:
@@ -2457,6 +1631,18 @@ class ERSportsAutomationGUI:
             if 'headless' in settings:
                 self.headless_var.set(settings.get('headless', False))
 
+            if 'scan_mode' in settings:
+                self.scan_mode_var.set(settings.get('scan_mode', 'browser'))
+
+            if settings.get('page_load_strategy') in PAGE_LOAD_STRATEGIES:
+                self.page_load_strategy_var.set(settings['page_load_strategy'])
+
+            if 'lean_mode' in settings:
+                self.lean_mode_var.set(settings.get('lean_mode', False))
+
+            if 'lean_blocked_hosts' in settings:
+                self.lean_blocked_hosts_var.set(", ".join(settings.get('lean_blocked_hosts', [])))
+
             if 'account_delay' in settings:
                 self.account_delay_var.set(settings.get('account_delay', 5))
 
@@ -2472,6 +1658,10 @@ class ERSportsAutomationGUI:
             if 'max_retries' in settings:
                 self.max_retries_var.set(settings.get('max_retries', 3))
 
+            if 'log_max_lines' in settings:
+                self.log_max_lines_var.set(settings.get('log_max_lines', DEFAULT_MAX_LINES))
+                self.apply_log_max_lines()
+
             # Load OpenVPN settings
             if 'enable_openvpn' in settings:
                 self.enable_openvpn_var.set(settings.get('enable_openvpn', False))
@@ -2484,23 +1674,56 @@ class ERSportsAutomationGUI:
 
             if 'openvpn_configs' in settings:
                 self.openvpn_config_files = [c for c in settings['openvpn_configs'] if os.path.exists(c)]
-                for config in self.openvpn_config_files:
-                    self.config_listbox.insert(tk.END, os.path.basename(config))
+                self.refresh_config_listbox()
 
             # Load đánh dấu tài khoản đã mua hôm nay
-            today_str = datetime.now().strftime('%Y-%m-%d')
-            saved_date = settings.get('purchased_date', today_str)
-            if saved_date == today_str:
-                self.purchased_today = set(settings.get('purchased_today', []))
-            else:
-                self.purchased_today = set()
-            self.purchased_date = today_str
+            self.engine.load_state(state)
 
             self.log_message("Đã load cấu hình đã lưu", "INFO")
 
         except Exception as e:
             print(f"Lỗi khi load cấu hình: {str(e)}")
 
+    def on_first_map(self, event):
+        """
+        Cửa sổ chính hiển thị lần đầu: load cấu hình đã lưu sau lượt vẽ đầu tiên
+        """
+        if event.widget is not self.root:
+            return
+        self.root.unbind('<Map>')
+        self.profile.mark("first_window")
+        # after_idle chạy cùng lượt idle với lệnh vẽ cửa sổ, after(0) chạy sau lượt đó
+        self.root.after_idle(self.root.after, 0, self.finish_startup)
+
+    def finish_startup(self):
+        """
+        Load settings.json/state.json, ghi các lần lưu bị hoãn và báo thời gian khởi động
+        """
+        with self.profile.phase("load_settings"):
+            self.load_settings()
+        self.settings_loaded = True
+        self.profile.mark("settings_loaded")
+        if self.save_pending and not self.tree_loaders:
+            self.save_pending = False
+            self.save_settings()
+
+        # Chrome/ChromeDriver còn sót lại từ lần chạy trước bị crash/kill
+        with self.profile.phase("sweep_orphans"):
+            killed = self.process_registry.sweep()
+        if killed:
+            self.log_message(f"Đã dọn {killed} process Chrome/ChromeDriver còn sót từ lần chạy trước", "WARNING")
+
+        # Cache HTTP vượt giới hạn dung lượng (Chrome đã đóng nên không đụng slot đang dùng)
+        if self.disk_cache is not None:
+            with self.profile.phase("disk_cache_cleanup"):
+                freed = self.disk_cache.cleanup()
+            if freed:
+                self.log_message(f"Đã dọn {freed / 1024 / 1024:.0f} MB cache HTTP vượt giới hạn", "INFO")
+
+        self.emit_event('startup', **self.profile.fields())
+        if self.print_profile:
+            print(self.profile.report())
+
     def on_closing(self):
         """
         Xử lý khi đóng app
@@ -2510,13 +1733,33 @@ class ERSportsAutomationGUI:
                 self.stop_automation()
                 # Đợi một chút để cleanup
                 time.sleep(1)
+                self.process_registry.sweep(own=True)
                 # Lưu settings
                 self.save_settings()
+                self.save_state()
+                self.settings_store.close()
+                self.product_cache.save()
                 self.root.destroy()
+                self.close_logs()
         else:
+            self.process_registry.sweep(own=True)
             # Lưu settings trước khi thoát
             self.save_settings()
+            self.save_state()
+            self.settings_store.close()
+            self.product_cache.save()
             self.root.destroy()
+            self.close_logs()
+
+    def close_logs(self):
+        """
+        Ghi nốt log/event/lịch sử còn trong queue và đóng file
+        """
+        if self.history is not None:
+            self.history.close()
+        if self.event_log is not None:
+            self.event_log.close()
+        stop_queue_logging(self.log_listener)
 
     def run(self):
         """
@@ -2526,12 +1769,20 @@ class ERSportsAutomationGUI:
         self.root.mainloop()
 
 
-def main():
+def main(argv=None):
     """
     Hàm main để khởi chạy ứng dụng
+
+    Args:
+        argv (list): Tham số dòng lệnh (mặc định sys.argv[1:])
     """
+    parser = argparse.ArgumentParser(description="ER Sports Automation Tool - giao diện đồ họa")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="In thời gian import và khởi tạo đến khi cửa sổ hiển thị, load xong cấu hình")
+    args = parser.parse_args(argv)
+
     try:
-        app = ERSportsAutomationGUI()
+        app = ERSportsAutomationGUI(profile=import_profile(), print_profile=args.profile_startup)
         app.run()
     except Exception as e:
         print(f"Lỗi khởi động ứng dụng: {str(e)}")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chặn popup WorldShopping (zigzag) và các overlay trên er-sports.com
+
+Thay vì dò từng selector bằng find_element/is_displayed (hàng chục round trip
+WebDriver mỗi lần), một script duy nhất được inject vào trang:
+- Thêm stylesheet ẩn ngay các modal/backdrop đã biết
+- Ẩn các node đang có và đếm số node đã vô hiệu hóa
+- Cài MutationObserver để tiếp tục ẩn popup chèn vào DOM sau này
+Các lần kiểm tra sau chỉ cần đọc bộ đếm (một round trip, không tốn thời gian chờ).
+"""
+
+import json
+
+# Selector các modal/backdrop cần ẩn
+POPUP_SELECTORS = [
+    '#zigzag-modal',
+    '#zigzag-worldshopping-checkout',
+    '.worldshopping-popup',
+    '[class*="worldshopping"]',
+    '[id*="zigzag"]',
+    '[class*="NoticeV2"]',
+    '.modal[class*="world"]',
+    '.modal-backdrop',
+    '.overlay',
+    '.popup-overlay',
+]
+
+# Script cài guard (idempotent) và trả về số node mới bị vô hiệu hóa kể từ lần gọi trước
+POPUP_GUARD_SCRIPT = r"""
+return (function (selectors) {
+    var guard = window.__ersPopupGuard;
+    if (!guard) {
+        guard = window.__ersPopupGuard = {count: 0, reported: 0};
+        var joined = selectors.join(',');
+        var seen = new WeakSet();
+
+        var neutralise = function (el) {
+            if (seen.has(el)) { return; }
+            seen.add(el);
+            el.style.setProperty('display', 'none', 'important');
+            el.setAttribute('data-ers-popup', 'hidden');
+            guard.count++;
+        };
+
+        // Overlay không có selector cố định: phần tử position:fixed phủ phần lớn màn hình
+        // và không chứa ô nhập liệu (tránh ẩn nhầm form đăng nhập)
+        var isOverlay = function (el) {
+            if (!el.getAttribute || (el.id || '').indexOf('zigzag') !== -1) { return false; }
+            var inline = el.getAttribute('style') || '';
+            if (inline.indexOf('fixed') === -1 && inline.indexOf('z-index') === -1) { return false; }
+            var cs = window.getComputedStyle(el);
+            if (cs.position !== 'fixed' || cs.display === 'none') { return false; }
+            if (el.querySelector('input, select, textarea, form')) { return false; }
+            var r = el.getBoundingClientRect();
+            return r.width * r.height >= 0.3 * window.innerWidth * window.innerHeight;
+        };
+
+        var sweep = function (root) {
+            if (root.nodeType !== 1 && root.nodeType !== 9) { return; }
+            if (root.nodeType === 1) {
+                if (root.matches(joined) || isOverlay(root)) { neutralise(root); }
+            }
+            var nodes = root.querySelectorAll(joined);
+            for (var i = 0; i < nodes.length; i++) { neutralise(nodes[i]); }
+            var styled = root.querySelectorAll('[style*="fixed"], [style*="z-index"]');
+            for (var j = 0; j < styled.length; j++) {
+                if (isOverlay(styled[j])) { neutralise(styled[j]); }
+            }
+        };
+
+        var install = function () {
+            var style = document.createElement('style');
+            style.id = 'ers-popup-guard';
+            style.textContent = joined + '{display:none !important;visibility:hidden !important;}';
+            (document.head || document.documentElement).appendChild(style);
+
+            sweep(document);
+            new MutationObserver(function (mutations) {
+                for (var m = 0; m < mutations.length; m++) {
+                    var added = mutations[m].addedNodes;
+                    for (var n = 0; n < added.length; n++) { sweep(added[n]); }
+                    var target = mutations[m].target;
+                    if (mutations[m].type === 'attributes' && !seen.has(target)
+                            && (target.matches(joined) || isOverlay(target))) {
+                        neutralise(target);
+                    }
+                }
+            }).observe(document.documentElement, {
+                childList: true, subtree: true, attributes: true, attributeFilter: ['style', 'class']
+            });
+        };
+
+        if (document.documentElement && document.body) {
+            install();
+        } else {
+            document.addEventListener('DOMContentLoaded', install);
+        }
+    }
+    var delta = guard.count - guard.reported;
+    guard.reported = guard.count;
+    return delta;
+})(arguments[0]);
+"""
+
+
+def install_popup_guard(driver):
+    """
+    Đăng ký guard chạy tự động ở mọi lần tải trang (qua CDP, chỉ Chrome)
+
+    Args:
+        driver: Selenium WebDriver
+
+    Returns:
+        bool: True nếu đăng ký thành công
+    """
+    # addScriptToEvaluateOnNewDocument không nhận arguments, nên nhúng selector trực tiếp
+    source = "(function(){" + POPUP_GUARD_SCRIPT.replace(
+        "})(arguments[0]);", "})(%s);" % json.dumps(POPUP_SELECTORS)) + "})();"
+    try:
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': source})
+        return True
+    except Exception:
+        return False
+
+
+def suppress_popups(driver):
+    """
+    Ẩn popup/overlay trên trang hiện tại trong một round trip
+
+    Args:
+        driver: Selenium WebDriver
+
+    Returns:
+        int: Số node mới bị vô hiệu hóa kể từ lần gọi trước trên trang này
+    """
+    return driver.execute_script(POPUP_GUARD_SCRIPT, POPUP_SELECTORS) or 0
+
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache product ID -> URL trang chi tiết (shopdetail) cho er-sports.com
+
+Khi một product ID đã được tìm thấy trên listing, các lần mua sau vào thẳng trang
+chi tiết thay vì quét lại listing. Mỗi entry lưu URL chi tiết, số page listing nơi
+tìm thấy và thời điểm xác minh gần nhất; entry hết hạn theo TTL, bị loại theo LRU
+khi vượt quá số lượng tối đa và bị xóa khi trang chi tiết 404 hoặc không còn chứa ID.
+Cache được lưu ra file JSON (settings_store.atomic_write_text: file tạm, fsync rồi os.replace).
+"""
+
+import json
+import time
+import threading
+from collections import OrderedDict
+
+try:
+    from .settings_store import atomic_write_text
+except ImportError:
+    from settings_store import atomic_write_text
+
+# Thời gian sống mặc định của entry (giây) kể từ lần xác minh cuối
+DEFAULT_TTL = 6 * 3600
+
+# Số entry tối đa (LRU)
+DEFAULT_MAX_ENTRIES = 500
+
+
+class ProductCache:
+    """
+    Cache LRU có TTL, thread-safe, lưu được ra file JSON
+    """
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES, clock=time.time):
+        """
+        Khởi tạo cache (tự load file nếu có)
+
+        Args:
+            path (str): File JSON lưu cache (None = chỉ giữ trong bộ nhớ)
+            ttl (float): Thời gian sống của entry (giây)
+            max_entries (int): Số entry tối đa trước khi loại entry ít dùng nhất
+            clock (callable): Hàm trả về thời gian hiện tại (giây)
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        if path:
+            self.load()
+
+    def get(self, product_id):
+        """
+        Tra cứu URL chi tiết của product ID (tính hit/miss)
+
+        Args:
+            product_id (str): ID sản phẩm
+
+        Returns:
+            dict: {'url', 'page', 'verified_at'} hoặc None nếu không có/hết hạn
+        """
+        with self._lock:
+            entry = self._entries.get(product_id)
+            if entry is not None and self._clock() - entry['verified_at'] > self.ttl:
+                del self._entries[product_id]
+                self._dirty = True
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(product_id)
+            self.hits += 1
+            return dict(entry)
+
+    def put(self, product_id, url, page=None):
+        """
+        Ghi (hoặc xác minh lại) URL chi tiết của product ID
+
+        Args:
+            product_id (str): ID sản phẩm
+            url (str): URL trang chi tiết
+            page (int): Số page listing nơi tìm thấy (None = giữ giá trị cũ)
+        """
+        with self._lock:
+            old = self._entries.pop(product_id, None)
+            if page is None and old is not None and old['url'] == url:
+                page = old['page']
+            self._entries[product_id] = {'url': url, 'page': page, 'verified_at': self._clock()}
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def invalidate(self, product_id):
+        """
+        Xóa entry (trang chi tiết 404 hoặc không còn chứa product ID)
+
+        Returns:
+            bool: True nếu có entry bị xóa
+        """
+        with self._lock:
+            if self._entries.pop(product_id, None) is None:
+                return False
+            self.invalidations += 1
+            self._dirty = True
+            return True
+
+    def stats(self):
+        """
+        Số liệu hit/miss của cache
+
+        Returns:
+            dict: {'hits', 'misses', 'invalidations', 'size', 'hit_rate'}
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'size': len(self._entries),
+                'hit_rate': (self.hits / lookups * 100) if lookups else 0,
+            }
+
+    def reset_stats(self):
+        """
+        Đặt lại bộ đếm hit/miss (giữ nguyên entry)
+        """
+        with self._lock:
+            self.hits = self.misses = self.invalidations = 0
+
+    def load(self):
+        """
+        Load cache từ file (bỏ qua entry hết hạn hoặc file hỏng)
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        entries = data.get('entries') if isinstance(data, dict) else None
+        if not isinstance(entries, list):
+            # File không đúng định dạng: coi như cache trống
+            entries = []
+        now = self._clock()
+        with self._lock:
+            self._entries.clear()
+            for item in entries:
+                if not isinstance(item, list) or len(item) != 2 or not isinstance(item[1], dict):
+                    continue
+                product_id, entry = item
+                verified_at = entry.get('verified_at')
+                # Entry sai kiểu (file bị sửa tay/hỏng) bị bỏ qua như entry hết hạn
+                if not isinstance(product_id, str) or not isinstance(entry.get('url'), str) \
+                        or isinstance(verified_at, bool) or not isinstance(verified_at, (int, float)):
+                    continue
+                if now - verified_at <= self.ttl and entry['url']:
+                    page = entry.get('page')
+                    if isinstance(page, bool) or not isinstance(page, int):
+                        page = None
+                    self._entries[product_id] = {'url': entry['url'], 'page': page, 'verified_at': verified_at}
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = False
+
+    def save(self):
+        """
+        Lưu cache ra file nếu có thay đổi
+
+        Returns:
+            bool: True nếu đã ghi file
+        """
+        if not self.path:
+            return False
+        with self._lock:
+            if not self._dirty:
+                return False
+            data = {'version': 1, 'entries': list(self._entries.items())}
+            self._dirty = False
+        try:
+            atomic_write_text(self.path, json.dumps(data, ensure_ascii=False))
+            return True
+        except OSError as e:
+            print(f"[cache] Lỗi khi lưu cache sản phẩm: {str(e)}")
+            with self._lock:
+                self._dirty = True
+            return False
+
+    def __contains__(self, product_id):
+        with self._lock:
+            entry = self._entries.get(product_id)
+            return entry is not None and self._clock() - entry['verified_at'] <= self.ttl
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
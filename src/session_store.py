@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lưu cookie phiên đăng nhập theo tài khoản để lần sau không phải điền form login
+
+Sau khi login thành công, cookie của shop được mã hóa (Fernet: AES-128-CBC + HMAC-SHA256) và
+ghi vào config/sessions.json, khóa theo hash email (không ghi email ra file). Lần khởi động
+Chrome sau, BrowserAutomation nạp lại cookie trước khi mở trang chủ và chỉ cần thấy link
+logout là đã đăng nhập; phiên hết hạn thì xóa khỏi file và login bằng form như cũ.
+
+Khóa mã hóa lấy từ biến môi trường ERS_SESSION_KEY (khóa Fernet, base64), không có thì tạo
+config/session.key (quyền 0600). Khóa nằm cạnh file phiên nên chỉ chống lộ cookie khi
+sessions.json bị chép/đồng bộ riêng; muốn chặt hơn thì đặt ERS_SESSION_KEY từ nơi lưu bí mật.
+Cần thư viện cryptography (pip install cryptography); không có thì không lưu phiên (không bao
+giờ ghi cookie dạng rõ ra đĩa).
+"""
+
+import os
+import json
+import time
+import threading
+import importlib.util
+
+try:
+    from .settings_store import atomic_write_text, read_json
+    from .events import account_hash
+except ImportError:
+    from settings_store import atomic_write_text, read_json
+    from events import account_hash
+
+# cryptography chỉ được import khi lưu/nạp phiên lần đầu (không làm chậm lúc mở app)
+CRYPTOGRAPHY_AVAILABLE = importlib.util.find_spec('cryptography') is not None
+
+SESSIONS_FILENAME = 'sessions.json'
+KEY_FILENAME = 'session.key'
+KEY_ENV = 'ERS_SESSION_KEY'
+SESSIONS_VERSION = 1
+
+# Tuổi tối đa của phiên đã lưu (ghi đè bằng browser.session.max_age_hours trong config.json)
+DEFAULT_MAX_AGE = 12 * 3600
+
+# Trường cookie của Selenium (get_cookies) được giữ lại
+COOKIE_FIELDS = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'expiry', 'sameSite')
+
+
+def load_key(key_path):
+    """
+    Đọc khóa Fernet từ ERS_SESSION_KEY hoặc key_path, tạo file khóa mới nếu chưa có
+
+    Args:
+        key_path (str): File khóa (config/session.key)
+
+    Returns:
+        bytes: Khóa Fernet
+    """
+    from cryptography.fernet import Fernet
+
+    key = os.environ.get(KEY_ENV)
+    if key:
+        return key.strip().encode('ascii')
+    try:
+        with open(key_path, 'rb') as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        pass
+    key = Fernet.generate_key()
+    directory = os.path.dirname(key_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # O_EXCL: hai process cùng tạo khóa thì process sau đọc khóa của process trước
+    try:
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        with open(key_path, 'rb') as f:
+            return f.read().strip()
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    return key
+
+
+def cdp_cookie(cookie, url):
+    """
+    Chuyển cookie dạng Selenium sang tham số của CDP Network.setCookies
+
+    Nạp qua CDP được khi tab còn ở about:blank (add_cookie của Selenium cần mở trang của domain trước).
+
+    Args:
+        cookie (dict): Cookie từ driver.get_cookies()
+        url (str): URL gốc của shop (cho cookie không có domain)
+
+    Returns:
+        dict: CookieParam của CDP
+    """
+    param = {'name': cookie['name'], 'value': cookie['value'], 'path': cookie.get('path', '/')}
+    if cookie.get('domain'):
+        param['domain'] = cookie['domain']
+    else:
+        param['url'] = url
+    for name in ('secure', 'httpOnly', 'sameSite'):
+        if name in cookie:
+            param[name] = cookie[name]
+    if 'expiry' in cookie:
+        param['expires'] = cookie['expiry']
+    return param
+
+
+class SessionStore:
+    """
+    Cookie phiên theo tài khoản, mã hóa trong config/sessions.json
+
+    File: {'version', 'sessions': {hash email: {'saved': epoch giây, 'token': cookie đã mã hóa}}}
+    """
+
+    def __init__(self, path, key_path=None, cipher=None, clock=time.time):
+        """
+        Args:
+            path (str): File sessions.json
+            key_path (str): File khóa (mặc định session.key cùng thư mục)
+            cipher: Đối tượng có encrypt(bytes)/decrypt(bytes) (mặc định Fernet, tắt nếu
+                chưa cài cryptography)
+            clock (callable): Thời gian hiện tại (epoch giây)
+        """
+        self.path = path
+        self.key_path = key_path or os.path.join(os.path.dirname(path), KEY_FILENAME)
+        self._cipher = cipher
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        """False nếu chưa cài cryptography (không lưu/nạp phiên)"""
+        return self._cipher is not None or CRYPTOGRAPHY_AVAILABLE
+
+    def _get_cipher(self):
+        """Tạo Fernet khi cần lần đầu (không đọc/tạo file khóa lúc mở app)"""
+        if self._cipher is None:
+            from cryptography.fernet import Fernet
+            self._cipher = Fernet(load_key(self.key_path))
+        return self._cipher
+
+    def _read(self):
+        data = read_json(self.path)
+        sessions = data.get('sessions') if data.get('version') == SESSIONS_VERSION else None
+        return sessions if isinstance(sessions, dict) else {}
+
+    def _write(self, sessions):
+        if sessions:
+            atomic_write_text(self.path, json.dumps({'version': SESSIONS_VERSION, 'sessions': sessions}, indent=2))
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+
+    def load(self, email, max_age=DEFAULT_MAX_AGE):
+        """
+        Cookie đã lưu của tài khoản (bỏ cookie đã hết hạn)
+
+        Args:
+            email (str): Email tài khoản
+            max_age (float): Tuổi tối đa của phiên (giây)
+
+        Returns:
+            list: Cookie dạng Selenium, None nếu không có phiên dùng được
+        """
+        if not self.enabled:
+            return None
+        key = account_hash(email)
+        now = self._clock()
+        with self._lock:
+            entry = self._read().get(key)
+            if not isinstance(entry, dict):
+                return None
+            cookies = None
+            if now - entry.get('saved', 0) <= max_age:
+                try:
+                    cookies = json.loads(self._get_cipher().decrypt(entry['token'].encode('ascii')))
+                except Exception as e:
+                    # Khóa đã đổi (InvalidToken), khóa hỏng hoặc file bị sửa: coi như không có phiên
+                    print(f"[session] Không giải mã được phiên đã lưu: {type(e).__name__}")
+            if isinstance(cookies, list):
+                cookies = [cookie for cookie in cookies
+                           if isinstance(cookie, dict) and cookie.get('expiry', now + 1) > now]
+            if not cookies:
+                self._forget(key)
+                return None
+        return cookies
+
+    def save(self, email, cookies, max_age=DEFAULT_MAX_AGE):
+        """
+        Mã hóa và lưu cookie sau khi login thành công (đồng thời xóa phiên quá hạn của tài khoản khác)
+
+        Args:
+            email (str): Email tài khoản
+            cookies (list): driver.get_cookies()
+            max_age (float): Tuổi tối đa của phiên (giây)
+
+        Returns:
+            bool: True nếu đã lưu
+        """
+        if not self.enabled or not cookies:
+            return False
+        cookies = [{name: cookie[name] for name in COOKIE_FIELDS if name in cookie} for cookie in cookies]
+        now = self._clock()
+        try:
+            token = self._get_cipher().encrypt(json.dumps(cookies).encode('utf-8')).decode('ascii')
+            with self._lock:
+                sessions = self._read()
+                sessions = {key: entry for key, entry in sessions.items()
+                            if isinstance(entry, dict) and now - entry.get('saved', 0) <= max_age}
+                sessions[account_hash(email)] = {'saved': now, 'token': token}
+                self._write(sessions)
+        except (OSError, ValueError) as e:
+            print(f"[session] Không lưu được phiên đăng nhập: {str(e)}")
+            return False
+        return True
+
+    def forget(self, email):
+        """
+        Xóa phiên đã lưu (đăng xuất, phiên hết hạn phía server)
+
+        Args:
+            email (str): Email tài khoản
+        """
+        with self._lock:
+            self._forget(account_hash(email))
+
+    def _forget(self, key):
+        sessions = self._read()
+        if sessions.pop(key, None) is not None:
+            try:
+                self._write(sessions)
+            except OSError as e:
+                print(f"[session] Không xóa được phiên đã lưu: {str(e)}")
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lưu cấu hình và trạng thái ra JSON: gộp nhiều lần lưu, ghi ở thread nền, ghi nguyên tử
+
+- settings.json: cấu hình ít thay đổi (tài khoản, sản phẩm, tùy chọn, danh sách OpenVPN)
+- state.json: trạng thái thay đổi thường xuyên (tài khoản đã mua trong ngày)
+
+Mỗi lần lưu chỉ thay dữ liệu chờ ghi; thread nền ghi khi đã yên DEFAULT_DELAY giây
+(tối đa trễ DEFAULT_MAX_DELAY giây), bỏ qua nếu nội dung giống lần ghi trước. File được
+ghi qua file tạm, fsync rồi os.replace, nên nếu app tắt giữa chừng file cũ vẫn nguyên vẹn.
+"""
+
+import os
+import json
+import time
+import threading
+
+SETTINGS_FILENAME = 'settings.json'
+STATE_FILENAME = 'state.json'
+
+# Khóa trạng thái (trước đây nằm trong settings.json)
+STATE_KEYS = ('purchased_today', 'purchased_date')
+
+# Thời gian yên lặng trước khi ghi và độ trễ tối đa (giây)
+DEFAULT_DELAY = 1.0
+DEFAULT_MAX_DELAY = 5.0
+
+
+def atomic_write_text(path, text):
+    """
+    Ghi file nguyên tử: ghi file tạm cùng thư mục, fsync rồi os.replace
+
+    Args:
+        path (str): File đích
+        text (str): Nội dung
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_json(path):
+    """
+    Đọc file JSON
+
+    Returns:
+        dict: Nội dung, {} nếu không có file hoặc file hỏng
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+class DebouncedWriter:
+    """
+    Ghi một file JSON ở thread nền, gộp các lần lưu liên tiếp thành một lần ghi
+    """
+
+    def __init__(self, path, delay=DEFAULT_DELAY, max_delay=DEFAULT_MAX_DELAY):
+        """
+        Args:
+            path (str): File JSON
+            delay (float): Ghi khi không có lần lưu mới trong delay giây
+            max_delay (float): Ghi muộn nhất max_delay giây sau lần lưu đầu tiên chưa ghi
+        """
+        self.path = path
+        self.delay = delay
+        self.max_delay = max_delay
+        self.requests = 0
+        self.writes = 0
+        self.skipped = 0
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._pending = None  # (số thứ tự, dữ liệu)
+        self._sequence = 0
+        self._written_sequence = 0
+        self._first = None
+        self._last = None
+        self._closed = False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self._last_text = f.read()
+        except OSError:
+            self._last_text = None
+        self._thread = threading.Thread(target=self._run, name=f"settings-writer-{os.path.basename(path)}",
+                                        daemon=True)
+        self._thread.start()
+
+    def schedule(self, data):
+        """
+        Đặt dữ liệu cần ghi (thay dữ liệu đang chờ nếu có)
+
+        Args:
+            data (dict): Dữ liệu JSON (không được sửa sau khi gọi)
+        """
+        with self._cond:
+            now = time.monotonic()
+            self._sequence += 1
+            self._pending = (self._sequence, data)
+            if self._first is None:
+                self._first = now
+            self._last = now
+            self.requests += 1
+            self._cond.notify()
+
+    def _take(self):
+        pending = self._pending
+        self._pending = None
+        self._first = None
+        return pending
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                while not self._closed and self._pending is not None:
+                    deadline = min(self._last + self.delay, self._first + self.max_delay)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                pending = self._take()
+            if pending is not None:
+                self._write(*pending)
+
+    def _write(self, sequence, data):
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+        with self._write_lock:
+            # flush() ở thread khác có thể đã ghi dữ liệu mới hơn
+            if sequence <= self._written_sequence:
+                return
+            self._written_sequence = sequence
+            if text == self._last_text:
+                self.skipped += 1
+                return
+            try:
+                atomic_write_text(self.path, text)
+                self._last_text = text
+                self.writes += 1
+            except OSError as e:
+                print(f"[settings] Lỗi khi lưu {self.path}: {str(e)}")
+
+    def flush(self):
+        """
+        Ghi ngay dữ liệu đang chờ (trong thread gọi)
+        """
+        with self._cond:
+            pending = self._take()
+        if pending is not None:
+            self._write(*pending)
+
+    def close(self):
+        """
+        Ghi nốt dữ liệu đang chờ và dừng thread nền
+        """
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+
+class SettingsStore:
+    """
+    settings.json (cấu hình) và state.json (trạng thái) trong thư mục cấu hình
+    """
+
+    def __init__(self, config_dir, delay=DEFAULT_DELAY, max_delay=DEFAULT_MAX_DELAY):
+        """
+        Args:
+            config_dir (str): Thư mục cấu hình
+            delay (float): Thời gian yên lặng trước khi ghi (giây)
+            max_delay (float): Độ trễ ghi tối đa (giây)
+        """
+        self.settings_path = os.path.join(config_dir, SETTINGS_FILENAME)
+        self.state_path = os.path.join(config_dir, STATE_FILENAME)
+        self.settings_writer = DebouncedWriter(self.settings_path, delay, max_delay)
+        self.state_writer = DebouncedWriter(self.state_path, delay, max_delay)
+
+    def load(self):
+        """
+        Đọc cấu hình và trạng thái
+
+        Trạng thái cũ còn nằm trong settings.json (trước khi tách state.json) được dùng
+        khi chưa có state.json.
+
+        Returns:
+            tuple: (settings dict, state dict)
+        """
+        settings = read_json(self.settings_path)
+        state = read_json(self.state_path)
+        if not state:
+            state = {key: settings[key] for key in STATE_KEYS if key in settings}
+        for key in STATE_KEYS:
+            settings.pop(key, None)
+        return settings, state
+
+    def save_settings(self, settings):
+        """
+        Lưu cấu hình (ghi sau ở thread nền)
+        """
+        self.settings_writer.schedule(settings)
+
+    def save_state(self, state):
+        """
+        Lưu trạng thái (ghi sau ở thread nền)
+        """
+        self.state_writer.schedule(state)
+
+    def flush(self):
+        """
+        Ghi ngay mọi dữ liệu đang chờ
+        """
+        self.settings_writer.flush()
+        self.state_writer.flush()
+
+    def close(self):
+        """
+        Ghi nốt và dừng các thread ghi
+        """
+        self.settings_writer.close()
+        self.state_writer.close()
@@ -0,0 +1,504 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Server giả lập er-sports.com chạy offline (stand-in)
+
+Phục vụ đúng các trang mà BrowserAutomation phụ thuộc để benchmark và kiểm thử
+end-to-end mà không chạm vào shop thật:
+- /index.html           : header có link ssl_login('login'), link logout khi đã đăng nhập
+- /shop/login.html      : form table.loginform (id, passwd) + nút login_check()
+- /shop/shopbrand.html  : listing ul.category-list, phân trang li.next "次の48件"
+- /shopdetail/<code>/   : trang chi tiết với .item-basket-btn a.btn-basket
+- /shop/basket.html     : giỏ hàng table.basket, nút basket_clear (confirm JS), nút sslorder
+- /ssl/sslorder.html    : trang checkout với nút xác nhận "注文を確定する"
+
+Có thể chỉnh độ trễ, số trang/số sản phẩm mỗi trang, bật popup WorldShopping và
+tài nguyên tĩnh (ảnh, web font, script widget tải từ host khác) cho benchmark chế độ lean.
+
+Cách chạy:
+    python src/standin_server.py --port 8765 --latency-ms 50 --pages 3 --popup
+"""
+
+import argparse
+import hashlib
+import html
+import random
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, urlencode
+
+# Query string giống PRODUCT_LIST_URL của shop thật
+LISTING_QUERY = ("search=mezz&sort=price_desc&money1=&money2=&prize1=&company1=&content1="
+                 "&originalcode1=&category=&subcategory=")
+
+
+def listing_path(query=LISTING_QUERY):
+    """
+    Đường dẫn trang listing (dùng để ghép PRODUCT_LIST_URL cho stand-in)
+    """
+    return f"/shop/shopbrand.html?{query}"
+
+
+class StandInShop:
+    """
+    Trạng thái của shop giả lập: catalog, session, giỏ hàng và đơn hàng
+    """
+
+    def __init__(self, pages=3, per_page=48, product_ids=None, product_page=None,
+                 latency_ms=0, jitter_ms=0, popup=False, popup_delay_ms=300, accounts=None, seed=1,
+                 etag=True, assets=False, asset_kb=20, images_per_page=8, asset_max_age=0):
+        """
+        Khởi tạo shop giả lập
+
+        Args:
+            pages (int): Số trang listing
+            per_page (int): Số sản phẩm mỗi trang
+            product_ids (list): Các product ID (được nhúng vào tên sản phẩm) cần có trong catalog
+            product_page (int): Trang đặt các product ID (mặc định: trang cuối)
+            latency_ms (int): Độ trễ cố định mỗi request (ms)
+            jitter_ms (int): Độ trễ ngẫu nhiên thêm vào (0..jitter_ms)
+            popup (bool): Chèn popup WorldShopping (#zigzag-modal) vào mọi trang
+            popup_delay_ms (int): Popup xuất hiện sau bao lâu kể từ khi tải trang
+            accounts (dict): {email: password}; None = chấp nhận mọi tài khoản
+            seed (int): Seed cho tên sản phẩm và jitter
+            etag (bool): Gửi ETag cho trang listing và trả 304 khi If-None-Match khớp
+            assets (bool): Chèn ảnh, web font và script widget (tải qua host "localhost"
+                để mô phỏng bên thứ ba) vào mọi trang
+            asset_kb (int): Kích thước mỗi ảnh/font (KB)
+            images_per_page (int): Số ảnh mỗi trang
+            asset_max_age (int): Cache-Control max-age (giây) của tài nguyên tĩnh, 0 = không gửi
+                (trình duyệt không cache được)
+        """
+        self.pages = max(1, pages)
+        self.per_page = max(1, per_page)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.popup = popup
+        self.popup_delay_ms = popup_delay_ms
+        self.accounts = accounts
+        self.etag = etag
+        self.assets = assets
+        self.asset_kb = asset_kb
+        self.images_per_page = images_per_page
+        self.asset_max_age = asset_max_age
+        self.asset_count = 0  # Số request tài nguyên tĩnh đã phục vụ
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self.sessions = {}  # token -> {'email', 'basket': [code]}
+        self.orders = []
+        self.request_count = 0
+        self.not_modified_count = 0
+
+        # Catalog: list các trang, mỗi trang là list (code, name)
+        self.catalog = []
+        self.products = {}
+        target_page = (product_page or self.pages) - 1
+        wanted = list(product_ids or [])
+        counter = 0
+        for page in range(self.pages):
+            items = []
+            for _ in range(self.per_page):
+                counter += 1
+                code = f"{counter:012d}"
+                name = f"ダミー商品 SHAFT-{counter:05d} カーボン"
+                if page == target_page and wanted:
+                    name = f"{wanted.pop(0)} シャフト {counter:05d}"
+                items.append((code, name))
+                self.products[code] = name
+            self.catalog.append(items)
+
+    def delay(self):
+        """
+        Mô phỏng độ trễ mạng/server
+        """
+        with self._lock:
+            self.request_count += 1
+            jitter = self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0
+        total = (self.latency_ms + jitter) / 1000.0
+        if total > 0:
+            time.sleep(total)
+
+    def new_session(self):
+        token = secrets.token_hex(16)
+        with self._lock:
+            self.sessions[token] = {'email': None, 'basket': []}
+        return token
+
+    def session(self, token):
+        with self._lock:
+            return self.sessions.get(token)
+
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="ja">
+<head><meta charset="utf-8"><title>{title} | er-sports stand-in</title>
+<script>
+function ssl_login(mode) {{ location.href = '/shop/login.html?mode=' + mode; }}
+function login_check() {{ document.forms['loginform'].submit(); }}
+function send(code) {{ document.forms['basket_form'].submit(); }}
+function basket_clear() {{
+  if (confirm('買い物かごを空にしますか？')) {{ location.href = '/shop/basket.html?mode=clear'; }}
+}}
+</script>
+</head>
+<body>
+<div id="header"><ul>{header_links}</ul></div>
+<div id="contents">
+{body}
+</div>
+{assets}
+{popup}
+</body>
+</html>
+"""
+
+POPUP_TEMPLATE = """<script>
+setTimeout(function () {{
+  var backdrop = document.createElement('div');
+  backdrop.className = 'modal-backdrop';
+  backdrop.style.cssText = 'position:fixed;top:0;left:0;width:100%;height:100%;background:rgba(0,0,0,.5);z-index:9998';
+  document.body.appendChild(backdrop);
+  var modal = document.createElement('div');
+  modal.id = 'zigzag-modal';
+  modal.className = 'worldshopping-popup';
+  modal.style.cssText = 'position:fixed;top:10%;left:10%;width:80%;height:80%;background:#fff;z-index:9999';
+  modal.innerHTML = '<p>WorldShopping</p><button type="button" id="zigzag-test__modal-close">'
+                  + '<img alt="Close" src="data:,"></button>';
+  document.body.appendChild(modal);
+}}, {delay});
+</script>"""
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    HTTP handler cho shop giả lập (shop được gắn vào server.shop)
+    """
+
+    server_version = "ERSportsStandIn/1.0"
+
+    # ------------------------------------------------------------------
+    # Tiện ích
+    # ------------------------------------------------------------------
+
+    @property
+    def shop(self):
+        return self.server.shop
+
+    def log_message(self, format, *args):
+        # Không in access log ra stderr (làm nhiễu kết quả benchmark)
+        pass
+
+    def _session(self):
+        """
+        Lấy (token, session) từ cookie, tạo mới nếu chưa có
+        """
+        cookies = {}
+        for part in (self.headers.get('Cookie') or '').split(';'):
+            if '=' in part:
+                key, value = part.strip().split('=', 1)
+                cookies[key] = value
+        token = cookies.get('ers_session')
+        session = self.shop.session(token) if token else None
+        if session is None:
+            token = self.shop.new_session()
+            session = self.shop.session(token)
+            self._new_token = token
+        return token, session
+
+    def _send(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        new_token = getattr(self, '_new_token', None)
+        if new_token:
+            self.send_header('Set-Cookie', f"ers_session={new_token}; Path=/")
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(data)
+
+    def _redirect(self, location):
+        self._send(303, "", headers={'Location': location})
+
+    def _page(self, title, body, session):
+        if session and session.get('email'):
+            header_links = ('<li><a href="/shop/basket.html">買い物かご</a></li>'
+                            '<li><a href="/shop/logout.html">ログアウト</a></li>')
+        else:
+            header_links = '<li><a href="javascript:ssl_login(\'login\')">ログイン</a></li>'
+        popup = POPUP_TEMPLATE.format(delay=self.shop.popup_delay_ms) if self.shop.popup else ""
+        return PAGE_TEMPLATE.format(title=html.escape(title), header_links=header_links, body=body,
+                                    popup=popup, assets=self._assets_html())
+
+    def _assets_html(self):
+        if not self.shop.assets:
+            return ""
+        port = self.server.server_address[1]
+        images = "".join(f'<img src="/static/img/{i}.png" width="80" height="80" alt="">'
+                         for i in range(self.shop.images_per_page))
+        return (f'<style>@font-face{{font-family:StandIn;src:url(/static/font/standin.woff2)}}'
+                f'body{{font-family:StandIn,sans-serif}}</style>'
+                f'<div class="banners">{images}</div>'
+                f'<script src="http://localhost:{port}/static/widget.js"></script>')
+
+    def _static(self, path):
+        with self.shop._lock:
+            self.shop.asset_count += 1
+        headers = {}
+        if self.shop.asset_max_age:
+            headers['Cache-Control'] = f"public, max-age={self.shop.asset_max_age}"
+        if path.endswith('.js'):
+            return self._send(200, "window.__standinWidget = true;", content_type="application/javascript",
+                              headers=headers)
+        content_type = 'font/woff2' if path.endswith('.woff2') else 'image/png'
+        data = b'\0' * (self.shop.asset_kb * 1024)
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_form(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length).decode('utf-8') if length else ''
+        return {key: values[0] for key, values in parse_qs(raw, keep_blank_values=True).items()}
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        self._new_token = None
+        self.shop.delay()
+        parts = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(parts.query, keep_blank_values=True).items()}
+        token, session = self._session()
+        path = parts.path
+
+        if path in ('/', '/index.html'):
+            return self._send(200, self._page("トップ", '<h1>er-sports stand-in</h1>', session))
+        if path == '/shop/login.html':
+            return self._send(200, self._page("ログイン", self._login_form(), session))
+        if path == '/shop/logout.html':
+            session['email'] = None
+            session['basket'] = []
+            return self._redirect('/index.html')
+        if path == '/shop/shopbrand.html':
+            return self._listing(query, session)
+        if path.startswith('/static/'):
+            return self._static(path)
+        if path.startswith('/shopdetail/'):
+            return self._detail(path, session)
+        if path == '/shop/basket.html':
+            if query.get('mode') == 'clear':
+                session['basket'] = []
+                return self._redirect('/shop/basket.html')
+            return self._basket(session)
+        if path == '/ssl/sslorder.html':
+            return self._order_form(session)
+        return self._send(404, self._page("404", '<p class="error">ページが見つかりません</p>', session))
+
+    def do_POST(self):
+        self._new_token = None
+        self.shop.delay()
+        path = urlsplit(self.path).path
+        token, session = self._session()
+        form = self._read_form()
+
+        if path == '/shop/login.html':
+            email = form.get('id', '').strip()
+            password = form.get('passwd', '')
+            accounts = self.shop.accounts
+            if email and password and (accounts is None or accounts.get(email) == password):
+                session['email'] = email
+                return self._redirect('/index.html')
+            return self._send(200, self._page("ログイン", self._login_form(
+                error="メールアドレスまたはパスワードが正しくありません"), session))
+        if path == '/shop/basket.html':
+            code = form.get('add')
+            if code in self.shop.products:
+                session['basket'].append(code)
+            return self._redirect('/shop/basket.html')
+        if path == '/ssl/sslorder.html':
+            if not session.get('email') or not session['basket']:
+                return self._redirect('/shop/basket.html')
+            with self.shop._lock:
+                self.shop.orders.append({'email': session['email'], 'items': list(session['basket'])})
+            session['basket'] = []
+            body = '<div class="order-complete"><h2>ご注文ありがとうございました</h2></div>'
+            return self._send(200, self._page("ご注文完了", body, session))
+        return self._send(404, self._page("404", '<p class="error">ページが見つかりません</p>', session))
+
+    # ------------------------------------------------------------------
+    # Trang
+    # ------------------------------------------------------------------
+
+    def _login_form(self, error=None):
+        error_html = f'<div class="error">{html.escape(error)}</div>' if error else ''
+        return f"""{error_html}
+<form name="loginform" method="post" action="/shop/login.html">
+<table class="loginform">
+<tr><th>メールアドレス</th><td><input type="text" name="id" value=""></td></tr>
+<tr><th>パスワード</th><td><input type="password" name="passwd" value=""></td></tr>
+</table>
+<div class="btn"><input type="button" value="ログイン" onclick="javascript:login_check();"></div>
+</form>"""
+
+    def _listing(self, query, session):
+        try:
+            page = int(query.get('page') or 1)
+        except ValueError:
+            page = 1
+        page = min(max(page, 1), self.shop.pages)
+        items = self.shop.catalog[page - 1]
+
+        rows = []
+        for code, name in items:
+            rows.append(
+                f'<li><div class="detail"><p class="name">'
+                f'<a href="/shopdetail/{code}/">{html.escape(name)}</a></p>'
+                f'<p class="price">10,000円</p></div></li>'
+            )
+        pager = []
+        if page < self.shop.pages:
+            next_query = dict(query)
+            next_query['page'] = str(page + 1)
+            pager.append(f'<li class="next"><a href="/shop/shopbrand.html?{html.escape(urlencode(next_query))}">'
+                         f'次の{self.shop.per_page}件 &raquo;</a></li>')
+        body = (f'<ul class="category-list">{"".join(rows)}</ul>'
+                f'<div class="pager"><ul>{"".join(pager)}</ul></div>')
+        page_html = self._page(f"商品一覧 {page}", body, session)
+        if not self.shop.etag:
+            return self._send(200, page_html)
+
+        etag = '"%s"' % hashlib.sha1(page_html.encode('utf-8')).hexdigest()[:16]
+        if self.headers.get('If-None-Match') == etag:
+            with self.shop._lock:
+                self.shop.not_modified_count += 1
+            return self._send(304, "", headers={'ETag': etag})
+        return self._send(200, page_html, headers={'ETag': etag})
+
+    def _detail(self, path, session):
+        code = path.strip('/').split('/')[-1]
+        name = self.shop.products.get(code)
+        if name is None:
+            return self._send(404, self._page("404", '<p class="error">ページが見つかりません</p>', session))
+        body = f"""<h2 class="item-name">{html.escape(name)}</h2>
+<form name="basket_form" method="post" action="/shop/basket.html">
+<input type="hidden" name="add" value="{code}">
+</form>
+<div class="item-basket-btn"><a class="btn-basket" href="JavaScript:send('{code}')">カートへ入れる</a></div>"""
+        return self._send(200, self._page(name, body, session))
+
+    def _basket(self, session):
+        basket = session['basket']
+        if not basket:
+            body = '<div class="basket-wrap"><p>買い物かごに商品がありません</p></div>'
+            return self._send(200, self._page("買い物かご", body, session))
+
+        rows = ['<tr><th>商品情報</th><th>数量</th></tr>']
+        for index, code in enumerate(basket):
+            rows.append(
+                f'<tr><td><a href="/shopdetail/{code}/">{html.escape(self.shop.products[code])}</a></td>'
+                f'<td><input type="text" name="amount_{index}" value="1"></td></tr>'
+            )
+        body = f"""<div class="basket-wrap">
+<table class="basket"><tbody>{"".join(rows)}</tbody></table>
+<div class="btn-wrap-back"><a href="javascript:basket_clear();">買い物かごを空にする</a></div>
+<div class="btn-wrap-order"><a class="btn" href="/ssl/sslorder.html">購入手続きへ進む</a></div>
+</div>"""
+        return self._send(200, self._page("買い物かご", body, session))
+
+    def _order_form(self, session):
+        if not session.get('email'):
+            return self._redirect('/shop/login.html')
+        body = """<form name="order" method="post" action="/ssl/sslorder.html">
+<p>ご注文内容の確認</p>
+<input type="button" name="checkout" class="checkout-confirm" value="注文を確定する"
+       onclick="document.forms['order'].submit();">
+</form>"""
+        return self._send(200, self._page("ご注文手続き", body, session))
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    ThreadingHTTPServer gắn với một StandInShop
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, shop):
+        super().__init__(address, StandInHandler)
+        self.shop = shop
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def serve_in_thread(shop=None, host='127.0.0.1', port=0):
+    """
+    Khởi chạy stand-in server trong thread nền
+
+    Args:
+        shop (StandInShop): Shop giả lập (mặc định: StandInShop())
+        host (str): Địa chỉ bind
+        port (int): Cổng (0 = tự chọn cổng trống)
+
+    Returns:
+        StandInServer: Server đang chạy (gọi shutdown() để dừng)
+    """
+    server = StandInServer((host, port), shop or StandInShop())
+    thread = threading.Thread(target=server.serve_forever, name="standin-server", daemon=True)
+    thread.start()
+    return server
+
+
+def main(argv=None):
+    """
+    Chạy stand-in server ở foreground
+    """
+    parser = argparse.ArgumentParser(description="Server giả lập er-sports.com cho benchmark/test")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--pages', type=int, default=3, help="Số trang listing")
+    parser.add_argument('--per-page', type=int, default=48, help="Số sản phẩm mỗi trang")
+    parser.add_argument('--product', action='append', dest='products', default=None,
+                        help="Product ID nhúng vào tên sản phẩm (lặp lại được)")
+    parser.add_argument('--product-page', type=int, default=None, help="Trang chứa các product ID")
+    parser.add_argument('--latency-ms', type=int, default=0, help="Độ trễ mỗi request (ms)")
+    parser.add_argument('--jitter-ms', type=int, default=0, help="Độ trễ ngẫu nhiên thêm (ms)")
+    parser.add_argument('--popup', action='store_true', help="Chèn popup WorldShopping")
+    parser.add_argument('--assets', action='store_true', help="Chèn ảnh, web font và script widget")
+    parser.add_argument('--asset-max-age', type=int, default=0,
+                        help="Cache-Control max-age (giây) của tài nguyên tĩnh, 0 = không cache")
+    args = parser.parse_args(argv)
+
+    shop = StandInShop(pages=args.pages, per_page=args.per_page, product_ids=args.products or ['MEZZ'],
+                       product_page=args.product_page, latency_ms=args.latency_ms,
+                       jitter_ms=args.jitter_ms, popup=args.popup, assets=args.assets,
+                       asset_max_age=args.asset_max_age)
+    server = StandInServer((args.host, args.port), shop)
+    print(f"Stand-in server đang chạy tại {server.base_url}")
+    print(f"PRODUCT_LIST_URL={server.base_url}{listing_path()}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Đo thời gian khởi động GUI (python src/main.py --profile-startup)
+
+Ghi thời lượng từng giai đoạn import và khởi tạo cùng các mốc (cửa sổ hiển thị lần
+đầu, đã load cấu hình), tính từ lúc bắt đầu import main.py. Thời gian khởi động
+interpreter trước đó không nằm trong bảng; xem chi tiết từng module bằng
+python -X importtime src/main.py.
+"""
+
+import sys
+import time
+from contextlib import contextmanager
+
+# Các thư viện nặng chỉ nên được import khi dùng tới (báo lại trong bảng để phát hiện hồi quy)
+HEAVY_MODULES = ('selenium', 'webdriver_manager', 'requests')
+
+
+class StartupProfile:
+    """
+    Các giai đoạn và mốc thời gian của một lần khởi động
+    """
+
+    def __init__(self, origin=None, clock=time.perf_counter):
+        """
+        Args:
+            origin (float): Thời điểm gốc theo clock (mặc định lúc tạo)
+            clock (callable): Đồng hồ đơn điệu (giây)
+        """
+        self._clock = clock
+        self.origin = origin if origin is not None else clock()
+        self.phases = []
+        self.marks = {}
+
+    def add(self, name, start, end):
+        """
+        Ghi một giai đoạn đã đo sẵn
+
+        Args:
+            name (str): Tên giai đoạn
+            start (float): Thời điểm bắt đầu theo clock
+            end (float): Thời điểm kết thúc theo clock
+        """
+        self.phases.append((name, start - self.origin, end - start))
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Đo một giai đoạn (with profile.phase('create_widgets'): ...)
+        """
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.add(name, start, self._clock())
+
+    def mark(self, name):
+        """
+        Ghi một mốc (chỉ lần đầu)
+
+        Returns:
+            float: Số giây từ gốc tới mốc
+        """
+        return self.marks.setdefault(name, self._clock() - self.origin)
+
+    def fields(self):
+        """
+        Các trường cho event 'startup' (giây, làm tròn 4 chữ số)
+
+        Returns:
+            dict: {'phases': {tên: thời lượng}, mốc: thời điểm}
+        """
+        fields = {'phases': {name: round(duration, 4) for name, _, duration in self.phases}}
+        for name, elapsed in self.marks.items():
+            fields[name] = round(elapsed, 4)
+        return fields
+
+    def report(self, modules=HEAVY_MODULES):
+        """
+        Bảng phân rã thời gian khởi động (ms)
+
+        Args:
+            modules (tuple): Các module nặng cần báo đã import hay chưa
+
+        Returns:
+            str: Bảng nhiều dòng
+        """
+        lines = ["[startup] Thời gian khởi động (ms, tính từ lúc import main.py)",
+                 f"  {'Giai đoạn':<32}{'bắt đầu':>10}{'thời lượng':>12}"]
+        for name, start, duration in self.phases:
+            lines.append(f"  {name:<32}{start * 1000:>10.1f}{duration * 1000:>12.1f}")
+        for name, elapsed in sorted(self.marks.items(), key=lambda item: item[1]):
+            lines.append(f"  -> {name:<29}{elapsed * 1000:>10.1f}")
+        loaded = [name for name in modules if name in sys.modules]
+        lines.append(f"  Module nặng đã import: {', '.join(loaded) if loaded else 'không'}")
+        return "\n".join(lines)
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Thống kê chạy automation cho GUI: thread worker ghi, GUI đọc snapshot bất biến
+
+Thread automation chỉ gọi các hàm record_*() (cập nhật dưới lock, không đụng tới Tk).
+GUI đọc snapshot() theo chu kỳ cố định và vẽ lại các label; nhiều lần cập nhật giữa hai
+lần vẽ được gộp thành một. Ngoài các bộ đếm, snapshot có:
+- Thông lượng: số lần quét mỗi phút trong cửa sổ trượt
+- p50/p95 thời gian từng bước (trên các lần chạy gần nhất)
+- Thời gian từ lần mua thành công gần nhất
+- Bước đang chạy và đã chạy bao lâu
+FlowStats cộng dồn thời gian chờ/làm việc theo flow cho WaitEngine (không cần selenium,
+nên engine/GUI dùng được mà chưa import browser).
+"""
+
+import time
+import threading
+from collections import deque
+from dataclasses import dataclass
+
+# Cửa sổ tính thông lượng (giây)
+DEFAULT_RATE_WINDOW = 300
+
+# Số lần đo gần nhất giữ lại cho mỗi bước để tính p50/p95
+DEFAULT_LATENCY_SAMPLES = 200
+
+
+def percentile(values, p):
+    """
+    Tính percentile bằng nội suy tuyến tính
+
+    Args:
+        values (list): Danh sách số
+        p (float): Percentile (0-100)
+
+    Returns:
+        float: Giá trị percentile, None nếu danh sách rỗng
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * p / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+@dataclass(frozen=True)
+class StepLatency:
+    name: str
+    count: int
+    p50: float
+    p95: float
+
+
+@dataclass(frozen=True)
+class StatsSnapshot:
+    version: int = 0
+    scans: int = 0
+    successes: int = 0
+    failures: int = 0
+    scans_per_minute: float = 0.0
+    steps: tuple = ()  # Các StepLatency, theo thứ tự bước xuất hiện lần đầu
+    since_last_success: float = None  # Giây, None = chưa có lần thành công
+    current_step: str = None
+    current_step_elapsed: float = None
+
+    @property
+    def success_rate(self):
+        return (self.successes / self.scans * 100) if self.scans else 0.0
+
+
+class StatsCollector:
+    """
+    Bộ đếm thống kê thread-safe, đọc ra bằng snapshot()
+    """
+
+    def __init__(self, rate_window=DEFAULT_RATE_WINDOW, latency_samples=DEFAULT_LATENCY_SAMPLES,
+                 clock=time.monotonic):
+        """
+        Args:
+            rate_window (float): Cửa sổ trượt tính số lần quét mỗi phút (giây)
+            latency_samples (int): Số lần đo giữ lại cho mỗi bước
+            clock (callable): Đồng hồ đơn điệu (giây)
+        """
+        self.rate_window = rate_window
+        self.latency_samples = latency_samples
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Đặt lại toàn bộ thống kê
+        """
+        with self._lock:
+            self._version = getattr(self, '_version', 0) + 1
+            self._started = self._clock()
+            self._scans = 0
+            self._successes = 0
+            self._failures = 0
+            self._scan_times = deque()
+            self._steps = {}
+            self._last_success = None
+            self._current_step = None
+            self._current_step_started = None
+
+    def record_scan(self):
+        """
+        Ghi nhận một lần thử mua (một lần quét sản phẩm)
+        """
+        with self._lock:
+            now = self._clock()
+            self._scans += 1
+            self._scan_times.append(now)
+            self._trim(now)
+            self._version += 1
+
+    def record_result(self, success):
+        """
+        Ghi nhận kết quả một lần mua
+
+        Args:
+            success (bool): Mua thành công
+        """
+        with self._lock:
+            if success:
+                self._successes += 1
+                self._last_success = self._clock()
+            else:
+                self._failures += 1
+            self._version += 1
+
+    def record_flow(self, flow_name, spans):
+        """
+        Ghi nhận thời gian các bước của một lần chạy flow
+
+        Args:
+            flow_name (str): Tên flow (login, purchase)
+            spans (dict): Cây span từ Tracer.breakdown()
+        """
+        if not spans:
+            return
+        with self._lock:
+            for child in spans.get('children', []):
+                name = f"{flow_name}.{child['name']}"
+                samples = self._steps.get(name)
+                if samples is None:
+                    samples = self._steps[name] = deque(maxlen=self.latency_samples)
+                samples.append(child['duration'])
+            self._version += 1
+
+    def set_current_step(self, name):
+        """
+        Đặt bước đang chạy (dùng làm listener của Tracer)
+
+        Args:
+            name (str): Tên bước, None = không chạy bước nào
+        """
+        with self._lock:
+            if name != self._current_step:
+                self._current_step = name
+                self._current_step_started = self._clock() if name else None
+                self._version += 1
+
+    def _trim(self, now):
+        while self._scan_times and now - self._scan_times[0] > self.rate_window:
+            self._scan_times.popleft()
+
+    def snapshot(self):
+        """
+        Ảnh chụp thống kê hiện tại (bất biến, an toàn để đọc từ thread khác)
+
+        Returns:
+            StatsSnapshot: Snapshot
+        """
+        with self._lock:
+            now = self._clock()
+            self._trim(now)
+            window = min(self.rate_window, now - self._started)
+            rate = len(self._scan_times) / window * 60 if window > 0 else 0.0
+            steps = tuple(StepLatency(name, len(samples), percentile(samples, 50), percentile(samples, 95))
+                          for name, samples in self._steps.items() if samples)
+            return StatsSnapshot(
+                version=self._version,
+                scans=self._scans,
+                successes=self._successes,
+                failures=self._failures,
+                scans_per_minute=rate,
+                steps=steps,
+                since_last_success=(now - self._last_success) if self._last_success is not None else None,
+                current_step=self._current_step,
+                current_step_elapsed=(now - self._current_step_started) if self._current_step else None,
+            )
+
+
+class FlowStats:
+    """
+    Bộ cộng dồn thời gian chờ/làm việc theo flow (thread-safe)
+
+    Có thể chia sẻ giữa nhiều WaitEngine (mỗi browser một engine) để GUI
+    có một báo cáo chung cho cả phiên chạy.
+    """
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, total, waiting):
+        """
+        Ghi nhận một lần chạy flow
+
+        Args:
+            name (str): Tên flow (login, purchase...)
+            total (float): Tổng thời gian (giây)
+            waiting (float): Thời gian chờ (giây)
+        """
+        with self._lock:
+            stats = self._stats.setdefault(name, {'runs': 0, 'total': 0.0, 'waiting': 0.0})
+            stats['runs'] += 1
+            stats['total'] += total
+            stats['waiting'] += waiting
+
+    def report(self):
+        """
+        Báo cáo thời gian chờ/làm việc theo flow
+
+        Returns:
+            dict: {flow: {'runs', 'total', 'waiting', 'working', 'waiting_ratio'}}
+        """
+        with self._lock:
+            report = {}
+            for name, stats in self._stats.items():
+                total = stats['total']
+                report[name] = {
+                    'runs': stats['runs'],
+                    'total': round(total, 3),
+                    'waiting': round(stats['waiting'], 3),
+                    'working': round(max(total - stats['waiting'], 0.0), 3),
+                    'waiting_ratio': round(stats['waiting'] / total, 3) if total > 0 else 0.0,
+                }
+            return report
+
+    def reset(self):
+        """
+        Xóa thống kê đã cộng dồn
+        """
+        with self._lock:
+            self._stats.clear()
+
+
+def format_duration(seconds):
+    """
+    Định dạng khoảng thời gian ngắn gọn cho label (45s, 12m05s, 3h20m)
+
+    Args:
+        seconds (float): Số giây, None = '-'
+
+    Returns:
+        str: Chuỗi hiển thị
+    """
+    if seconds is None:
+        return "-"
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Đo thời gian theo từng bước (span phân cấp) cho các flow login/purchase
+
+Mỗi span ghi lại thời điểm bắt đầu, thời lượng và các span con. Kết quả có thể:
+- Gắn vào dict kết quả dưới dạng cây thời gian (breakdown)
+- Xuất ra file JSON theo định dạng Chrome trace-event để mở bằng Perfetto
+  (https://ui.perfetto.dev) hoặc chrome://tracing
+"""
+
+import os
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+# Giới hạn số event giữ trong bộ nhớ cho một phiên chạy dài
+DEFAULT_MAX_EVENTS = 200000
+
+
+class Span:
+    """
+    Một khoảng thời gian được đo (có thể chứa span con)
+    """
+
+    __slots__ = ('name', 'args', 'start', 'end', 'children', 'is_step')
+
+    def __init__(self, name, args, start, is_step=False):
+        self.name = name
+        self.args = args
+        self.start = start
+        self.end = None
+        self.children = []
+        self.is_step = is_step
+
+    @property
+    def duration(self):
+        """
+        Thời lượng span (giây), tính đến hiện tại nếu span chưa kết thúc
+        """
+        end = self.end if self.end is not None else time.perf_counter()
+        return end - self.start
+
+
+class Tracer:
+    """
+    Bộ ghi span phân cấp (thread-safe, mỗi thread một stack riêng)
+
+    Dùng span() cho các khối lồng nhau và step() cho các bước tuần tự trong
+    cùng một span cha (step trước tự kết thúc khi step sau bắt đầu).
+    """
+
+    def __init__(self, max_events=DEFAULT_MAX_EVENTS, listener=None):
+        """
+        Khởi tạo tracer
+
+        Args:
+            max_events (int): Số event tối đa giữ lại để export
+            listener (callable): Gọi listener(tên span) khi span/step bắt đầu và khi quay về
+                span cha; listener(None) khi span ngoài cùng kết thúc (tùy chọn)
+        """
+        self.listener = listener
+        self._origin = time.perf_counter()
+        self._events = deque(maxlen=max_events)
+        self._threads = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _open(self, name, args, is_step=False):
+        span = Span(name, args, time.perf_counter(), is_step)
+        stack = self._stack()
+        if stack:
+            stack[-1].children.append(span)
+        stack.append(span)
+        if self.listener:
+            self.listener(name)
+        return span
+
+    def _close(self, span):
+        span.end = time.perf_counter()
+        thread = threading.current_thread()
+        event = {
+            'name': span.name,
+            'cat': 'automation',
+            'ph': 'X',
+            'ts': round((span.start - self._origin) * 1e6, 1),
+            'dur': round((span.end - span.start) * 1e6, 1),
+            'pid': os.getpid(),
+            'tid': thread.ident,
+        }
+        if span.args:
+            event['args'] = span.args
+        with self._lock:
+            self._events.append(event)
+            self._threads[thread.ident] = thread.name
+
+    def _close_until(self, span):
+        """
+        Kết thúc các span/step đang mở phía trên span (bao gồm cả span)
+        """
+        stack = self._stack()
+        while stack:
+            top = stack.pop()
+            self._close(top)
+            if top is span:
+                break
+        if self.listener:
+            self.listener(stack[-1].name if stack else None)
+
+    @contextmanager
+    def span(self, name, **args):
+        """
+        Context manager đo một khối code
+
+        Args:
+            name (str): Tên span (ví dụ: 'purchase', 'product_match')
+            **args: Thông tin thêm hiển thị trong trace (product_id, page...)
+
+        Yields:
+            Span: Span vừa mở
+        """
+        span = self._open(name, args)
+        try:
+            yield span
+        finally:
+            self._close_until(span)
+
+    def step(self, name, **args):
+        """
+        Bắt đầu một bước tuần tự trong span hiện tại
+
+        Bước trước đó (nếu đang mở) sẽ được kết thúc. Bước cuối cùng kết thúc
+        cùng với span cha.
+
+        Returns:
+            Span: Step vừa mở
+        """
+        stack = self._stack()
+        if stack and stack[-1].is_step:
+            self._close(stack.pop())
+        return self._open(name, args, is_step=True)
+
+    def end_step(self):
+        """
+        Kết thúc bước đang mở (nếu có) mà không mở bước mới
+        """
+        stack = self._stack()
+        if stack and stack[-1].is_step:
+            self._close(stack.pop())
+            if self.listener:
+                self.listener(stack[-1].name if stack else None)
+
+    @staticmethod
+    def breakdown(span):
+        """
+        Chuyển span thành cây dict để gắn vào kết quả
+
+        Returns:
+            dict: {'name', 'duration', 'args', 'children': [...]}
+        """
+        node = {'name': span.name, 'duration': round(span.duration, 3)}
+        if span.args:
+            node['args'] = dict(span.args)
+        if span.children:
+            node['children'] = [Tracer.breakdown(child) for child in span.children]
+        return node
+
+    def export_chrome_trace(self, filename):
+        """
+        Xuất toàn bộ span đã ghi ra file Chrome trace-event JSON
+
+        Args:
+            filename (str): Đường dẫn file .json
+
+        Returns:
+            int: Số event đã xuất
+        """
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+
+        pid = os.getpid()
+        metadata = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                     'args': {'name': 'ER Sports Automation'}}]
+        for tid, thread_name in threads.items():
+            metadata.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                             'args': {'name': thread_name}})
+
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+        return len(events)
+
+    def clear(self):
+        """
+        Xóa các event đã ghi
+        """
+        with self._lock:
+            self._events.clear()
+
+
+class RoundTripCounter:
+    """
+    Đếm số lệnh WebDriver (mỗi lệnh là một round trip HTTP tới chromedriver)
+
+    Bọc driver.execute của instance, nên mọi lệnh (find_element, .text,
+    execute_script...) đều được đếm mà không cần sửa code gọi.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def attach(self, driver):
+        """
+        Gắn bộ đếm vào driver (gọi lại nhiều lần không đếm trùng)
+
+        Args:
+            driver: Selenium WebDriver
+
+        Returns:
+            bool: True nếu gắn thành công
+        """
+        execute = getattr(driver, 'execute', None)
+        if execute is None:
+            return False
+        if getattr(execute, '__round_trip_counter__', None) is self:
+            return True
+
+        def counted_execute(*args, **kwargs):
+            with self._lock:
+                self.count += 1
+            return execute(*args, **kwargs)
+
+        counted_execute.__round_trip_counter__ = self
+        driver.execute = counted_execute
+        return True
+
+    def mark(self):
+        """
+        Lấy giá trị bộ đếm hiện tại (dùng để tính số round trip của một đoạn code)
+
+        Returns:
+            int: Tổng số lệnh đã đếm
+        """
+        return self.count
+
+    def since(self, mark):
+        """
+        Số lệnh kể từ một mốc mark()
+
+        Returns:
+            int: Số round trip
+        """
+        return self.count - mark
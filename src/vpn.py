@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Đổi IP bằng OpenVPN (kết nối/ngắt theo danh sách file .ovpn)
+"""
+
+import os
+import time
+import random
+import subprocess
+
+
+class OpenVPNManager:
+    """
+    Class quản lý kết nối OpenVPN
+    Sử dụng để thay đổi IP address bằng cách kết nối/disconnect VPN
+    """
+
+    def __init__(self, openvpn_path=None):
+        """
+        Khởi tạo OpenVPN Manager
+
+        Args:
+            openvpn_path (str): Đường dẫn đến OpenVPN executable
+        """
+        self.openvpn_path = openvpn_path or "C:\\Program Files\\OpenVPN\\bin\\openvpn.exe"
+        self.current_connection = None
+        self.config_files = []
+        self.current_config_index = 0
+
+    def load_config_files(self, config_files):
+        """
+        Nạp danh sách file config OpenVPN
+
+        Args:
+            config_files (list): List các đường dẫn đến file .ovpn
+        """
+        self.config_files = [f for f in config_files if os.path.exists(f)]
+
+    def connect(self, config_file):
+        """
+        Kết nối VPN sử dụng config file
+
+        Args:
+            config_file (str): Đường dẫn đến file .ovpn
+
+        Returns:
+            bool: True nếu kết nối thành công
+        """
+        try:
+            if not os.path.exists(config_file):
+                print(f"File config không tồn tại: {config_file}")
+                return False
+
+            # Đóng kết nối cũ nếu có
+            self.disconnect()
+
+            # Kết nối OpenVPN với config file
+            self.current_connection = subprocess.Popen(
+                [self.openvpn_path, '--config', config_file],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+
+            # Đợi kết nối thành công (tối đa 30 giây)
+            time.sleep(5)
+
+            # Kiểm tra xem process còn chạy không
+            if self.current_connection and self.current_connection.poll() is None:
+                return True
+            else:
+                return False
+
+        except Exception as e:
+            print(f"Lỗi khi kết nối VPN: {str(e)}")
+            return False
+
+    def disconnect(self):
+        """
+        Ngắt kết nối VPN hiện tại
+        """
+        try:
+            if self.current_connection:
+                self.current_connection.terminate()
+                self.current_connection.wait(timeout=10)
+                self.current_connection = None
+
+            # Đảm bảo đóng tất cả OpenVPN processes
+            subprocess.run(['taskkill', '/F', '/IM', 'openvpn.exe'],
+                           capture_output=True)
+
+            time.sleep(3)
+
+        except Exception as e:
+            print(f"Lỗi khi ngắt kết nối VPN: {str(e)}")
+
+    def connect_random_japan(self):
+        """
+        Kết nối VPN random với một IP Nhật Bản
+
+        Returns:
+            str: Đường dẫn config file được sử dụng, None nếu thất bại
+        """
+        if not self.config_files:
+            print("Không có config file nào được load")
+            return None
+
+        # Random một config file
+        selected_config = random.choice(self.config_files)
+
+        if self.connect(selected_config):
+            return selected_config
+        else:
+            return None
+
+    def connect_next_japan(self):
+        """
+        Kết nối VPN với IP Nhật Bản tiếp theo trong danh sách
+
+        Returns:
+            str: Đường dẫn config file được sử dụng, None nếu thất bại
+        """
+        if not self.config_files:
+            print("Không có config file nào được load")
+            return None
+
+        # Lấy config file tiếp theo
+        config_file = self.config_files[self.current_config_index % len(self.config_files)]
+        self.current_config_index += 1
+
+        if self.connect(config_file):
+            return config_file
+        else:
+            return None
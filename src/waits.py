@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Wait engine cho BrowserAutomation
+
+Thay thế các lệnh time.sleep() cố định bằng các điều kiện chờ theo sự kiện:
+document ready, URL thay đổi, element xuất hiện và alert xuất hiện.
+Đồng thời đo thời gian mỗi flow dành cho việc chờ so với thời gian làm việc.
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, \
+    StaleElementReferenceException, JavascriptException
+
+try:
+    from .stats import FlowStats
+except ImportError:
+    from stats import FlowStats
+
+# Timeout mặc định (giây) cho từng loại bước chờ
+DEFAULT_STEP_TIMEOUTS = {
+    'page_load': 15,
+    'element': 10,
+    'clickable': 10,
+    'url_change': 15,
+    'alert': 5,
+    'probe': 5,  # Chờ ngắn cho selector dự phòng / kiểm tra tùy chọn
+}
+
+# Trạng thái document cần chờ sau khi mở trang, theo page load strategy của Chrome
+READY_STATES = {
+    'normal': 'complete',
+    'eager': 'interactive',
+    'none': 'interactive',
+}
+
+# Đánh dấu document cũ trước khi mở trang (strategy 'none': get() trả về trước khi trang mới commit)
+NAVIGATION_MARKER_SCRIPT = "window.__ersNavigating = true;"
+
+# Chu kỳ poll của WebDriverWait (mặc định của selenium là 0.5s - quá chậm)
+DEFAULT_POLL_FREQUENCY = 0.1
+
+
+class WaitEngine:
+    """
+    Lớp chờ dùng chung cho mọi bước của login/purchase
+
+    Mọi lần chờ đều đi qua engine để:
+    - Dùng timeout riêng cho từng bước
+    - Cộng dồn thời gian chờ vào flow đang chạy (login, purchase...)
+    """
+
+    def __init__(self, driver=None, timeouts=None, poll_frequency=DEFAULT_POLL_FREQUENCY, flow_stats=None,
+                 page_load_strategy='normal'):
+        """
+        Khởi tạo wait engine
+
+        Args:
+            driver: Selenium WebDriver (có thể gán sau bằng bind())
+            timeouts (dict): Ghi đè timeout mặc định theo loại bước
+            poll_frequency (float): Chu kỳ kiểm tra điều kiện (giây)
+            flow_stats (FlowStats): Bộ cộng dồn dùng chung (tạo mới nếu None)
+            page_load_strategy (str): Strategy của Chrome ('normal', 'eager', 'none'), quyết định
+                trạng thái document cần chờ sau khi mở trang
+        """
+        self.driver = driver
+        self.timeouts = dict(DEFAULT_STEP_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+        self.poll_frequency = poll_frequency
+        self.flow_stats = flow_stats if flow_stats is not None else FlowStats()
+        self.page_load_strategy = page_load_strategy
+        self.ready_state = READY_STATES.get(page_load_strategy, 'complete')
+        self._local = threading.local()
+
+    def bind(self, driver):
+        """
+        Gắn driver mới (sau khi setup_driver hoặc khởi động lại browser)
+        """
+        self.driver = driver
+
+    def _timeout(self, kind, timeout):
+        return timeout if timeout is not None else self.timeouts.get(kind, 10)
+
+    def _current_flow(self):
+        return getattr(self._local, 'flow', None)
+
+    def until(self, kind, condition, timeout=None, message=''):
+        """
+        Chờ condition với timeout theo loại bước, cộng dồn thời gian chờ
+
+        Raises:
+            TimeoutException: Nếu điều kiện không thỏa mãn trong thời gian cho phép
+        """
+        started = time.perf_counter()
+        try:
+            return WebDriverWait(
+                self.driver,
+                self._timeout(kind, timeout),
+                poll_frequency=self.poll_frequency,
+                ignored_exceptions=(NoSuchElementException, StaleElementReferenceException,
+                                    JavascriptException)
+            ).until(condition, message)
+        finally:
+            self._record_wait(time.perf_counter() - started)
+
+    def _record_wait(self, elapsed):
+        flow = self._current_flow()
+        if flow is not None:
+            flow['waiting'] += elapsed
+
+    # ------------------------------------------------------------------
+    # Các điều kiện chờ
+    # ------------------------------------------------------------------
+
+    def document_ready(self, timeout=None, state=None):
+        """
+        Chờ document.readyState đạt trạng thái mong muốn
+
+        Args:
+            state (str): 'complete' hoặc 'interactive' (DOM đã dùng được),
+                None = theo page load strategy
+        """
+        state = state or self.ready_state
+        accepted = ('interactive', 'complete') if state == 'interactive' else ('complete',)
+        return self.until(
+            'page_load',
+            lambda d: d.execute_script(
+                "return window.__ersNavigating ? 'navigating' : document.readyState") in accepted,
+            timeout,
+            f"document.readyState != {state}"
+        )
+
+    def url_changes(self, old_url, timeout=None):
+        """
+        Chờ URL hiện tại khác old_url
+        """
+        return self.until('url_change', EC.url_changes(old_url), timeout, f"URL vẫn là {old_url}")
+
+    def url_contains(self, *fragments, timeout=None):
+        """
+        Chờ URL hiện tại chứa một trong các chuỗi fragments
+        """
+        return self.until(
+            'url_change',
+            lambda d: any(fragment in d.current_url for fragment in fragments),
+            timeout,
+            f"URL không chứa {fragments}"
+        )
+
+    def element(self, selector, timeout=None, by=By.CSS_SELECTOR):
+        """
+        Chờ element xuất hiện trong DOM
+
+        Returns:
+            WebElement: Element tìm được
+        """
+        return self.until('element', EC.presence_of_element_located((by, selector)), timeout,
+                          f"Không tìm thấy {selector}")
+
+    def clickable(self, selector, timeout=None, by=By.CSS_SELECTOR):
+        """
+        Chờ element có thể click được
+
+        Returns:
+            WebElement: Element tìm được
+        """
+        return self.until('clickable', EC.element_to_be_clickable((by, selector)), timeout,
+                          f"Không click được {selector}")
+
+    def staleness(self, element, timeout=None):
+        """
+        Chờ element cũ bị gỡ khỏi DOM (trang đã chuyển hoặc reload)
+        """
+        return self.until('url_change', EC.staleness_of(element), timeout, "Trang chưa chuyển")
+
+    def alert(self, timeout=None):
+        """
+        Chờ alert JavaScript xuất hiện
+
+        Returns:
+            Alert: Alert hiện tại
+        """
+        return self.until('alert', EC.alert_is_present(), timeout, "Không có alert")
+
+    def optional(self, method, *args, **kwargs):
+        """
+        Gọi một điều kiện chờ nhưng trả về None thay vì raise TimeoutException
+        """
+        try:
+            return method(*args, **kwargs)
+        except TimeoutException:
+            return None
+
+    def navigate(self, url, timeout=None, state=None):
+        """
+        Truy cập URL rồi chờ document sẵn sàng (thay cho get() + sleep(2))
+
+        Với strategy 'eager'/'none', get() trả về sớm và việc chờ DOM dùng được
+        (readyState 'interactive' của document mới) được làm ở đây. get() vượt page load
+        timeout thì dừng tải (window.stop()) và để document_ready quyết định.
+        """
+        started = time.perf_counter()
+        try:
+            if self.page_load_strategy == 'none':
+                try:
+                    self.driver.execute_script(NAVIGATION_MARKER_SCRIPT)
+                except Exception:
+                    pass
+            try:
+                self.driver.get(url)
+            except TimeoutException:
+                # Trang chậm (thường do tài nguyên phụ): DOM có thể đã dùng được
+                try:
+                    self.driver.execute_script("window.stop();")
+                except Exception:
+                    pass
+        finally:
+            # Thời gian driver.get() chặn cũng là thời gian chờ trang tải
+            self._record_wait(time.perf_counter() - started)
+        return self.optional(self.document_ready, timeout, state)
+
+    # ------------------------------------------------------------------
+    # Đo thời gian theo flow
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def flow(self, name):
+        """
+        Context manager đánh dấu một flow (login, purchase...) để đo thời gian
+
+        Yields:
+            dict: Thống kê của lần chạy hiện tại {'total', 'waiting', 'working'}
+        """
+        previous = self._current_flow()
+        current = {'total': 0.0, 'waiting': 0.0, 'working': 0.0}
+        self._local.flow = current
+        started = time.perf_counter()
+        try:
+            yield current
+        finally:
+            current['total'] = time.perf_counter() - started
+            current['working'] = max(current['total'] - current['waiting'], 0.0)
+            self._local.flow = previous
+            if previous is not None:
+                # Flow lồng nhau: thời gian chờ cũng tính cho flow cha
+                previous['waiting'] += current['waiting']
+            self.flow_stats.record(name, current['total'], current['waiting'])
+
+    def report(self):
+        """
+        Báo cáo thời gian chờ/làm việc theo flow
+
+        Returns:
+            dict: Xem FlowStats.report()
+        """
+        return self.flow_stats.report()
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Theo dõi bộ nhớ/CPU của Chrome và dọn process Chrome/ChromeDriver mồ côi
+
+- ChromeWatchdog đo RSS và CPU của cả cây process dưới ChromeDriver (ChromeDriver, Chrome,
+  renderer, GPU...) tại các điểm an toàn giữa hai sản phẩm. Khi vượt ngưỡng, engine khởi động
+  lại browser ngay tại điểm đó, không phải giữa một lần mua.
+- ProcessRegistry ghi các process do app khởi động vào config/chrome_pids.json. Lúc mở và đóng
+  app, các process còn sót (app trước bị crash, bị kill) được dọn. Chỉ process đã ghi, cùng tên
+  và cùng thời điểm khởi động, mới bị kill, nên không đụng tới Chrome của người dùng.
+
+Đọc process qua psutil nếu đã cài (pip install psutil), không có thì đọc /proc (Linux).
+Trên Windows/macOS không có psutil thì watchdog và dọn process mồ côi bị tắt.
+"""
+
+import os
+import json
+import time
+import signal
+import threading
+from collections import deque
+from dataclasses import dataclass
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    from .settings_store import atomic_write_text, read_json
+except ImportError:
+    from settings_store import atomic_write_text, read_json
+
+PIDS_FILENAME = 'chrome_pids.json'
+PIDS_VERSION = 1
+
+# Sai số cho phép khi so thời điểm khởi động process (giây) để phát hiện PID bị dùng lại
+CREATED_TOLERANCE = 1.0
+
+# Ngưỡng mặc định (ghi đè bằng browser.watchdog trong config.json)
+DEFAULT_MAX_RSS_MB = 1500
+DEFAULT_SAMPLE_INTERVAL = 30
+
+# Khi RSS đạt tỷ lệ này của ngưỡng thì khởi động trước Chrome thay thế
+PREWARM_RATIO = 0.8
+
+# Số mẫu giữ lại cho báo cáo (30 giây/mẫu -> 24 giờ)
+MAX_SAMPLES = 2880
+
+MB = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ProcessInfo:
+    pid: int
+    name: str
+    created: float  # Epoch giây
+    rss: int  # Byte
+    cpu: float  # CPU time user + system (giây)
+
+
+@dataclass(frozen=True)
+class MemorySample:
+    elapsed: float  # Giây từ lúc bắt đầu theo dõi
+    rss_mb: float
+    cpu_percent: float  # 100 = một core
+    processes: int
+
+
+class PsutilProcesses:
+    """
+    Đọc process qua psutil (Windows, macOS, Linux)
+    """
+
+    name = 'psutil'
+
+    def tree(self, pid):
+        """
+        Returns:
+            list: PID gốc và mọi process con (đệ quy), [] nếu process không còn
+        """
+        try:
+            root = psutil.Process(pid)
+            return [pid] + [child.pid for child in root.children(recursive=True)]
+        except psutil.Error:
+            return []
+
+    def info(self, pid):
+        """
+        Returns:
+            ProcessInfo: Thông tin process, None nếu không còn (hoặc là zombie)
+        """
+        try:
+            process = psutil.Process(pid)
+            with process.oneshot():
+                if process.status() == psutil.STATUS_ZOMBIE:
+                    return None
+                times = process.cpu_times()
+                return ProcessInfo(pid, process.name(), process.create_time(), process.memory_info().rss,
+                                   times.user + times.system)
+        except psutil.Error:
+            return None
+
+    def kill(self, pid):
+        try:
+            psutil.Process(pid).kill()
+        except psutil.Error:
+            pass
+
+
+class ProcfsProcesses:
+    """
+    Đọc process qua /proc (Linux, không cần psutil)
+    """
+
+    name = 'procfs'
+
+    def __init__(self, root='/proc'):
+        self.root = root
+        self._ticks = os.sysconf('SC_CLK_TCK')
+        self._page_size = os.sysconf('SC_PAGE_SIZE')
+        self._boot_time = 0.0
+        try:
+            with open(os.path.join(root, 'stat'), encoding='ascii') as f:
+                for line in f:
+                    if line.startswith('btime '):
+                        self._boot_time = float(line.split()[1])
+                        break
+        except OSError:
+            pass
+
+    def _stat(self, pid):
+        """
+        Đọc /proc/<pid>/stat
+
+        Returns:
+            tuple: (tên, trạng thái, ppid, các trường còn lại) hoặc None
+        """
+        try:
+            with open(os.path.join(self.root, str(pid), 'stat'), encoding='utf-8', errors='replace') as f:
+                data = f.read()
+        except OSError:
+            return None
+        # Tên process nằm trong ngoặc và có thể chứa khoảng trắng
+        name = data[data.find('(') + 1:data.rfind(')')]
+        fields = data[data.rfind(')') + 2:].split()
+        return name, fields[0], int(fields[1]), fields
+
+    def tree(self, pid):
+        if self._stat(pid) is None:
+            return []
+        children = {}
+        for entry in os.listdir(self.root):
+            if entry.isdigit():
+                stat = self._stat(int(entry))
+                if stat is not None:
+                    children.setdefault(stat[2], []).append(int(entry))
+        pids = [pid]
+        index = 0
+        while index < len(pids):
+            pids.extend(children.get(pids[index], ()))
+            index += 1
+        return pids
+
+    def info(self, pid):
+        stat = self._stat(pid)
+        if stat is None or stat[1] == 'Z':
+            return None
+        name, _, _, fields = stat
+        return ProcessInfo(pid, name, round(self._boot_time + int(fields[19]) / self._ticks, 2),
+                           int(fields[21]) * self._page_size, (int(fields[11]) + int(fields[12])) / self._ticks)
+
+    def kill(self, pid):
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+def default_processes():
+    """
+    Cách đọc process có trên máy: psutil, /proc, hoặc None (không theo dõi được)
+    """
+    if psutil is not None:
+        return PsutilProcesses()
+    if os.path.isdir('/proc/self'):
+        return ProcfsProcesses()
+    return None
+
+
+def tree_usage(processes, pid):
+    """
+    Tổng RSS và CPU time của cây process
+
+    Returns:
+        tuple: (rss byte, cpu giây, số process)
+    """
+    rss = 0
+    cpu = 0.0
+    count = 0
+    for child in processes.tree(pid):
+        info = processes.info(child)
+        if info is not None:
+            rss += info.rss
+            cpu += info.cpu
+            count += 1
+    return rss, cpu, count
+
+
+class ChromeWatchdog:
+    """
+    Đo RSS/CPU của browser đang dùng và báo khi cần khởi động lại
+    """
+
+    def __init__(self, max_rss_mb=DEFAULT_MAX_RSS_MB, max_cpu_percent=0, cpu_samples=3,
+                 interval=DEFAULT_SAMPLE_INTERVAL, processes=None, clock=time.monotonic):
+        """
+        Args:
+            max_rss_mb (int): Ngưỡng tổng RSS của cây process (MB, 0 = không giới hạn)
+            max_cpu_percent (float): Ngưỡng CPU giữa hai lần đo (100 = một core, 0 = không giới hạn)
+            cpu_samples (int): Số lần đo liên tiếp vượt ngưỡng CPU trước khi khởi động lại
+            interval (float): Khoảng cách tối thiểu giữa hai lần đo (giây)
+            processes: Cách đọc process (mặc định default_processes(), tắt nếu máy không hỗ trợ)
+            clock (callable): Đồng hồ đơn điệu (giây)
+        """
+        self.max_rss_mb = max_rss_mb
+        self.max_cpu_percent = max_cpu_percent
+        self.cpu_samples = cpu_samples
+        self.interval = interval
+        self.processes = processes if processes is not None else default_processes()
+        self._clock = clock
+        self._origin = clock()
+        self._pid = None
+        self._last = None  # (thời điểm, cpu giây) của lần đo trước
+        self._due = 0.0
+        self._cpu_over = 0
+        self.samples = deque(maxlen=MAX_SAMPLES)
+        self.last_sample = None
+        self.recycles = []
+
+    @property
+    def enabled(self):
+        return self.processes is not None and bool(self.max_rss_mb or self.max_cpu_percent)
+
+    def attach(self, pid):
+        """
+        Theo dõi cây process dưới ChromeDriver pid (giữ nguyên số đo nếu vẫn là browser cũ)
+
+        Args:
+            pid (int): PID của ChromeDriver (BrowserAutomation.process_id())
+        """
+        if pid == self._pid:
+            return
+        self._pid = pid
+        self._last = None
+        self._cpu_over = 0
+        self._due = 0.0
+        self.last_sample = None
+
+    def check(self):
+        """
+        Đo (nếu đã tới lượt) và trả lý do cần khởi động lại browser
+
+        Returns:
+            str: Lý do vượt ngưỡng, None nếu chưa cần (hoặc chưa tới lượt đo)
+        """
+        if not self.enabled or self._pid is None:
+            return None
+        now = self._clock()
+        if now < self._due:
+            return None
+        self._due = now + self.interval
+
+        rss, cpu, count = tree_usage(self.processes, self._pid)
+        if not count:
+            return None
+        cpu_percent = 0.0
+        if self._last is not None and now > self._last[0]:
+            cpu_percent = max(cpu - self._last[1], 0.0) / (now - self._last[0]) * 100
+        self._last = (now, cpu)
+        self.last_sample = MemorySample(round(now - self._origin, 1), round(rss / MB, 1), round(cpu_percent, 1), count)
+        self.samples.append(self.last_sample)
+
+        if self.max_rss_mb and rss / MB > self.max_rss_mb:
+            return f"RSS {rss / MB:.0f} MB > {self.max_rss_mb} MB"
+        if self.max_cpu_percent and cpu_percent > self.max_cpu_percent:
+            self._cpu_over += 1
+            if self._cpu_over >= self.cpu_samples:
+                return f"CPU {cpu_percent:.0f}% > {self.max_cpu_percent:g}% trong {self._cpu_over} lần đo liên tiếp"
+        else:
+            self._cpu_over = 0
+        return None
+
+    def near_limit(self):
+        """
+        RSS lần đo gần nhất đã tới PREWARM_RATIO của ngưỡng (nên khởi động trước Chrome thay thế)
+        """
+        sample = self.last_sample
+        return bool(self.max_rss_mb and sample and sample.rss_mb >= self.max_rss_mb * PREWARM_RATIO)
+
+    def record_recycle(self, reason):
+        """
+        Ghi một lần khởi động lại browser và bỏ theo dõi browser cũ
+        """
+        self.recycles.append({'elapsed': round(self._clock() - self._origin, 1), 'reason': reason})
+        self._pid = None
+
+    def report(self):
+        """
+        Chuỗi thời gian bộ nhớ cho báo cáo
+
+        Returns:
+            dict: {'enabled', 'backend', 'max_rss_mb', 'max_cpu_percent', 'peak_rss_mb', 'recycles',
+                'series': [[giây, RSS MB, CPU %, số process], ...]}
+        """
+        samples = list(self.samples)
+        return {
+            'enabled': self.enabled,
+            'backend': self.processes.name if self.processes is not None else None,
+            'max_rss_mb': self.max_rss_mb,
+            'max_cpu_percent': self.max_cpu_percent,
+            'peak_rss_mb': max((sample.rss_mb for sample in samples), default=None),
+            'recycles': list(self.recycles),
+            'series': [[sample.elapsed, sample.rss_mb, sample.cpu_percent, sample.processes] for sample in samples],
+        }
+
+
+class ProcessRegistry:
+    """
+    Danh sách process Chrome/ChromeDriver do app khởi động (chrome_pids.json)
+    """
+
+    def __init__(self, path, processes=None, owner=None):
+        """
+        Args:
+            path (str): File chrome_pids.json
+            processes: Cách đọc process (mặc định default_processes(), tắt nếu máy không hỗ trợ)
+            owner (int): PID của app (mặc định process hiện tại)
+        """
+        self.path = path
+        self.processes = processes if processes is not None else default_processes()
+        self.owner = owner if owner is not None else os.getpid()
+        self._owner_created = self._created(self.owner)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.processes is not None
+
+    def _created(self, pid):
+        info = self.processes.info(pid) if self.processes is not None else None
+        return info.created if info is not None else None
+
+    def _load(self):
+        data = read_json(self.path)
+        groups = data.get('groups') if data.get('version') == PIDS_VERSION else None
+        return groups if isinstance(groups, dict) else {}
+
+    def _save(self, groups):
+        if groups:
+            atomic_write_text(self.path, json.dumps({'version': PIDS_VERSION, 'groups': groups}, indent=2))
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _matches(self, entry):
+        """
+        Process trong entry vẫn là process đã ghi (không phải PID đã bị hệ điều hành cấp lại)
+        """
+        info = self.processes.info(entry.get('pid'))
+        return (info is not None and info.name == entry.get('name')
+                and abs(info.created - entry.get('created', 0)) <= CREATED_TOLERANCE)
+
+    def _kill_group(self, group):
+        """
+        Kill các process còn sống của group và process con của chúng
+
+        Returns:
+            int: Số process đã kill
+        """
+        pids = []
+        for entry in group.get('processes', ()):
+            if isinstance(entry, dict) and self._matches(entry):
+                pids.extend(pid for pid in self.processes.tree(entry['pid']) if pid not in pids)
+        for pid in pids:
+            self.processes.kill(pid)
+        return len(pids)
+
+    def register(self, pid):
+        """
+        Ghi cây process của ChromeDriver vừa khởi động (ChromeDriver và Chrome)
+
+        Args:
+            pid (int): PID của ChromeDriver
+        """
+        if not self.enabled or pid is None:
+            return
+        entries = []
+        for child in self.processes.tree(pid):
+            info = self.processes.info(child)
+            if info is not None:
+                entries.append({'pid': info.pid, 'name': info.name, 'created': info.created})
+        if not entries:
+            return
+        with self._lock:
+            groups = self._load()
+            groups[str(pid)] = {'owner': self.owner, 'owner_created': self._owner_created, 'processes': entries}
+            self._save(groups)
+
+    def release(self, pid):
+        """
+        Bỏ ghi ChromeDriver đã đóng, kill các process của nó còn sót lại sau quit()
+
+        Args:
+            pid (int): PID của ChromeDriver
+
+        Returns:
+            int: Số process đã kill
+        """
+        if not self.enabled or pid is None:
+            return 0
+        with self._lock:
+            groups = self._load()
+            group = groups.pop(str(pid), None)
+            killed = self._kill_group(group) if group else 0
+            self._save(groups)
+        return killed
+
+    def sweep(self, own=False):
+        """
+        Kill process của các app đã thoát (và của chính app này nếu own=True, lúc đóng app)
+
+        Returns:
+            int: Số process đã kill
+        """
+        if not self.enabled:
+            return 0
+        killed = 0
+        with self._lock:
+            groups = self._load()
+            for key, group in list(groups.items()):
+                if not isinstance(group, dict):
+                    del groups[key]
+                    continue
+                owner = group.get('owner')
+                if owner == self.owner and group.get('owner_created') == self._owner_created:
+                    if not own:
+                        continue
+                else:
+                    # App khác đang chạy (cùng máy, cùng thư mục config) thì không đụng tới
+                    info = self.processes.info(owner) if isinstance(owner, int) else None
+                    if info is not None and group.get('owner_created') is not None \
+                            and abs(info.created - group['owner_created']) <= CREATED_TOLERANCE:
+                        continue
+                killed += self._kill_group(group)
+                del groups[key]
+            self._save(groups)
+        if killed:
+            print(f"[watchdog] Đã dọn {killed} process Chrome/ChromeDriver còn sót")
+        return killed
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cases cho chế độ dòng lệnh (không giao diện)
+"""
+
+import unittest
+import sys
+import os
+import io
+import json
+import signal
+import tempfile
+import threading
+import subprocess
+
+# Thêm src vào path để import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from cli import ConsoleReporter, build_options, install_signal_handlers, load_run_settings, \
+    restore_signal_handlers, EXIT_CONFIG, EXIT_OK
+from config_loader import AppConfig, ConfigError
+
+CLI = os.path.join(os.path.dirname(__file__), '..', 'src', 'cli.py')
+
+
+class TestSettings(unittest.TestCase):
+    """
+    Test cases cho đọc settings.json và dựng RunOptions
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'settings.json')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, data):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def test_load_run_settings(self):
+        """Test tài khoản/sản phẩm được kiểm tra và bỏ trùng"""
+        self.write({'accounts': [{'email': 'a@x.com', 'password': 123}, {'email': 'a@x.com', 'password': 'x'},
+                                 {'email': 'b@x.com'}],
+                    'products': [{'productId': 12345}, {'productId': '12345'}, {'productId': 'B'}]})
+        accounts, products, settings = load_run_settings(self.path)
+        self.assertEqual(accounts, [{'email': 'a@x.com', 'password': '123'}])
+        self.assertEqual(products, [{'productId': '12345'}, {'productId': 'B'}])
+
+    def test_load_run_settings_errors(self):
+        """Test file không có hoặc không phải object"""
+        with self.assertRaises(ConfigError):
+            load_run_settings(os.path.join(self.tmp.name, 'missing.json'))
+        self.write([1, 2])
+        with self.assertRaises(ConfigError):
+            load_run_settings(self.path)
+
+    def test_build_options(self):
+        """Test tùy chọn lấy từ settings.json, headless ghi đè được"""
+        settings = {'headless': False, 'scan_mode': 'http', 'page_load_strategy': 'eager', 'lean_mode': True,
+                    'lean_blocked_hosts': ['ads.example'], 'account_delay': 7, 'product_delay': 2,
+                    'enable_openvpn': True, 'openvpn_configs': [self.path, '/missing.ovpn']}
+        self.write({})
+        options = build_options(settings, AppConfig(), headless=True)
+        self.assertTrue(options.headless)
+        self.assertEqual(options.scan_mode, 'http')
+        self.assertEqual(options.browser_config.browser.page_load_strategy, 'eager')
+        self.assertEqual(options.lean_profile.blocked_hosts, ['ads.example'])
+        self.assertEqual((options.account_delay, options.product_delay), (7, 2))
+        self.assertEqual(options.openvpn_configs, (self.path,))
+
+        defaults = build_options({}, AppConfig())
+        self.assertFalse(defaults.headless)
+        self.assertIsNone(defaults.lean_profile)
+        self.assertEqual(defaults.openvpn_configs, ())
+
+
+class TestConsoleReporter(unittest.TestCase):
+    """
+    Test cases cho in tiến trình
+    """
+
+    def test_text(self):
+        """Test chế độ chữ chỉ in dòng log"""
+        stream = io.StringIO()
+        reporter = ConsoleReporter(stream)
+        reporter.log("xin chào", "SUCCESS")
+        reporter.emit('purchase', ok=True)
+        self.assertIn("[SUCCESS] xin chào", stream.getvalue())
+        self.assertEqual(len(stream.getvalue().splitlines()), 1)
+
+    def test_jsonl(self):
+        """Test chế độ JSON Lines in mọi event"""
+        stream = io.StringIO()
+        reporter = ConsoleReporter(stream, jsonl=True, clock=lambda: 100.0)
+        reporter.log("xin chào")
+        reporter.emit('purchase', ok=True, product='A', error=None)
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(lines[0], {'ts': 100.0, 'event': 'log', 'level': 'INFO', 'message': "xin chào"})
+        self.assertEqual(lines[1], {'ts': 100.0, 'event': 'purchase', 'ok': True, 'product': 'A'})
+
+
+class TestSignals(unittest.TestCase):
+    """
+    Test cases cho xử lý SIGTERM
+    """
+
+    @unittest.skipUnless(hasattr(signal, 'SIGTERM') and os.name == 'posix', "Cần POSIX signal")
+    def test_sigterm_sets_flag(self):
+        """Test SIGTERM chỉ đặt cờ dừng, handler cũ được trả lại"""
+        before = signal.getsignal(signal.SIGTERM)
+        stop_requested = threading.Event()
+        previous = install_signal_handlers(stop_requested)
+        try:
+            os.kill(os.getpid(), signal.SIGTERM)
+            self.assertTrue(stop_requested.wait(2))
+        finally:
+            restore_signal_handlers(previous)
+        self.assertEqual(signal.getsignal(signal.SIGTERM), before)
+
+
+class TestRunCommand(unittest.TestCase):
+    """
+    Test cases chạy lệnh run trong process riêng
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_cli(self, *args):
+        return subprocess.run([sys.executable, CLI, 'run', '--log-dir', os.path.join(self.tmp.name, 'logs'),
+                               '--no-history'] + list(args),
+                              cwd=self.tmp.name, capture_output=True, text=True, timeout=60)
+
+    def test_no_accounts(self):
+        """Test không còn tài khoản: kết thúc ngay, stdout là JSON Lines, có state.json"""
+        path = os.path.join(self.tmp.name, 'settings.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'accounts': [], 'products': [{'productId': 'A'}]}, f)
+        result = self.run_cli('--config', path, '--jsonl')
+        self.assertEqual(result.returncode, EXIT_OK, result.stderr)
+        events = [json.loads(line) for line in result.stdout.splitlines()]
+        self.assertEqual(events[-1]['event'], 'summary')
+        self.assertFalse(events[-1]['stopped'])
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, 'state.json')))
+
+    def test_missing_config(self):
+        """Test file cấu hình không có trả về mã 2"""
+        result = self.run_cli('--config', os.path.join(self.tmp.name, 'missing.json'))
+        self.assertEqual(result.returncode, EXIT_CONFIG)
+
+
+if __name__ == '__main__':
+    unittest.main()
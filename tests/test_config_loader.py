@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cases cho config loader
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Thêm src vào path để import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config_loader import AppConfig, ConfigError, parse_config, load_config
+
+SAMPLE_CONFIG = os.path.join(os.path.dirname(__file__), '..', 'config', 'config_sample.json')
+
+
+class TestConfigLoader(unittest.TestCase):
+    """
+    Test cases cho config_loader
+    """
+
+    def test_sample_config(self):
+        """Test config_sample.json được load đầy đủ"""
+        config = load_config(SAMPLE_CONFIG)
+        self.assertEqual(config.timing.page_load_timeout, 30.0)
+        self.assertEqual(config.timing.element_wait_timeout, 10.0)
+        self.assertEqual(config.timing.delay_between_actions, 0.0)
+        self.assertEqual((config.browser.window_size.width, config.browser.window_size.height), (1920, 1080))
+        self.assertEqual(config.browser.page_load_strategy, 'normal')
+        self.assertFalse(config.browser.lean_mode.enabled)
+        self.assertIsInstance(config.browser.lean_mode.blocked_hosts, tuple)
+        self.assertEqual(config.logging.max_file_size, 10485760)
+        self.assertEqual(config.logging.max_files, 5)
+        self.assertIn('website', config.raw)
+        self.assertNotIn('logging', config.raw)
+        self.assertTrue(config.source.endswith('config_sample.json'))
+
+    def test_defaults_and_partial(self):
+        """Test khóa thiếu dùng giá trị mặc định"""
+        config = parse_config({'browser': {'page_load_strategy': 'eager'}, 'timing': {'page_load_timeout': 20}})
+        self.assertEqual(config.browser.page_load_strategy, 'eager')
+        self.assertEqual(config.timing.element_wait_timeout, AppConfig().timing.element_wait_timeout)
+        self.assertEqual(config.wait_timeouts()['page_load'], 20.0)
+        self.assertEqual(config.wait_timeouts()['url_change'], 20.0)
+        self.assertEqual(config.wait_timeouts()['clickable'], 10.0)
+
+    def test_invalid_values(self):
+        """Test giá trị sai kiểu / ngoài phạm vi báo lỗi kèm tên khóa"""
+        cases = [
+            ({'timing': {'page_load_timeout': 'abc'}}, 'timing.page_load_timeout'),
+            ({'timing': {'element_wait_timeout': 0}}, 'timing.element_wait_timeout'),
+            ({'browser': {'headless': 'yes'}}, 'browser.headless'),
+            ({'browser': {'page_load_strategy': 'fast'}}, 'browser.page_load_strategy'),
+            ({'browser': {'window_size': [1, 2]}}, 'browser.window_size'),
+            ({'browser': {'lean_mode': {'blocked_hosts': 'a.com'}}}, 'browser.lean_mode.blocked_hosts'),
+            ({'logging': {'level': 'LOUD'}}, 'logging.level'),
+            ({'logging': {'max_files': 0}}, 'logging.max_files'),
+            ({'browser': {'reuse_limit': -1}}, 'browser.reuse_limit'),
+            ({'browser': {'session': {'max_age_hours': 0}}}, 'browser.session.max_age_hours'),
+            ({'browser': {'disk_cache': {'slots': 0}}}, 'browser.disk_cache.slots'),
+        ]
+        for data, key in cases:
+            with self.subTest(key=key):
+                with self.assertRaises(ConfigError) as ctx:
+                    parse_config(data)
+                self.assertIn(key, str(ctx.exception))
+
+    def test_search_dirs(self):
+        """Test tìm config.json trong thư mục cấu hình, không có thì dùng mặc định"""
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertEqual(load_config(search_dirs=[tmp]), AppConfig())
+            with open(os.path.join(tmp, 'config.json'), 'w', encoding='utf-8') as f:
+                json.dump({'timing': {'delay_between_actions': 1.5}}, f)
+            self.assertEqual(load_config(search_dirs=[tmp]).timing.delay_between_actions, 1.5)
+
+            with open(os.path.join(tmp, 'config.json'), 'w', encoding='utf-8') as f:
+                f.write('{broken')
+            with self.assertRaises(ConfigError):
+                load_config(search_dirs=[tmp])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cases cho cache HTTP trên đĩa dùng chung giữa các Chrome
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+# Thêm src vào path để import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from disk_cache import DiskCache, CACHE_DIRNAME, create_disk_cache, dir_size, MB
+from config_loader import DiskCacheConfig
+
+
+def fill(path, size):
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, 'data_0'), 'wb') as f:
+        f.write(b'\0' * size)
+
+
+class TestDiskCache(unittest.TestCase):
+    """
+    Test cases cho DiskCache
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, CACHE_DIRNAME)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_slots_are_exclusive(self):
+        """Test mỗi Chrome một slot, hết slot thì None, nhả rồi lấy lại được"""
+        cache = DiskCache(self.root, max_size_mb=10, slots=2)
+        first = cache.acquire()
+        second = cache.acquire()
+        self.assertEqual((first.index, second.index), (0, 1))
+        self.assertIsNone(cache.acquire())
+        self.assertEqual(first.chrome_arguments(),
+                         [f"--disk-cache-dir={os.path.join(self.root, 'slot-0')}", f"--disk-cache-size={5 * MB}"])
+
+        cache.release(second)
+        cache.release(second)
+        self.assertEqual(cache.acquire().index, 1)
+
+    def test_lock_shared_across_instances(self):
+        """Test slot đang giữ (khóa file) không bị app khác dùng chung thư mục lấy mất"""
+        held = DiskCache(self.root, slots=2).acquire()
+        other = DiskCache(self.root, slots=2)
+        self.assertEqual(other.acquire().index, 1)
+        self.assertIsNone(other.acquire())
+        self.assertEqual(held.index, 0)
+
+    def test_cleanup_oversized_and_extra_slots(self):
+        """Test dọn slot vượt giới hạn hoặc thừa, không đụng slot đang dùng"""
+        cache = DiskCache(self.root, max_size_mb=2, slots=2)
+        fill(os.path.join(self.root, 'slot-0'), 2 * MB)
+        fill(os.path.join(self.root, 'slot-1'), MB // 2)
+        fill(os.path.join(self.root, 'slot-3'), 1024)
+        self.assertEqual(cache.usage()['slots'], 3)
+
+        self.assertEqual(cache.cleanup(), 2 * MB + 1024)
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'slot-0')))
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'slot-3')))
+        self.assertEqual(dir_size(os.path.join(self.root, 'slot-1')), MB // 2)
+
+        # Slot đang được Chrome dùng không bị xóa dù vượt giới hạn
+        slot = cache.acquire()
+        fill(slot.path, 2 * MB)
+        self.assertEqual(cache.cleanup(), 0)
+        self.assertTrue(os.path.exists(slot.path))
+        cache.release(slot)
+        self.assertEqual(cache.cleanup(), 2 * MB)
+
+    def test_create_from_config(self):
+        """Test tạo từ browser.disk_cache: tắt thì None, mặc định nằm trong thư mục cấu hình"""
+        self.assertIsNone(create_disk_cache(DiskCacheConfig(enabled=False), self.tmp.name))
+        cache = create_disk_cache(DiskCacheConfig(max_size_mb=100, slots=4), self.tmp.name)
+        self.assertEqual((cache.root, cache.slot_size), (self.root, 25 * MB))
+        custom = os.path.join(self.tmp.name, 'custom')
+        self.assertEqual(create_disk_cache(DiskCacheConfig(dir=custom), self.tmp.name).root, custom)
+        # Chưa khởi động Chrome nào thì không tạo thư mục
+        self.assertFalse(os.path.exists(self.root))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cases cho cache Chrome/ChromeDriver (driver_manifest.json)
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Thêm src vào path để import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from driver_cache import DriverCache, MANIFEST_FILENAME, major_version, parse_version
+
+
+class FakeSystem:
+    """
+    Chrome/ChromeDriver giả: phiên bản theo file, đếm số lần chạy --version và tải driver
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.versions = {}
+        self.probes = []
+        self.installs = 0
+        self.install_error = None
+        self.path_commands = {}
+
+    def write(self, name, version, content="bin"):
+        path = os.path.join(self.root, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        self.versions[path] = version
+        return path
+
+    def probe(self, args):
+        self.probes.append(args[0])
+        version = self.versions.get(args[0])
+        return f"Binary {version} (abc)" if version else None
+
+    def install(self, chrome_version):
+        if self.install_error:
+            raise self.install_error
+        self.installs += 1
+        return self.write(f"wdm-chromedriver-{self.installs}", chrome_version)
+
+    def which(self, command):
+        return self.path_commands.get(command)
+
+    def cache(self, path):
+        return DriverCache(path, install=self.install, probe=self.probe, which=self.which)
+
+
+class TestVersions(unittest.TestCase):
+    """
+    Test cases cho đọc phiên bản
+    """
+
+    def test_parse(self):
+        """Test lấy phiên bản từ output --version"""
+        self.assertEqual(parse_version("Google Chrome 120.0.6099.109 "), "120.0.6099.109")
+        self.assertEqual(parse_version("ChromeDriver 120.0.6099.109 (3419140ab665...)"), "120.0.6099.109")
+        self.assertIsNone(parse_version(None))
+        self.assertEqual(major_version("120.0.6099.109"), 120)
+        self.assertIsNone(major_version(None))
+
+
+class TestDriverCache(unittest.TestCase):
+    """
+    Test cases cho DriverCache
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.system = FakeSystem(self.tmp.name)
+        self.chrome = self.system.write('chrome', "120.0.6099.109")
+        self.manifest = os.path.join(self.tmp.name, MANIFEST_FILENAME)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_warm_cache_is_offline(self):
+        """Test lần mở app sau dùng manifest: không chạy --version, không tải driver"""
+        first = self.system.cache(self.manifest).resolve(self.chrome)
+        self.assertFalse(first.cached)
+        self.assertEqual(first.source, 'webdriver-manager')
+        self.assertEqual((first.chrome_version, first.driver_version), ("120.0.6099.109", "120.0.6099.109"))
+        with open(self.manifest, encoding='utf-8') as f:
+            self.assertIn(self.chrome, json.load(f)['entries'])
+
+        self.system.probes.clear()
+        self.system.install_error = OSError("offline")
+        cache = self.system.cache(self.manifest)
+        second = cache.resolve(self.chrome)
+        self.assertTrue(second.cached)
+        self.assertEqual(second.driver_path, first.driver_path)
+        self.assertEqual(self.system.probes, [])
+        self.assertEqual(self.system.installs, 1)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 0, 'size': 1})
+
+    def test_chrome_rewritten_same_version(self):
+        """Test file Chrome đổi nhưng cùng phiên bản: chỉ đọc lại phiên bản, giữ driver"""
+        cache = self.system.cache(self.manifest)
+        first = cache.resolve(self.chrome)
+        self.system.write('chrome', "120.0.6099.109", content="bin-rebuilt")
+        self.system.probes.clear()
+        second = cache.resolve(self.chrome)
+        self.assertTrue(second.cached)
+        self.assertEqual(second.driver_path, first.driver_path)
+        self.assertEqual(self.system.probes, [self.chrome])
+        # Dấu vết mới đã được ghi: lần sau không cần chạy --version
+        self.system.probes.clear()
+        self.assertTrue(self.system.cache(self.manifest).resolve(self.chrome).cached)
+        self.assertEqual(self.system.probes, [])
+
+    def test_chrome_upgrade_resolves_again(self):
+        """Test Chrome lên phiên bản mới: tải ChromeDriver mới"""
+        cache = self.system.cache(self.manifest)
+        cache.resolve(self.chrome)
+        self.system.write('chrome', "121.0.6167.85", content="bin-121")
+        resolution = cache.resolve(self.chrome)
+        self.assertFalse(resolution.cached)
+        self.assertEqual(resolution.driver_version, "121.0.6167.85")
+        self.assertEqual(self.system.installs, 2)
+
+    def test_driver_removed(self):
+        """Test file ChromeDriver trong manifest bị xóa thì tìm lại"""
+        cache = self.system.cache(self.manifest)
+        os.remove(cache.resolve(self.chrome).driver_path)
+        self.assertFalse(cache.resolve(self.chrome).cached)
+        self.assertEqual(self.system.installs, 2)
+
+    def test_local_driver(self):
+        """Test ChromeDriver trong PATH được dùng khi cùng major version, bỏ qua khi lệch"""
+        self.system.path_commands['chromedriver'] = self.system.write('chromedriver', "120.0.6099.71")
+        resolution = self.system.cache(None).resolve(self.chrome)
+        self.assertEqual((resolution.source, resolution.driver_path),
+                         ('local', self.system.path_commands['chromedriver']))
+        self.assertEqual(self.system.installs, 0)
+
+        self.system.write('chromedriver', "118.0.5993.70")
+        resolution = self.system.cache(None).resolve(self.chrome)
+        self.assertEqual(resolution.source, 'webdriver-manager')
+
+    def test_install_failure_not_persisted(self):
+        """Test không tải được driver: dùng Service() mặc định, không ghi manifest, không thử lại trong phiên"""
+        self.system.install_error = OSError("offline")
+        cache = self.system.cache(self.manifest)
+        resolution = cache.resolve(self.chrome)
+        self.assertIsNone(resolution.driver_path)
+        self.assertEqual(resolution.source, 'selenium')
+        self.assertFalse(os.path.exists(self.manifest))
+        self.assertTrue(cache.resolve(self.chrome).cached)
+
+    def test_invalidate(self):
+        """Test invalidate() (Chrome từ chối driver) buộc tìm lại"""
+        cache = self.system.cache(self.manifest)
+        resolution = cache.resolve(self.chrome)
+        self.assertTrue(cache.invalidate(resolution))
+        self.assertFalse(cache.resolve(self.chrome).cached)
+        self.assertEqual(self.system.installs, 2)
+        self.assertFalse(cache.resolve(self.chrome, force=True).cached)
+
+    def test_corrupt_manifest(self):
+        """Test manifest hỏng hoặc khác định dạng bị bỏ qua"""
+        for text in ("{broken", json.dumps({'version': 99, 'entries': {}}), json.dumps({'version': 1, 'entries': []})):
+            with self.subTest(text=text):
+                with open(self.manifest, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                self.assertEqual(self.system.cache(self.manifest).stats()['size'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cases cho vòng đời Chrome (DriverPool)
+"""
+
+import unittest
+import sys
+import os
+import threading
+
+# Thêm src vào path để import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from driver_pool import DriverPool
+
+
+class FakeBrowser:
+    """
+    Browser giả: setup_driver chờ được mở khóa (giả lập Chrome khởi động chậm)
+    """
+
+    def __init__(self, gate=None):
+        self.gate = gate
+        self.driver = None
+        self.resets = 0
+        self.closes = 0
+        self.reset_ok = True
+        self.started = threading.Event()
+
+    def setup_driver(self, verbose=True):
+        self.started.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.driver = object()
+        return True
+
+    def reset(self):
+        self.resets += 1
+        return self.reset_ok
+
+    def close(self):
+        self.closes += 1
+        self.driver = None
+
+
+class TestDriverPool(unittest.TestCase):
+    """
+    Test cases cho DriverPool
+    """
+
+    def setUp(self):
+        self.browsers = []
+        self.gate = None
+        self.created = threading.Event()
+
+    def factory(self):
+        browser = FakeBrowser(self.gate)
+        self.browsers.append(browser)
+        self.created.set()
+        return browser
+
+    def test_cold_then_reused(self):
+        """Test lần đầu khởi động khi cần, sau release thì dùng lại Chrome đã reset"""
+        pool = DriverPool(self.factory, reuse_limit=2)
+        first = pool.acquire()
+        self.assertEqual(pool.last_acquire['source'], 'cold')
+        self.assertIsNotNone(first.driver)
+        self.assertTrue(pool.release(first))
+        self.assertIs(pool.acquire(), first)
+        self.assertEqual((pool.last_acquire['source'], pool.last_acquire['uses'], first.resets), ('reused', 2, 1))
+
+        # Hết lượt dùng: đóng thay vì reset
+        self.assertFalse(pool.release(first))
+        self.assertEqual((first.resets, first.closes), (1, 1))
+        stats = pool.stats()
+        self.assertEqual((stats['acquired'], stats['cold'], stats['reused'], stats['open']), (2, 1, 1, 0))
+
+    def test_prewarm_in_background(self):
+        """Test prewarm() khởi động trong thread nền, acquire() chờ browser đang khởi động"""
+        self.gate = threading.Event()
+        pool = DriverPool(self.factory)
+        self.assertTrue(pool.prewarm())
+        self.assertFalse(pool.prewarm())
+        self.assertTrue(self.created.wait(5))
+        self.assertTrue(self.browsers[0].started.wait(5))
+
+        threading.Timer(0.05, self.gate.set).start()
+        browser = pool.acquire()
+        self.assertIs(browser, self.browsers[0])
+        self.assertEqual(pool.last_acquire['source'], 'prewarmed')
+        self.assertGreater(pool.last_acquire['ready'], 0.01)
+        self.assertEqual(len(self.browsers), 1)
+        pool.close()
+        self.assertEqual(browser.closes, 1)
+
+    def test_reset_failure_closes(self):
+        """Test reset lỗi thì đóng browser, lần sau khởi động Chrome mới"""
+        pool = DriverPool(self.factory)
+        browser = pool.acquire()
+        browser.reset_ok = False
+        self.assertFalse(pool.release(browser))
+        self.assertEqual(browser.closes, 1)
+        self.assertIsNot(pool.acquire(), browser)
+        self.assertEqual(pool.stats()['discarded'], 1)
+
+    def test_close_tears_down_everything(self):
+        """Test close() đóng browser đang dùng, dự phòng và browser còn đang khởi động"""
+        pool = DriverPool(self.factory)
+        in_use = pool.acquire()
+        self.gate = threading.Event()
+        self.created.clear()
+        pool.prewarm()
+        self.assertTrue(self.created.wait(5))
+        self.assertTrue(self.browsers[-1].started.wait(5))
+        warming = self.browsers[-1]
+
+        closer = threading.Thread(target=pool.close)
+        closer.start()
+        self.gate.set()
+        closer.join(5)
+        self.assertFalse(closer.is_alive())
+        self.assertEqual(in_use.closes, 1)
+        # Browser khởi động xong sau khi pool đóng cũng bị đóng
+        self.assertIsNone(warming.driver)
+        self.assertGreaterEqual(warming.closes, 1)
+        self.assertEqual(pool.stats()['open'], 0)
+
+        self.assertFalse(pool.prewarm())
+        self.assertFalse(pool.release(in_use))
+        with self.assertRaises(RuntimeError):
+            pool.acquire()
+
+    def test_close_wakes_waiting_acquire(self):
+        """Test close() (nút Dừng) giải phóng thread đang chờ acquire()"""
+        self.gate = threading.Event()
+        pool = DriverPool(self.factory)
+        pool.prewarm()
+        errors = []
+
+        def acquire():
+            try:
+                pool.acquire()
+            except RuntimeError as e:
+                errors.append(e)
+
+        waiter = threading.Thread(target=acquire)
+        waiter.start()
+        pool.close(wait=False)
+        waiter.join(5)
+        self.assertFalse(waiter.is_alive())
+        self.assertEqual(len(errors), 1)
+        self.gate.set()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cases cho vòng lặp automation không giao diện
+"""
+
+import unittest
+import sys
+import os
+import time
+import threading
+import subprocess
+from types import SimpleNamespace
+
+# Thêm src vào path để import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from engine import AutomationEngine, RunOptions, today
+from product_cache import ProductCache
+from config_loader import AppConfig, BrowserConfig
+from watchdog import ChromeWatchdog, ProcessInfo
+
+
+class FakeBrowser:
+    """
+    BrowserAutomation giả: kết quả login/purchase lấy từ kịch bản dùng chung
+    """
+
+    def __init__(self, script, **kwargs):
+        self.script = script
+        self.kwargs = kwargs
+        self.closed = False
+        self.last_login_timing = {'total': 0.5, 'waiting': 0.2, 'working': 0.3}
+        self.last_login_spans = {'name': 'login', 'duration': 0.5,
+                                 'children': [{'name': 'submit', 'duration': 0.4}]}
+        self.last_driver_setup = {'resolve': 0.002, 'create': 0.8, 'cached': True, 'source': 'local',
+                                  'chrome_version': '120.0.6099.109', 'driver_version': '120.0.6099.71'}
+        self.driver = None
+        script['browsers'].append(self)
+        self.pid = 1000 + len(script['browsers'])
+
+    def setup_driver(self, verbose=True):
+        self.driver = object()
+        return True
+
+    def process_id(self):
+        # Chỉ báo PID giả khi test dùng cây process giả (PID thật có thể trùng)
+        return self.pid if self.driver and self.script.get('fake_pids') else None
+
+    def reset(self):
+        self.script['resets'] = self.script.get('resets', 0) + 1
+        return not self.script.get('reset_fails')
+
+    def login(self, email, password):
+        self.script['logins'].append(email)
+        self.last_login_source = 'session' if email in self.script.get('sessions', ()) else 'form'
+        return email not in self.script.get('bad_logins', ())
+
+    def scan_listing(self, product_ids, listing_url):
+        self.script['scans'].append(list(product_ids))
+        entries = {pid: {'url': f"http://shop/{pid}", 'page': 1} for pid in product_ids
+                   if pid in self.script['listed']}
+        return SimpleNamespace(entries=entries, missing=[pid for pid in product_ids if pid not in entries])
+
+    def purchase_product(self, listing_url, product_id, detail_url=None):
+        self.script['purchases'].append(product_id)
+        callback = self.script.get('on_purchase')
+        if callback:
+            callback()
+        ok = product_id in self.script.get('available', ())
+        return {'success': ok, 'error': None if ok else "Hết hàng", 'timing': None,
+                'spans': {'name': 'purchase', 'duration': 0.1, 'children': []}}
+
+    def logout(self):
+        self.script['logouts'] += 1
+
+    def close(self):
+        self.closed = True
+        self.driver = None
+
+
+class BrowserProcesses:
+    """
+    Cây process giả cho watchdog: RSS theo PID ChromeDriver
+    """
+
+    name = 'fake'
+
+    def __init__(self, rss_mb):
+        self.rss_mb = rss_mb
+
+    def tree(self, pid):
+        return [pid] if pid in self.rss_mb else []
+
+    def info(self, pid):
+        return ProcessInfo(pid, 'chromedriver', 0.0, self.rss_mb[pid] * 1024 * 1024, 0.0)
+
+    def kill(self, pid):
+        pass
+
+
+class RecordingHistory:
+    def __init__(self):
+        self.records = []
+
+    def record(self, kind, ok, **fields):
+        self.records.append((kind, ok, fields.get('product')))
+
+
+class TestAutomationEngine(unittest.TestCase):
+    """
+    Test cases cho AutomationEngine với browser giả
+    """
+
+    def setUp(self):
+        self.script = {'browsers': [], 'logins': [], 'scans': [], 'purchases': [], 'logouts': 0,
+                       'listed': {'A', 'B'}, 'available': {'B'}}
+        self.logs = []
+        self.events = []
+        self.saved = []
+        self.history = RecordingHistory()
+        self.engine = AutomationEngine(
+            ProductCache(None),
+            log=lambda message, level="INFO": self.logs.append((level, message)),
+            emit=lambda event, **fields: self.events.append((event, fields)),
+            history=self.history,
+            save_state=lambda: self.saved.append(self.engine.state()),
+            browser_factory=lambda **kwargs: FakeBrowser(self.script, **kwargs))
+        self.accounts = [{'email': 'a@x.com', 'password': 'p'}, {'email': 'b@x.com', 'password': 'p'}]
+        self.products = [{'productId': 'A'}, {'productId': 'B'}, {'productId': 'C'}]
+
+    def test_buys_once_per_account(self):
+        """Test mỗi tài khoản mua được một lần rồi chuyển tài khoản, dừng khi hết tài khoản"""
+        ok = self.engine.run(self.accounts, self.products, RunOptions(headless=True))
+        self.assertTrue(ok)
+        self.assertEqual(self.script['logins'], ['a@x.com', 'b@x.com'])
+        self.assertEqual(self.script['purchases'], ['A', 'B', 'A', 'B'])
+        self.assertEqual(self.engine.purchased_today, {'a@x.com', 'b@x.com'})
+        self.assertEqual(self.saved[-1]['purchased_today'], ['a@x.com', 'b@x.com'])
+        # Lần quét listing thứ hai chỉ tìm sản phẩm chưa có trong cache
+        self.assertEqual(self.script['scans'], [['A', 'B', 'C'], ['C']])
+        self.assertTrue(all(browser.closed for browser in self.script['browsers']))
+        # Tài khoản thứ hai dùng lại Chrome của tài khoản đầu (đã xóa cookie/storage)
+        self.assertEqual(len(self.script['browsers']), 1)
+        self.assertEqual(self.script['resets'], 1)
+        ready = [fields for event, fields in self.events if event == 'browser']
+        self.assertEqual([fields['source'] for fields in ready], ['prewarmed', 'reused'])
+        self.assertTrue(self.script['browsers'][0].kwargs['headless'])
+        self.assertIn('driver_cache', self.script['browsers'][0].kwargs)
+        self.assertTrue(any(message.startswith("Khởi tạo Chrome 0.80s, tìm ChromeDriver 2 ms [cache")
+                            for _, message in self.logs))
+
+        snapshot = self.engine.stats.snapshot()
+        self.assertEqual((snapshot.scans, snapshot.successes, snapshot.failures), (4, 2, 2))
+        self.assertIn(('purchase', True, 'B'), self.history.records)
+        self.assertIn('step', [event for event, _ in self.events])
+        self.assertFalse(self.engine.running)
+
+    def test_reuse_disabled_prewarms_next(self):
+        """Test reuse_limit=0: mỗi tài khoản một Chrome, Chrome kế tiếp khởi động trước, đóng hết khi xong"""
+        config = AppConfig(browser=BrowserConfig(reuse_limit=0))
+        self.engine.run(self.accounts, self.products, RunOptions(browser_config=config))
+        self.assertEqual(len(self.script['browsers']), 2)
+        self.assertNotIn('resets', self.script)
+        self.assertEqual([fields['source'] for event, fields in self.events if event == 'browser'],
+                         ['prewarmed', 'prewarmed'])
+        self.assertTrue(all(browser.closed for browser in self.script['browsers']))
+
+    def test_reset_failure_replaces_browser(self):
+        """Test không xóa được trạng thái thì đóng Chrome đó và dùng Chrome mới"""
+        self.script['reset_fails'] = True
+        self.engine.run(self.accounts, self.products, RunOptions())
+        self.assertEqual(len(self.script['browsers']), 2)
+        self.assertTrue(all(browser.closed for browser in self.script['browsers']))
+
+    def test_watchdog_recycles_between_products(self):
+        """Test Chrome vượt ngưỡng RSS: đóng ở điểm giữa hai sản phẩm, login lại bằng Chrome mới"""
+        self.script['available'] = set()
+        self.script['fake_pids'] = True
+        processes = BrowserProcesses({1001: 900, 1002: 200})
+        self.engine.create_watchdog = lambda options: ChromeWatchdog(max_rss_mb=500, interval=0,
+                                                                     processes=processes)
+
+        def stop_after_three():
+            if len(self.script['purchases']) >= 3:
+                self.engine.stop()
+
+        self.script['on_purchase'] = stop_after_three
+        self.engine.run(self.accounts, self.products, RunOptions())
+        self.assertEqual(self.script['logins'], ['a@x.com', 'a@x.com'])
+        self.assertEqual(len(self.script['browsers']), 2)
+        self.assertTrue(all(browser.closed for browser in self.script['browsers']))
+        recycles = [fields for event, fields in self.events if event == 'recycle']
+        self.assertEqual([fields['reason'] for fields in recycles], ["RSS 900 MB > 500 MB"])
+        report = self.engine.watchdog.report()
+        self.assertEqual(report['peak_rss_mb'], 900.0)
+        self.assertEqual(len(report['recycles']), 1)
+        self.assertIn('memory', [event for event, _ in self.events])
+
+    def test_session_login_reported(self):
+        """Test login bằng phiên đã lưu được ghi vào log/event, session_store truyền cho browser"""
+        store = object()
+        self.engine.session_store = store
+        self.script['sessions'] = {'a@x.com'}
+        self.engine.run(self.accounts, self.products, RunOptions())
+        self.assertIs(self.script['browsers'][0].kwargs['session_store'], store)
+        logins = [fields for event, fields in self.events if event == 'login']
+        self.assertEqual([fields['session'] for fields in logins], [True, None])
+        self.assertIn(('SUCCESS', "Đăng nhập thành công (phiên đã lưu): a@x.com"), self.logs)
+
+    def test_page_cache_logged(self):
+        """Test disk_cache truyền cho browser, cuối lần chạy log tỷ lệ hit cache HTTP"""
+        cache = object()
+        self.engine.disk_cache = cache
+        self.engine.page_stats.record({'load_ms': 800, 'measured': 4, 'cached': 3}, first=True)
+        self.engine.run(self.accounts, self.products, RunOptions())
+        self.assertIs(self.script['browsers'][0].kwargs['disk_cache'], cache)
+        self.assertIn(('INFO', "Cache HTTP: 75.0% tài nguyên lấy từ cache, trang đầu của Chrome mới tải trung "
+                               "bình 800 ms (1 lần)"), self.logs)
+
+    def test_skips_accounts_bought_today(self):
+        """Test tài khoản đã mua hôm nay bị bỏ qua"""
+        self.engine.load_state({'purchased_today': ['a@x.com'], 'purchased_date': today()})
+        self.engine.run(self.accounts, self.products, RunOptions())
+        self.assertEqual(self.script['logins'], ['b@x.com'])
+        self.engine.load_state({'purchased_today': ['a@x.com', 'b@x.com'], 'purchased_date': today()})
+        self.engine.run(self.accounts, self.products, RunOptions())
+        # Không còn tài khoản nào: không khởi động Chrome
+        self.assertEqual(len(self.script['browsers']), 1)
+
+    def test_state_from_other_day_ignored(self):
+        """Test trạng thái của ngày khác không được dùng"""
+        self.engine.load_state({'purchased_today': ['a@x.com'], 'purchased_date': '2000-01-01'})
+        self.assertEqual(self.engine.purchased_today, set())
+        self.assertEqual(self.engine.state()['purchased_date'], today())
+
+    def test_failed_login_moves_on(self):
+        """Test login thất bại chuyển sang tài khoản tiếp theo"""
+        self.script['bad_logins'] = {'a@x.com'}
+        self.engine.run(self.accounts, self.products, RunOptions())
+        self.assertEqual(self.script['logins'], ['a@x.com', 'b@x.com'])
+        self.assertEqual(self.engine.purchased_today, {'b@x.com'})
+        self.assertIn(('login', False, None), self.history.records)
+
+    def test_stop_interrupts_delay(self):
+        """Test stop() dừng ngay cả khi đang nghỉ giữa các sản phẩm"""
+        self.script['available'] = set()
+        started = threading.Event()
+        self.script['on_purchase'] = started.set
+        thread = threading.Thread(target=self.engine.run,
+                                  args=(self.accounts, self.products, RunOptions(product_delay=60)))
+        thread.start()
+        self.assertTrue(started.wait(5))
+        begin = time.monotonic()
+        self.engine.stop()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertLess(time.monotonic() - begin, 2)
+        self.assertTrue(self.script['browsers'][0].closed)
+        self.assertEqual(self.engine.purchased_today, set())
+
+    def test_exception_reported(self):
+        """Test lỗi trong vòng lặp được log và run() trả về False"""
+        def broken(**kwargs):
+            raise RuntimeError("chrome hỏng")
+
+        self.engine.browser_factory = broken
+        self.assertFalse(self.engine.run(self.accounts, self.products, RunOptions()))
+        self.assertIn(('ERROR', "Lỗi trong automation: chrome hỏng"), self.logs)
+
+
+class TestNoTkinter(unittest.TestCase):
+    """
+    Engine và CLI không được import tkinter
+    """
+
+    def test_engine_and_cli_do_not_import_tkinter(self):
+        """Test import engine/cli trong process mới không kéo theo tkinter"""
+        src = os.path.join(os.path.dirname(__file__), '..', 'src')
+        code = "import sys, engine, cli; print('tkinter' in sys.modules)"
+        output = subprocess.run([sys.executable, '-c', code], cwd=src, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), 'False')
+
+    def test_package_import_is_lazy(self):
+        """Test import package src (python -m src.cli) không kéo theo tkinter"""
+        root = os.path.join(os.path.dirname(__file__), '..')
+        code = "import sys, src.cli, src; src.BrowserAutomation; print('tkinter' in sys.modules)"
+        output = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), 'False')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cases cho event log JSON Lines
+"""
+
+import unittest
+import sys
+import os
+import gzip
+import json
+import io
+import tempfile
+from unittest import mock
+
+# Thêm src vào path để import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from events import EventLog, LatencyHistogram, account_hash, step_events, summarize_files, main
+
+
+class TestEventLog(unittest.TestCase):
+    """
+    Test cases cho EventLog và lệnh phân tích
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'events.jsonl')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_sample(self):
+        clock = iter(range(1000, 100000, 60)).__next__
+        log = EventLog(self.path, clock=clock)
+        account = account_hash("user@example.com")
+        log.emit('log', level='INFO', message="Đăng nhập với tài khoản")
+        log.emit('login', account=account, ok=True, duration=2.5)
+        for index in range(10):
+            ok = index % 5 == 0
+            log.emit('step', flow='purchase', step='detail_page', duration=0.1 * (index + 1), account=account)
+            log.emit('purchase', account=account, product='MEZZ', ok=ok, duration=1.0 + index,
+                     step='confirm' if ok else 'checkout', error=None if ok else "Không tìm thấy nút checkout",
+                     error_class=None if ok else 'TimeoutException')
+        log.close()
+        log.close()
+
+    def test_emit_jsonl(self):
+        """Test mỗi event là một dòng JSON, trường None bị bỏ"""
+        self.write_sample()
+        with open(self.path, encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(len(lines), 22)
+        self.assertEqual(lines[0], {'ts': 1000, 'event': 'log', 'level': 'INFO',
+                                    'message': "Đăng nhập với tài khoản"})
+        self.assertNotIn('error', lines[3])
+        self.assertNotIn("user@example.com", open(self.path, encoding='utf-8').read())
+
+    def test_account_hash(self):
+        """Test hash email không phân biệt hoa thường/khoảng trắng"""
+        self.assertEqual(account_hash(" User@Example.com"), account_hash("user@example.com"))
+        self.assertEqual(len(account_hash("a@b.c")), 12)
+        self.assertIsNone(account_hash(""))
+
+    def test_step_events(self):
+        """Test lấy các bước con trực tiếp của cây span"""
+        spans = {'name': 'purchase', 'duration': 3.0,
+                 'children': [{'name': 'detail_page', 'duration': 1.0}, {'name': 'checkout', 'duration': 2.0}]}
+        self.assertEqual(step_events(spans), [('detail_page', 1.0), ('checkout', 2.0)])
+        self.assertEqual(step_events(None), [])
+
+    def test_summary(self):
+        """Test tổng hợp thông lượng, lỗi theo bước và độ trễ, kể cả file .gz"""
+        self.write_sample()
+        rotated = self.path + '.1.gz'
+        with gzip.open(rotated, 'wt', encoding='utf-8') as f:
+            f.write('{"ts": 500, "event": "purchase", "ok": false, "step": "detail_page"}\n')
+            f.write('not json\n')
+            f.write('{"ts": 501, "event": "browser", "source": "reused", "duration": 0.004}\n')
+            f.write('{"ts": 502, "event": "login", "ok": true, "session": true, "duration": 0.3}\n')
+
+        report = summarize_files([self.path, rotated])
+        self.assertEqual(report['throughput']['purchases'], 11)
+        self.assertEqual(report['throughput']['purchases_ok'], 2)
+        self.assertEqual(report['throughput']['accounts'], 1)
+        self.assertEqual(report['failures'][0], {'step': 'checkout', 'error_class': 'TimeoutException',
+                                                 'count': 8, 'share': 88.9})
+        self.assertEqual(report['failures'][1]['error_class'], '-')
+        self.assertEqual(report['steps']['purchase.detail_page']['count'], 10)
+        self.assertEqual(report['flows']['login']['count'], 1)
+        self.assertEqual(report['flows']['login_session']['count'], 1)
+        self.assertEqual((report['throughput']['logins'], report['throughput']['logins_restored']), (2, 1))
+        self.assertEqual(report['flows']['browser_ready']['count'], 1)
+        self.assertEqual(report['bad_lines'], 1)
+
+        report = summarize_files([self.path], since=1000 + 60 * 12)
+        self.assertEqual(report['throughput']['purchases'], 5)
+
+    def test_histogram(self):
+        """Test percentile từ histogram sai số nhỏ"""
+        histogram = LatencyHistogram()
+        for index in range(1, 1001):
+            histogram.add(index / 100.0)
+        self.assertAlmostEqual(histogram.percentile(50), 5.0, delta=0.3)
+        self.assertAlmostEqual(histogram.percentile(99), 9.9, delta=0.5)
+        self.assertEqual(histogram.percentile(100), 10.0)
+        self.assertEqual(histogram.summary()['count'], 1000)
+        self.assertIsNone(LatencyHistogram().percentile(50))
+
+    def test_cli(self):
+        """Test lệnh phân tích in JSON"""
+        self.write_sample()
+        self.assertEqual(main([self.path, '--json']), 0)
+
+    def test_since_with_bad_ts(self):
+        """Test lọc --since/--until: event có ts không phải số được tính là dòng lỗi, không làm crash"""
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('{"ts": "x", "event": "log"}\n')
+            f.write('{"event": "purchase", "ok": true}\n')
+            f.write('{"ts": 2000000000, "event": "purchase", "ok": true, "duration": 1.0}\n')
+        report = summarize_files([self.path], since=1000)
+        self.assertEqual((report['throughput']['purchases'], report['bad_lines']), (1, 2))
+        self.assertEqual(summarize_files([self.path])['bad_lines'], 0)
+        with mock.patch('sys.stdout', new_callable=io.StringIO):
+            self.assertEqual(main([self.path, '--since', '2024-01-01', '--until', '2100-01-01']), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cases cho lịch sử chạy SQLite
+"""
+
+import unittest
+import sys
+import os
+import csv
+import json
+import sqlite3
+import tempfile
+from datetime import datetime
+
+# Thêm src vào path để import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from history import HistoryStore
+
+
+class TestHistoryStore(unittest.TestCase):
+    """
+    Test cases cho HistoryStore
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'history.db')
+        self.store = HistoryStore(self.path, batch_size=3, flush_interval=0.05)
+        self.base = datetime(2024, 5, 1, 10, 0).timestamp()
+        spans = {'name': 'purchase', 'duration': 3.0, 'children': [{'name': 'checkout', 'duration': 2.0}]}
+        self.store.record('login', True, account='a1', duration=2.0, ts=self.base)
+        for index in range(6):
+            ok = index % 3 == 0
+            self.store.record('purchase', ok, account='a1', product='MEZZ' if index < 4 else 'OTHER',
+                              duration=1.0 + index, waiting=0.5, step='confirm' if ok else 'checkout',
+                              error=None if ok else "Không tìm thấy nút checkout",
+                              error_class=None if ok else 'TimeoutException',
+                              spans=spans, ts=self.base + index * 1800)
+        self.assertTrue(self.store.flush())
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_wal_and_indexes(self):
+        """Test database ở chế độ WAL và có index theo thời gian/sản phẩm"""
+        connection = sqlite3.connect(self.path)
+        try:
+            self.assertEqual(connection.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+            indexes = {row[1] for row in connection.execute("PRAGMA index_list(attempts)")}
+        finally:
+            connection.close()
+        self.assertEqual(indexes, {'idx_attempts_ts', 'idx_attempts_product_ts'})
+        self.assertEqual(self.store.written, 7)
+
+    def test_product_summary(self):
+        """Test tổng hợp purchase theo sản phẩm"""
+        rows = {row['product']: row for row in self.store.product_summary()}
+        self.assertEqual(rows['MEZZ']['attempts'], 4)
+        self.assertEqual(rows['MEZZ']['successes'], 2)
+        self.assertEqual(rows['MEZZ']['success_rate'], 50.0)
+        self.assertEqual(rows['MEZZ']['avg_duration'], 2.5)
+        self.assertEqual(rows['MEZZ']['last_success'], self.base + 3 * 1800)
+        self.assertEqual(rows['OTHER']['successes'], 0)
+        self.assertIsNone(rows['OTHER']['last_success'])
+
+        rows = self.store.product_summary(start=self.base + 1800 * 4)
+        self.assertEqual([row['product'] for row in rows], ['OTHER'])
+
+    def test_hourly_and_failures(self):
+        """Test tổng hợp theo giờ và theo loại lỗi"""
+        hours = self.store.hourly_summary()
+        purchases = [row for row in hours if row['kind'] == 'purchase']
+        self.assertEqual([row['hour'] for row in purchases],
+                         ['2024-05-01 10:00', '2024-05-01 11:00', '2024-05-01 12:00'])
+        self.assertEqual(sum(row['attempts'] for row in purchases), 6)
+        failures = self.store.failure_summary()
+        self.assertEqual(failures, [{'kind': 'purchase', 'step': 'checkout',
+                                     'error_class': 'TimeoutException', 'failures': 4}])
+
+    def test_export(self):
+        """Test xuất CSV/JSONL theo khoảng thời gian"""
+        jsonl = os.path.join(self.tmp.name, 'out.jsonl')
+        self.assertEqual(self.store.export(jsonl, start=self.base, end=self.base + 1800 * 2), 3)
+        with open(jsonl, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records[0]['kind'], 'login')
+        self.assertIs(records[1]['ok'], True)
+        self.assertEqual(records[1]['spans']['children'][0]['name'], 'checkout')
+
+        csv_path = os.path.join(self.tmp.name, 'out.csv')
+        self.assertEqual(self.store.export(csv_path), 7)
+        with open(csv_path, encoding='utf-8-sig', newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(rows[2]['error_class'], 'TimeoutException')
+
+    def test_close_flushes(self):
+        """Test close ghi nốt bản ghi còn trong hàng đợi"""
+        self.store.record('purchase', True, product='LATE', ts=self.base + 99999)
+        self.store.close()
+        self.assertFalse(self.store.flush())
+        reopened = HistoryStore(self.path)
+        try:
+            self.assertIn('LATE', [row['product'] for row in reopened.product_summary()])
+        finally:
+            reopened.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cases cho quét listing qua HTTP (dùng stand-in server, không cần Chrome)
+"""
+
+import unittest
+import sys
+import os
+
+import requests
+
+# Thêm src vào path để import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from http_listing import parse_listing_html, decode_html, content_hash, HttpListingFetcher
+from standin_server import StandInShop, serve_in_thread, listing_path
+
+
+class CookieDriver:
+    """
+    Driver giả lập chỉ cung cấp cookie và User-Agent
+    """
+
+    def __init__(self, cookies):
+        self.cookies = cookies
+
+    def get_cookies(self):
+        return self.cookies
+
+    def execute_script(self, script, *args):
+        return 'StandInBench/1.0'
+
+
+class TestParseListingHtml(unittest.TestCase):
+    """
+    Test cases cho ListingHTMLParser
+    """
+
+    def test_items_and_next_link(self):
+        """Test lấy link shopdetail, bỏ link khác, chuẩn hóa href và link next"""
+        html = """
+        <ul class="category-list">
+          <li><p class="name"><a href="/shopdetail/001/">ラケット <b>MEZZ</b> &amp; ケース</a></p></li>
+          <li><p class="name"><a href="/shopdetail/001/">ラケット <b>MEZZ</b> &amp; ケース</a></p></li>
+          <li><p class="name"><a href="/shop/other.html">Khác</a></p></li>
+          <li><p class="name"><a href="/shopdetail/002/">  </a></p></li>
+        </ul>
+        <ul><li class="prev"><a href="?page=1">前へ</a></li>
+            <li class="next"><a href="/shop/shopbrand.html?page=3">次の48件 &raquo;</a></li></ul>
+        """
+        items, next_link = parse_listing_html(html, 'https://shop.example/shop/shopbrand.html?page=2')
+        self.assertEqual(items, [('ラケット MEZZ & ケース', 'https://shop.example/shopdetail/001/')])
+        self.assertEqual(next_link, ('次の48件 »', 'https://shop.example/shop/shopbrand.html?page=3'))
+
+    def test_no_next_link(self):
+        """Test trang cuối không có li.next"""
+        items, next_link = parse_listing_html('<a href="/shopdetail/9/">X</a>')
+        self.assertEqual(items, [('X', '/shopdetail/9/')])
+        self.assertIsNone(next_link)
+
+    def test_decode_meta_charset(self):
+        """Test giải mã theo thẻ meta khi header không có charset"""
+        response = requests.Response()
+        response.headers['Content-Type'] = 'text/html'
+        response._content = ('<meta http-equiv="Content-Type" content="text/html; charset=EUC-JP">'
+                             '<a href="/shopdetail/1/">商品</a>').encode('euc-jp')
+        self.assertIn('商品', decode_html(response))
+
+    def test_content_hash_ignores_volatile_parts(self):
+        """Test hash không đổi khi chỉ khác script, comment, input hidden hoặc khoảng trắng"""
+        base = '<ul><li><a href="/shopdetail/1/">A</a></li></ul>'
+        noisy = ('<script>var t = 123;</script><!-- generated 10:00 -->\n<ul>  <li><a href="/shopdetail/1/">A</a>'
+                 '</li></ul><input type="hidden" name="token" value="abc">')
+        self.assertEqual(content_hash(base), content_hash(noisy))
+        self.assertNotEqual(content_hash(base), content_hash(base.replace('>A<', '>B<')))
+
+
+class TestHttpListingFetcher(unittest.TestCase):
+    """
+    Test cases cho HttpListingFetcher với stand-in server
+    """
+
+    def setUp(self):
+        self.server = serve_in_thread(StandInShop(pages=2, per_page=5, product_ids=['MEZZ']))
+        self.fetcher = HttpListingFetcher(timeout=5)
+
+    def tearDown(self):
+        self.fetcher.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_fetch_pages(self):
+        """Test tải listing, theo link next tới trang có sản phẩm"""
+        items, next_link = self.fetcher.fetch(self.server.base_url + listing_path())
+        self.assertEqual(len(items), 5)
+        self.assertIn('次の5件', next_link[0])
+
+        items, next_link = self.fetcher.fetch(next_link[1])
+        self.assertIsNone(next_link)
+        self.assertTrue(any('MEZZ' in name for name, _ in items))
+        self.assertTrue(all(href.startswith(self.server.base_url + '/shopdetail/') for _, href in items))
+        self.assertEqual(self.fetcher.requests_made, 2)
+        self.assertGreater(self.fetcher.bytes_received, 0)
+
+    def test_conditional_request_not_modified(self):
+        """Test lần tải thứ hai gửi If-None-Match và dùng lại kết quả khi nhận 304"""
+        url = self.server.base_url + listing_path()
+        first = self.fetcher.fetch(url)
+        second = self.fetcher.fetch(url)
+        self.assertIs(first, second)
+        self.assertEqual(self.fetcher.not_modified, 1)
+        self.assertEqual(self.fetcher.parsed, 1)
+        self.assertEqual(self.server.shop.not_modified_count, 1)
+
+    def test_unchanged_content_skips_parser(self):
+        """Test server không có ETag: trang giống hệt không phải phân tích lại, trang đổi thì có"""
+        self.server.shop.etag = False
+        url = self.server.base_url + listing_path()
+        first = self.fetcher.fetch(url)
+        self.assertIs(self.fetcher.fetch(url), first)
+        self.assertEqual(self.fetcher.stats()['unchanged'], 1)
+
+        code, _ = self.server.shop.catalog[0][0]
+        self.server.shop.catalog[0][0] = (code, 'MEZZ mới')
+        items, _ = self.fetcher.fetch(url)
+        self.assertEqual(items[0][0], 'MEZZ mới')
+        self.assertEqual(self.fetcher.stats()['parsed'], 2)
+
+    def test_sync_cookies_from_driver(self):
+        """Test cookie phiên đăng nhập của WebDriver được dùng cho request HTTP"""
+        login = requests.Session()
+        login.post(self.server.base_url + '/shop/login.html',
+                   data={'id': 'bench@example.com', 'passwd': 'x'}, timeout=5)
+        token = login.cookies.get('ers_session')
+        login.close()
+
+        driver = CookieDriver([{'name': 'ers_session', 'value': token, 'domain': '127.0.0.1', 'path': '/'}])
+        self.assertEqual(self.fetcher.sync_from_driver(driver), 1)
+        self.assertEqual(self.fetcher.session.headers['User-Agent'], 'StandInBench/1.0')
+
+        page = self.fetcher.session.get(self.server.base_url + '/index.html', timeout=5).text
+        self.assertIn('logout', page)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cases cho import danh sách tài khoản/sản phẩm
+"""
+
+import unittest
+import sys
+import os
+import io
+import json
+import tempfile
+
+# Thêm src vào path để import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from importers import ChunkedTreeLoader, ImportFormatError, collect_rows, iter_json_array, merge_rows, \
+    normalize_account, normalize_product, read_accounts, read_products
+
+
+class FakeTree:
+    """
+    Treeview giả: chỉ ghi lại các dòng được chèn
+    """
+
+    def __init__(self):
+        self.rows = []
+
+    def insert(self, parent, index, values=()):
+        self.rows.append(values)
+
+
+class FakeRoot:
+    """
+    Tk giả: after() chỉ xếp callback vào hàng đợi, run() chạy lần lượt
+    """
+
+    def __init__(self):
+        self.jobs = []
+        self.cancelled = []
+
+    def after(self, delay, callback):
+        self.jobs.append(callback)
+        return f"after#{len(self.jobs)}"
+
+    def after_cancel(self, job):
+        self.cancelled.append(job)
+
+    def run(self):
+        while self.jobs:
+            self.jobs.pop(0)()
+
+
+class TestJsonArrayStream(unittest.TestCase):
+    """
+    Test cases cho iter_json_array
+    """
+
+    def test_small_read_size(self):
+        """Test parse đúng khi phần tử bị cắt giữa các khối đọc"""
+        data = [{'productId': 'A1', 'name': 'Áo "đẹp"'}, 12345, "P-2", [1, 2], None, True, 3.5]
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+        for read_size in (1, 2, 3, 7, 64):
+            with self.subTest(read_size=read_size):
+                self.assertEqual(list(iter_json_array(io.StringIO(text), read_size)), data)
+
+    def test_empty_array(self):
+        """Test array rỗng"""
+        self.assertEqual(list(iter_json_array(io.StringIO("  [ ]  "), 1)), [])
+
+    def test_object_lines_read_as_jsonl(self):
+        """Test file bắt đầu bằng object được đọc như JSONL"""
+        text = '{"productId": "A"}\n{"productId": "B"}\n'
+        self.assertEqual(list(iter_json_array(io.StringIO(text), 5)), [{'productId': 'A'}, {'productId': 'B'}])
+
+    def test_invalid(self):
+        """Test file không phải JSON array hoặc bị cắt cụt"""
+        for text in ('"abc"', '', '[1, 2', '[1 2]', '[{"a": }]'):
+            with self.subTest(text=text):
+                with self.assertRaises(ImportFormatError):
+                    list(iter_json_array(io.StringIO(text), 4))
+
+
+class TestNormalize(unittest.TestCase):
+    """
+    Test cases cho chuẩn hóa bản ghi
+    """
+
+    def test_account(self):
+        """Test tài khoản hợp lệ/không hợp lệ"""
+        self.assertEqual(normalize_account({'email': ' a@x.com ', 'password': 'p'}), ('a@x.com', 'p'))
+        self.assertEqual(normalize_account({'email': 'a@x.com', 'password': 123456}), ('a@x.com', '123456'))
+        self.assertIsNone(normalize_account({'email': 'a@x.com'}))
+        self.assertIsNone(normalize_account({'email': '', 'password': 'p'}))
+        self.assertIsNone(normalize_account('a@x.com'))
+
+    def test_product(self):
+        """Test sản phẩm dạng object, chuỗi hoặc số"""
+        self.assertEqual(normalize_product({'productId': ' 12345 '}), ('12345',))
+        self.assertEqual(normalize_product({'product_id': 'X'}), ('X',))
+        self.assertEqual(normalize_product(67890), ('67890',))
+        self.assertEqual(normalize_product('ABC'), ('ABC',))
+        self.assertIsNone(normalize_product({'name': 'thiếu ID'}))
+        self.assertIsNone(normalize_product(True))
+        self.assertIsNone(normalize_product(None))
+
+    def test_collect_rows(self):
+        """Test bỏ trùng, đếm dòng không hợp lệ và giới hạn tính cả dòng đã có"""
+        records = ['A', 'B', {'name': 'x'}, 'A', 'C', 'D', 'E']
+        result = collect_rows(records, normalize_product, limit=3, existing=['B'])
+        self.assertEqual(result.rows, (('A',), ('C',)))
+        self.assertEqual((result.total, result.invalid, result.duplicates, result.over_limit), (7, 1, 2, 2))
+        self.assertIn("2/7", result.summary())
+
+    def test_merge_rows(self):
+        """Test nối kết quả đã đọc vào danh sách đang có: bỏ trùng, giới hạn, cộng dồn số đếm"""
+        result = collect_rows(['A', 'B', 'B', 'C', 'D'], normalize_product, limit=3)
+        merged = merge_rows(result, limit=3, existing=['B'])
+        self.assertEqual(merged.rows, (('A',), ('C',)))
+        self.assertEqual((merged.total, merged.invalid, merged.duplicates, merged.over_limit), (5, 0, 2, 1))
+        self.assertEqual(merge_rows(result, limit=3), result)
+
+    def test_collect_rows_unlimited(self):
+        """Test không giới hạn"""
+        result = collect_rows((f"P{i}" for i in range(5000)), normalize_product)
+        self.assertEqual(len(result.rows), 5000)
+        self.assertEqual(result.summary(), "5000/5000 dòng")
+
+
+class TestReadFiles(unittest.TestCase):
+    """
+    Test cases cho read_accounts/read_products với các định dạng file
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        return path
+
+    def test_products_formats(self):
+        """Test cùng danh sách sản phẩm ở dạng JSON, JSONL, CSV có/không tiêu đề"""
+        products = [{'productId': str(10000 + i)} for i in range(3000)] + [{'productId': '10000'}]
+        files = {
+            'products.json': json.dumps(products),
+            'products.jsonl': "".join(json.dumps(p) + "\n" for p in products),
+            'products.csv': "productId,name\n" + "".join(f"{p['productId']},x\n" for p in products),
+            'products.txt': "".join(f"{p['productId']}\n" for p in products),
+        }
+        for name, text in files.items():
+            with self.subTest(name=name):
+                result = read_products(self.write(name, text), limit=None)
+                self.assertEqual(len(result.rows), 3000)
+                self.assertEqual(result.rows[0], ('10000',))
+                self.assertEqual(result.duplicates, 1)
+
+    def test_products_default_limit(self):
+        """Test giới hạn mặc định MAX_PRODUCTS"""
+        path = self.write('products.json', json.dumps([str(i) for i in range(1000)]))
+        result = read_products(path)
+        self.assertEqual(len(result.rows), 60)
+        self.assertEqual(result.over_limit, 940)
+
+    def test_accounts_csv_with_bom(self):
+        """Test CSV tài khoản có BOM (Excel) và dòng không hợp lệ"""
+        path = self.write('accounts.csv', "﻿email,password\na@x.com,1\n,2\nb@x.com,3\na@x.com,4\n")
+        result = read_accounts(path)
+        self.assertEqual(result.rows, (('a@x.com', '1'), ('b@x.com', '3')))
+        self.assertEqual((result.invalid, result.duplicates), (1, 1))
+
+    def test_accounts_jsonl_bad_line(self):
+        """Test dòng JSONL hỏng được đếm là không hợp lệ"""
+        path = self.write('accounts.jsonl', '{"email": "a@x.com", "password": "p"}\n{broken\n')
+        result = read_accounts(path)
+        self.assertEqual(result.rows, (('a@x.com', 'p'),))
+        self.assertEqual(result.invalid, 1)
+
+    def test_not_array(self):
+        """Test file JSON không phải array"""
+        path = self.write('accounts.json', '"abc"')
+        with self.assertRaises(ImportFormatError):
+            read_accounts(path)
+
+
+class TestChunkedTreeLoader(unittest.TestCase):
+    """
+    Test cases cho ChunkedTreeLoader
+    """
+
+    def test_loads_in_chunks(self):
+        """Test chèn theo khối, khối đầu chạy ngay, các khối sau qua after()"""
+        root = FakeRoot()
+        tree = FakeTree()
+        done = []
+        rows = [(str(i),) for i in range(450)]
+        loader = ChunkedTreeLoader(root, tree, rows, chunk_size=200, on_done=done.append).start()
+        self.assertEqual(len(tree.rows), 200)
+        self.assertFalse(loader.done)
+        root.run()
+        self.assertEqual(tree.rows, rows)
+        self.assertEqual(loader.chunks, 3)
+        self.assertEqual(done, [450])
+
+    def test_empty(self):
+        """Test danh sách rỗng gọi on_done ngay"""
+        done = []
+        ChunkedTreeLoader(FakeRoot(), FakeTree(), [], on_done=done.append).start()
+        self.assertEqual(done, [0])
+
+    def test_cancel(self):
+        """Test hủy giữa chừng"""
+        root = FakeRoot()
+        tree = FakeTree()
+        done = []
+        loader = ChunkedTreeLoader(root, tree, [(str(i),) for i in range(10)], chunk_size=4,
+                                   on_done=done.append).start()
+        loader.cancel()
+        root.run()
+        self.assertEqual(len(tree.rows), 4)
+        self.assertEqual(root.cancelled, ['after#1'])
+        self.assertEqual(done, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cases cho chế độ lean (chặn tài nguyên) và số liệu tải trang
+"""
+
+import unittest
+import sys
+import os
+import urllib.request
+
+# Thêm src vào path để import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from selenium.webdriver.chrome.options import Options
+
+from lean_mode import LeanProfile, PageLoadStats, collect_page_metrics, PAGE_METRICS_SCRIPT
+from standin_server import StandInShop, serve_in_thread
+
+
+class RecordingDriver:
+    """
+    Driver giả lập ghi lại lệnh CDP / script
+    """
+
+    def __init__(self, metrics=None):
+        self.cdp = []
+        self.metrics = metrics
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp.append((cmd, params))
+        return {}
+
+    def execute_script(self, script, *args):
+        return self.metrics
+
+
+class TestLeanProfile(unittest.TestCase):
+    """
+    Test cases cho LeanProfile
+    """
+
+    def test_blocked_patterns(self):
+        """Test pattern chặn theo đuôi file và theo host"""
+        patterns = LeanProfile(blocked_hosts=['*.doubleclick.net']).blocked_url_patterns()
+        self.assertIn('*.png', patterns)
+        self.assertIn('*.woff2?*', patterns)
+        self.assertIn('*.mp4', patterns)
+        self.assertIn('*://*.doubleclick.net/*', patterns)
+
+    def test_disabled_types(self):
+        """Test tắt từng loại tài nguyên"""
+        profile = LeanProfile(block_images=False, block_fonts=False, block_media=False, blocked_hosts=[])
+        self.assertEqual(profile.blocked_url_patterns(), [])
+        self.assertEqual(profile.chrome_prefs(), {})
+
+    def test_allowlist_wins(self):
+        """Test host trong allowlist không bị chặn"""
+        profile = LeanProfile(blocked_hosts=['cdn.er-sports.com', 'er-sports.com', 'ads.example.com'],
+                              allowed_hosts=['*.er-sports.com'])
+        self.assertEqual(profile.effective_blocked_hosts(), ['ads.example.com'])
+
+    def test_apply_options_and_install(self):
+        """Test áp dụng prefs vào ChromeOptions và gửi lệnh CDP"""
+        profile = LeanProfile.from_dict({'block_fonts': False, 'blocked_hosts': ['localhost']})
+        options = Options()
+        profile.apply_options(options)
+        self.assertEqual(options.experimental_options['prefs'],
+                         {'profile.managed_default_content_settings.images': 2})
+
+        driver = RecordingDriver()
+        self.assertTrue(profile.install(driver))
+        self.assertEqual(driver.cdp[0][0], 'Network.enable')
+        cmd, params = driver.cdp[1]
+        self.assertEqual(cmd, 'Network.setBlockedURLs')
+        self.assertIn('*://localhost/*', params['urls'])
+        self.assertNotIn('*.woff2', params['urls'])
+
+    def test_page_load_stats(self):
+        """Test tổng hợp thời gian tải và byte"""
+        stats = PageLoadStats()
+        self.assertEqual(stats.report(), {'pages': 0})
+        stats.record(collect_page_metrics(RecordingDriver({'load_ms': 100, 'bytes': 3000, 'resources': 4})))
+        stats.record({'load_ms': 300, 'bytes': 1000, 'resources': 0})
+        stats.record(None)
+        report = stats.report()
+        self.assertEqual(report['pages'], 2)
+        self.assertEqual(report['load_ms_mean'], 200)
+        self.assertEqual(report['bytes_total'], 4000)
+        self.assertIn('transferSize', PAGE_METRICS_SCRIPT)
+        self.assertIsNone(report['cache_hit_ratio'])
+
+        stats.record({'load_ms': 900, 'resources': 4, 'measured': 4, 'cached': 0}, first=True)
+        stats.record({'load_ms': 500, 'resources': 4, 'measured': 4, 'cached': 3}, first=True)
+        stats.record({'load_ms': 100, 'resources': 4, 'measured': 2, 'cached': 2})
+        report = stats.report()
+        self.assertEqual(report['cache_hit_ratio'], 50.0)
+        self.assertEqual((report['first_pages'], report['first_load_ms_mean']), (2, 700.0))
+        stats.reset()
+        self.assertEqual(stats.report(), {'pages': 0})
+
+
+class TestStandInAssets(unittest.TestCase):
+    """
+    Test tài nguyên tĩnh của stand-in server (dùng cho benchmark lean)
+    """
+
+    def test_assets_served(self):
+        """Test trang có ảnh, font, script widget từ host khác và tài nguyên được phục vụ"""
+        server = serve_in_thread(StandInShop(pages=1, per_page=2, assets=True, asset_kb=1, images_per_page=3))
+        try:
+            with urllib.request.urlopen(server.base_url + '/index.html') as response:
+                page = response.read().decode('utf-8')
+            self.assertEqual(page.count('/static/img/'), 3)
+            self.assertIn('/static/font/standin.woff2', page)
+            self.assertIn(f'http://localhost:{server.server_address[1]}/static/widget.js', page)
+
+            with urllib.request.urlopen(server.base_url + '/static/img/0.png') as response:
+                self.assertEqual(len(response.read()), 1024)
+                self.assertIsNone(response.headers.get('Cache-Control'))
+            self.assertEqual(server.shop.asset_count, 1)
+
+            server.shop.asset_max_age = 3600
+            with urllib.request.urlopen(server.base_url + '/static/font/standin.woff2') as response:
+                self.assertEqual(response.headers.get('Cache-Control'), "public, max-age=3600")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
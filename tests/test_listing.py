@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cases cho việc đọc trang listing và bộ đếm round trip (không cần Chrome)
+"""
+
+import unittest
+import sys
+import os
+import json
+
+# Thêm src vào path để import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from listing import (LISTING_EXTRACT_SCRIPT, PRODUCT_LINK_SELECTOR, NEXT_LINK_SELECTOR,
+                     extract_listing, parse_listing_payload, find_product,
+                     normalize_text, ProductMatcher, ListingIndex)
+from tracing import RoundTripCounter
+
+
+class ListingDriver:
+    """
+    Driver giả lập trả về payload JSON của trang listing
+    """
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.commands = []
+
+    def execute(self, command, params=None):
+        self.commands.append((command, params))
+        return self.payload
+
+    def execute_script(self, script, *args):
+        return self.execute('executeScript', {'script': script, 'args': list(args)})
+
+
+class TestListing(unittest.TestCase):
+    """
+    Test cases cho listing module
+    """
+
+    def setUp(self):
+        self.payload = json.dumps({
+            'items': [['ラケット ABC-1', 'https://shop/shopdetail/1/'],
+                      ['シューズ MEZZ-2 限定', 'https://shop/shopdetail/2/']],
+            'next': ['次の48件', 'https://shop/shop/shopbrand.html?page=2'],
+        })
+
+    def test_parse_payload(self):
+        """Test giải mã JSON thành list tuple"""
+        items, next_link = parse_listing_payload(self.payload)
+        self.assertEqual(items[1], ('シューズ MEZZ-2 限定', 'https://shop/shopdetail/2/'))
+        self.assertEqual(next_link, ('次の48件', 'https://shop/shop/shopbrand.html?page=2'))
+
+    def test_parse_empty_payload(self):
+        """Test payload rỗng hoặc không có link next"""
+        self.assertEqual(parse_listing_payload(None), ([], None))
+        self.assertEqual(parse_listing_payload('{"items": [], "next": null}'), ([], None))
+
+    def test_find_product(self):
+        """Test so khớp product ID trong tên"""
+        items, _ = parse_listing_payload(self.payload)
+        self.assertEqual(find_product(items, 'MEZZ')[1], 'https://shop/shopdetail/2/')
+        self.assertIsNone(find_product(items, 'XYZ'))
+        self.assertIsNone(find_product(items, ''))
+
+    def test_extract_is_single_round_trip(self):
+        """Test toàn bộ trang listing chỉ tốn một lệnh WebDriver"""
+        driver = ListingDriver(self.payload)
+        counter = RoundTripCounter()
+        self.assertTrue(counter.attach(driver))
+        mark = counter.mark()
+
+        items, next_link = extract_listing(driver)
+
+        self.assertEqual(len(items), 2)
+        self.assertIsNotNone(next_link)
+        self.assertEqual(counter.since(mark), 1)
+        command, params = driver.commands[0]
+        self.assertEqual(command, 'executeScript')
+        self.assertEqual(params['script'], LISTING_EXTRACT_SCRIPT)
+        self.assertEqual(params['args'], [PRODUCT_LINK_SELECTOR, NEXT_LINK_SELECTOR])
+
+    def test_counter_attach_idempotent(self):
+        """Test gắn bộ đếm hai lần không đếm trùng"""
+        driver = ListingDriver('{}')
+        counter = RoundTripCounter()
+        counter.attach(driver)
+        counter.attach(driver)
+        driver.execute('getTitle')
+        self.assertEqual(counter.count, 1)
+
+
+class TestProductMatcher(unittest.TestCase):
+    """
+    Test cases cho so khớp nhiều product ID và chỉ mục listing
+    """
+
+    def test_normalize_width_and_case(self):
+        """Test chuẩn hóa full-width/half-width và hoa/thường"""
+        self.assertEqual(normalize_text('ＭＥＺＺ－２'), normalize_text('mezz-2'))
+        self.assertEqual(normalize_text('ｶﾀｶﾅ'), 'カタカナ')
+
+    def test_find_all_overlapping(self):
+        """Test các ID chồng lấn / lồng nhau đều được tìm thấy"""
+        matcher = ProductMatcher(['ABC', 'BCD', 'C', 'XYZ'])
+        self.assertEqual(sorted(matcher.find_all('zABCDz')), ['ABC', 'BCD', 'C'])
+        self.assertEqual(matcher.find_all('nothing here'), [])
+
+    def test_find_all_fullwidth_name(self):
+        """Test tên sản phẩm full-width vẫn khớp ID half-width"""
+        matcher = ProductMatcher(['MEZZ', 'abc-1'])
+        self.assertEqual(matcher.find_all('シューズ ＭＥＺＺ 限定 ABC-1'), ['MEZZ', 'abc-1'])
+
+    def test_matcher_ignores_empty_and_duplicates(self):
+        """Test bỏ qua ID rỗng và trùng"""
+        matcher = ProductMatcher(['', '  ', 'A1', 'A1'])
+        self.assertEqual(matcher.product_ids, ['A1'])
+
+    def test_listing_index(self):
+        """Test dựng chỉ mục qua nhiều page, giữ kết quả đầu tiên"""
+        index = ListingIndex(['MEZZ', 'ABC', 'NONE'])
+        self.assertEqual(index.add_page([('x MEZZ', '/shopdetail/1/'), ('y', '/shopdetail/2/')], 1), 1)
+        self.assertEqual(index.add_page([('ABC and MEZZ', '/shopdetail/3/')], 2), 1)
+
+        self.assertIn('ABC', index)
+        self.assertEqual(index.get('MEZZ'), {'name': 'x MEZZ', 'url': '/shopdetail/1/', 'page': 1})
+        self.assertEqual(index.get('ABC')['page'], 2)
+        self.assertEqual(index.missing, ['NONE'])
+        self.assertFalse(index.complete)
+        self.assertEqual((index.pages_scanned, index.items_scanned, len(index)), (2, 3, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cases cho logging qua queue
+"""
+
+import unittest
+import sys
+import os
+import gzip
+import time
+import logging
+import logging.handlers
+import tempfile
+
+# Thêm src vào path để import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from log_setup import LOG_FILENAME, enforce_retention, setup_queue_logging, stop_queue_logging
+
+
+class TestLogSetup(unittest.TestCase):
+    """
+    Test cases cho log_setup
+    """
+
+    def setUp(self):
+        self.root = logging.getLogger()
+        self.saved_handlers = list(self.root.handlers)
+        self.saved_level = self.root.level
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        for handler in list(self.root.handlers):
+            self.root.removeHandler(handler)
+        for handler in self.saved_handlers:
+            self.root.addHandler(handler)
+        self.root.setLevel(self.saved_level)
+        self.tmp.cleanup()
+
+    def test_rotation_and_gzip(self):
+        """Test ghi qua queue, xoay file theo dung lượng và nén file cũ"""
+        listener = setup_queue_logging(self.tmp.name, max_file_size=2000, max_files=2, console_output=False)
+        self.assertEqual(len(self.root.handlers), 1)
+        self.assertIsInstance(self.root.handlers[0], logging.handlers.QueueHandler)
+        logger = logging.getLogger('test_log_setup')
+        for index in range(200):
+            logger.info("message %d %s", index, "x" * 40)
+        self.assertTrue(listener.running)
+        stop_queue_logging(listener)
+        self.assertFalse(listener.running)
+        stop_queue_logging(listener)  # Gọi lần hai không lỗi
+        self.assertFalse(listener.stop())
+
+        files = sorted(os.listdir(self.tmp.name))
+        self.assertEqual(files, [LOG_FILENAME, LOG_FILENAME + '.1.gz', LOG_FILENAME + '.2.gz'])
+        with gzip.open(os.path.join(self.tmp.name, LOG_FILENAME + '.1.gz'), 'rt', encoding='utf-8') as f:
+            self.assertIn("message", f.read())
+        with open(os.path.join(self.tmp.name, LOG_FILENAME), encoding='utf-8') as f:
+            self.assertIn("message 199", f.read())
+
+    def test_level(self):
+        """Test mức log lấy từ cấu hình"""
+        listener = setup_queue_logging(self.tmp.name, level='WARNING', console_output=False)
+        logging.getLogger('test_log_setup').info("hidden")
+        logging.getLogger('test_log_setup').warning("shown")
+        stop_queue_logging(listener)
+        with open(os.path.join(self.tmp.name, LOG_FILENAME), encoding='utf-8') as f:
+            content = f.read()
+        self.assertNotIn("hidden", content)
+        self.assertIn("shown", content)
+
+    def test_retention(self):
+        """Test dọn file đã xoay thừa và file log kiểu cũ"""
+        names = [LOG_FILENAME, LOG_FILENAME + '.1.gz', LOG_FILENAME + '.2.gz', LOG_FILENAME + '.3.gz']
+        for index in range(4):
+            names.append(f"automation_2024010{index + 1}_000000.log")
+        for index, name in enumerate(names):
+            path = os.path.join(self.tmp.name, name)
+            with open(path, 'w') as f:
+                f.write(name)
+            os.utime(path, (time.time() - 1000 + index, time.time() - 1000 + index))
+
+        removed = {os.path.basename(path) for path in enforce_retention(self.tmp.name, 2)}
+        self.assertEqual(removed, {LOG_FILENAME + '.3.gz', 'automation_20240101_000000.log',
+                                   'automation_20240102_000000.log'})
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, LOG_FILENAME)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cases cho hiển thị log theo lô
+"""
+
+import unittest
+import sys
+import os
+import queue
+
+# Thêm src vào path để import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from log_view import LogBuffer, LogView, drain_queue, pump_log_queue
+
+
+class FakeText:
+    """
+    Text widget giả lập: lưu nội dung theo dòng và ghi lại các lệnh được gọi
+    """
+
+    def __init__(self):
+        self.content = ""
+        self.calls = []
+        self.state = "disabled"
+
+    def config(self, state=None):
+        self.state = state
+
+    def insert(self, index, *args):
+        assert self.state == "normal"
+        self.calls.append(('insert', args))
+        self.content += "".join(args[0::2])
+
+    def delete(self, start, end):
+        assert self.state == "normal"
+        self.calls.append(('delete', start, end))
+        if end == "end":
+            self.content = ""
+            return
+        line = int(end.split('.')[0])
+        self.content = "".join(self.content.splitlines(keepends=True)[line - 1:])
+
+    def see(self, index):
+        self.calls.append(('see', index))
+
+    def lines(self):
+        return self.content.splitlines()
+
+
+class TestLogView(unittest.TestCase):
+    """
+    Test cases cho LogView
+    """
+
+    def test_batch_is_one_insert(self):
+        """Test cả lô được insert một lần, gom dòng cùng level vào một tag"""
+        widget = FakeText()
+        view = LogView(widget, max_lines=100)
+        view.append([("a", "INFO"), ("b", "INFO"), ("c", "ERROR"), ("d", "INFO")])
+        inserts = [call for call in widget.calls if call[0] == 'insert']
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(inserts[0][1], ("a\nb\n", ("INFO",), "c\n", ("ERROR",), "d\n", ("INFO",)))
+        self.assertEqual(widget.lines(), ["a", "b", "c", "d"])
+        self.assertEqual(widget.state, "disabled")
+
+    def test_untagged(self):
+        """Test widget không tô màu nhận một chuỗi duy nhất"""
+        widget = FakeText()
+        LogView(widget, tagged=False).append([("a", "INFO"), ("b", "ERROR")])
+        self.assertEqual(widget.calls[0], ('insert', ("a\nb\n",)))
+
+    def test_ring_buffer(self):
+        """Test chỉ giữ max_lines dòng mới nhất"""
+        widget = FakeText()
+        view = LogView(widget, max_lines=3)
+        for index in range(5):
+            view.append([(f"line {index}", "INFO")])
+        self.assertEqual(widget.lines(), ["line 2", "line 3", "line 4"])
+        self.assertEqual(view.line_count, 3)
+
+        # Lô lớn hơn giới hạn: chỉ insert phần được giữ lại
+        view.append([(f"big {index}", "INFO") for index in range(10)])
+        self.assertEqual(widget.lines(), ["big 7", "big 8", "big 9"])
+        self.assertEqual(widget.calls[-3][1], ("big 7\nbig 8\nbig 9\n", ("INFO",)))
+
+        view.set_max_lines(1)
+        self.assertEqual(widget.lines(), ["big 9"])
+        view.clear()
+        self.assertEqual(widget.content, "")
+        self.assertEqual(view.line_count, 0)
+
+    def test_pump_caps_batch(self):
+        """Test mỗi lần chỉ lấy tối đa batch_size entry khỏi queue"""
+        source = queue.Queue()
+        for index in range(25):
+            source.put((f"m{index}", "INFO"))
+        widget = FakeText()
+        view = LogView(widget)
+        self.assertEqual(pump_log_queue(source, [view], batch_size=10), 10)
+        self.assertEqual(source.qsize(), 15)
+        self.assertEqual(len(drain_queue(source, 100)), 15)
+        self.assertEqual(pump_log_queue(source, [view], batch_size=10), 0)
+        self.assertEqual(widget.lines()[-1], "m9")
+
+
+class TestLogBuffer(unittest.TestCase):
+    """
+    Test cases cho LogBuffer (tab log chưa được dựng)
+    """
+
+    def test_buffer_then_attach(self):
+        """Test buffer giữ tối đa max_lines entry và chuyển sang widget khi tab được dựng"""
+        source = queue.Queue()
+        for index in range(30):
+            source.put((f"m{index}", "INFO"))
+        buffer = LogBuffer(max_lines=20)
+        pump_log_queue(source, [buffer], batch_size=100)
+        buffer.set_max_lines(10)
+        self.assertEqual(buffer.line_count, 10)
+
+        widget = FakeText()
+        view = buffer.attach(widget)
+        self.assertIsInstance(view, LogView)
+        self.assertEqual(widget.lines(), [f"m{index}" for index in range(20, 30)])
+        self.assertEqual(view.max_lines, 10)
+        self.assertEqual(buffer.line_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
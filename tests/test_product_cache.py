@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cases cho cache product ID -> URL trang chi tiết
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Thêm src vào path để import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from product_cache import ProductCache
+
+
+class FakeClock:
+    """
+    Đồng hồ giả lập để test TTL
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestProductCache(unittest.TestCase):
+    """
+    Test cases cho ProductCache
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ProductCache(ttl=60, max_entries=2, clock=self.clock)
+
+    def test_hit_and_miss(self):
+        """Test đếm hit/miss"""
+        self.assertIsNone(self.cache.get('MEZZ'))
+        self.cache.put('MEZZ', 'https://shop/shopdetail/1/', 2)
+        entry = self.cache.get('MEZZ')
+        self.assertEqual((entry['url'], entry['page']), ('https://shop/shopdetail/1/', 2))
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (1, 1, 1))
+        self.assertEqual(stats['hit_rate'], 50)
+
+    def test_ttl_expiry(self):
+        """Test entry hết hạn sau TTL, xác minh lại thì gia hạn"""
+        self.cache.put('MEZZ', '/shopdetail/1/', 1)
+        self.clock.now += 50
+        self.cache.put('MEZZ', '/shopdetail/1/')
+        self.clock.now += 50
+        self.assertEqual(self.cache.get('MEZZ')['page'], 1)
+        self.clock.now += 61
+        self.assertNotIn('MEZZ', self.cache)
+        self.assertIsNone(self.cache.get('MEZZ'))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_lru_eviction(self):
+        """Test loại entry ít dùng nhất khi vượt max_entries"""
+        self.cache.put('A', '/a', 1)
+        self.cache.put('B', '/b', 1)
+        self.cache.get('A')
+        self.cache.put('C', '/c', 1)
+        self.assertIn('A', self.cache)
+        self.assertNotIn('B', self.cache)
+        self.assertIn('C', self.cache)
+
+    def test_invalidate(self):
+        """Test xóa entry khi trang chi tiết không còn hợp lệ"""
+        self.cache.put('A', '/a', 1)
+        self.assertTrue(self.cache.invalidate('A'))
+        self.assertFalse(self.cache.invalidate('A'))
+        self.assertEqual(self.cache.stats()['invalidations'], 1)
+
+    def test_persistence(self):
+        """Test lưu và load lại từ file, bỏ qua entry hết hạn"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'config', 'product_cache.json')
+            cache = ProductCache(path, ttl=60, clock=self.clock)
+            cache.put('A', '/a', 1)
+            self.clock.now += 30
+            cache.put('B', '/b', 3)
+            self.assertTrue(cache.save())
+            self.assertFalse(cache.save())  # Không có thay đổi
+
+            self.clock.now += 40  # A đã quá 60s, B còn hạn
+            reloaded = ProductCache(path, ttl=60, clock=self.clock)
+            self.assertNotIn('A', reloaded)
+            self.assertEqual(reloaded.get('B')['page'], 3)
+
+    def test_load_corrupt_file(self):
+        """Test file cache hỏng không làm lỗi khởi tạo"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'product_cache.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('{not json')
+            self.assertEqual(len(ProductCache(path)), 0)
+
+    def test_load_wrong_shape(self):
+        """Test JSON hợp lệ nhưng sai cấu trúc được coi như cache trống"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'product_cache.json')
+            for data in ([1, 2], 'abc', 5, None, {'entries': {'A': {}}},
+                         {'entries': [['A'], 'B', ['C', 'not dict']]}):
+                with self.subTest(data=data):
+                    with open(path, 'w', encoding='utf-8') as f:
+                        json.dump(data, f)
+                    self.assertEqual(len(ProductCache(path)), 0)
+
+    def test_load_skips_bad_entries(self):
+        """Test entry sai kiểu bị bỏ qua, entry hợp lệ cùng file vẫn được load"""
+        good = {'url': '/good', 'page': 2, 'verified_at': self.clock.now}
+        bad_entries = {
+            'verified_at_string': ['A', {'url': '/a', 'page': 1, 'verified_at': 'x'}],
+            'verified_at_missing': ['A', {'url': '/a', 'page': 1}],
+            'verified_at_bool': ['A', {'url': '/a', 'page': 1, 'verified_at': True}],
+            'product_id_list': [['A'], {'url': '/a', 'page': 1, 'verified_at': self.clock.now}],
+            'product_id_int': [123, {'url': '/a', 'page': 1, 'verified_at': self.clock.now}],
+            'url_not_string': ['A', {'url': 5, 'page': 1, 'verified_at': self.clock.now}],
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'product_cache.json')
+            for name, item in bad_entries.items():
+                with self.subTest(name=name):
+                    with open(path, 'w', encoding='utf-8') as f:
+                        json.dump({'version': 1, 'entries': [item, ['G', good]]}, f)
+                    cache = ProductCache(path, ttl=60, clock=self.clock)
+                    self.assertEqual(len(cache), 1)
+                    self.assertEqual(cache.get('G')['page'], 2)
+
+    def test_load_bad_page_and_put(self):
+        """Test page sai kiểu/thiếu được coi là None, put() sau đó không lỗi"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'product_cache.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'version': 1, 'entries': [['A', {'url': '/a', 'verified_at': self.clock.now}],
+                                                     ['B', {'url': '/b', 'page': 'x', 'verified_at': self.clock.now}]]}, f)
+            cache = ProductCache(path, ttl=60, clock=self.clock)
+            self.assertIsNone(cache.get('A')['page'])
+            self.assertIsNone(cache.get('B')['page'])
+            cache.put('A', '/a')
+            self.assertIsNone(cache.get('A')['page'])
+            self.assertTrue(cache.save())
+            self.assertFalse(os.path.exists(path + '.tmp'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cases cho lưu phiên đăng nhập theo tài khoản
+"""
+
+import unittest
+import sys
+import os
+import json
+import base64
+import tempfile
+from unittest import mock
+
+# Thêm src vào path để import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import session_store
+from session_store import SessionStore, SESSIONS_FILENAME, KEY_FILENAME, KEY_ENV, CRYPTOGRAPHY_AVAILABLE, cdp_cookie
+from events import account_hash
+
+COOKIES = [
+    {'name': 'ers_session', 'value': 'secret-token', 'domain': 'www.er-sports.com', 'path': '/',
+     'secure': True, 'httpOnly': True, 'sameSite': 'Lax'},
+    {'name': 'cart', 'value': '1', 'domain': 'www.er-sports.com', 'path': '/', 'expiry': 1500, 'size': 5},
+]
+
+
+class XorCipher:
+    """
+    Cipher giả (đảo ngược được, sai khóa thì lỗi) để test không cần cryptography
+    """
+
+    def __init__(self, key):
+        self.key = key
+
+    def encrypt(self, data):
+        return base64.b64encode(bytes([self.key]) + bytes(b ^ self.key for b in data))
+
+    def decrypt(self, token):
+        raw = base64.b64decode(token)
+        if raw[0] != self.key:
+            raise ValueError("sai khóa")
+        return bytes(b ^ self.key for b in raw[1:])
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSessionStore(unittest.TestCase):
+    """
+    Test cases cho SessionStore
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, SESSIONS_FILENAME)
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def store(self, key=7):
+        return SessionStore(self.path, cipher=XorCipher(key), clock=self.clock)
+
+    def test_save_and_load(self):
+        """Test lưu rồi nạp lại cookie, file không chứa email và cookie dạng rõ"""
+        store = self.store()
+        self.assertTrue(store.save('User@Example.com', COOKIES))
+        with open(self.path, encoding='utf-8') as f:
+            text = f.read()
+        self.assertNotIn('example.com', text.lower())
+        self.assertNotIn('secret-token', text)
+        self.assertIn(account_hash('user@example.com'), json.loads(text)['sessions'])
+
+        cookies = self.store().load('user@example.com')
+        self.assertEqual([cookie['name'] for cookie in cookies], ['ers_session', 'cart'])
+        # Trường không cần cho nạp lại bị bỏ
+        self.assertNotIn('size', cookies[1])
+        self.assertIsNone(store.load('other@example.com'))
+
+    def test_expired_sessions_dropped(self):
+        """Test phiên quá tuổi hoặc mọi cookie đã hết hạn thì bị xóa khỏi file"""
+        store = self.store()
+        store.save('a@x.com', COOKIES)
+        self.clock.now = 2000
+        # Cookie 'cart' có expiry 1500: chỉ còn cookie phiên
+        self.assertEqual([cookie['name'] for cookie in store.load('a@x.com')], ['ers_session'])
+
+        self.clock.now = 1000 + 3600 + 1
+        self.assertIsNone(store.load('a@x.com', max_age=3600))
+        self.assertFalse(os.path.exists(self.path))
+
+        store.save('b@x.com', [COOKIES[1]])
+        self.assertIsNone(store.load('b@x.com'))
+
+    def test_wrong_key_and_forget(self):
+        """Test không giải mã được (đổi khóa) thì coi như không có phiên; forget() xóa phiên"""
+        self.store(key=7).save('a@x.com', COOKIES)
+        self.store(key=7).save('b@x.com', COOKIES)
+        self.assertIsNone(self.store(key=9).load('a@x.com'))
+        store = self.store(key=7)
+        self.assertIsNone(store.load('a@x.com'))
+        store.forget('b@x.com')
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_save_prunes_old_sessions(self):
+        """Test lưu phiên mới thì bỏ phiên quá tuổi của tài khoản khác"""
+        store = self.store()
+        store.save('a@x.com', COOKIES)
+        self.clock.now = 1000 + 7200
+        store.save('b@x.com', COOKIES, max_age=3600)
+        with open(self.path, encoding='utf-8') as f:
+            self.assertEqual(list(json.load(f)['sessions']), [account_hash('b@x.com')])
+
+    def test_disabled_without_cryptography(self):
+        """Test chưa cài cryptography thì không lưu gì ra đĩa"""
+        with mock.patch.object(session_store, 'CRYPTOGRAPHY_AVAILABLE', False):
+            store = SessionStore(self.path)
+            self.assertFalse(store.enabled)
+            self.assertFalse(store.save('a@x.com', COOKIES))
+            self.assertIsNone(store.load('a@x.com'))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_cdp_cookie(self):
+        """Test chuyển cookie Selenium sang tham số CDP Network.setCookies"""
+        self.assertEqual(cdp_cookie(COOKIES[1], 'https://www.er-sports.com'),
+                         {'name': 'cart', 'value': '1', 'path': '/', 'domain': 'www.er-sports.com', 'expires': 1500})
+        self.assertEqual(cdp_cookie({'name': 'a', 'value': 'b'}, 'https://www.er-sports.com'),
+                         {'name': 'a', 'value': 'b', 'path': '/', 'url': 'https://www.er-sports.com'})
+
+    @unittest.skipUnless(CRYPTOGRAPHY_AVAILABLE, "cần cryptography")
+    def test_fernet_key_file(self):
+        """Test mã hóa Fernet: tạo khóa 0600 lần đầu, ERS_SESSION_KEY ghi đè file khóa"""
+        with mock.patch.dict(os.environ, {}, clear=False):
+            os.environ.pop(KEY_ENV, None)
+            SessionStore(self.path).save('a@x.com', COOKIES)
+            key_path = os.path.join(self.tmp.name, KEY_FILENAME)
+            if os.name == 'posix':
+                self.assertEqual(os.stat(key_path).st_mode & 0o777, 0o600)
+            self.assertEqual(SessionStore(self.path).load('a@x.com')[0]['value'], 'secret-token')
+
+            from cryptography.fernet import Fernet
+            os.environ[KEY_ENV] = Fernet.generate_key().decode('ascii')
+            self.assertIsNone(SessionStore(self.path).load('a@x.com'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cases cho lưu cấu hình/trạng thái
+"""
+
+import unittest
+import sys
+import os
+import json
+import time
+import tempfile
+from unittest import mock
+
+# Thêm src vào path để import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import settings_store
+from settings_store import DebouncedWriter, SettingsStore, atomic_write_text
+
+
+class TestDebouncedWriter(unittest.TestCase):
+    """
+    Test cases cho DebouncedWriter
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'settings.json')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self):
+        with open(self.path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_coalesces_burst(self):
+        """Test nhiều lần lưu liên tiếp chỉ ghi một lần, với dữ liệu mới nhất"""
+        writer = DebouncedWriter(self.path, delay=0.05, max_delay=1.0)
+        for index in range(50):
+            writer.schedule({'value': index})
+        deadline = time.time() + 2
+        while writer.writes == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        writer.close()
+        self.assertEqual(writer.requests, 50)
+        self.assertEqual(writer.writes, 1)
+        self.assertEqual(self.read(), {'value': 49})
+
+    def test_skip_unchanged_and_flush(self):
+        """Test flush ghi ngay và bỏ qua nội dung giống lần ghi trước"""
+        writer = DebouncedWriter(self.path, delay=10, max_delay=10)
+        writer.schedule({'a': 1})
+        writer.flush()
+        self.assertEqual(self.read(), {'a': 1})
+        writer.schedule({'a': 1})
+        writer.flush()
+        writer.close()
+        self.assertEqual((writer.writes, writer.skipped), (1, 1))
+
+        # Writer mới đọc nội dung hiện có, không ghi lại nếu giống
+        writer = DebouncedWriter(self.path, delay=10, max_delay=10)
+        writer.schedule({'a': 1})
+        writer.close()
+        self.assertEqual((writer.writes, writer.skipped), (0, 1))
+
+    def test_atomic_write_keeps_old_file_on_error(self):
+        """Test lỗi giữa lúc ghi không làm hỏng file cũ"""
+        atomic_write_text(self.path, '{"ok": true}')
+        with mock.patch.object(settings_store.os, 'replace', side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                atomic_write_text(self.path, '{"ok": fal')
+        self.assertEqual(self.read(), {'ok': True})
+
+
+class TestSettingsStore(unittest.TestCase):
+    """
+    Test cases cho SettingsStore
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_split_settings_and_state(self):
+        """Test cấu hình và trạng thái được ghi vào hai file riêng"""
+        store = SettingsStore(self.tmp.name, delay=10)
+        store.save_settings({'headless': True})
+        store.save_state({'purchased_today': ['a@b.c'], 'purchased_date': '2024-05-01'})
+        store.close()
+
+        settings, state = SettingsStore(self.tmp.name).load()
+        self.assertEqual(settings, {'headless': True})
+        self.assertEqual(state['purchased_today'], ['a@b.c'])
+
+    def test_migrates_state_from_settings(self):
+        """Test settings.json kiểu cũ (có purchased_today) vẫn load được trạng thái"""
+        with open(os.path.join(self.tmp.name, 'settings.json'), 'w', encoding='utf-8') as f:
+            json.dump({'headless': False, 'purchased_today': ['x@y.z'], 'purchased_date': '2024-05-01'}, f)
+        store = SettingsStore(self.tmp.name)
+        settings, state = store.load()
+        store.close()
+        self.assertEqual(settings, {'headless': False})
+        self.assertEqual(state, {'purchased_today': ['x@y.z'], 'purchased_date': '2024-05-01'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cases cho server giả lập er-sports.com (không cần Chrome)
+"""
+
+import unittest
+import sys
+import os
+import http.cookiejar
+import urllib.request
+import urllib.parse
+
+# Thêm src vào path để import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from standin_server import StandInShop, serve_in_thread, listing_path
+from benchmark import percentile
+
+
+class TestStandInServer(unittest.TestCase):
+    """
+    Test cases cho StandInServer
+    """
+
+    def setUp(self):
+        self.server = serve_in_thread(StandInShop(pages=2, per_page=5, product_ids=['MEZZ']))
+        jar = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def get(self, path, data=None):
+        if data is not None:
+            data = urllib.parse.urlencode(data).encode('utf-8')
+        with self.opener.open(self.server.base_url + path, data=data) as response:
+            return response.geturl(), response.read().decode('utf-8')
+
+    def test_index_has_login_link(self):
+        """
+        Trang chủ có link ssl_login('login')
+        """
+        _, body = self.get('/index.html')
+        self.assertIn("ssl_login('login')", body)
+        self.assertNotIn('logout', body)
+
+    def test_listing_pagination_and_product(self):
+        """
+        Listing có li.next "次の…件" và sản phẩm chứa product ID ở trang cuối
+        """
+        _, page1 = self.get(listing_path())
+        self.assertIn('class="next"', page1)
+        self.assertIn('次の5件', page1)
+        self.assertIn('/shopdetail/', page1)
+        self.assertNotIn('MEZZ', page1)
+
+        _, page2 = self.get(listing_path() + '&page=2')
+        self.assertNotIn('class="next"', page2)
+        self.assertIn('MEZZ', page2)
+
+    def test_full_purchase_flow(self):
+        """
+        Login -> thêm giỏ hàng -> checkout -> xác nhận tạo đơn hàng
+        """
+        _, body = self.get('/shop/login.html', {'id': 'user@example.com', 'passwd': 'secret'})
+        self.assertIn('logout', body)
+
+        code = next(c for c, name in self.server.shop.catalog[-1] if 'MEZZ' in name)
+        _, detail = self.get(f'/shopdetail/{code}/')
+        self.assertIn('item-basket-btn', detail)
+        self.assertIn('btn-basket', detail)
+
+        url, basket = self.get('/shop/basket.html', {'add': code})
+        self.assertTrue(url.endswith('/shop/basket.html'))
+        self.assertIn('table class="basket"', basket)
+        self.assertIn('basket_clear', basket)
+        self.assertIn('sslorder', basket)
+
+        _, order = self.get('/ssl/sslorder.html')
+        self.assertIn('name="checkout"', order)
+        _, done = self.get('/ssl/sslorder.html', {})
+        self.assertIn('ご注文ありがとうございました', done)
+        self.assertEqual(len(self.server.shop.orders), 1)
+
+        _, basket = self.get('/shop/basket.html')
+        self.assertIn('買い物かごに商品がありません', basket)
+
+    def test_unknown_detail_is_404(self):
+        """
+        Trang chi tiết không tồn tại trả về 404
+        """
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            self.get('/shopdetail/999999999999/')
+        self.assertEqual(ctx.exception.code, 404)
+
+
+class TestPercentile(unittest.TestCase):
+    """
+    Test cases cho hàm percentile của benchmark
+    """
+
+    def test_percentile(self):
+        values = [1, 2, 3, 4, 5]
+        self.assertEqual(percentile(values, 50), 3)
+        self.assertEqual(percentile(values, 100), 5)
+        self.assertAlmostEqual(percentile(values, 90), 4.6)
+        self.assertIsNone(percentile([], 50))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
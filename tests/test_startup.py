@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cases cho đo thời gian khởi động và import lazy
+"""
+
+import unittest
+import sys
+import os
+import subprocess
+
+# Thêm src vào path để import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from startup import StartupProfile
+
+SRC = os.path.join(os.path.dirname(__file__), '..', 'src')
+
+
+class FakeClock:
+    """
+    Đồng hồ giả: mỗi lần gọi tăng thêm step giây
+    """
+
+    def __init__(self, step=0.01):
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+class TestStartupProfile(unittest.TestCase):
+    """
+    Test cases cho StartupProfile
+    """
+
+    def test_phases_and_marks(self):
+        """Test giai đoạn đo bằng phase/add, mốc chỉ ghi lần đầu"""
+        clock = FakeClock()
+        profile = StartupProfile(origin=0.0, clock=clock)
+        profile.add("import", 0.0, 0.2)
+        with profile.phase("create_widgets"):
+            pass
+        first = profile.mark("first_window")
+        self.assertEqual(profile.mark("first_window"), first)
+
+        fields = profile.fields()
+        self.assertEqual(fields['phases']['import'], 0.2)
+        self.assertAlmostEqual(fields['phases']['create_widgets'], 0.01)
+        self.assertAlmostEqual(fields['first_window'], 0.03)
+
+        report = profile.report(modules=('sys', 'module_khong_co'))
+        self.assertIn("create_widgets", report)
+        self.assertIn("-> first_window", report)
+        self.assertIn("Module nặng đã import: sys", report)
+
+
+class TestLazyImports(unittest.TestCase):
+    """
+    Module GUI không import selenium/webdriver-manager khi khởi động
+    """
+
+    def run_code(self, code):
+        output = subprocess.run([sys.executable, '-c', code], cwd=SRC, capture_output=True, text=True, check=True)
+        return output.stdout.strip()
+
+    def test_main_does_not_import_selenium(self):
+        """Test import main không kéo theo selenium, BrowserAutomation nạp khi dùng tới"""
+        code = ("import sys, main; print('selenium' in sys.modules, 'webdriver_manager' in sys.modules); "
+                "main.BrowserAutomation; print('selenium' in sys.modules)")
+        self.assertEqual(self.run_code(code).splitlines(), ['False False', 'True'])
+
+    def test_import_profile(self):
+        """Test profile import của main.py có sẵn các giai đoạn import"""
+        code = "import main; print(sorted(main.import_profile().fields()['phases']))"
+        self.assertEqual(self.run_code(code), "['import module nội bộ', 'import tkinter + stdlib']")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cases cho thống kê dạng snapshot
+"""
+
+import unittest
+import sys
+import os
+import threading
+import dataclasses
+
+# Thêm src vào path để import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from stats import StatsCollector, format_duration
+from tracing import Tracer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStatsCollector(unittest.TestCase):
+    """
+    Test cases cho StatsCollector
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.stats = StatsCollector(rate_window=60, latency_samples=10, clock=self.clock)
+
+    def test_counters_and_rate(self):
+        """Test bộ đếm, tỷ lệ thành công và số lần quét mỗi phút"""
+        for _ in range(4):
+            self.clock.now += 5
+            self.stats.record_scan()
+        self.stats.record_result(False)
+        self.stats.record_result(True)
+        self.clock.now += 10
+
+        snapshot = self.stats.snapshot()
+        self.assertEqual((snapshot.scans, snapshot.successes, snapshot.failures), (4, 1, 1))
+        self.assertEqual(snapshot.success_rate, 25.0)
+        self.assertAlmostEqual(snapshot.scans_per_minute, 4 / 30 * 60)
+        self.assertEqual(snapshot.since_last_success, 10)
+
+        # Ra khỏi cửa sổ 60 giây thì không còn tính vào tốc độ
+        self.clock.now += 100
+        self.assertEqual(self.stats.snapshot().scans_per_minute, 0)
+        self.assertEqual(self.stats.snapshot().scans, 4)
+
+    def test_snapshot_is_immutable(self):
+        """Test snapshot không bị thay đổi bởi cập nhật sau đó"""
+        self.stats.record_scan()
+        snapshot = self.stats.snapshot()
+        self.stats.record_scan()
+        self.assertEqual(snapshot.scans, 1)
+        self.assertGreater(self.stats.snapshot().version, snapshot.version)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            snapshot.scans = 5
+
+    def test_step_latency(self):
+        """Test p50/p95 theo bước trên các lần đo gần nhất"""
+        for index in range(20):
+            spans = {'name': 'purchase', 'duration': 2.0,
+                     'children': [{'name': 'checkout', 'duration': float(index)}]}
+            self.stats.record_flow('purchase', spans)
+        self.stats.record_flow('purchase', None)
+        step, = self.stats.snapshot().steps
+        self.assertEqual(step.name, 'purchase.checkout')
+        self.assertEqual(step.count, 10)
+        self.assertEqual(step.p50, 14.5)
+        self.assertAlmostEqual(step.p95, 18.55)
+
+    def test_current_step_from_tracer(self):
+        """Test bước đang chạy được cập nhật qua listener của Tracer"""
+        tracer = Tracer(listener=self.stats.set_current_step)
+        with tracer.span('purchase'):
+            tracer.step('detail_page')
+            self.clock.now += 3
+            snapshot = self.stats.snapshot()
+            self.assertEqual(snapshot.current_step, 'detail_page')
+            self.assertEqual(snapshot.current_step_elapsed, 3)
+            tracer.end_step()
+            self.assertEqual(self.stats.snapshot().current_step, 'purchase')
+        self.assertIsNone(self.stats.snapshot().current_step)
+
+    def test_thread_safety(self):
+        """Test ghi từ nhiều thread không mất số đếm"""
+        def worker():
+            for _ in range(1000):
+                self.stats.record_scan()
+                self.stats.record_result(True)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        snapshot = self.stats.snapshot()
+        self.assertEqual((snapshot.scans, snapshot.successes), (4000, 4000))
+
+    def test_reset(self):
+        """Test reset xóa toàn bộ số liệu"""
+        self.stats.record_scan()
+        self.stats.record_result(True)
+        self.stats.reset()
+        snapshot = self.stats.snapshot()
+        self.assertEqual((snapshot.scans, snapshot.steps, snapshot.since_last_success), (0, (), None))
+
+    def test_format_duration(self):
+        """Test định dạng thời gian cho label"""
+        self.assertEqual(format_duration(None), "-")
+        self.assertEqual(format_duration(45.7), "45s")
+        self.assertEqual(format_duration(725), "12m05s")
+        self.assertEqual(format_duration(12000), "3h20m")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cases cho span tracer và Chrome trace export
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Thêm src vào path để import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from tracing import Tracer
+
+
+class TestTracer(unittest.TestCase):
+    """
+    Test cases cho Tracer
+    """
+
+    def test_steps_are_sequential_children(self):
+        """
+        step() kết thúc bước trước và các bước là con của span cha
+        """
+        tracer = Tracer()
+        with tracer.span('purchase', product_id='MEZZ') as span:
+            tracer.step('basket_clear')
+            tracer.step('listing_page', page=1)
+            with tracer.span('product_match'):
+                pass
+            tracer.step('detail_page')
+
+        tree = tracer.breakdown(span)
+        self.assertEqual(tree['args'], {'product_id': 'MEZZ'})
+        self.assertEqual([c['name'] for c in tree['children']],
+                         ['basket_clear', 'listing_page', 'detail_page'])
+        self.assertEqual(tree['children'][1]['children'][0]['name'], 'product_match')
+
+    def test_open_steps_closed_on_early_exit(self):
+        """
+        Step đang mở được đóng khi span cha thoát (kể cả khi có exception)
+        """
+        tracer = Tracer()
+        with self.assertRaises(ValueError):
+            with tracer.span('login'):
+                tracer.step('open_home')
+                raise ValueError("boom")
+
+        with tracer.span('purchase') as span:
+            pass
+        # Span mới là root, không bị lồng vào step cũ
+        self.assertNotIn('children', tracer.breakdown(span))
+
+    def test_export_chrome_trace(self):
+        """
+        File xuất ra đúng định dạng trace-event
+        """
+        tracer = Tracer()
+        with tracer.span('login'):
+            tracer.step('submit')
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'trace.json')
+            self.assertEqual(tracer.export_chrome_trace(path), 2)
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+
+        events = [e for e in data['traceEvents'] if e['ph'] == 'X']
+        self.assertEqual({e['name'] for e in events}, {'login', 'submit'})
+        for event in events:
+            self.assertIn('ts', event)
+            self.assertGreaterEqual(event['dur'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cases cho wait engine (không cần Chrome)
+"""
+
+import unittest
+import sys
+import os
+import time
+
+# Thêm src vào path để import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from selenium.common.exceptions import TimeoutException
+from waits import WaitEngine, FlowStats
+
+
+class FakeDriver:
+    """
+    Driver giả lập: readyState chuyển sang 'complete' sau một số lần poll
+    """
+
+    def __init__(self, ready_after=0, url="http://localhost/index.html"):
+        self.ready_after = ready_after
+        self.polls = 0
+        self.current_url = url
+
+    def execute_script(self, script, *args):
+        self.polls += 1
+        return "complete" if self.polls > self.ready_after else "loading"
+
+
+class TestWaitEngine(unittest.TestCase):
+    """
+    Test cases cho WaitEngine
+    """
+
+    def test_document_ready_returns_without_fixed_sleep(self):
+        """
+        Trang đã sẵn sàng thì không phải chờ
+        """
+        engine = WaitEngine(FakeDriver(ready_after=0))
+        started = time.perf_counter()
+        self.assertTrue(engine.document_ready())
+        self.assertLess(time.perf_counter() - started, 0.1)
+
+    def test_document_ready_polls_until_complete(self):
+        """
+        Chờ đến khi readyState chuyển sang complete
+        """
+        driver = FakeDriver(ready_after=2)
+        engine = WaitEngine(driver, poll_frequency=0.01)
+        self.assertTrue(engine.document_ready())
+        self.assertEqual(driver.polls, 3)
+
+    def test_step_timeout(self):
+        """
+        Timeout riêng cho từng bước được áp dụng
+        """
+        engine = WaitEngine(FakeDriver(), timeouts={'url_change': 0.05}, poll_frequency=0.01)
+        with self.assertRaises(TimeoutException):
+            engine.url_contains("basket.html")
+        self.assertIsNone(engine.optional(engine.url_contains, "basket.html"))
+        self.assertTrue(engine.url_contains("index.html"))
+
+    def test_flow_report_splits_waiting_and_working(self):
+        """
+        Báo cáo tách thời gian chờ và thời gian làm việc
+        """
+        stats = FlowStats()
+        engine = WaitEngine(FakeDriver(), timeouts={'url_change': 0.05}, poll_frequency=0.01,
+                            flow_stats=stats)
+        with engine.flow('purchase') as timing:
+            engine.optional(engine.url_contains, "basket.html")
+            time.sleep(0.02)
+
+        self.assertGreaterEqual(timing['waiting'], 0.05)
+        self.assertGreaterEqual(timing['working'], 0.02)
+        report = stats.report()
+        self.assertEqual(report['purchase']['runs'], 1)
+        self.assertAlmostEqual(report['purchase']['total'],
+                               report['purchase']['waiting'] + report['purchase']['working'], places=2)
+
+
+class NavigatingDriver:
+    """
+    Driver giả lập strategy 'none': get() trả về khi document cũ vẫn còn
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.marked = False
+        self.state = "complete"
+
+    def execute_script(self, script, *args):
+        self.calls.append(script)
+        if script.startswith("window.__ersNavigating"):
+            self.marked = True
+            return None
+        if self.marked:
+            # Document mới commit sau lần poll đầu tiên
+            self.marked = False
+            self.state = "interactive"
+            return "navigating"
+        return self.state
+
+    def get(self, url):
+        self.calls.append(('get', url))
+
+
+class SlowPageDriver(NavigatingDriver):
+    """
+    Driver giả lập trang vượt page load timeout: get() raise TimeoutException
+    """
+
+    def get(self, url):
+        super().get(url)
+        raise TimeoutException("timeout: Timed out receiving message from renderer")
+
+
+class TestPageLoadStrategy(unittest.TestCase):
+    """
+    Test cases cho việc chờ theo page load strategy
+    """
+
+    def test_ready_state_by_strategy(self):
+        """Test trạng thái document cần chờ theo strategy"""
+        self.assertEqual(WaitEngine().ready_state, 'complete')
+        self.assertEqual(WaitEngine(page_load_strategy='eager').ready_state, 'interactive')
+        self.assertEqual(WaitEngine(page_load_strategy='none').ready_state, 'interactive')
+
+    def test_none_strategy_waits_for_new_document(self):
+        """Test strategy 'none' đánh dấu document cũ và chờ document mới"""
+        driver = NavigatingDriver()
+        engine = WaitEngine(driver, poll_frequency=0.01, page_load_strategy='none')
+        self.assertTrue(engine.navigate("http://localhost/shop/basket.html"))
+        self.assertTrue(driver.calls[0].startswith("window.__ersNavigating"))
+        self.assertEqual(driver.calls[1], ('get', "http://localhost/shop/basket.html"))
+        self.assertEqual(driver.state, "interactive")
+
+    def test_normal_strategy_does_not_mark(self):
+        """Test strategy 'normal' không tốn thêm round trip"""
+        driver = NavigatingDriver()
+        engine = WaitEngine(driver, poll_frequency=0.01)
+        engine.navigate("http://localhost/index.html")
+        self.assertEqual(driver.calls[0], ('get', "http://localhost/index.html"))
+
+    def test_page_load_timeout_stops_loading(self):
+        """Test get() vượt page load timeout: dừng tải và để document_ready quyết định"""
+        driver = SlowPageDriver()
+        engine = WaitEngine(driver, poll_frequency=0.01)
+        self.assertTrue(engine.navigate("http://localhost/index.html"))
+        self.assertEqual(driver.calls[:2], [('get', "http://localhost/index.html"), "window.stop();"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test cases cho watchdog bộ nhớ Chrome và dọn process mồ côi
+"""
+
+import unittest
+import sys
+import os
+import json
+import subprocess
+import tempfile
+import time
+
+# Thêm src vào path để import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from watchdog import ChromeWatchdog, ProcessInfo, ProcessRegistry, ProcfsProcesses, PIDS_FILENAME, MB
+
+HAS_PROCFS = os.path.isdir('/proc/self')
+
+
+class FakeProcesses:
+    """
+    Cây process giả: pid -> (RSS MB, CPU giây), process con theo pid cha
+    """
+
+    name = 'fake'
+
+    def __init__(self):
+        self.usage = {}
+        self.children = {}
+
+    def tree(self, pid):
+        if pid not in self.usage:
+            return []
+        return [pid] + list(self.children.get(pid, ()))
+
+    def info(self, pid):
+        if pid not in self.usage:
+            return None
+        rss_mb, cpu = self.usage[pid]
+        return ProcessInfo(pid, 'chrome', 0.0, int(rss_mb * MB), cpu)
+
+    def kill(self, pid):
+        self.usage.pop(pid, None)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestChromeWatchdog(unittest.TestCase):
+    """
+    Test cases cho ChromeWatchdog
+    """
+
+    def setUp(self):
+        self.processes = FakeProcesses()
+        self.processes.usage = {100: (50, 1.0), 101: (300, 10.0)}
+        self.processes.children = {100: [101]}
+        self.clock = FakeClock()
+
+    def watchdog(self, **kwargs):
+        return ChromeWatchdog(processes=self.processes, clock=self.clock, **kwargs)
+
+    def test_rss_threshold_and_interval(self):
+        """Test đo tổng RSS cả cây process, chỉ đo lại sau interval"""
+        watchdog = self.watchdog(max_rss_mb=500, interval=30)
+        watchdog.attach(100)
+        self.assertIsNone(watchdog.check())
+        self.assertEqual((watchdog.last_sample.rss_mb, watchdog.last_sample.processes), (350.0, 2))
+        self.assertFalse(watchdog.near_limit())
+
+        self.processes.usage[101] = (480, 12.0)
+        self.clock.now = 10
+        self.assertIsNone(watchdog.check())
+        self.assertEqual(len(watchdog.samples), 1)
+
+        self.clock.now = 30
+        self.assertEqual(watchdog.check(), "RSS 530 MB > 500 MB")
+        self.assertTrue(watchdog.near_limit())
+        watchdog.record_recycle("RSS 530 MB > 500 MB")
+
+        report = watchdog.report()
+        self.assertEqual(report['peak_rss_mb'], 530.0)
+        self.assertEqual(report['series'], [[0.0, 350.0, 0.0, 2], [30.0, 530.0, 6.7, 2]])
+        self.assertEqual(report['recycles'], [{'elapsed': 30.0, 'reason': "RSS 530 MB > 500 MB"}])
+        # Đã bỏ theo dõi browser cũ
+        self.assertIsNone(watchdog.check())
+
+    def test_cpu_sustained(self):
+        """Test CPU chỉ tính khi vượt ngưỡng nhiều lần đo liên tiếp"""
+        watchdog = self.watchdog(max_rss_mb=0, max_cpu_percent=90, cpu_samples=2, interval=10)
+        watchdog.attach(100)
+        self.assertIsNone(watchdog.check())
+        # CPU time tăng thêm mỗi 10 giây: 10s (100%), 1s (10%), 10s, 10s
+        results = []
+        for now, cpu in ((10, 20.0), (20, 21.0), (30, 31.0), (40, 41.0)):
+            self.clock.now = now
+            self.processes.usage[101] = (300, cpu)
+            results.append(watchdog.check())
+        self.assertEqual(results[:3], [None, None, None])
+        self.assertEqual(results[3], "CPU 100% > 90% trong 2 lần đo liên tiếp")
+        self.assertEqual([sample.cpu_percent for sample in watchdog.samples], [0.0, 100.0, 10.0, 100.0, 100.0])
+
+    def test_disabled_without_backend(self):
+        """Test không đọc được process thì watchdog tắt"""
+        watchdog = ChromeWatchdog()
+        watchdog.processes = None
+        watchdog.attach(100)
+        self.assertFalse(watchdog.enabled)
+        self.assertIsNone(watchdog.check())
+        self.assertIsNone(watchdog.report()['peak_rss_mb'])
+
+
+@unittest.skipUnless(HAS_PROCFS, "cần /proc (Linux)")
+class TestProcessRegistry(unittest.TestCase):
+    """
+    Test cases cho ProcessRegistry với process thật (/proc)
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, PIDS_FILENAME)
+        self.processes = ProcfsProcesses()
+        self.spawned = []
+
+    def tearDown(self):
+        for process in self.spawned:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+        self.tmp.cleanup()
+
+    def spawn_tree(self):
+        """Process cha (giống ChromeDriver) có một process con (giống Chrome)"""
+        process = subprocess.Popen(['/bin/sh', '-c', 'sleep 30 & wait'])
+        self.spawned.append(process)
+        deadline = time.monotonic() + 5
+        while len(self.processes.tree(process.pid)) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return process
+
+    def dead_pid(self):
+        process = subprocess.Popen(['/bin/sh', '-c', 'exit 0'])
+        process.wait()
+        return process.pid
+
+    def test_procfs_tree(self):
+        """Test đọc cây process, RSS và tên qua /proc"""
+        process = self.spawn_tree()
+        tree = self.processes.tree(process.pid)
+        self.assertEqual(len(tree), 2)
+        info = self.processes.info(tree[1])
+        self.assertEqual(info.name, 'sleep')
+        self.assertGreater(info.rss, 0)
+        self.assertEqual(self.processes.tree(self.dead_pid()), [])
+
+    def test_sweep_orphans_of_dead_app(self):
+        """Test mở app: kill process do app trước (đã thoát) khởi động, kể cả process con"""
+        process = self.spawn_tree()
+        child = self.processes.tree(process.pid)[1]
+        ProcessRegistry(self.path, processes=self.processes, owner=self.dead_pid()).register(process.pid)
+        with open(self.path, encoding='utf-8') as f:
+            self.assertEqual(len(json.load(f)['groups'][str(process.pid)]['processes']), 2)
+
+        registry = ProcessRegistry(self.path, processes=self.processes)
+        self.assertEqual(registry.sweep(), 2)
+        self.assertEqual(process.wait(5), -9)
+        self.assertIsNone(self.processes.info(child))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_sweep_keeps_live_owner_and_reused_pid(self):
+        """Test không kill process của app đang chạy, không kill PID đã bị cấp lại cho process khác"""
+        process = self.spawn_tree()
+        ProcessRegistry(self.path, processes=self.processes).register(process.pid)
+        other = ProcessRegistry(self.path, processes=self.processes, owner=12345678)
+        # Chủ là process test này (đang chạy): app khác mở lên không được đụng tới
+        self.assertEqual(other.sweep(), 0)
+        self.assertIsNone(process.poll())
+
+        # PID trong file trỏ tới process khởi động ở thời điểm khác (PID bị dùng lại)
+        with open(self.path, encoding='utf-8') as f:
+            data = json.load(f)
+        group = data['groups'][str(process.pid)]
+        group['owner'] = self.dead_pid()
+        for entry in group['processes']:
+            entry['created'] -= 100
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        self.assertEqual(ProcessRegistry(self.path, processes=self.processes).sweep(), 0)
+        self.assertIsNone(process.poll())
+
+    def test_release_and_own_sweep(self):
+        """Test release() kill process còn sót sau khi đóng, sweep(own=True) lúc đóng app"""
+        first = self.spawn_tree()
+        second = self.spawn_tree()
+        registry = ProcessRegistry(self.path, processes=self.processes)
+        registry.register(first.pid)
+        registry.register(second.pid)
+        self.assertEqual(registry.release(first.pid), 2)
+        self.assertEqual(first.wait(5), -9)
+        self.assertEqual(registry.sweep(), 0)
+        self.assertIsNone(second.poll())
+        self.assertEqual(registry.sweep(own=True), 2)
+        self.assertEqual(second.wait(5), -9)
+
+
+if __name__ == '__main__':
+    unittest.main()